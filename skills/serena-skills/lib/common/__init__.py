@@ -3,24 +3,34 @@ Common utilities for Serena Skills
 """
 from .utils import (
     load_project_config,
+    load_ignore_pattern_lines,
     load_ignore_patterns,
     is_ignored_path,
+    is_ignored_entry,
     validate_relative_path,
-    limit_output_length,
+    paginate_output,
+    encode_continuation_token,
+    decode_continuation_token,
     format_error,
     replace_content_advanced,
+    write_file_atomic,
     create_lsp_settings,
     get_project_language,
 )
 
 __all__ = [
     'load_project_config',
+    'load_ignore_pattern_lines',
     'load_ignore_patterns',
     'is_ignored_path',
+    'is_ignored_entry',
     'validate_relative_path',
-    'limit_output_length',
+    'paginate_output',
+    'encode_continuation_token',
+    'decode_continuation_token',
     'format_error',
     'replace_content_advanced',
+    'write_file_atomic',
     'create_lsp_settings',
     'get_project_language',
 ]
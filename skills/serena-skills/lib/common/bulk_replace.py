@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Content replacement across many files, processed in parallel by a pool of worker processes
+"""
+import difflib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .utils import replace_content_advanced, write_file_atomic
+
+# below this number of files, the files are processed in the calling process (starting workers would take longer)
+MIN_FILES_PER_WORKER = 8
+
+
+def replace_in_file(
+    project_root: str,
+    file: str,
+    needle: str,
+    repl: str,
+    mode: str = "literal",
+    allow_multiple: bool = False,
+    dry_run: bool = False
+) -> dict[str, Any]:
+    """
+    Replace content in a single file; the file is written atomically and keeps its line endings
+
+    :param dry_run: whether to compute a unified diff of the changes instead of writing the file
+    :return: a dict with the file, the number of replacements ("count"), the line of the first match
+        ("first_match_line", if any), the "diff" (in dry-run mode, if any) or the "error" which occurred
+    """
+    result: dict[str, Any] = {"file": file, "count": 0}
+    try:
+        file_path = os.path.join(project_root, file)
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+            # the line ending found in the file (None if there is none or there are several)
+            newline = f.newlines if isinstance(f.newlines, str) else None
+
+        # files without matches are skipped without computing replacements
+        if mode == "literal":
+            if needle not in content:
+                return result
+        elif mode == "regex":
+            if re.search(needle, content, re.DOTALL | re.MULTILINE) is None:
+                return result
+
+        new_content, count, first_match_line = replace_content_advanced(content, needle, repl, mode, allow_multiple)
+        result["count"] = count
+        result["first_match_line"] = first_match_line
+        if dry_run:
+            diff = difflib.unified_diff(
+                content.splitlines(keepends=True), new_content.splitlines(keepends=True), "a/" + file, "b/" + file
+            )
+            result["diff"] = "".join(diff)
+        elif new_content != content:
+            write_file_atomic(file_path, new_content, newline=newline)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _replace_in_file_args(args: tuple) -> dict[str, Any]:
+    return replace_in_file(*args)
+
+
+def bulk_replace(
+    project_root: str,
+    files: list[str],
+    needle: str,
+    repl: str,
+    mode: str = "literal",
+    allow_multiple: bool = False,
+    dry_run: bool = False,
+    max_workers: int | None = None
+) -> dict[str, Any]:
+    """
+    Replace content in many files, each of which is processed independently (an error in one file does not prevent
+    the replacements in the others)
+
+    :param max_workers: the number of worker processes (default: number of CPUs)
+    :return: the results of the files which contain matches or could not be processed (see replace_in_file), in the
+        order of the given files, and totals
+    """
+    if mode not in ("literal", "regex"):
+        raise ValueError(f"Invalid mode: {mode}. Must be 'literal' or 'regex'")
+    if mode == "regex":
+        # fail early (instead of once per file) for invalid patterns
+        re.compile(needle, re.DOTALL | re.MULTILINE)
+
+    tasks = [(project_root, file, needle, repl, mode, allow_multiple, dry_run) for file in files]
+    num_workers = min(max_workers or os.cpu_count() or 1, len(tasks) // MIN_FILES_PER_WORKER)
+    if num_workers <= 1:
+        results = [_replace_in_file_args(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunksize = max(1, len(tasks) // (num_workers * 4))
+            results = list(executor.map(_replace_in_file_args, tasks, chunksize=chunksize))
+
+    reported = [r for r in results if r["count"] > 0 or "error" in r]
+    return {
+        "files": reported,
+        "files_scanned": len(files),
+        "files_changed": sum(1 for r in reported if r["count"] > 0 and "error" not in r),
+        "replacements": sum(r["count"] for r in reported if "error" not in r),
+        "errors": sum(1 for r in reported if "error" in r),
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Store of the project memories (markdown files in .tmp/.serena-skills/memories) with a persistent inverted index
+for ranked (BM25) search.
+
+The index maps each token to the memories containing it (with the number of occurrences) and stores the modification
+time and size of each indexed memory. It is updated incrementally: memories written, edited or deleted through the
+store are re-indexed immediately, and memories changed by other means are detected by their modification time and
+size (one directory scan), such that only changed memories are read.
+"""
+import math
+import os
+import pickle
+import re
+import tempfile
+import time
+from collections import Counter
+from typing import Any
+
+from .utils import get_project_data_dir, replace_content_advanced, write_file_atomic
+
+MEMORY_INDEX_FILENAME = "memory_index.pkl"
+MEMORY_INDEX_VERSION = 1
+MEMORY_EXTENSION = ".md"
+
+# memories modified within this margin before they were indexed are re-indexed on the next update, as changes made
+# within the same timestamp granularity could otherwise go unnoticed
+RACY_MTIME_MARGIN_NS = 2_000_000_000
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# the tokens of a memory's name are counted this many times (names are short and descriptive)
+NAME_TOKEN_WEIGHT = 3
+
+TOKEN_REGEX = re.compile(r"[^\W_]+")
+CAMEL_CASE_PART_REGEX = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into lower-case alphanumeric tokens; mixed-case words (e.g. camelCase identifiers) additionally yield
+    their parts
+
+    :return: the tokens, in order of occurrence
+    """
+    tokens = []
+    for match in TOKEN_REGEX.finditer(text):
+        word = match.group(0)
+        tokens.append(word.lower())
+        if not word.islower() and not word.isupper():
+            parts = CAMEL_CASE_PART_REGEX.findall(word)
+            if len(parts) > 1:
+                tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+def memory_file_name(name: str) -> str:
+    """
+    :return: the file name of the memory with the given name (with or without extension)
+    """
+    return name if name.endswith(MEMORY_EXTENSION) else name + MEMORY_EXTENSION
+
+
+def memory_name(name: str) -> str:
+    """
+    :return: the name of the memory (without extension)
+    """
+    return name[: -len(MEMORY_EXTENSION)] if name.endswith(MEMORY_EXTENSION) else name
+
+
+class MemoryStore:
+    """
+    The memories of a project together with their search index, which is persisted in the project data directory
+    """
+
+    def __init__(self, project_root: str):
+        self.project_root = os.path.abspath(project_root)
+        self.memory_dir = os.path.join(self.project_root, ".tmp", ".serena-skills", "memories")
+        self._index_path = os.path.join(self.project_root, ".tmp", ".serena-skills", MEMORY_INDEX_FILENAME)
+        # memory name -> (mtime_ns, size, indexed_at_ns, number of tokens, distinct tokens)
+        self._docs: dict[str, tuple[int, int, int, int, tuple[str, ...]]] = {}
+        # token -> {memory name: number of occurrences}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+        self._loaded = False
+        self._changed = False
+
+    def _memory_path(self, name: str) -> str:
+        return os.path.join(self.memory_dir, memory_file_name(name))
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self._index_path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            # a corrupted index is rebuilt
+            return
+        if not isinstance(data, dict) or data.get("version") != MEMORY_INDEX_VERSION:
+            return
+        self._docs = data["docs"]
+        self._postings = data["postings"]
+        self._total_length = sum(doc[3] for doc in self._docs.values())
+
+    def save(self) -> None:
+        """
+        Atomically writes the index to the project data directory (if it has changed)
+        """
+        if not self._changed:
+            return
+        data = {"version": MEMORY_INDEX_VERSION, "docs": self._docs, "postings": self._postings}
+        directory = str(get_project_data_dir(self.project_root))
+        fd, tmp_path = tempfile.mkstemp(prefix=MEMORY_INDEX_FILENAME + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._changed = False
+
+    def _remove_from_index(self, name: str) -> None:
+        doc = self._docs.pop(name, None)
+        if doc is None:
+            return
+        self._total_length -= doc[3]
+        for token in doc[4]:
+            postings = self._postings[token]
+            del postings[name]
+            if not postings:
+                del self._postings[token]
+        self._changed = True
+
+    def _add_to_index(self, name: str, content: str, mtime_ns: int, size: int) -> None:
+        self._remove_from_index(name)
+        term_freqs = Counter(tokenize(content))
+        for token in tokenize(name):
+            term_freqs[token] += NAME_TOKEN_WEIGHT
+        for token, freq in term_freqs.items():
+            self._postings.setdefault(token, {})[name] = freq
+        length = sum(term_freqs.values())
+        self._docs[name] = (mtime_ns, size, time.time_ns(), length, tuple(term_freqs))
+        self._total_length += length
+        self._changed = True
+
+    def _index_file(self, name: str) -> None:
+        path = self._memory_path(name)
+        stat_before = os.stat(path)
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        self._add_to_index(name, content, stat_before.st_mtime_ns, stat_before.st_size)
+
+    def update(self) -> bool:
+        """
+        Brings the index up to date with the memory directory, re-indexing the memories which have been added or
+        modified by other means than this store and removing deleted ones
+
+        :return: whether the index has changed
+        """
+        if not self._loaded:
+            self._load()
+        changed_before = self._changed
+        self._changed = False
+        present = set()
+        try:
+            with os.scandir(self.memory_dir) as it:
+                entries = [entry for entry in it if entry.name.endswith(MEMORY_EXTENSION) and entry.is_file()]
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            name = memory_name(entry.name)
+            present.add(name)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            doc = self._docs.get(name)
+            if (
+                doc is not None
+                and doc[0] == stat.st_mtime_ns
+                and doc[1] == stat.st_size
+                and stat.st_mtime_ns < doc[2] - RACY_MTIME_MARGIN_NS
+            ):
+                continue
+            try:
+                self._index_file(name)
+            except OSError:
+                present.discard(name)
+        for name in [name for name in self._docs if name not in present]:
+            self._remove_from_index(name)
+        changed = self._changed
+        self._changed = changed or changed_before
+        return changed
+
+    def list_memories(self) -> list[str]:
+        """
+        :return: the sorted names of the memories
+        """
+        self.update()
+        self.save()
+        return sorted(self._docs)
+
+    def read(self, name: str) -> str:
+        path = self._memory_path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Memory not found: {memory_file_name(name)}")
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def write(self, name: str, content: str) -> None:
+        """
+        Writes (creates or overwrites) a memory (atomically) and updates the index
+        """
+        self.update()
+        os.makedirs(self.memory_dir, exist_ok=True)
+        path = self._memory_path(name)
+        write_file_atomic(path, content)
+        stat = os.stat(path)
+        self._add_to_index(memory_name(name), content, stat.st_mtime_ns, stat.st_size)
+        self.save()
+
+    def edit(self, name: str, needle: str, repl: str, mode: str = "literal") -> tuple[int, int | None]:
+        """
+        Replaces content in a memory (see replace_content_advanced) and updates the index
+
+        :return: the number of replacements and the line of the first match
+        """
+        content = self.read(name)
+        new_content, count, first_match_line = replace_content_advanced(content, needle, repl, mode, allow_multiple=False)
+        self.write(name, new_content)
+        return count, first_match_line
+
+    def delete(self, name: str) -> None:
+        """
+        Deletes a memory and removes it from the index
+        """
+        path = self._memory_path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Memory not found: {memory_file_name(name)}")
+        self.update()
+        os.unlink(path)
+        self._remove_from_index(memory_name(name))
+        self.save()
+
+    def _score(self, query_tokens: list[str]) -> dict[str, float]:
+        num_docs = len(self._docs)
+        avg_length = self._total_length / num_docs if num_docs else 0
+        scores: dict[str, float] = {}
+        for token in set(query_tokens):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, freq in postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self._docs[name][3] / avg_length if avg_length else 1
+                scores[name] = scores.get(name, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + BM25_K1 * length_norm)
+        return scores
+
+    def _snippet(self, name: str, query_tokens: set[str], context_lines: int) -> tuple[int | None, str]:
+        """
+        :return: the line (1-based) of the memory containing the most distinct query tokens (None if the matches are
+            in the memory's name only) and the text around it
+        """
+        lines = self.read(name).splitlines()
+        best_line = None
+        best_hits = 0
+        for i, line in enumerate(lines):
+            hits = len(query_tokens.intersection(tokenize(line)))
+            if hits > best_hits:
+                best_line, best_hits = i, hits
+                if hits == len(query_tokens):
+                    break
+        center = best_line if best_line is not None else 0
+        start = max(0, center - context_lines)
+        snippet = "\n".join(lines[start : center + context_lines + 1])
+        return (best_line + 1 if best_line is not None else None), snippet
+
+    def search(self, query: str, top_k: int = 10, context_lines: int = 1) -> list[dict[str, Any]]:
+        """
+        Searches the memories, ranking them by BM25 score; only the memories which are returned are read (to extract
+        snippets)
+
+        :param context_lines: the number of lines before and after the best matching line to include in snippets
+        :return: the best matches {"name": ..., "score": ..., "line": ..., "snippet": ...}
+        """
+        self.update()
+        self.save()
+        query_tokens = tokenize(query)
+        scores = self._score(query_tokens)
+        best = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:top_k]
+        results = []
+        for name, score in best:
+            try:
+                line, snippet = self._snippet(name, set(query_tokens), context_lines)
+            except OSError:
+                continue
+            results.append({"name": name, "score": round(score, 3), "line": line, "snippet": snippet})
+        return results
+
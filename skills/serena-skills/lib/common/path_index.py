@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Persistent index of the file paths of a project, supporting glob, substring and fuzzy queries.
+
+The index stores the (non-ignored) entries of each directory together with the directory's modification time.
+It is refreshed incrementally: the entries of a directory are only re-read if its modification time has changed
+(which is the case whenever an entry is added, removed or renamed), so a refresh costs one stat call per directory.
+
+The sorted paths are kept in a single newline-separated string, which is loaded quickly and searched with regular
+expressions (i.e. in C) instead of testing the paths one by one; as the paths are sorted, the paths within a
+directory form a contiguous range of the string.
+"""
+import hashlib
+import heapq
+import os
+import pickle
+import re
+import tempfile
+import time
+from typing import Any, Iterator
+
+from .utils import get_project_data_dir, is_ignored_entry, load_ignore_pattern_lines, load_ignore_patterns
+
+PATH_INDEX_FILENAME = "path_index.pkl"
+# the index including the files matched by the ignore patterns is kept separately, such that switching between both
+# kinds of queries does not rebuild (and overwrite) either index
+PATH_INDEX_ALL_FILENAME = "path_index_all.pkl"
+PATH_INDEX_VERSION = 1
+
+# directories which are never indexed, regardless of the ignore patterns
+ALWAYS_IGNORED_DIRS = {".git", ".hg", ".svn"}
+# the project data directory (relative to the project root), which contains the index itself
+PROJECT_DATA_DIR = os.path.join(".tmp", ".serena-skills")
+
+# directory modification times are only trusted if they are older than the previous scan by at least this margin:
+# changes made within the same timestamp granularity as a scan would otherwise go unnoticed
+RACY_MTIME_MARGIN_NS = 2_000_000_000
+
+# fuzzy scoring (similar to fzf): each matched character scores SCORE_MATCH, plus bonuses for matches at word
+# boundaries and for consecutive matches; gaps between matches are penalized
+SCORE_MATCH = 16
+BONUS_BOUNDARY = 8
+BONUS_CAMEL_CASE = 7
+BONUS_CONSECUTIVE = 4
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+BONUS_BASENAME = 10
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+BOUNDARY_CHARS = frozenset("/\\_-. ")
+
+# fuzzy queries are ranked in two stages: all paths containing the query characters in order are ranked by a cheap
+# score (derived from a regular expression match); only the best candidates are then scored exactly
+FUZZY_CANDIDATES_PER_RESULT = 10
+MIN_FUZZY_CANDIDATES = 200
+# the number of alignments of the query which are scored per path (starting at different occurrences of its first character)
+MAX_FUZZY_ALIGNMENTS = 16
+
+
+def fuzzy_score(query: str, path: str) -> int | None:
+    """
+    Scores how well the path matches the query, where the characters of the query must occur in the path in order
+    (case-insensitively, unless the query contains upper case characters)
+
+    :return: the score (higher is better) or None if the path does not match
+    """
+    if not query:
+        return 0
+    text = path if query != query.lower() else path.lower()
+    basename_start = max(path.rfind("/"), path.rfind(os.sep)) + 1
+    best = None
+    start = text.find(query[0])
+    num_alignments = 0
+    while start != -1 and num_alignments < MAX_FUZZY_ALIGNMENTS:
+        score = _score_alignment(query, path, text, start, basename_start)
+        if score is None:
+            # if the query cannot be matched from this position, it cannot be matched from any later one
+            break
+        if best is None or score > best:
+            best = score
+        start = text.find(query[0], start + 1)
+        num_alignments += 1
+    return best
+
+
+def _char_bonus(path: str, pos: int) -> int:
+    if pos == 0 or path[pos - 1] in BOUNDARY_CHARS:
+        return BONUS_BOUNDARY
+    if path[pos].isupper() and path[pos - 1].islower():
+        return BONUS_CAMEL_CASE
+    return 0
+
+
+def _score_alignment(query: str, path: str, text: str, start: int, basename_start: int) -> int | None:
+    score = 0
+    prev = -1
+    pos = start
+    for i, char in enumerate(query):
+        if i > 0:
+            pos = text.find(char, prev + 1)
+            if pos == -1:
+                return None
+        bonus = _char_bonus(path, pos)
+        if i == 0:
+            bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+        elif pos == prev + 1:
+            bonus = max(bonus, BONUS_CONSECUTIVE)
+        else:
+            score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (pos - prev - 2)
+        score += SCORE_MATCH + bonus
+        prev = pos
+    if start >= basename_start:
+        score += BONUS_BASENAME
+    return score
+
+
+def _glob_to_regex(pattern: str, sep: str) -> str:
+    """
+    Translates a glob pattern (*, ?, **, [seq], [!seq]) into a regular expression matching paths with the given
+    separator. The wildcards * and ? match within a path segment (not the separator); a segment consisting of **
+    matches any number of directories (including none) if it is followed by a separator, and anything otherwise.
+    """
+    sep_regex = re.escape(sep)
+    any_char = f"[^{sep_regex}\n]"
+    result = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            if pattern.startswith("*", i) and (i == 1 or pattern[i - 2] == sep) and (i + 1 == n or pattern[i + 1] == sep):
+                if i + 1 == n:
+                    result.append("[^\n]*")
+                else:
+                    result.append(f"(?:[^\n]*{sep_regex})?")
+                i += 2
+            else:
+                result.append(any_char + "*")
+        elif c == "?":
+            result.append(any_char)
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            j = pattern.find("]", j)
+            if j == -1:
+                result.append(re.escape(c))
+                continue
+            content = pattern[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if content.startswith("!"):
+                content = f"^{sep_regex}\n" + content[1:]
+            elif content.startswith("^"):
+                content = "\\" + content
+            result.append(f"[{content}]")
+        else:
+            result.append(re.escape(c))
+    return "".join(result)
+
+
+def _longest_literal(pattern: str) -> str:
+    """
+    :return: the longest part of a glob pattern which contains no wildcards
+    """
+    return max(re.split(r"[*?]|\[!?\]?[^\]]*\]|\[", pattern), key=len)
+
+
+def _subsequence_regex(query: str) -> str:
+    """
+    :return: a regular expression matching the characters of the query in order within a line, where each character
+        is matched at its first occurrence (such that matching requires no backtracking)
+    """
+    parts = []
+    for i, c in enumerate(query):
+        if i > 0:
+            parts.append(f"[^{re.escape(c)}\n]*")
+        parts.append(re.escape(c))
+    return "".join(parts)
+
+
+class PathIndex:
+    """
+    Index of the file paths (relative to the project root) of a project, persisted in the project data directory
+    """
+
+    def __init__(self, project_root: str, skip_ignored: bool = True):
+        """
+        :param project_root: the project root
+        :param skip_ignored: whether to exclude the files and directories matched by the project's ignore patterns
+        """
+        self.project_root = os.path.abspath(project_root)
+        self.skip_ignored = skip_ignored
+        self._ignore_spec = load_ignore_patterns(self.project_root) if skip_ignored else None
+        self._path = str(get_project_data_dir(self.project_root) / (PATH_INDEX_FILENAME if skip_ignored else PATH_INDEX_ALL_FILENAME))
+        self._key = self._compute_key()
+        # relative directory path ("" for the root) -> (mtime_ns, subdirectory names, newline-separated file names)
+        self._dirs: dict[str, tuple[int, list[str], str]] = {}
+        self._scanned_at_ns = 0
+        # the sorted paths, each followed by a newline, preceded by a newline
+        self._text = "\n"
+        self._lower_text: str | None = None
+        self._load()
+
+    def _compute_key(self) -> str:
+        """
+        :return: a key identifying the parameters of the index (an index with a different key must be rebuilt)
+        """
+        patterns = load_ignore_pattern_lines(self.project_root) if self._ignore_spec is not None else []
+        data = repr((PATH_INDEX_VERSION, self.project_root, os.sep, sorted(ALWAYS_IGNORED_DIRS), PROJECT_DATA_DIR, patterns))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            # a corrupted index is rebuilt
+            return
+        if not isinstance(data, dict) or data.get("key") != self._key:
+            return
+        self._dirs = data["dirs"]
+        self._scanned_at_ns = data["scanned_at_ns"]
+        self._text = data["text"]
+
+    def save(self) -> None:
+        """
+        Atomically writes the index to the project data directory
+        """
+        data = {"key": self._key, "dirs": self._dirs, "scanned_at_ns": self._scanned_at_ns, "text": self._text}
+        directory = os.path.dirname(self._path)
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self._path) + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _scan_directory(self, dir_path: str, rel_dir: str) -> tuple[list[str], str]:
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if "\n" in entry.name:
+                        continue
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        # symbolic links to directories are not followed
+                        if entry.name in ALWAYS_IGNORED_DIRS or entry.is_symlink() or rel_path == PROJECT_DATA_DIR:
+                            continue
+                        if not is_ignored_entry(self._ignore_spec, rel_path, True):
+                            subdirs.append(entry.name)
+                    elif not is_ignored_entry(self._ignore_spec, rel_path, False):
+                        files.append(entry.name)
+        except OSError:
+            pass
+        subdirs.sort()
+        files.sort()
+        return subdirs, "\n".join(files)
+
+    def refresh(self) -> bool:
+        """
+        Updates the index, re-reading the entries of directories which have been modified since the last refresh
+
+        :return: whether the index has changed (and should be saved)
+        """
+        scan_start_ns = time.time_ns()
+        trusted_before_ns = self._scanned_at_ns - RACY_MTIME_MARGIN_NS
+        dirs = {}
+        changed = False
+        paths_changed = False
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            dir_path = os.path.join(self.project_root, rel_dir) if rel_dir else self.project_root
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            cached = self._dirs.get(rel_dir)
+            if cached is not None and cached[0] == mtime_ns and mtime_ns < trusted_before_ns:
+                entry = cached
+            else:
+                subdirs, files = self._scan_directory(dir_path, rel_dir)
+                entry = (mtime_ns, subdirs, files)
+                changed = True
+                if cached is None or cached[1] != subdirs or cached[2] != files:
+                    paths_changed = True
+            dirs[rel_dir] = entry
+            stack.extend(os.path.join(rel_dir, name) if rel_dir else name for name in entry[1])
+        if len(dirs) != len(self._dirs):
+            changed = paths_changed = True
+
+        self._dirs = dirs
+        self._scanned_at_ns = scan_start_ns
+        if paths_changed:
+            paths = sorted(
+                os.path.join(rel_dir, name) if rel_dir else name
+                for rel_dir, (_, _, files) in dirs.items()
+                if files
+                for name in files.split("\n")
+            )
+            self._text = "\n" + "".join(path + "\n" for path in paths)
+            self._lower_text = None
+        return changed
+
+    @property
+    def paths(self) -> list[str]:
+        """
+        The sorted paths of all indexed files
+        """
+        return self._text[1:-1].split("\n") if len(self._text) > 1 else []
+
+    def _get_search_text(self, case_sensitive: bool) -> tuple[str, int]:
+        """
+        :return: the text to search and the flags of the regular expressions to apply
+        """
+        if case_sensitive:
+            return self._text, 0
+        if self._text.isascii():
+            # searching the lower-case text is faster than case-insensitive matching (and positions are identical)
+            if self._lower_text is None:
+                self._lower_text = self._text.lower()
+            return self._lower_text, 0
+        return self._text, re.IGNORECASE
+
+    def _get_range(self, search_path: str) -> tuple[int, int]:
+        """
+        :return: the range of the text containing the paths within the given search path
+        """
+        prefix = os.path.normpath(search_path)
+        if prefix == ".":
+            return 0, len(self._text)
+        prefix = "\n" + prefix + os.sep
+        start = self._text.find(prefix)
+        if start == -1:
+            return 0, 0
+        end = self._text.find("\n", self._text.rfind(prefix) + 1) + 1
+        return start, end
+
+    def _iter_matching_lines(self, regex: re.Pattern, text: str, search_path: str) -> Iterator[tuple[int, int, re.Match]]:
+        """
+        :return: an iterator of triples (start, end, first match) for each path matching the regular expression
+        """
+        pos, end_pos = self._get_range(search_path)
+        while True:
+            match = regex.search(text, pos, end_pos)
+            if match is None:
+                return
+            start = text.rfind("\n", 0, match.start()) + 1
+            end = text.find("\n", match.end())
+            yield start, end, match
+            pos = end + 1
+
+    def glob(self, pattern: str, search_path: str = ".") -> list[str]:
+        """
+        :param pattern: a glob pattern (*, ?, ** and [seq] wildcards, see _glob_to_regex); patterns containing a path
+            separator are matched against the full relative path, other patterns against the file name
+        :return: the sorted paths of the matching files
+        """
+        flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+        pattern = pattern.replace("/", os.sep)
+        if os.sep in pattern:
+            path_regex = re.compile(_glob_to_regex(pattern, os.sep), flags)
+        else:
+            path_regex = re.compile(f"(?:[^\n]*{re.escape(os.sep)})?" + _glob_to_regex(pattern, os.sep), flags)
+        # the paths are searched for the longest literal part of the pattern first (which is much faster than
+        # attempting to match the pattern at every position), and only the paths containing it are matched
+        literal = _longest_literal(pattern)
+        line_regex = re.compile(re.escape(literal) if literal else "(?<=\n)[^\n]", flags)
+        return [
+            self._text[start:end]
+            for start, end, _ in self._iter_matching_lines(line_regex, self._text, search_path)
+            if path_regex.fullmatch(self._text, start, end)
+        ]
+
+    def substring(self, query: str, search_path: str = ".", top_k: int = 20) -> list[dict[str, Any]]:
+        """
+        Finds the paths containing the query (case-insensitively, unless the query contains upper case characters),
+        preferring matches at the start of the file name, then matches in the file name, then shorter paths
+
+        :return: the top_k best matches {"path": ..., "score": ...}, best first
+        """
+        text, flags = self._get_search_text(query != query.lower())
+        regex = re.compile(re.escape(query), flags)
+        scored = []
+        for start, end, _ in self._iter_matching_lines(regex, text, search_path):
+            basename_start = text.rfind(os.sep, start, end) + 1 or start
+            basename_match = regex.search(text, basename_start, end)
+            tier = 0 if basename_match is None else 2 if basename_match.start() == basename_start else 1
+            scored.append((tier * 1000 - (end - start), start, end))
+        best = heapq.nlargest(top_k, scored, key=lambda x: (x[0], -x[1]))
+        return [{"path": self._text[start:end], "score": score} for score, start, end in best]
+
+    def fuzzy(self, query: str, search_path: str = ".", top_k: int = 20) -> list[dict[str, Any]]:
+        """
+        Finds the paths containing the characters of the query in order (fzf-style), ranked by fuzzy_score
+
+        :return: the top_k best matches {"path": ..., "score": ...}, best first
+        """
+        if not query:
+            return []
+        text, flags = self._get_search_text(query != query.lower())
+        regex = re.compile(_subsequence_regex(query), flags)
+
+        # stage 1: cheap score (shorter matches in the file name first)
+        candidates = []
+        for start, end, match in self._iter_matching_lines(regex, text, search_path):
+            basename_start = text.rfind(os.sep, start, end) + 1 or start
+            if match.start() < basename_start:
+                basename_match = regex.search(text, basename_start, end)
+                if basename_match is not None:
+                    match = basename_match
+            in_basename = match.start() >= basename_start
+            candidates.append((in_basename, match.start() - match.end(), start - end, start, end))
+        num_candidates = max(top_k * FUZZY_CANDIDATES_PER_RESULT, MIN_FUZZY_CANDIDATES)
+        if len(candidates) > num_candidates:
+            candidates = heapq.nlargest(num_candidates, candidates)
+
+        # stage 2: exact score
+        scored = []
+        for *_, start, end in candidates:
+            path = self._text[start:end]
+            score = fuzzy_score(query, path)
+            if score is not None:
+                scored.append((score, path))
+        best = heapq.nsmallest(top_k, scored, key=lambda x: (-x[0], len(x[1]), x[1]))
+        return [{"path": path, "score": score} for score, path in best]
+
+
+def open_path_index(project_root: str, refresh: bool = True, skip_ignored: bool = True) -> PathIndex:
+    """
+    Loads the path index of the project (building it on first use)
+
+    :param refresh: whether to update the index (saving it if it has changed)
+    """
+    index = PathIndex(project_root, skip_ignored=skip_ignored)
+    if refresh or not index._dirs:
+        if index.refresh():
+            index.save()
+    return index
@@ -2,23 +2,21 @@
 """
 Common utilities for Serena Skills
 """
+import base64
+import hashlib
+import importlib.util
 import json
 import os
 import re
+import stat
+import tempfile
+from collections.abc import Callable, Iterable
 from pathlib import Path
 from typing import Any
 
-try:
-    import pathspec
-    HAS_PATHSPEC = True
-except ImportError:
-    HAS_PATHSPEC = False
-
-try:
-    import yaml
-    HAS_YAML = True
-except ImportError:
-    HAS_YAML = False
+# The optional dependencies are imported when needed only, as importing them is slow (in particular pathspec)
+HAS_PATHSPEC = importlib.util.find_spec("pathspec") is not None
+HAS_YAML = importlib.util.find_spec("yaml") is not None
 
 
 def load_project_config(project_root: str) -> dict[str, Any]:
@@ -30,18 +28,14 @@ def load_project_config(project_root: str) -> dict[str, Any]:
     if not project_yml.exists():
         return {}
     
+    import yaml
+    
     with open(project_yml, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f) or {}
 
 
-def load_ignore_patterns(project_root: str):
-    """
-    Load and merge ignore patterns from project.yml and .gitignore
-    Returns pathspec.PathSpec if pathspec is available, None otherwise
-    """
-    if not HAS_PATHSPEC:
-        return None
-    
+def load_ignore_pattern_lines(project_root: str) -> list[str]:
+    """Load and merge the ignore patterns (gitignore syntax) from project.yml and .gitignore"""
     patterns = []
     config = load_project_config(project_root)
     
@@ -58,9 +52,23 @@ def load_ignore_patterns(project_root: str):
                     if line and not line.startswith('#'):
                         patterns.append(line)
     
+    return patterns
+
+
+def load_ignore_patterns(project_root: str):
+    """
+    Load and merge ignore patterns from project.yml and .gitignore
+    Returns pathspec.PathSpec if pathspec is available, None otherwise
+    """
+    if not HAS_PATHSPEC:
+        return None
+    
+    patterns = load_ignore_pattern_lines(project_root)
     if not patterns:
         return None
     
+    import pathspec
+    
     # Create pathspec matcher
     return pathspec.PathSpec.from_lines(
         pathspec.patterns.GitWildMatchPattern,
@@ -86,6 +94,22 @@ def is_ignored_path(path: str, project_root: str, ignore_spec=None) -> bool:
     return ignore_spec.match_file(path)
 
 
+def is_ignored_entry(ignore_spec, rel_path: str, is_dir: bool) -> bool:
+    """
+    Check if a directory entry should be ignored (faster than is_ignored_path when walking directories)
+
+    :param ignore_spec: the ignore patterns, as returned by load_ignore_patterns
+    :param rel_path: the path of the entry relative to the project root
+    :param is_dir: whether the entry is a directory
+    """
+    if ignore_spec is None:
+        return False
+    if os.sep != "/":
+        rel_path = rel_path.replace(os.sep, "/")
+    # directory patterns (e.g. "build/") only match paths with a trailing slash
+    return ignore_spec.match_file(rel_path + "/" if is_dir else rel_path)
+
+
 def validate_relative_path(
     project_root: str,
     relative_path: str,
@@ -108,32 +132,87 @@ def validate_relative_path(
         )
 
 
-def limit_output_length(
-    result: Any,
+def _query_fingerprint(query: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(query, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_continuation_token(query: dict[str, Any], position: Any) -> str:
+    """
+    Create a continuation token from which a paginated query resumes
+
+    :param query: the parameters of the query (a token is only valid for the same parameters)
+    :param position: the (JSON-serializable) position of the first result of the next page
+    """
+    token = json.dumps({"q": _query_fingerprint(query), "p": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii")
+
+
+def decode_continuation_token(token: str, query: dict[str, Any]) -> Any:
+    """
+    Get the position encoded in a continuation token
+
+    Raises ValueError if the token is malformed or was created for a different query
+    """
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        fingerprint, position = decoded["q"], decoded["p"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid continuation token: {token}") from e
+    if fingerprint != _query_fingerprint(query):
+        raise ValueError("The continuation token was created for a different query; repeat the query with the same parameters")
+    return position
+
+
+def paginate_output(
+    items: Iterable[tuple[Any, Any]],
     project_root: str,
-    max_chars: int = -1
+    max_chars: int = -1,
+    query: dict[str, Any] | None = None,
+    continuation_token: str | None = None,
+    assemble: Callable[[list[Any]], Any] = list
 ) -> str:
     """
-    Convert result to JSON and limit length based on configuration
-    Returns JSON string or error dict
+    Convert results to JSON, stopping once the output length limit is reached
+
+    The results are consumed lazily, so results beyond the limit are never computed. If the limit is reached,
+    the output is {"results": ..., "continuation_token": ...}, and the query resumes from the first result that was
+    not returned when it is repeated with the token. If all results fit (and no token was given), the output is
+    just the JSON of the results.
+
+    :param items: pairs (position, result), where position is the (JSON-serializable) position from which the
+        producer can resume such that the result is the first one it yields
+    :param project_root: the project root (for the configured max_answer_chars)
+    :param max_chars: the (approximate) maximum output length; -1 for the configured value
+    :param query: the parameters of the query (to which continuation tokens are bound)
+    :param continuation_token: the token with which the query was resumed (if any)
+    :param assemble: a function creating the output object from a list of results
     """
-    config = load_project_config(project_root)
-    
     if max_chars == -1:
-        max_chars = config.get('max_answer_chars', 100000)
-    
-    result_str = json.dumps(result, indent=2)
-    
-    if len(result_str) > max_chars:
-        error_result = {
-            "error": "Output too long",
-            "length": len(result_str),
-            "max_allowed": max_chars,
-            "hint": "Increase max_answer_chars in project.yml or use more specific query"
-        }
-        return json.dumps(error_result, indent=2)
-    
-    return result_str
+        max_chars = load_project_config(project_root).get('max_answer_chars', 100000)
+
+    page = []
+    length = 0
+    next_position = None
+    truncated = False
+    for position, item in items:
+        item_length = len(json.dumps(item, indent=2)) + 4
+        # a page contains at least one result, such that every continuation makes progress
+        if page and length + item_length > max_chars:
+            next_position = position
+            truncated = True
+            break
+        page.append(item)
+        length += item_length
+
+    if not truncated and continuation_token is None:
+        return json.dumps(assemble(page), indent=2)
+    result = {
+        "results": assemble(page),
+        "continuation_token": encode_continuation_token(query or {}, next_position) if truncated else None,
+    }
+    if truncated:
+        result["hint"] = "Output limited to max_answer_chars; repeat the query with --continuation-token to get the next page"
+    return json.dumps(result, indent=2)
 
 
 def format_error(error: Exception, context: dict[str, Any] | None = None) -> str:
@@ -184,11 +263,7 @@ def replace_content_advanced(
         new_content = content.replace(needle, repl)
         
         # Find first match line
-        first_match_line = None
-        for i, line in enumerate(content.split('\n'), 1):
-            if needle.split('\n')[0] in line:
-                first_match_line = i
-                break
+        first_match_line = content.count('\n', 0, content.find(needle)) + 1
         
         return new_content, count, first_match_line
     
@@ -233,7 +308,7 @@ def replace_content_advanced(
         first_match_line = None
         if matches:
             first_match_pos = matches[0].start()
-            first_match_line = content[:first_match_pos].count('\n') + 1
+            first_match_line = content.count('\n', 0, first_match_pos) + 1
         
         return new_content, count, first_match_line
     
@@ -241,6 +316,27 @@ def replace_content_advanced(
         raise ValueError(f"Invalid mode: {mode}. Must be 'literal' or 'regex'")
 
 
+def write_file_atomic(path: str, content: str, encoding: str = "utf-8", newline: str | None = None) -> None:
+    """
+    Write a file via a temporary file in the same directory, which replaces the file once it is complete,
+    such that readers never see a partially written file (the permissions of an existing file are kept)
+    """
+    path = os.path.realpath(path)
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline=newline) as f:
+            f.write(content)
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def create_lsp_settings(project_root: str):
     """Create SolidLSP settings with consistent configuration"""
     from solidlsp.settings import SolidLSPSettings
@@ -322,3 +418,47 @@ def auto_detect_language(project_root: str, file_path: str | None = None, defaul
     
     # Strategy 3: Project scan
     return get_project_language(project_root)
+
+
+def get_project_data_dir(project_root: str) -> Path:
+    """Get (and create) the project-local data directory (.tmp/.serena-skills)"""
+    data_dir = Path(project_root) / ".tmp" / ".serena-skills"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def spawn_detached(cmd: list[str], log_file: Path) -> int:
+    """
+    Launch a command as a detached background process (surviving the calling script),
+    appending its output to the given log file
+
+    :return: the process id
+    """
+    import subprocess
+
+    kwargs: dict[str, Any] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    with open(log_file, "a", encoding="utf-8") as f:
+        process = subprocess.Popen(cmd, stdout=f, stderr=f, stdin=subprocess.DEVNULL, **kwargs)
+    return process.pid
+
+
+def is_process_running(pid: int | None) -> bool:
+    """Check whether a process with the given id is running"""
+    if not pid:
+        return False
+    try:
+        import psutil
+    except ImportError:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return False
+        return True
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
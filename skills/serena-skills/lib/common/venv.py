@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Auto-activation of the virtual environment of Serena Skills for scripts
+"""
+import importlib.util
+import os
+import platform
+import sys
+from pathlib import Path
+
+# top-level modules of the packages required by the scripts (see SETUP.md)
+REQUIRED_MODULES = ("pathspec", "requests", "joblib", "yaml", "psutil", "overrides", "typing_extensions")
+
+
+def get_venv_python(skills_root: Path) -> Path:
+    """Get the path of the interpreter of the virtual environment in skills_root"""
+    if platform.system() == "Windows":
+        return skills_root / ".venv" / "Scripts" / "python.exe"
+    return skills_root / ".venv" / "bin" / "python"
+
+
+def has_required_modules() -> bool:
+    """Check whether the running interpreter provides all required packages (without importing them)"""
+    return all(importlib.util.find_spec(module) is not None for module in REQUIRED_MODULES)
+
+
+def activate_venv(skills_root: Path) -> None:
+    """
+    Re-execute the running script with the interpreter of the virtual environment (if it exists)
+
+    Re-executing starts a new interpreter, so it is skipped if the running interpreter already provides all
+    required packages; set SERENA_SKILLS_USE_VENV=1 to always use the virtual environment
+    """
+    venv_python = get_venv_python(skills_root)
+    if not venv_python.exists() or str(Path(sys.executable).parent) == str(venv_python.parent):
+        return
+    if os.environ.get("SERENA_SKILLS_USE_VENV") != "1" and has_required_modules():
+        return
+    os.execv(str(venv_python), [str(venv_python)] + sys.argv)
@@ -7,9 +7,22 @@ from time import perf_counter
 
 
 # Pickle utilities
-def getstate(obj):
-    """Get state for pickling"""
-    return obj.__dict__ if hasattr(obj, '__dict__') else obj
+def getstate(cls, obj, transient_properties=None, excluded_properties=None):
+    """
+    Get state for pickling (compatible with sensai.util.pickle.getstate)
+
+    :param cls: the class whose state is being retrieved (for compatibility with sensai)
+    :param obj: the object whose state is retrieved
+    :param transient_properties: properties which are to be set to None in the state
+    :param excluded_properties: properties which are to be removed from the state
+    """
+    state = obj.__dict__.copy()
+    for p in transient_properties or ():
+        if p in state:
+            state[p] = None
+    for p in excluded_properties or ():
+        state.pop(p, None)
+    return state
 
 
 def load_pickle(path):
@@ -7,7 +7,6 @@ from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Any, Self
 
-from joblib import Parallel, delayed
 
 # Import from local copy
 try:
@@ -388,7 +387,9 @@ def search_files(
             log.debug(f"Error processing {path}: {e}")
             return {"path": path, "results": [], "error": str(e)}
 
-    # Execute in parallel using joblib
+    # Execute in parallel using joblib (imported lazily, as it is slow to import)
+    from joblib import Parallel, delayed
+
     results = Parallel(
         n_jobs=-1,
         backend="threading",
@@ -1,2 +1,45 @@
 # ruff: noqa
-from .ls import SolidLanguageServer
+if __name__ == "solidlsp":
+    from .ls import SolidLanguageServer
+else:
+    # Imported as a subpackage (e.g. lib.solidlsp by the scripts): the modules of this package import each other as
+    # solidlsp.*, so without aliasing every module would be loaded twice (once per name), which doubles the import
+    # time and yields distinct classes (e.g. two Language enums). Therefore, this package and its modules are
+    # aliased to the top-level package solidlsp.
+    import importlib
+    import importlib.abc
+    import importlib.util
+    import sys
+    from pathlib import Path
+
+    class _AliasLoader(importlib.abc.Loader):
+        def __init__(self, target_name: str):
+            self._target_name = target_name
+            self._target_spec = None
+
+        def create_module(self, spec):
+            module = importlib.import_module(self._target_name)
+            self._target_spec = module.__spec__
+            return module
+
+        def exec_module(self, module) -> None:
+            # the import system set __spec__ to the alias' spec; restore the module's own spec
+            module.__spec__ = self._target_spec
+
+    class _AliasFinder(importlib.abc.MetaPathFinder):
+        def __init__(self, alias_name: str, target_name: str):
+            self._alias_prefix = alias_name + "."
+            self._target_name = target_name
+
+        def find_spec(self, fullname, path, target=None):
+            if not fullname.startswith(self._alias_prefix):
+                return None
+            return importlib.util.spec_from_loader(
+                fullname, _AliasLoader(self._target_name + "." + fullname[len(self._alias_prefix) :])
+            )
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    sys.meta_path.insert(0, _AliasFinder(__name__, "solidlsp"))
+    import solidlsp
+
+    sys.modules[__name__] = solidlsp
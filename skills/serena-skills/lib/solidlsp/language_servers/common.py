@@ -28,6 +28,8 @@ class RuntimeDependency:
     package_version: str | None = None
     extract_path: str | None = None
     description: str | None = None
+    sha256: str | None = None
+    """the expected sha256 digest of the file at `url` (optional; the download is verified against it)"""
 
 
 class RuntimeDependencyCollection:
@@ -85,7 +87,13 @@ class RuntimeDependencyCollection:
         """
         os.makedirs(target_dir, exist_ok=True)
         results: dict[str, str] = {}
-        for dep in self.get_dependencies_for_current_platform():
+        dependencies = self.get_dependencies_for_current_platform()
+        # imported lazily, as it imports requests (slow) and is only needed when dependencies are installed
+        from solidlsp.util.fetcher import FetchRequest, get_default_fetcher
+
+        # the downloads are independent of each other, so they are performed concurrently up front
+        get_default_fetcher().fetch_many([FetchRequest(dep.url, dep.sha256) for dep in dependencies if dep.url])
+        for dep in dependencies:
             if dep.url:
                 self._install_from_url(dep, target_dir)
             if dep.command:
@@ -136,9 +144,9 @@ class RuntimeDependencyCollection:
 
         if dep.archive_type in ("gz", "binary") and dep.binary_name:
             dest = os.path.join(target_dir, dep.binary_name)
-            FileUtils.download_and_extract_archive(dep.url, dest, dep.archive_type)
+            FileUtils.download_and_extract_archive(dep.url, dest, dep.archive_type, dep.sha256)
         else:
-            FileUtils.download_and_extract_archive(dep.url, target_dir, dep.archive_type or "zip")
+            FileUtils.download_and_extract_archive(dep.url, target_dir, dep.archive_type or "zip", dep.sha256)
 
 
 def quote_windows_path(path: str) -> str:
@@ -2,17 +2,19 @@
 CSharp Language Server using Microsoft.CodeAnalysis.LanguageServer (Official Roslyn-based LSP server)
 """
 
+import hashlib
 import json
 import logging
 import os
 import platform
 import shutil
 import subprocess
-import tarfile
 import threading
+import time
 import urllib.request
-import zipfile
-from collections.abc import Iterable
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, cast
 
@@ -21,10 +23,11 @@ from overrides import override
 from solidlsp.ls import SolidLanguageServer
 from solidlsp.ls_config import LanguageServerConfig
 from solidlsp.ls_exceptions import SolidLSPException
-from solidlsp.ls_utils import PathUtils
+from solidlsp.ls_utils import FileUtils, PathUtils
 from solidlsp.lsp_protocol_handler.lsp_types import InitializeParams, InitializeResult
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
 from solidlsp.settings import SolidLSPSettings
+from solidlsp.util.fetcher import get_default_fetcher
 from solidlsp.util.zip import SafeZipExtractor
 
 from .common import RuntimeDependency, RuntimeDependencyCollection
@@ -135,48 +138,49 @@ _RUNTIME_DEPENDENCIES = [
 ]
 
 
-def breadth_first_file_scan(root_dir: str) -> Iterable[str]:
+SOLUTION_DISCOVERY_MAX_DEPTH = 8
+"""the default maximum depth (below the repository root) of directories searched for solution and project files"""
+
+
+def discover_solution_and_project_files(
+    root_dir: str, is_ignored_dir: Callable[[str], bool] | None = None, max_depth: int = SOLUTION_DISCOVERY_MAX_DEPTH
+) -> tuple[list[str], list[str]]:
     """
-    Perform a breadth-first scan of files in the given directory.
-    Yields file paths in breadth-first order.
+    Finds the solution (.sln) and project (.csproj) files in the given directory with a breadth-first search,
+    such that files closer to the root come first. Hidden directories are not searched.
+
+    :param root_dir: the directory to search
+    :param is_ignored_dir: a function which, given the path of a directory relative to `root_dir`, returns whether
+        the directory shall not be searched
+    :param max_depth: the maximum depth of directories to search (0 for searching only the root directory)
+    :return: a pair (solution files, project files) of lists of absolute paths in breadth-first order
     """
-    queue = [root_dir]
+    solution_files: list[str] = []
+    project_files: list[str] = []
+    queue: deque[tuple[str, str, int]] = deque([(root_dir, "", 0)])  # (absolute path, relative path, depth)
     while queue:
-        current_dir = queue.pop(0)
+        abs_dir_path, rel_dir_path, depth = queue.popleft()
         try:
-            for item in os.listdir(current_dir):
-                if item.startswith("."):
-                    continue
-                item_path = os.path.join(current_dir, item)
-                if os.path.isdir(item_path):
-                    queue.append(item_path)
-                elif os.path.isfile(item_path):
-                    yield item_path
-        except (PermissionError, OSError):
+            with os.scandir(abs_dir_path) as entries:
+                sorted_entries = sorted(entries, key=lambda e: e.name)
+        except OSError:
             # Skip directories we can't access
-            pass
-
-
-def find_solution_or_project_file(root_dir: str) -> str | None:
-    """
-    Find the first .sln file in breadth-first order.
-    If no .sln file is found, look for a .csproj file.
-    """
-    sln_file = None
-    csproj_file = None
-
-    for filename in breadth_first_file_scan(root_dir):
-        if filename.endswith(".sln") and sln_file is None:
-            sln_file = filename
-        elif filename.endswith(".csproj") and csproj_file is None:
-            csproj_file = filename
-
-        # If we found a .sln file, return it immediately
-        if sln_file:
-            return sln_file
-
-    # If no .sln file was found, return the first .csproj file
-    return csproj_file
+            continue
+        for entry in sorted_entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    rel_path = os.path.join(rel_dir_path, entry.name) if rel_dir_path else entry.name
+                    if depth < max_depth and (is_ignored_dir is None or not is_ignored_dir(rel_path)):
+                        queue.append((entry.path, rel_path, depth + 1))
+                elif entry.name.endswith(".sln") and entry.is_file():
+                    solution_files.append(entry.path)
+                elif entry.name.endswith(".csproj") and entry.is_file():
+                    project_files.append(entry.path)
+            except OSError:
+                pass
+    return solution_files, project_files
 
 
 class CSharpLanguageServer(SolidLanguageServer):
@@ -197,8 +201,13 @@ class CSharpLanguageServer(SolidLanguageServer):
     ```
 
     See the `_RUNTIME_DEPENDENCIES` variable above for the available dependency ids and platform_ids.
+
+    The maximum depth of directories searched for solution and project files can be set via the key
+    "solution_discovery_max_depth" (default: `SOLUTION_DISCOVERY_MAX_DEPTH`).
     """
 
+    SOLUTION_DISCOVERY_CACHE_FILENAME = "solution_discovery.json"
+
     def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
         """
         Creates a CSharpLanguageServer instance. This class is not meant to be instantiated directly.
@@ -206,9 +215,6 @@ class CSharpLanguageServer(SolidLanguageServer):
         """
         dotnet_path, language_server_path = self._ensure_server_installed(config, solidlsp_settings)
 
-        # Find solution or project file
-        solution_or_project = find_solution_or_project_file(repository_root_path)
-
         # Create log directory
         log_dir = Path(self.ls_resources_dir(solidlsp_settings)) / "logs"
         log_dir.mkdir(parents=True, exist_ok=True)
@@ -216,21 +222,80 @@ class CSharpLanguageServer(SolidLanguageServer):
         # Build command using dotnet directly
         cmd = [dotnet_path, language_server_path, "--logLevel=Information", f"--extensionLogDirectory={log_dir}", "--stdio"]
 
-        # The language server will discover the solution/project from the workspace root
-        if solution_or_project:
-            log.info(f"Found solution/project file: {solution_or_project}")
-        else:
-            log.warning("No .sln or .csproj file found, language server will attempt auto-discovery")
-
         log.debug(f"Language server command: {' '.join(cmd)}")
 
         super().__init__(config, repository_root_path, ProcessLaunchInfo(cmd=cmd, cwd=repository_root_path), "csharp", solidlsp_settings)
 
+        # Find solution and project files (the directories ignored by the language server are not searched)
+        self._solution_files, self._project_files = self._discover_solution_and_project_files()
+        if self._solution_files or self._project_files:
+            log.info(f"Found solution/project file: {(self._solution_files or self._project_files)[0]}")
+        else:
+            log.warning("No .sln or .csproj file found, language server will attempt auto-discovery")
+
         self.initialization_complete = threading.Event()
 
     @override
     def is_ignored_dirname(self, dirname: str) -> bool:
-        return super().is_ignored_dirname(dirname) or dirname in ["bin", "obj", "packages", ".vs"]
+        return super().is_ignored_dirname(dirname) or dirname in ["bin", "obj", "packages", ".vs", "node_modules"]
+
+    def _discover_solution_and_project_files(self) -> tuple[list[str], list[str]]:
+        """
+        Finds the solution and project files in the repository (see `discover_solution_and_project_files`).
+        The result is cached in the project's cache directory and reused as long as the modification time of the
+        repository root directory, the search settings and the ignore patterns are unchanged and all files still exist.
+
+        :return: a pair (solution files, project files) of lists of absolute paths in breadth-first order
+        """
+        max_depth = int(
+            self._solidlsp_settings.get_ls_specific_settings(self.get_language_enum_instance()).get(
+                "solution_discovery_max_depth", SOLUTION_DISCOVERY_MAX_DEPTH
+            )
+        )
+        ignore_patterns = sorted(str(getattr(pattern, "pattern", pattern)) for pattern in self.get_ignore_spec().patterns)
+        settings_key = hashlib.sha256(json.dumps([max_depth, ignore_patterns]).encode("utf-8")).hexdigest()
+        cache_file = self.cache_dir / self.SOLUTION_DISCOVERY_CACHE_FILENAME
+        try:
+            root_mtime_ns = os.stat(self.repository_root_path).st_mtime_ns
+        except OSError:
+            root_mtime_ns = None
+
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached["root_mtime_ns"] == root_mtime_ns and cached["settings_key"] == settings_key:
+                solution_files = [os.path.join(self.repository_root_path, p) for p in cached["solution_files"]]
+                project_files = [os.path.join(self.repository_root_path, p) for p in cached["project_files"]]
+                if all(os.path.isfile(p) for p in solution_files + project_files):
+                    log.debug(f"Using cached solution/project discovery result from {cache_file}")
+                    return solution_files, project_files
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        start_time = time.perf_counter()
+        solution_files, project_files = discover_solution_and_project_files(
+            self.repository_root_path,
+            is_ignored_dir=lambda rel_path: self.is_ignored_dirname(os.path.basename(rel_path)) or self.is_ignored_path(rel_path),
+            max_depth=max_depth,
+        )
+        log.debug(
+            f"Discovered {len(solution_files)} solution and {len(project_files)} project files in {time.perf_counter() - start_time:.2f}s"
+        )
+        if root_mtime_ns is not None:
+            try:
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "root_mtime_ns": root_mtime_ns,
+                            "settings_key": settings_key,
+                            "solution_files": [os.path.relpath(p, self.repository_root_path) for p in solution_files],
+                            "project_files": [os.path.relpath(p, self.repository_root_path) for p in project_files],
+                        },
+                        f,
+                    )
+            except OSError as e:
+                log.debug(f"Could not cache the solution/project discovery result: {e}")
+        return solution_files, project_files
 
     @classmethod
     def _ensure_server_installed(cls, config: LanguageServerConfig, solidlsp_settings: SolidLSPSettings) -> tuple[str, str]:
@@ -255,8 +320,12 @@ class CSharpLanguageServer(SolidLanguageServer):
         # Find the dependencies for our platform
         lang_server_dep = runtime_dependencies.get_single_dep_for_current_platform("CSharpLanguageServer")
         dotnet_runtime_dep = runtime_dependencies.get_single_dep_for_current_platform("DotNetRuntime")
-        dotnet_path = CSharpLanguageServer._ensure_dotnet_runtime(dotnet_runtime_dep, solidlsp_settings)
-        server_dll_path = CSharpLanguageServer._ensure_language_server(lang_server_dep, solidlsp_settings)
+        # the runtime and the language server are independent of each other, so they are installed concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dotnet_path_future = executor.submit(CSharpLanguageServer._ensure_dotnet_runtime, dotnet_runtime_dep, solidlsp_settings)
+            server_dll_path_future = executor.submit(CSharpLanguageServer._ensure_language_server, lang_server_dep, solidlsp_settings)
+            dotnet_path = dotnet_path_future.result()
+            server_dll_path = server_dll_path_future.result()
 
         return dotnet_path, server_dll_path
 
@@ -371,9 +440,8 @@ class CSharpLanguageServer(SolidLanguageServer):
 
             log.debug(f"Downloading package from: {package_url}")
 
-            # Download the .nupkg file
-            nupkg_file = temp_dir / f"{package_name}.{package_version}.nupkg"
-            urllib.request.urlretrieve(package_url, nupkg_file)
+            # Download the .nupkg file (into the download store)
+            nupkg_file = Path(get_default_fetcher().fetch(package_url))
 
             # Extract the .nupkg file (it's just a zip file)
             package_extract_dir = temp_dir / f"{package_name}.{package_version}"
@@ -383,9 +451,6 @@ class CSharpLanguageServer(SolidLanguageServer):
             extractor = SafeZipExtractor(archive_path=nupkg_file, extract_dir=package_extract_dir, verbose=False)
             extractor.extract_all()
 
-            # Clean up the nupkg file
-            nupkg_file.unlink()
-
             log.info(f"Successfully downloaded and extracted {package_name} version {package_version}")
             return package_extract_dir
 
@@ -437,23 +502,9 @@ class CSharpLanguageServer(SolidLanguageServer):
 
         archive_type = dotnet_runtime_dep.archive_type
 
-        # Download the runtime
-        download_path = dotnet_dir / f"dotnet-runtime.{archive_type}"
+        # Download and extract the runtime
         try:
-            log.debug(f"Downloading from {url}")
-            urllib.request.urlretrieve(url, download_path)
-
-            # Extract the archive
-            if archive_type == "zip":
-                with zipfile.ZipFile(download_path, "r") as zip_ref:
-                    zip_ref.extractall(dotnet_dir)
-            else:
-                # tar.gz
-                with tarfile.open(download_path, "r:gz") as tar_ref:
-                    tar_ref.extractall(dotnet_dir)
-
-            # Remove the archive
-            download_path.unlink()
+            FileUtils.download_and_extract_archive(url, str(dotnet_dir), "zip" if archive_type == "zip" else "gztar", dotnet_runtime_dep.sha256)
 
             # Make dotnet executable on Unix
             if platform.system().lower() != "windows":
@@ -719,12 +770,8 @@ class CSharpLanguageServer(SolidLanguageServer):
         """
         Open solution and project files using notifications.
         """
-        # Find solution file
-        solution_file = None
-        for filename in breadth_first_file_scan(self.repository_root_path):
-            if filename.endswith(".sln"):
-                solution_file = filename
-                break
+        solution_file = self._solution_files[0] if self._solution_files else None
+        project_files = self._project_files
 
         # Send solution/open notification if solution file found
         if solution_file:
@@ -732,12 +779,6 @@ class CSharpLanguageServer(SolidLanguageServer):
             self.server.notify.send_notification("solution/open", {"solution": solution_uri})
             log.debug(f"Opened solution file: {solution_file}")
 
-        # Find and open project files
-        project_files = []
-        for filename in breadth_first_file_scan(self.repository_root_path):
-            if filename.endswith(".csproj"):
-                project_files.append(filename)
-
         # Send project/open notifications for each project file
         if project_files:
             project_uris = [PathUtils.path_to_uri(project_file) for project_file in project_files]
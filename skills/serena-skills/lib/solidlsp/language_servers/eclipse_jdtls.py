@@ -3,14 +3,18 @@ Provides Java specific instantiation of the LanguageServer class. Contains vario
 """
 
 import dataclasses
+import hashlib
+import json
 import logging
 import os
 import pathlib
 import shutil
 import threading
+import time
 import uuid
 from pathlib import PurePath
-from typing import cast
+from collections.abc import Callable
+from typing import IO, ClassVar, cast
 
 from overrides import override
 
@@ -21,10 +25,45 @@ from solidlsp.ls_utils import FileUtils, PlatformUtils
 from solidlsp.lsp_protocol_handler.lsp_types import DocumentSymbol, InitializeParams, SymbolInformation
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
 from solidlsp.settings import SolidLSPSettings
+from solidlsp.util.fetcher import FetchRequest, get_default_fetcher
 
 log = logging.getLogger(__name__)
 
 
+def _try_lock_file(f: IO) -> bool:
+    """
+    Tries to acquire an exclusive (advisory) lock on the given open file without blocking;
+    the lock is released by the operating system if the holding process terminates.
+
+    :return: whether the lock was acquired
+    """
+    f.seek(0)
+    try:
+        if os.name == "nt":
+            import msvcrt  # imported lazily, as it is only available on Windows
+
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl  # imported lazily, as it is not available on Windows
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock_file(f: IO) -> None:
+    f.seek(0)
+    if os.name == "nt":
+        import msvcrt  # imported lazily, as it is only available on Windows
+
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl  # imported lazily, as it is not available on Windows
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
 @dataclasses.dataclass
 class RuntimeDependencyPaths:
     """
@@ -37,10 +76,294 @@ class RuntimeDependencyPaths:
     jre_home_path: str
     jdtls_launcher_jar_path: str
     jdtls_readonly_config_path: str
+    jdtls_release: str
+    """identifies the release of JDTLS (the file name of the vscode-java package bundling it)"""
     intellicode_jar_path: str
     intellisense_members_path: str
 
 
+@dataclasses.dataclass
+class JDTLSWorkspace:
+    """
+    A JDTLS workspace directory (containing the `-data` directory and a copy of the configuration tree), which
+    is keyed by the repository root and a fingerprint of the build files, such that it can be reused across runs
+    (avoiding a re-import and re-indexing of the project upon each start).
+
+    A workspace can only be used by a single JDTLS process at a time, which is ensured via an (operating system)
+    lock on a lock file. If the workspace of a repository is locked by another process, an ephemeral workspace
+    (named `{name}.{uuid}`) is used instead, which is deleted when the language server is shut down.
+    """
+
+    BUILD_FILE_NAMES = (
+        "pom.xml",
+        "build.gradle",
+        "build.gradle.kts",
+        "settings.gradle",
+        "settings.gradle.kts",
+        "gradle.properties",
+        "gradle-wrapper.properties",
+        ".classpath",
+        ".project",
+    )
+    BUILD_FILE_MAX_DEPTH = 3
+    LOCK_FILENAME = "workspace.lock"
+    METADATA_FILENAME = "workspace.json"
+
+    path: str
+    ephemeral: bool = False
+    _lock_file: IO | None = dataclasses.field(default=None, repr=False, compare=False)
+
+    _paths_locked_by_this_process: ClassVar[set[str]] = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def workspaces_dir(cls, ls_resources_dir: str) -> str:
+        return str(PurePath(ls_resources_dir, "EclipseJDTLS", "workspaces"))
+
+    @classmethod
+    def compute_build_fingerprint(cls, repository_root_path: str, is_ignored_dirname: Callable[[str], bool]) -> str:
+        """
+        Computes a fingerprint of the contents of all build files (Maven, Gradle, Eclipse) in the repository,
+        considering directories up to a depth of BUILD_FILE_MAX_DEPTH
+
+        :param repository_root_path: the repository root
+        :param is_ignored_dirname: a function determining whether a directory shall not be searched
+        :return: the fingerprint (hex digest)
+        """
+        build_files: list[tuple[str, str]] = []
+        stack = [(repository_root_path, 0)]
+        while stack:
+            dir_path, depth = stack.pop()
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < cls.BUILD_FILE_MAX_DEPTH and not is_ignored_dirname(entry.name):
+                                stack.append((entry.path, depth + 1))
+                        elif entry.name in cls.BUILD_FILE_NAMES:
+                            with open(entry.path, "rb") as f:
+                                content_hash = hashlib.sha256(f.read()).hexdigest()
+                            build_files.append((os.path.relpath(entry.path, repository_root_path), content_hash))
+            except OSError as e:
+                log.debug("Skipping %s while fingerprinting build files: %s", dir_path, e)
+        fingerprint = hashlib.sha256()
+        for relative_path, content_hash in sorted(build_files):
+            fingerprint.update(f"{relative_path}\0{content_hash}\n".encode())
+        return fingerprint.hexdigest()
+
+    @classmethod
+    def acquire(cls, ls_resources_dir: str, repository_root_path: str, build_fingerprint: str, jdtls_release: str = "") -> "JDTLSWorkspace":
+        """
+        Acquires the persistent workspace for the given repository, build fingerprint and JDTLS release
+        (or an ephemeral workspace if the persistent one is in use by another process).
+        Since the workspace (including its copy of the configuration tree) is specific to the JDTLS release,
+        a new workspace is used after an upgrade (and the previous one is deleted as superseded by `gc`).
+        """
+        repository_root_path = os.path.normcase(os.path.realpath(repository_root_path))
+        root_hash = hashlib.sha256(repository_root_path.encode("utf-8")).hexdigest()[:16]
+        key_hash = hashlib.sha256(f"{build_fingerprint}\0{jdtls_release}".encode()).hexdigest()[:12]
+        workspace_name = f"{root_hash}-{key_hash}"
+        workspaces_dir = cls.workspaces_dir(ls_resources_dir)
+        workspace = cls(str(PurePath(workspaces_dir, workspace_name)))
+        os.makedirs(workspace.path, exist_ok=True)
+        if not workspace._try_lock():
+            log.warning("JDTLS workspace %s is in use by another process; using an ephemeral workspace", workspace.path)
+            workspace = cls(str(PurePath(workspaces_dir, f"{workspace_name}.{uuid.uuid4().hex}")), ephemeral=True)
+            os.makedirs(workspace.path, exist_ok=True)
+            workspace._try_lock()
+        else:
+            log.info("Using JDTLS workspace %s", workspace.path)
+        workspace._write_metadata(repository_root_path, build_fingerprint, jdtls_release)
+        return workspace
+
+    @staticmethod
+    def is_ephemeral_name(workspace_name: str) -> bool:
+        return "." in workspace_name
+
+    @property
+    def data_dir(self) -> str:
+        return str(PurePath(self.path, "data_dir"))
+
+    @property
+    def config_path(self) -> str:
+        return str(PurePath(self.path, "config_path"))
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.path, self.LOCK_FILENAME)
+
+    @classmethod
+    def is_locked(cls, workspace_path: str) -> bool:
+        """
+        :return: whether the workspace at the given path is currently in use by a running process
+        """
+        lock_path = os.path.join(workspace_path, cls.LOCK_FILENAME)
+        if not os.path.exists(lock_path):
+            return False
+        try:
+            with open(lock_path, "a+", encoding="utf-8") as f:
+                if not _try_lock_file(f):
+                    return True
+                _unlock_file(f)
+                return False
+        except OSError:
+            return False
+
+    def _try_lock(self) -> bool:
+        with self._lock:
+            if self.path in self._paths_locked_by_this_process:
+                return False
+            if self._try_create_lock_file():
+                self._paths_locked_by_this_process.add(self.path)
+                return True
+            return False
+
+    def _try_create_lock_file(self) -> bool:
+        """
+        Locks the lock file, which is held open until the workspace is released. The lock file is never deleted,
+        since a process could otherwise lock a file which has already been replaced by another process' lock file.
+        """
+        f = open(self._lock_path, "a+", encoding="utf-8")
+        if not _try_lock_file(f):
+            f.close()
+            return False
+        # the process id is informational only (the lock itself is held by the operating system)
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._lock_file = f
+        return True
+
+    def _write_metadata(self, repository_root_path: str, build_fingerprint: str, jdtls_release: str) -> None:
+        metadata_path = os.path.join(self.path, self.METADATA_FILENAME)
+        metadata = {
+            "repository_root": repository_root_path,
+            "build_fingerprint": build_fingerprint,
+            "jdtls_release": jdtls_release,
+            "last_used": time.time(),
+        }
+        try:
+            with open(metadata_path, "w", encoding="utf-8") as f:
+                json.dump(metadata, f)
+        except OSError as e:
+            log.warning("Could not write JDTLS workspace metadata to %s: %s", metadata_path, e)
+
+    def release(self) -> None:
+        """
+        Releases the lock on the workspace; ephemeral workspaces are deleted.
+        Must only be called after the JDTLS process using the workspace has terminated.
+        """
+        with self._lock:
+            self._paths_locked_by_this_process.discard(self.path)
+        if self._lock_file is not None:
+            try:
+                _unlock_file(self._lock_file)
+            except OSError as e:
+                log.warning("Could not release JDTLS workspace lock %s: %s", self._lock_path, e)
+            self._lock_file.close()
+            self._lock_file = None
+        if self.ephemeral:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    @classmethod
+    def gc(
+        cls,
+        ls_resources_dir: str,
+        max_age_days: float | None = 30,
+        max_total_size_mb: float | None = None,
+        dry_run: bool = False,
+    ) -> list[dict]:
+        """
+        Deletes stale workspaces. Workspaces which are locked by a running process are never deleted
+        (and are considered to be the most recently used ones).
+        A workspace is deleted if
+          * it is an ephemeral workspace (left behind by a process which terminated abnormally),
+          * its repository no longer exists,
+          * it was superseded by a more recently used persistent workspace of the same repository (changed build
+            files or JDTLS release),
+          * it was not used within max_age_days (workspaces without metadata, e.g. from older versions,
+            are judged by their modification time), or
+          * the total size of the remaining workspaces exceeds max_total_size_mb, in which case the least
+            recently used workspaces are deleted first.
+
+        :param ls_resources_dir: the language server resources directory
+        :param max_age_days: the maximum age (time since last use) in days; None for no limit
+        :param max_total_size_mb: the disk budget for all workspaces in MB; None for no limit
+        :param dry_run: whether to only report the workspaces that would be deleted
+        :return: a list of dictionaries describing the deleted workspaces
+        """
+        workspaces_dir = cls.workspaces_dir(ls_resources_dir)
+        if not os.path.isdir(workspaces_dir):
+            return []
+
+        workspaces = []
+        for entry in os.scandir(workspaces_dir):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            metadata: dict = {}
+            try:
+                with open(os.path.join(entry.path, cls.METADATA_FILENAME), encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                pass
+            last_used = metadata.get("last_used") or entry.stat().st_mtime
+            size = sum(
+                os.path.getsize(os.path.join(dir_path, fn)) for dir_path, _, file_names in os.walk(entry.path) for fn in file_names
+            )
+            locked = cls.is_locked(entry.path)
+            workspaces.append(
+                {
+                    "path": entry.path,
+                    "repository_root": metadata.get("repository_root"),
+                    "last_used": time.time() if locked else last_used,
+                    "locked": locked,
+                    "ephemeral": cls.is_ephemeral_name(entry.name),
+                    "size": size,
+                }
+            )
+
+        now = time.time()
+        to_delete: dict[str, str] = {}
+        most_recent_per_root: dict[str, dict] = {}
+        for ws in sorted(workspaces, key=lambda w: w["last_used"], reverse=True):
+            root = ws["repository_root"]
+            if ws["locked"]:
+                pass
+            elif ws["ephemeral"]:
+                to_delete[ws["path"]] = "abandoned ephemeral workspace"
+            elif root is not None and not os.path.isdir(root):
+                to_delete[ws["path"]] = "repository no longer exists"
+            elif root is not None and root in most_recent_per_root:
+                to_delete[ws["path"]] = "superseded"
+            elif max_age_days is not None and now - ws["last_used"] > max_age_days * 86400:
+                to_delete[ws["path"]] = "unused for more than %s days" % max_age_days
+            if root is not None and not ws["ephemeral"]:
+                most_recent_per_root.setdefault(root, ws)
+
+        if max_total_size_mb is not None:
+            remaining = sorted((w for w in workspaces if w["path"] not in to_delete), key=lambda w: w["last_used"])
+            total_size = sum(w["size"] for w in remaining)
+            for ws in remaining:
+                if total_size <= max_total_size_mb * 1024 * 1024:
+                    break
+                if ws["locked"]:
+                    continue
+                to_delete[ws["path"]] = "disk budget exceeded"
+                total_size -= ws["size"]
+
+        deleted = []
+        for ws in workspaces:
+            reason = to_delete.get(ws["path"])
+            if reason is None:
+                continue
+            if not dry_run:
+                log.info("Deleting JDTLS workspace %s (%s)", ws["path"], reason)
+                shutil.rmtree(ws["path"], ignore_errors=True)
+            deleted.append({"path": ws["path"], "repository_root": ws["repository_root"], "size": ws["size"], "reason": reason})
+        return deleted
+
+
 class EclipseJDTLS(SolidLanguageServer):
     r"""
     The EclipseJDTLS class provides a Java specific implementation of the LanguageServer class
@@ -70,28 +393,23 @@ class EclipseJDTLS(SolidLanguageServer):
         runtime_dependency_paths = self._setupRuntimeDependencies(config, solidlsp_settings)
         self.runtime_dependency_paths = runtime_dependency_paths
 
-        # ws_dir is the workspace directory for the EclipseJDTLS server
-        ws_dir = str(
-            PurePath(
-                solidlsp_settings.ls_resources_dir,
-                "EclipseJDTLS",
-                "workspaces",
-                uuid.uuid4().hex,
-            )
+        # the workspace directory for the EclipseJDTLS server is reused across runs for the same repository and build files
+        build_fingerprint = JDTLSWorkspace.compute_build_fingerprint(repository_root_path, self.is_ignored_dirname)
+        self.workspace = JDTLSWorkspace.acquire(
+            solidlsp_settings.ls_resources_dir, repository_root_path, build_fingerprint, runtime_dependency_paths.jdtls_release
         )
 
         # shared_cache_location is the global cache used by Eclipse JDTLS across all workspaces
         shared_cache_location = str(PurePath(solidlsp_settings.ls_resources_dir, "lsp", "EclipseJDTLS", "sharedIndex"))
         os.makedirs(shared_cache_location, exist_ok=True)
-        os.makedirs(ws_dir, exist_ok=True)
 
         jre_path = self.runtime_dependency_paths.jre_path
         lombok_jar_path = self.runtime_dependency_paths.lombok_jar_path
 
         jdtls_launcher_jar = self.runtime_dependency_paths.jdtls_launcher_jar_path
 
-        data_dir = str(PurePath(ws_dir, "data_dir"))
-        jdtls_config_path = str(PurePath(ws_dir, "config_path"))
+        data_dir = self.workspace.data_dir
+        jdtls_config_path = self.workspace.config_path
 
         jdtls_readonly_config_path = self.runtime_dependency_paths.jdtls_readonly_config_path
 
@@ -152,6 +470,13 @@ class EclipseJDTLS(SolidLanguageServer):
             config, repository_root_path, ProcessLaunchInfo(cmd, proc_env, proc_cwd), "java", solidlsp_settings=solidlsp_settings
         )
 
+    @override
+    def _shutdown(self, timeout: float = 5.0) -> None:
+        try:
+            super()._shutdown(timeout=timeout)
+        finally:
+            self.workspace.release()
+
     @override
     def is_ignored_dirname(self, dirname: str) -> bool:
         # Ignore common Java build directories from different build tools:
@@ -260,24 +585,27 @@ class EclipseJDTLS(SolidLanguageServer):
                 "gradle-8.14.2",
             )
         )
+        gradle_dependency = runtime_dependencies["gradle"]["platform-agnostic"]
 
-        if not os.path.exists(gradle_path):
-            FileUtils.download_and_extract_archive(
-                runtime_dependencies["gradle"]["platform-agnostic"]["url"],
-                str(PurePath(gradle_path).parent),
-                runtime_dependencies["gradle"]["platform-agnostic"]["archiveType"],
-            )
-
-        assert os.path.exists(gradle_path)
-
-        dependency = runtime_dependencies["vscode-java"][platformId.value]
-        vscode_java_path = str(PurePath(cls.ls_resources_dir(solidlsp_settings), dependency["relative_extraction_path"]))
+        vscode_java_dependency = runtime_dependencies["vscode-java"][platformId.value]
+        vscode_java_path = str(PurePath(cls.ls_resources_dir(solidlsp_settings), vscode_java_dependency["relative_extraction_path"]))
         os.makedirs(vscode_java_path, exist_ok=True)
-        jre_home_path = str(PurePath(vscode_java_path, dependency["jre_home_path"]))
-        jre_path = str(PurePath(vscode_java_path, dependency["jre_path"]))
-        lombok_jar_path = str(PurePath(vscode_java_path, dependency["lombok_jar_path"]))
-        jdtls_launcher_jar_path = str(PurePath(vscode_java_path, dependency["jdtls_launcher_jar_path"]))
-        jdtls_readonly_config_path = str(PurePath(vscode_java_path, dependency["jdtls_readonly_config_path"]))
+        jre_home_path = str(PurePath(vscode_java_path, vscode_java_dependency["jre_home_path"]))
+        jre_path = str(PurePath(vscode_java_path, vscode_java_dependency["jre_path"]))
+        lombok_jar_path = str(PurePath(vscode_java_path, vscode_java_dependency["lombok_jar_path"]))
+        jdtls_launcher_jar_path = str(PurePath(vscode_java_path, vscode_java_dependency["jdtls_launcher_jar_path"]))
+        jdtls_readonly_config_path = str(PurePath(vscode_java_path, vscode_java_dependency["jdtls_readonly_config_path"]))
+
+        intellicode_dependency = runtime_dependencies["intellicode"]["platform-agnostic"]
+        intellicode_directory_path = str(PurePath(cls.ls_resources_dir(solidlsp_settings), intellicode_dependency["relative_extraction_path"]))
+        os.makedirs(intellicode_directory_path, exist_ok=True)
+        intellicode_jar_path = str(PurePath(intellicode_directory_path, intellicode_dependency["intellicode_jar_path"]))
+        intellisense_members_path = str(PurePath(intellicode_directory_path, intellicode_dependency["intellisense_members_path"]))
+
+        # (dependency, extraction path) pairs of the dependencies which are not yet installed
+        missing_dependencies: list[tuple[dict, str]] = []
+        if not os.path.exists(gradle_path):
+            missing_dependencies.append((gradle_dependency, str(PurePath(gradle_path).parent)))
         if not all(
             [
                 os.path.exists(vscode_java_path),
@@ -288,7 +616,23 @@ class EclipseJDTLS(SolidLanguageServer):
                 os.path.exists(jdtls_readonly_config_path),
             ]
         ):
-            FileUtils.download_and_extract_archive(dependency["url"], vscode_java_path, dependency["archiveType"])
+            missing_dependencies.append((vscode_java_dependency, vscode_java_path))
+        if not all(
+            [
+                os.path.exists(intellicode_directory_path),
+                os.path.exists(intellicode_jar_path),
+                os.path.exists(intellisense_members_path),
+            ]
+        ):
+            missing_dependencies.append((intellicode_dependency, intellicode_directory_path))
+
+        # the dependencies are independent of each other, so they are downloaded concurrently
+        # (the subsequent extraction then takes the archives from the download store)
+        get_default_fetcher().fetch_many([FetchRequest(dep["url"]) for dep, _ in missing_dependencies])
+        for dep, extraction_path in missing_dependencies:
+            FileUtils.download_and_extract_archive(dep["url"], extraction_path, dep["archiveType"])
+
+        assert os.path.exists(gradle_path)
 
         os.chmod(jre_path, 0o755)
 
@@ -299,20 +643,6 @@ class EclipseJDTLS(SolidLanguageServer):
         assert os.path.exists(jdtls_launcher_jar_path)
         assert os.path.exists(jdtls_readonly_config_path)
 
-        dependency = runtime_dependencies["intellicode"]["platform-agnostic"]
-        intellicode_directory_path = str(PurePath(cls.ls_resources_dir(solidlsp_settings), dependency["relative_extraction_path"]))
-        os.makedirs(intellicode_directory_path, exist_ok=True)
-        intellicode_jar_path = str(PurePath(intellicode_directory_path, dependency["intellicode_jar_path"]))
-        intellisense_members_path = str(PurePath(intellicode_directory_path, dependency["intellisense_members_path"]))
-        if not all(
-            [
-                os.path.exists(intellicode_directory_path),
-                os.path.exists(intellicode_jar_path),
-                os.path.exists(intellisense_members_path),
-            ]
-        ):
-            FileUtils.download_and_extract_archive(dependency["url"], intellicode_directory_path, dependency["archiveType"])
-
         assert os.path.exists(intellicode_directory_path)
         assert os.path.exists(intellicode_jar_path)
         assert os.path.exists(intellisense_members_path)
@@ -324,6 +654,7 @@ class EclipseJDTLS(SolidLanguageServer):
             jre_home_path=jre_home_path,
             jdtls_launcher_jar_path=jdtls_launcher_jar_path,
             jdtls_readonly_config_path=jdtls_readonly_config_path,
+            jdtls_release=vscode_java_dependency["url"].rsplit("/", 1)[-1],
             intellicode_jar_path=intellicode_jar_path,
             intellisense_members_path=intellisense_members_path,
         )
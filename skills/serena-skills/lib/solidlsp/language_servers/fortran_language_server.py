@@ -44,7 +44,7 @@ class FortranLanguageServer(SolidLanguageServer):
         ]
 
     def _fix_fortls_selection_range(
-        self, symbol: ls_types.UnifiedSymbolInformation, file_content: str
+        self, symbol: ls_types.UnifiedSymbolInformation, file_data: LSPFileBuffer
     ) -> ls_types.UnifiedSymbolInformation:
         """
         Fix fortls's incorrect selectionRange that points to line start instead of identifier name.
@@ -55,7 +55,7 @@ class FortranLanguageServer(SolidLanguageServer):
 
         Args:
             symbol: The symbol with potentially incorrect selectionRange
-            file_content: Full file content to parse the line
+            file_data: The buffer of the file containing the symbol (used to look up the line)
 
         Returns:
             Symbol with corrected selectionRange pointing to the identifier name
@@ -68,12 +68,10 @@ class FortranLanguageServer(SolidLanguageServer):
         start_line = sel_range["start"]["line"]
         start_char = sel_range["start"]["character"]
 
-        # Split file content into lines
-        lines = file_content.split("\n")
-        if start_line >= len(lines):
+        if start_line >= file_data.num_lines:
             return symbol
 
-        line = lines[start_line]
+        line = file_data.line(start_line)
 
         # Fortran keywords that define named constructs
         # Match patterns:
@@ -136,7 +134,9 @@ class FortranLanguageServer(SolidLanguageServer):
         return symbol
 
     @override
-    def request_document_symbols(self, relative_file_path: str, file_buffer: LSPFileBuffer | None = None) -> DocumentSymbols:
+    def request_document_symbols(
+        self, relative_file_path: str, file_buffer: LSPFileBuffer | None = None, fast: bool = False
+    ) -> DocumentSymbols:
         # Override to fix fortls's incorrect selectionRange bug.
         #
         # fortls returns selectionRange pointing to line start (character 0) instead of the
@@ -149,25 +149,23 @@ class FortranLanguageServer(SolidLanguageServer):
         # 4. Returns corrected symbols
 
         # Get symbols from fortls (with incorrect selectionRange)
-        document_symbols = super().request_document_symbols(relative_file_path, file_buffer=file_buffer)
+        document_symbols = super().request_document_symbols(relative_file_path, file_buffer=file_buffer, fast=fast)
 
-        # Get file content for parsing
-        with self.open_file(relative_file_path) as file_data:
-            file_content = file_data.contents
+        # Fix selectionRange recursively for all symbols, looking up lines via the file buffer's line index
+        with self._open_file_context(relative_file_path, file_buffer) as file_data:
 
-        # Fix selectionRange recursively for all symbols
-        def fix_symbol_and_children(symbol: ls_types.UnifiedSymbolInformation) -> ls_types.UnifiedSymbolInformation:
-            # Fix this symbol's selectionRange
-            fixed = self._fix_fortls_selection_range(symbol, file_content)
+            def fix_symbol_and_children(symbol: ls_types.UnifiedSymbolInformation) -> ls_types.UnifiedSymbolInformation:
+                # Fix this symbol's selectionRange
+                fixed = self._fix_fortls_selection_range(symbol, file_data)
 
-            # Fix children recursively
-            if fixed.get("children"):
-                fixed["children"] = [fix_symbol_and_children(child) for child in fixed["children"]]
+                # Fix children recursively
+                if fixed.get("children"):
+                    fixed["children"] = [fix_symbol_and_children(child) for child in fixed["children"]]
 
-            return fixed
+                return fixed
 
-        # Apply fix to all symbols
-        fixed_root_symbols = [fix_symbol_and_children(sym) for sym in document_symbols.root_symbols]
+            # Apply fix to all symbols
+            fixed_root_symbols = [fix_symbol_and_children(sym) for sym in document_symbols.root_symbols]
 
         return DocumentSymbols(fixed_root_symbols)
 
@@ -1,6 +1,7 @@
 import logging
 import os
 import pathlib
+import shutil
 import subprocess
 import threading
 from typing import cast
@@ -12,6 +13,7 @@ from solidlsp.ls_config import LanguageServerConfig
 from solidlsp.lsp_protocol_handler.lsp_types import InitializeParams
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
 from solidlsp.settings import SolidLSPSettings
+from solidlsp.util.resolution_manifest import get_search_path_key
 
 log = logging.getLogger(__name__)
 
@@ -69,18 +71,30 @@ class Gopls(SolidLanguageServer):
             return None
         return None
 
-    @staticmethod
-    def _setup_runtime_dependency() -> bool:
+    @classmethod
+    def _setup_runtime_dependency(cls, solidlsp_settings: SolidLSPSettings) -> str:
         """
         Check if required Go runtime dependencies are available.
         Raises RuntimeError with helpful message if dependencies are missing.
+        The result is recorded in the resolution manifest, such that later starts need not run `go version` and `gopls version`.
+
+        :return: the path of the gopls executable
         """
+        search_path_key = get_search_path_key()
+        cls._resolve_binary(solidlsp_settings, f"go:{search_path_key}", cls._resolve_go)
+        return cls._resolve_binary(solidlsp_settings, f"gopls:{search_path_key}", cls._resolve_gopls).path
+
+    @staticmethod
+    def _resolve_go() -> tuple[str, str | None]:
         go_version = Gopls._get_go_version()
         if not go_version:
             raise RuntimeError(
                 "Go is not installed. Please install Go from https://golang.org/doc/install and make sure it is added to your PATH."
             )
+        return shutil.which("go") or "go", go_version
 
+    @staticmethod
+    def _resolve_gopls() -> tuple[str, str | None]:
         gopls_version = Gopls._get_gopls_version()
         if not gopls_version:
             raise RuntimeError(
@@ -88,13 +102,14 @@ class Gopls(SolidLanguageServer):
                 "Please install gopls as described in https://pkg.go.dev/golang.org/x/tools/gopls#section-readme\n\n"
                 "After installation, make sure it is added to your PATH (it might be installed in a different location than Go)."
             )
-
-        return True
+        return shutil.which("gopls") or "gopls", gopls_version
 
     def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
-        self._setup_runtime_dependency()
+        gopls_executable_path = self._setup_runtime_dependency(solidlsp_settings)
 
-        super().__init__(config, repository_root_path, ProcessLaunchInfo(cmd="gopls", cwd=repository_root_path), "go", solidlsp_settings)
+        super().__init__(
+            config, repository_root_path, ProcessLaunchInfo(cmd=gopls_executable_path, cwd=repository_root_path), "go", solidlsp_settings
+        )
         self.server_ready = threading.Event()
         self.request_id = 0
 
@@ -0,0 +1,323 @@
+"""
+Provides an in-process Python language server based on the jedi library.
+
+Instead of launching jedi-language-server as a subprocess and communicating via JSON-RPC over stdio, the LSP requests
+sent by SolidLanguageServer are dispatched directly to functions calling the jedi API, which return the same
+(LSP-shaped) results. This avoids the process start, the serialization of all requests and responses and the
+synchronization of document contents (the contents of open files are taken directly from the file buffers).
+"""
+
+import difflib
+import logging
+import os
+import pathlib
+import re
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import jedi
+from overrides import override
+
+from solidlsp.ls import SolidLanguageServer
+from solidlsp.ls_config import LanguageServerConfig
+from solidlsp.ls_exceptions import SolidLSPException
+from solidlsp.ls_handler import SolidLanguageServerHandler
+from solidlsp.ls_types import SymbolKind
+from solidlsp.ls_utils import FileUtils, PathUtils
+from solidlsp.lsp_protocol_handler.server import PayloadLike, ProcessLaunchInfo
+from solidlsp.settings import SolidLSPSettings
+
+log = logging.getLogger(__name__)
+
+
+# the line breaks of Python source code as counted by jedi (unlike str.splitlines, form feeds etc. do not end a line)
+_LINE_BREAK_RE = re.compile(r"\r\n|\r|\n")
+
+
+def _position(line: int, column: int) -> dict:
+    """Converts a jedi position (1-based line, 0-based column) to an LSP position"""
+    return {"line": line - 1, "character": column}
+
+
+def _name_range(name: jedi.api.classes.Name) -> dict:
+    return {"start": _position(name.line, name.column), "end": _position(name.line, name.column + len(name.name))}
+
+
+def _location(name: jedi.api.classes.Name) -> dict | None:
+    if name.module_path is None or name.line is None:
+        return None
+    return {"uri": pathlib.Path(name.module_path).as_uri(), "range": _name_range(name)}
+
+
+class JediBackend:
+    """
+    Implements the LSP requests used by SolidLanguageServer with the jedi API
+    """
+
+    def __init__(self, repository_root_path: str, encoding: str, get_open_document_text: Callable[[str], str | None]):
+        """
+        :param repository_root_path: the repository root
+        :param encoding: the encoding of the source files
+        :param get_open_document_text: a function returning the current text of the document with the given URI
+            if the document is open (None otherwise)
+        """
+        self._repository_root_path = repository_root_path
+        self._encoding = encoding
+        self._get_open_document_text = get_open_document_text
+        self._project = jedi.Project(repository_root_path)
+        # jedi is not thread-safe
+        self._lock = threading.RLock()
+        self.request_handlers: dict[str, Callable[[Any], Any]] = {
+            "initialize": lambda params: {"capabilities": {}},
+            "shutdown": lambda params: None,
+            "textDocument/documentSymbol": self.document_symbol,
+            "textDocument/definition": self.definition,
+            "textDocument/references": self.references,
+            "textDocument/rename": self.rename,
+            "textDocument/hover": self.hover,
+            "workspace/symbol": self.workspace_symbol,
+        }
+
+    def _get_text(self, uri: str) -> str:
+        text = self._get_open_document_text(uri)
+        if text is None:
+            text = FileUtils.read_file(PathUtils.uri_to_path(uri), self._encoding)
+        return text
+
+    def _script(self, uri: str, text: str | None = None) -> jedi.Script:
+        if text is None:
+            text = self._get_text(uri)
+        return jedi.Script(text, path=PathUtils.uri_to_path(uri), project=self._project)
+
+    @staticmethod
+    def _jedi_position(params: dict) -> tuple[int, int]:
+        return params["position"]["line"] + 1, params["position"]["character"]
+
+    def document_symbol(self, params: dict) -> list[dict]:
+        """
+        :return: the hierarchical document symbols (shaped like pyright's: no imports, no self/cls parameters,
+            one symbol per name and scope, see python_ast_symbols)
+        """
+        uri = params["textDocument"]["uri"]
+        with self._lock:
+            text = self._get_text(uri)
+            script = self._script(uri, text)
+            lines = _LINE_BREAK_RE.split(text)
+            names = script.get_names(all_scopes=True, definitions=True, references=False)
+
+            root_symbols: list[dict] = []
+            # (line, column) of class/function names -> (symbol, symbol of the enclosing class/function or None)
+            scopes: dict[tuple[int, int], tuple[dict, dict | None]] = {}
+            # (id of the enclosing symbol or None, name) -> [symbol, whether it was declared with a type (class/function)]
+            declarations: dict[tuple[int | None, str], list] = {}
+            for name in names:
+                start = name.get_definition_start_position()
+                if start is None:
+                    continue
+                line = lines[start[0] - 1]
+                if name.type == "module" or line[start[1] :].startswith(("import ", "from ")):
+                    continue
+                parent = name.parent()
+                if name.type == "param" and (name.name in ("self", "cls") or parent.type == "module"):
+                    # self/cls are omitted by pyright; a parameter within the module scope is a lambda parameter
+                    continue
+                if parent.type == "module":
+                    parent_symbol = None
+                elif (parent.line, parent.column) in scopes:
+                    parent_symbol, grandparent_symbol = scopes[(parent.line, parent.column)]
+                    if name.type == "statement" and lines[name.line - 1][: name.column].endswith("self."):
+                        # instance attribute, which belongs to the class
+                        if grandparent_symbol is None or any(c["name"] == name.name for c in grandparent_symbol["children"]):
+                            continue
+                        parent_symbol = grandparent_symbol
+                else:
+                    # a name within a scope that is not represented as a symbol (e.g. a lambda)
+                    continue
+
+                if name.type == "class":
+                    kind = SymbolKind.Class
+                elif name.type == "function":
+                    kind = SymbolKind.Method if parent.type == "class" else SymbolKind.Function
+                elif name.name.isupper() and parent.type == "module":
+                    kind = SymbolKind.Constant
+                else:
+                    kind = SymbolKind.Variable
+
+                if name.type in ("class", "function"):
+                    start_line, start_column = start
+                    if line[:start_column].rstrip().endswith("async"):
+                        start_column = line.rindex("async", 0, start_column)
+                    # the range includes the decorators
+                    while start_line > 1 and lines[start_line - 2].strip().startswith("@"):
+                        start_line -= 1
+                        start_column = len(lines[start_line - 1]) - len(lines[start_line - 1].lstrip())
+                    symbol_range = {"start": _position(start_line, start_column), "end": _position(*name.get_definition_end_position())}
+                else:
+                    symbol_range = _name_range(name)
+                symbol = {
+                    "name": name.name,
+                    "kind": int(kind),
+                    "range": symbol_range,
+                    "selectionRange": _name_range(name),
+                    "children": [],
+                }
+                has_type = name.type in ("class", "function")
+                declaration_key = (id(parent_symbol) if parent_symbol is not None else None, name.name)
+                declaration = declarations.get(declaration_key)
+                if declaration is None:
+                    declarations[declaration_key] = [symbol, has_type]
+                    (parent_symbol["children"] if parent_symbol is not None else root_symbols).append(symbol)
+                elif has_type:
+                    # a redefinition by a class/function replaces the previous symbol (retaining its position)
+                    declaration[0].clear()
+                    declaration[0].update(symbol)
+                    declaration[1] = True
+                    symbol = declaration[0]
+                else:
+                    # further assignments to a name are not reported
+                    continue
+                if has_type:
+                    scopes[(name.line, name.column)] = (symbol, parent_symbol)
+            return root_symbols
+
+    def definition(self, params: dict) -> list[dict]:
+        with self._lock:
+            names = self._script(params["textDocument"]["uri"]).goto(*self._jedi_position(params), follow_imports=True)
+            return [loc for loc in map(_location, names) if loc is not None]
+
+    def references(self, params: dict) -> list[dict]:
+        include_declaration = params.get("context", {}).get("includeDeclaration", True)
+        with self._lock:
+            names = self._script(params["textDocument"]["uri"]).get_references(*self._jedi_position(params), include_builtins=False)
+            return [loc for name in names if include_declaration or not name.is_definition() for loc in [_location(name)] if loc is not None]
+
+    def rename(self, params: dict) -> dict:
+        with self._lock:
+            refactoring = self._script(params["textDocument"]["uri"]).rename(*self._jedi_position(params), new_name=params["newName"])
+            changes = {}
+            for path, changed_file in refactoring.get_changed_files().items():
+                uri = pathlib.Path(path).as_uri()
+                old_lines = self._get_text(uri).splitlines(keepends=True)
+                new_lines = changed_file.get_new_code().splitlines(keepends=True)
+                edits = []
+                # replace only the lines that changed
+                for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False).get_opcodes():
+                    if tag != "equal":
+                        edits.append(
+                            {"range": {"start": _position(i1 + 1, 0), "end": _position(i2 + 1, 0)}, "newText": "".join(new_lines[j1:j2])}
+                        )
+                changes[uri] = edits
+            return {"changes": changes}
+
+    def hover(self, params: dict) -> dict | None:
+        with self._lock:
+            names = self._script(params["textDocument"]["uri"]).help(*self._jedi_position(params))
+            if not names:
+                return None
+            name = names[0]
+            signatures = [s.to_string() for s in name.get_signatures()] or [name.description]
+            value = "```python\n" + "\n".join(signatures) + "\n```"
+            docstring = name.docstring(raw=True)
+            if docstring:
+                value += "\n\n" + docstring
+            return {"contents": {"kind": "markdown", "value": value}}
+
+    def workspace_symbol(self, params: dict) -> list[dict]:
+        kinds = {"class": SymbolKind.Class, "function": SymbolKind.Function, "module": SymbolKind.Module}
+        root_prefix = os.path.join(self._repository_root_path, "")
+        with self._lock:
+            result = []
+            for name in self._project.complete_search(params["query"], all_scopes=True) if params["query"] else []:
+                if name.module_path is None or not str(name.module_path).startswith(root_prefix):
+                    continue
+                location = _location(name)
+                if location is None:
+                    continue
+                if name.type == "function" and name.parent().type == "class":
+                    kind = SymbolKind.Method
+                else:
+                    kind = kinds.get(name.type, SymbolKind.Variable)
+                result.append({"name": name.name, "kind": int(kind), "location": location})
+            return result
+
+
+class InProcessLanguageServerHandler(SolidLanguageServerHandler):
+    """
+    A language server handler which dispatches requests to an in-process backend instead of a language server process
+    """
+
+    def __init__(self, request_handlers: dict[str, Callable[[Any], Any]], **kwargs: Any):
+        super().__init__(ProcessLaunchInfo(cmd=""), **kwargs)
+        self._request_handlers = request_handlers
+        self._running = False
+
+    @override
+    def is_running(self) -> bool:
+        return self._running
+
+    @override
+    def start(self) -> None:
+        self._running = True
+
+    @override
+    def stop(self) -> None:
+        self._running = False
+
+    @override
+    def shutdown(self) -> None:
+        self._running = False
+
+    @override
+    def send_request(self, method: str, params: dict | None = None) -> PayloadLike:
+        handler = self._request_handlers.get(method)
+        if handler is None:
+            raise SolidLSPException(f"Request {method} is not supported by the in-process language server")
+        try:
+            return handler(params)
+        except Exception as e:
+            raise SolidLSPException(f"Error processing request {method} with params:\n{params}", cause=e) from e
+
+    @override
+    def send_notification(self, method: str, params: dict | None = None) -> None:
+        # document contents are read directly from the file buffers, so notifications need not be processed
+        pass
+
+
+class JediInProcessServer(SolidLanguageServer):
+    """
+    Python language server calling the jedi API in-process (see module documentation)
+    """
+
+    def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
+        """
+        Creates a JediInProcessServer instance. This class is not meant to be instantiated directly. Use LanguageServer.create() instead.
+        """
+        super().__init__(
+            config,
+            repository_root_path,
+            ProcessLaunchInfo(cmd="", cwd=repository_root_path),
+            "python",
+            solidlsp_settings,
+        )
+        backend = JediBackend(self.repository_root_path, self._encoding, self._get_open_document_text)
+        self.server = InProcessLanguageServerHandler(
+            backend.request_handlers, language=self.language, determine_log_level=self._determine_log_level
+        )
+
+    def _get_open_document_text(self, uri: str) -> str | None:
+        file_buffer = self.open_file_buffers.get(uri)
+        return file_buffer.contents if file_buffer is not None else None
+
+    @override
+    def is_ignored_dirname(self, dirname: str) -> bool:
+        return super().is_ignored_dirname(dirname) or dirname in ["venv", "__pycache__"]
+
+    def _start_server(self) -> None:
+        log.info("Starting in-process jedi language server for %s (jedi %s)", self.repository_root_path, jedi.__version__)
+        self.server.start()
+        self.completions_available.set()
+
+    @override
+    def _shutdown(self, timeout: float = 5.0) -> None:
+        self.server.stop()
@@ -33,6 +33,7 @@ log = logging.getLogger(__name__)
 # Default JVM options for Kotlin Language Server
 # -Xmx4G: Limit max heap to 4GB to prevent OOM on large projects
 DEFAULT_KOTLIN_JVM_OPTIONS = "-Xmx4G"
+KOTLIN_LSP_VERSION = "0.253.10629"
 
 
 @dataclasses.dataclass
@@ -98,7 +99,7 @@ class KotlinLanguageServer(SolidLanguageServer):
             "runtimeDependency": {
                 "id": "KotlinLsp",
                 "description": "Kotlin Language Server",
-                "url": "https://download-cdn.jetbrains.com/kotlin-lsp/0.253.10629/kotlin-0.253.10629.zip",
+                "url": f"https://download-cdn.jetbrains.com/kotlin-lsp/{KOTLIN_LSP_VERSION}/kotlin-{KOTLIN_LSP_VERSION}.zip",
                 "archiveType": "zip",
             },
             "java": {
@@ -469,6 +470,8 @@ class KotlinLanguageServer(SolidLanguageServer):
         log.info("Starting Kotlin server process")
         self.server.start()
         initialize_params = self._get_initialize_params(self.repository_root_path)
+        # persist the server's index across starts
+        initialize_params["initializationOptions"]["storagePath"] = self.get_persistent_index_dir(KOTLIN_LSP_VERSION)  # type: ignore
 
         log.info("Sending initialize request from LSP client to LSP server and awaiting response")
         init_response = self.server.send.initialize(initialize_params)
@@ -21,6 +21,9 @@ from solidlsp.settings import SolidLSPSettings
 
 log = logging.getLogger(__name__)
 
+# directories which pyright never analyzes (pyright's own default exclusions are replaced when exclusions are configured)
+DEFAULT_EXCLUDE_GLOBS = ["**/node_modules", "**/__pycache__", "**/.*", "**/.venv", "**/.env", "**/build", "**/dist", "**/.pixi"]
+
 
 class PyrightServer(SolidLanguageServer):
     """
@@ -42,6 +45,8 @@ class PyrightServer(SolidLanguageServer):
             solidlsp_settings,
         )
 
+        self._ignored_paths = list(config.ignored_paths)
+
         # Event to signal when initial workspace analysis is complete
         self.analysis_complete = threading.Event()
         self.found_source_files = False
@@ -63,6 +68,22 @@ class PyrightServer(SolidLanguageServer):
                 return candidate
         return sys.executable
 
+    def _get_exclude_globs(self) -> list[str]:
+        """
+        :return: the globs (relative to the repository root) of the paths which pyright shall not analyze, i.e. the default
+            exclusions and the ignored paths of the configuration (e.g. the sub-projects served by other shards)
+        """
+        globs = list(DEFAULT_EXCLUDE_GLOBS)
+        for pattern in self._ignored_paths:
+            pattern = pattern.strip().replace(os.path.sep, "/")
+            if not pattern or pattern.startswith(("#", "!")):
+                continue
+            # as in .gitignore files, patterns containing a slash (other than a trailing one) are relative to the root
+            anchored = "/" in pattern.rstrip("/")
+            pattern = pattern.strip("/")
+            globs.append(pattern if anchored else f"**/{pattern}")
+        return globs
+
     @staticmethod
     def _get_initialize_params(repository_absolute_path: str) -> InitializeParams:
         """
@@ -94,6 +115,7 @@ class PyrightServer(SolidLanguageServer):
                         "symbolKind": {"valueSet": list(range(1, 27))},
                     },
                     "executeCommand": {"dynamicRegistration": True},
+                    "configuration": True,
                 },
                 "textDocument": {
                     "synchronization": {"dynamicRegistration": True, "willSave": True, "willSaveWaitUntil": True, "didSave": True},
@@ -146,6 +168,13 @@ class PyrightServer(SolidLanguageServer):
         def do_nothing(params: dict) -> None:
             return
 
+        def workspace_configuration_handler(params: dict) -> list:
+            # the analysis settings (e.g. python.analysis.exclude) are read from the section "python"
+            return [
+                {"analysis": {"exclude": self._get_exclude_globs()}} if item.get("section") == "python" else {}
+                for item in params.get("items", [])
+            ]
+
         def window_log_message(msg: dict) -> None:
             """
             Monitor Pyright's log messages to detect when initial analysis is complete.
@@ -177,6 +206,7 @@ class PyrightServer(SolidLanguageServer):
         self.server.on_notification("language/status", do_nothing)
         self.server.on_notification("window/logMessage", window_log_message)
         self.server.on_request("workspace/executeClientCommand", execute_client_command_handler)
+        self.server.on_request("workspace/configuration", workspace_configuration_handler)
         self.server.on_notification("$/progress", do_nothing)
         self.server.on_notification("textDocument/publishDiagnostics", do_nothing)
         self.server.on_notification("language/actionableNotification", do_nothing)
@@ -18,6 +18,7 @@ from solidlsp.ls_config import LanguageServerConfig
 from solidlsp.lsp_protocol_handler.lsp_types import InitializeParams
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
 from solidlsp.settings import SolidLSPSettings
+from solidlsp.util.resolution_manifest import get_search_path_key
 
 log = logging.getLogger(__name__)
 
@@ -65,6 +66,20 @@ class RustAnalyzer(SolidLanguageServer):
             pass
         return None
 
+    @staticmethod
+    def _get_resolution_key(repository_root_path: str) -> str:
+        """
+        :return: the key under which the resolved rust-analyzer binary is recorded (see `_resolve_binary`), capturing
+            the inputs of the resolution (toolchain overrides and the search path)
+        """
+        key = f"rust-analyzer:{get_search_path_key()}"
+        toolchain_override = os.environ.get("RUSTUP_TOOLCHAIN")
+        if toolchain_override:
+            key += f":{toolchain_override}"
+        if any(os.path.exists(os.path.join(repository_root_path, fn)) for fn in ("rust-toolchain", "rust-toolchain.toml")):
+            key += f":{os.path.realpath(repository_root_path)}"
+        return key
+
     @staticmethod
     def _ensure_rust_analyzer_installed() -> str:
         """
@@ -166,7 +181,10 @@ class RustAnalyzer(SolidLanguageServer):
         """
         Creates a RustAnalyzer instance. This class is not meant to be instantiated directly. Use LanguageServer.create() instead.
         """
-        rustanalyzer_executable_path = self._ensure_rust_analyzer_installed()
+        rustanalyzer_executable_path = self._resolve_binary(
+            solidlsp_settings, self._get_resolution_key(repository_root_path), lambda: (self._ensure_rust_analyzer_installed(), None)
+        ).path
+        self._rustanalyzer_executable_path = rustanalyzer_executable_path
         log.info(f"Using rust-analyzer at: {rustanalyzer_executable_path}")
 
         super().__init__(
@@ -704,6 +722,10 @@ class RustAnalyzer(SolidLanguageServer):
         log.info("Starting RustAnalyzer server process")
         self.server.start()
         initialize_params = self._get_initialize_params(self.repository_root_path)
+        # use a persistent, separate target directory for build scripts, proc macros and checks, such that their
+        # outputs are reused across starts (and rust-analyzer does not contend with the user's builds for the cargo lock)
+        index_dir = self.get_persistent_index_dir(self.get_executable_version_fingerprint(self._rustanalyzer_executable_path))
+        initialize_params["initializationOptions"]["cargo"]["targetDir"] = os.path.join(index_dir, "target")  # type: ignore
 
         log.info("Sending initialize request from LSP client to LSP server and awaiting response")
         init_response = self.server.send.initialize(initialize_params)
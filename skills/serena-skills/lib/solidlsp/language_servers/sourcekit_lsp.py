@@ -1,6 +1,7 @@
 import logging
 import os
 import pathlib
+import shutil
 import subprocess
 import threading
 import time
@@ -13,6 +14,7 @@ from solidlsp.ls_config import LanguageServerConfig
 from solidlsp.lsp_protocol_handler.lsp_types import InitializeParams
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
 from solidlsp.settings import SolidLSPSettings
+from solidlsp.util.resolution_manifest import get_search_path_key
 
 log = logging.getLogger(__name__)
 
@@ -47,11 +49,16 @@ class SourceKitLSP(SolidLanguageServer):
             ) from e
 
     def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
-        sourcekit_version = self._get_sourcekit_lsp_version()
-        log.info(f"Starting sourcekit lsp with version: {sourcekit_version}")
+        # the resolution is recorded in the resolution manifest, such that later starts need not run `sourcekit-lsp -h`
+        sourcekit = self._resolve_binary(
+            solidlsp_settings,
+            f"sourcekit-lsp:{get_search_path_key()}",
+            lambda: (shutil.which("sourcekit-lsp") or "sourcekit-lsp", self._get_sourcekit_lsp_version()),
+        )
+        log.info(f"Starting sourcekit lsp at {sourcekit.path} with version: {sourcekit.version}")
 
         super().__init__(
-            config, repository_root_path, ProcessLaunchInfo(cmd="sourcekit-lsp", cwd=repository_root_path), "swift", solidlsp_settings
+            config, repository_root_path, ProcessLaunchInfo(cmd=sourcekit.path, cwd=repository_root_path), "swift", solidlsp_settings
         )
         self.server_ready = threading.Event()
         self.request_id = 0
@@ -8,6 +8,10 @@ import os
 import pathlib
 import shutil
 import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from time import sleep
 from typing import Any
@@ -24,7 +28,7 @@ from solidlsp.ls import LSPFileBuffer, SolidLanguageServer
 from solidlsp.ls_config import Language, LanguageServerConfig
 from solidlsp.ls_exceptions import SolidLSPException
 from solidlsp.ls_types import Location
-from solidlsp.ls_utils import PathUtils
+from solidlsp.ls_utils import FileUtils, PathUtils
 from solidlsp.lsp_protocol_handler import lsp_types
 from solidlsp.lsp_protocol_handler.lsp_types import DocumentSymbol, ExecuteCommandParams, InitializeParams, SymbolInformation
 from solidlsp.lsp_protocol_handler.server import ProcessLaunchInfo
@@ -136,7 +140,12 @@ class VueLanguageServer(SolidLanguageServer):
     TS_SERVER_READY_TIMEOUT = 5.0
     VUE_SERVER_READY_TIMEOUT = 3.0
     # Windows requires more time due to slower I/O and process operations.
+    # Only used if the TypeScript server does not provide a readiness signal after indexing (see _wait_for_vue_files_processed).
     VUE_INDEXING_WAIT_TIME = 4.0 if os.name == "nt" else 2.0
+    # maximum time to wait for the TypeScript server to have processed the indexed .vue files
+    VUE_INDEXING_READY_TIMEOUT = 30.0
+    # number of .vue files whose contents are read concurrently (and which may be read ahead of the file being opened)
+    VUE_INDEXING_MAX_WORKERS = 8
 
     def __init__(self, config: LanguageServerConfig, repository_root_path: str, solidlsp_settings: SolidLSPSettings):
         vue_lsp_executable_path, self.tsdk_path, self._ts_ls_cmd = self._setup_runtime_dependencies(config, solidlsp_settings)
@@ -154,6 +163,8 @@ class VueLanguageServer(SolidLanguageServer):
         self._ts_server_started = False
         self._vue_files_indexed = False
         self._indexed_vue_file_uris: list[str] = []
+        self.vue_indexing_duration: float | None = None
+        """the time (in seconds) it took to index the .vue files on the TypeScript server (None if not yet indexed)"""
 
     @override
     def is_ignored_dirname(self, dirname: str) -> bool:
@@ -183,18 +194,84 @@ class VueLanguageServer(SolidLanguageServer):
         return ext in (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
 
     def _find_all_vue_files(self) -> list[str]:
-        vue_files = []
-        repo_path = Path(self.repository_root_path)
+        return [relative_path for relative_path in self.iter_source_files() if relative_path.endswith(".vue")]
 
-        for vue_file in repo_path.rglob("*.vue"):
+    def _read_files_concurrently(self, relative_paths: Iterable[str]) -> Iterator[tuple[str, str | None]]:
+        """
+        Reads the given files with a pool of threads, keeping at most twice as many reads in flight as there are workers.
+
+        :return: an iterator over pairs (relative path, contents) in the order of the given paths, where the contents
+            are None if the file could not be read
+        """
+
+        def read(relative_path: str) -> str | None:
+            try:
+                return FileUtils.read_file(os.path.join(self.repository_root_path, relative_path), self._encoding)
+            except Exception as e:
+                log.debug(f"Failed to read {relative_path}: {e}")
+                return None
+
+        window: deque[tuple[str, Future[str | None]]] = deque()
+        with ThreadPoolExecutor(max_workers=self.VUE_INDEXING_MAX_WORKERS, thread_name_prefix="vue-indexing") as executor:
+            for relative_path in relative_paths:
+                window.append((relative_path, executor.submit(read, relative_path)))
+                if len(window) >= 2 * self.VUE_INDEXING_MAX_WORKERS:
+                    path, future = window.popleft()
+                    yield path, future.result()
+            while window:
+                path, future = window.popleft()
+                yield path, future.result()
+
+    def _open_vue_file_on_ts_server(self, relative_path: str, contents: str) -> None:
+        """
+        Opens the given .vue file on the TypeScript server (keeping it open until _cleanup_indexed_vue_files is called)
+        """
+        assert self._ts_server is not None
+        uri = pathlib.Path(os.path.join(self.repository_root_path, relative_path)).as_uri()
+        file_buffer = self._ts_server.open_file_buffers.get(uri)
+        if file_buffer is not None:
+            file_buffer.ref_count += 1
+        else:
+            language_id = self._ts_server._get_language_id_for_file(relative_path)
+            self._ts_server.open_file_buffers[uri] = LSPFileBuffer(uri, contents, 0, language_id, 1)
+            self._ts_server.server.notify.did_open_text_document(
+                {"textDocument": {"uri": uri, "languageId": language_id, "version": 0, "text": contents}}  # type: ignore[typeddict-item]
+            )
+        self._indexed_vue_file_uris.append(uri)
+
+    def _wait_for_vue_files_processed(self, last_relative_path: str) -> bool:
+        """
+        Waits until the TypeScript server has processed the opened .vue files.
+        tsserver handles requests in the order in which they are received, and answering a projectInfo request
+        requires the project containing the file to be loaded, so the response to a projectInfo request for the
+        last opened file signals that all files were processed.
+
+        :param last_relative_path: the relative path of the last opened file
+        :return: whether the readiness signal was received (within VUE_INDEXING_READY_TIMEOUT)
+        """
+        assert self._ts_server is not None
+        ts_server = self._ts_server
+        responded = threading.Event()
+
+        def request_project_info() -> None:
             try:
-                relative_path = str(vue_file.relative_to(repo_path))
-                if "node_modules" not in relative_path and not relative_path.startswith("."):
-                    vue_files.append(relative_path)
+                ts_server.handler.send.execute_command(
+                    {
+                        "command": "typescript.tsserverRequest",
+                        "arguments": [
+                            "projectInfo",
+                            {"file": os.path.join(self.repository_root_path, last_relative_path), "needFileNameList": False},
+                        ],
+                    }
+                )
+                responded.set()
             except Exception as e:
-                log.debug(f"Error processing Vue file {vue_file}: {e}")
+                log.debug(f"projectInfo request to the TypeScript server failed: {e}")
 
-        return vue_files
+        thread = threading.Thread(target=request_project_info, name="vue-indexing-ready", daemon=True)
+        thread.start()
+        thread.join(timeout=self.VUE_INDEXING_READY_TIMEOUT)
+        return responded.is_set()
 
     def _ensure_vue_files_indexed_on_ts_server(self) -> None:
         if self._vue_files_indexed:
@@ -202,22 +279,31 @@ class VueLanguageServer(SolidLanguageServer):
 
         assert self._ts_server is not None
         log.info("Indexing .vue files on TypeScript server for cross-file references")
+        start_time = time.perf_counter()
         vue_files = self._find_all_vue_files()
         log.debug(f"Found {len(vue_files)} .vue files to index")
 
-        for vue_file in vue_files:
+        last_opened_file = None
+        for vue_file, contents in self._read_files_concurrently(vue_files):
+            if contents is None:
+                continue
             try:
-                with self._ts_server.open_file(vue_file) as file_buffer:
-                    file_buffer.ref_count += 1
-                    self._indexed_vue_file_uris.append(file_buffer.uri)
+                self._open_vue_file_on_ts_server(vue_file, contents)
+                last_opened_file = vue_file
             except Exception as e:
                 log.debug(f"Failed to open {vue_file} on TS server: {e}")
+        open_duration = time.perf_counter() - start_time
 
         self._vue_files_indexed = True
-        log.info("Vue file indexing on TypeScript server complete")
-
-        sleep(self._get_vue_indexing_wait_time())
-        log.debug("Wait period after Vue file indexing complete")
+        if last_opened_file is not None and not self._wait_for_vue_files_processed(last_opened_file):
+            log.info("No readiness signal from the TypeScript server after indexing; waiting for a fixed period instead")
+            sleep(self._get_vue_indexing_wait_time())
+
+        self.vue_indexing_duration = time.perf_counter() - start_time
+        log.info(
+            f"Indexed {len(self._indexed_vue_file_uris)} .vue files on TypeScript server in {self.vue_indexing_duration:.2f}s "
+            f"(finding and opening files: {open_duration:.2f}s)"
+        )
 
     def _get_vue_indexing_wait_time(self) -> float:
         return self.VUE_INDEXING_WAIT_TIME
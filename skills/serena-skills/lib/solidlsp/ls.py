@@ -1,3 +1,4 @@
+import bisect
 import dataclasses
 import hashlib
 import json
@@ -8,8 +9,8 @@ import shutil
 import subprocess
 import threading
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from collections.abc import Hashable, Iterator
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Hashable, Iterable, Iterator, MutableMapping
 from contextlib import contextmanager
 from copy import copy
 from pathlib import Path, PurePath
@@ -32,8 +33,9 @@ from solidlsp import ls_types
 from solidlsp.ls_config import Language, LanguageServerConfig
 from solidlsp.ls_exceptions import SolidLSPException
 from solidlsp.ls_handler import SolidLanguageServerHandler
+from solidlsp.ls_symbol_table import CompactSymbolTable, SymbolView
 from solidlsp.ls_types import UnifiedSymbolInformation
-from solidlsp.ls_utils import FileUtils, PathUtils, TextUtils
+from solidlsp.ls_utils import FileUtils, InvalidTextLocationError, PathUtils
 from solidlsp.lsp_protocol_handler import lsp_types
 from solidlsp.lsp_protocol_handler import lsp_types as LSPTypes
 from solidlsp.lsp_protocol_handler.lsp_constants import LSPConstants
@@ -51,7 +53,9 @@ from solidlsp.lsp_protocol_handler.server import (
     StringDict,
 )
 from solidlsp.settings import SolidLSPSettings
-from solidlsp.util.cache import load_cache, save_cache
+from solidlsp.util import index_dirs, python_ast_symbols
+from solidlsp.util.cache import LazyCache, load_binary_cache, load_cache, save_binary_cache
+from solidlsp.util.resolution_manifest import ResolutionManifest, ResolvedBinary
 
 GenericDocumentSymbol = Union[LSPTypes.DocumentSymbol, LSPTypes.SymbolInformation, ls_types.UnifiedSymbolInformation]
 log = logging.getLogger(__name__)
@@ -89,6 +93,12 @@ class LSPFileBuffer:
 
     content_hash: str = ""
 
+    # offsets at which each line starts within `contents`; built lazily and kept up to date on edits
+    _line_starts: list[int] | None = dataclasses.field(default=None, init=False, repr=False, compare=False)
+
+    # the contents for which `_line_starts` was computed (used to detect direct assignments to `contents`)
+    _line_starts_contents: str | None = dataclasses.field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         self.content_hash = hashlib.md5(self.contents.encode("utf-8")).hexdigest()
 
@@ -96,16 +106,202 @@ class LSPFileBuffer:
         """Splits the contents of the file into lines."""
         return self.contents.split("\n")
 
+    def _get_line_starts(self) -> list[int]:
+        if self._line_starts is None or self._line_starts_contents is not self.contents:
+            line_starts = [0]
+            contents = self.contents
+            idx = contents.find("\n")
+            while idx != -1:
+                line_starts.append(idx + 1)
+                idx = contents.find("\n", idx + 1)
+            self._line_starts = line_starts
+            self._line_starts_contents = contents
+        return self._line_starts
+
+    def _get_line_end(self, line_starts: list[int], line: int) -> int:
+        """:return: the offset of the end of the given line (excluding the line break)"""
+        if line + 1 < len(line_starts):
+            return line_starts[line + 1] - 1
+        return len(self.contents)
+
+    @property
+    def num_lines(self) -> int:
+        return len(self._get_line_starts())
+
+    def line(self, line: int) -> str:
+        """
+        :param line: the zero-based line number
+        :return: the content of the given line (without the line break)
+        """
+        line_starts = self._get_line_starts()
+        if not 0 <= line < len(line_starts):
+            raise IndexError(f"Line {line} out of range (file has {len(line_starts)} lines)")
+        return self.contents[line_starts[line] : self._get_line_end(line_starts, line)]
+
+    def lines_text(self, start_line: int, end_line: int, start_character: int = 0) -> str:
+        """
+        Returns the text of the given inclusive range of lines, equivalent to
+        `"\n".join(self.split_lines()[start_line : end_line + 1])[start_character:]`.
+
+        :param start_line: the first line (zero-based)
+        :param end_line: the last line (zero-based, inclusive); lines beyond the end of the file are ignored
+        :param start_character: the number of characters to skip at the start of the first line
+        """
+        line_starts = self._get_line_starts()
+        if start_line >= len(line_starts) or end_line < start_line:
+            return ""
+        end_offset = self._get_line_end(line_starts, min(end_line, len(line_starts) - 1))
+        start_offset = min(line_starts[start_line] + start_character, end_offset)
+        return self.contents[start_offset:end_offset]
+
+    def offset_at(self, position: ls_types.Position) -> int:
+        """
+        :param position: a position within the file
+        :return: the index in `contents` corresponding to the given position; columns beyond the end of the file
+            are clamped to the end of the file (as slicing the contents would)
+        """
+        line_starts = self._get_line_starts()
+        line = position["line"]
+        if not 0 <= line < len(line_starts):
+            raise InvalidTextLocationError(f"Line {line} out of range (file has {len(line_starts)} lines)")
+        return min(line_starts[line] + position["character"], len(self.contents))
+
+    def position_at(self, offset: int) -> ls_types.Position:
+        """
+        :param offset: an index in `contents`
+        :return: the position corresponding to the given index
+        """
+        line_starts = self._get_line_starts()
+        line = bisect.bisect_right(line_starts, offset) - 1
+        return ls_types.Position(line=line, character=offset - line_starts[line])
+
+    def slice(self, range: ls_types.Range) -> str:
+        """
+        :param range: a range within the file
+        :return: the text within the given range
+        """
+        return self.contents[self.offset_at(range["start"]) : self.offset_at(range["end"])]
+
+    def insert_text(self, line: int, column: int, text_to_be_inserted: str) -> ls_types.Position:
+        """
+        Inserts text at the given position, updating the line index incrementally.
+
+        :return: the position right after the inserted text
+        """
+        line_starts = self._get_line_starts()
+        try:
+            offset = self.offset_at(ls_types.Position(line=line, character=column))
+        except InvalidTextLocationError:
+            if line == len(line_starts) and column == 0:  # trying to insert at new line after full text
+                # insert at end, adding missing newline
+                offset = len(self.contents)
+                text_to_be_inserted = "\n" + text_to_be_inserted
+            else:
+                raise
+        new_contents = self.contents[:offset] + text_to_be_inserted + self.contents[offset:]
+
+        insert_line = bisect.bisect_right(line_starts, offset) - 1
+        new_line_starts = [offset + i + 1 for i, c in enumerate(text_to_be_inserted) if c == "\n"]
+        shift = len(text_to_be_inserted)
+        line_starts[insert_line + 1 :] = new_line_starts + [s + shift for s in line_starts[insert_line + 1 :]]
+        self.contents = new_contents
+        self._line_starts_contents = new_contents
+
+        num_newlines = len(new_line_starts)
+        if num_newlines > 0:
+            return ls_types.Position(line=line + num_newlines, character=len(text_to_be_inserted) - (new_line_starts[-1] - offset))
+        return ls_types.Position(line=line, character=column + len(text_to_be_inserted))
+
+    def delete_text(self, start: ls_types.Position, end: ls_types.Position) -> str:
+        """
+        Deletes the text between the given positions, updating the line index incrementally.
+
+        :return: the deleted text
+        """
+        line_starts = self._get_line_starts()
+        start_offset = self.offset_at(start)
+        end_offset = self.offset_at(end)
+        deleted_text = self.contents[start_offset:end_offset]
+        new_contents = self.contents[:start_offset] + self.contents[end_offset:]
+
+        first_removed = bisect.bisect_right(line_starts, start_offset)
+        first_kept = bisect.bisect_right(line_starts, end_offset)
+        shift = end_offset - start_offset
+        line_starts[first_removed:] = [s - shift for s in line_starts[first_kept:]]
+        self.contents = new_contents
+        self._line_starts_contents = new_contents
+        return deleted_text
+
 
 class DocumentSymbols:
-    # IMPORTANT: Instances of this class are persisted in the high-level document symbol cache
+    # IMPORTANT: Instances of this class are persisted in the high-level document symbol cache.
+    # Only the compact symbol table is persisted; the dictionary representation is materialized on demand.
 
-    def __init__(self, root_symbols: list[ls_types.UnifiedSymbolInformation]):
-        self.root_symbols = root_symbols
+    def __init__(
+        self,
+        root_symbols: list[ls_types.UnifiedSymbolInformation] | None = None,
+        symbol_table: CompactSymbolTable | None = None,
+    ):
+        """
+        :param root_symbols: the root symbols (dictionary representation)
+        :param symbol_table: the compact representation of the symbols; if `root_symbols` is not given,
+            the dictionary representation is materialized from it on demand
+        """
+        if root_symbols is None and symbol_table is None:
+            raise ValueError("Either root_symbols or symbol_table must be given")
+        self._root_symbols = root_symbols
+        self._symbol_table = symbol_table
         self._all_symbols: list[ls_types.UnifiedSymbolInformation] | None = None
 
     def __getstate__(self) -> dict:
-        return getstate(DocumentSymbols, self, transient_properties=["_all_symbols"])
+        self.get_symbol_table()
+        return getstate(DocumentSymbols, self, transient_properties=["_root_symbols", "_all_symbols"])
+
+    @property
+    def root_symbols(self) -> list[ls_types.UnifiedSymbolInformation]:
+        if self._root_symbols is None:
+            self.materialize()
+        assert self._root_symbols is not None
+        return self._root_symbols
+
+    def is_materialized(self) -> bool:
+        return self._root_symbols is not None
+
+    def materialize(self, text: str | None = None) -> None:
+        """
+        Creates the dictionary representation of the symbols from the compact symbol table (if it does not exist yet).
+
+        :param text: the contents of the document, which is required to restore the symbol bodies.
+            If it is not given, bodies are omitted (they can be retrieved later via `SolidLanguageServer.retrieve_symbol_body`).
+        """
+        if self._root_symbols is not None:
+            return
+        assert self._symbol_table is not None
+        self._root_symbols = self._symbol_table.materialize(text)
+
+    def to_unmaterialized(self) -> "DocumentSymbols":
+        """
+        :return: an instance sharing this instance's compact symbol table but not its dictionary representation
+            (which is materialized anew on demand); this instance remains unchanged
+        """
+        return DocumentSymbols(symbol_table=self.get_symbol_table())
+
+    def get_symbol_table(self, text: str | None = None) -> CompactSymbolTable:
+        """
+        :param text: the contents of the document; if given and the table does not exist yet, symbol bodies are
+            stored as spans within the text rather than as strings
+        :return: the compact representation of the symbols
+        """
+        if self._symbol_table is None:
+            assert self._root_symbols is not None
+            self._symbol_table = CompactSymbolTable.from_symbols(self._root_symbols, text=text)
+        return self._symbol_table
+
+    def iter_symbol_views(self) -> Iterator[SymbolView]:
+        """
+        Iterates over all symbols in a depth-first manner without materializing them.
+        """
+        return self.get_symbol_table().iter_views()
 
     def iter_symbols(self) -> Iterator[ls_types.UnifiedSymbolInformation]:
         """
@@ -151,10 +347,17 @@ class SolidLanguageServer(ABC):
     If the result of a language server changes in a way that affects the raw document symbols,
     the LS-specific version should be incremented instead.
     """
-    RAW_DOCUMENT_SYMBOL_CACHE_FILENAME = "raw_document_symbols.pkl"
+    RAW_DOCUMENT_SYMBOL_CACHE_FILENAME = "raw_document_symbols.bin"
+    RAW_DOCUMENT_SYMBOL_CACHE_FILENAME_PICKLE_LEGACY = "raw_document_symbols.pkl"
     RAW_DOCUMENT_SYMBOL_CACHE_FILENAME_LEGACY_FALLBACK = "document_symbols_cache_v23-06-25.pkl"
-    DOCUMENT_SYMBOL_CACHE_VERSION = 3
-    DOCUMENT_SYMBOL_CACHE_FILENAME = "document_symbols.pkl"
+    DOCUMENT_SYMBOL_CACHE_VERSION = 4
+    MAX_MATERIALIZED_DOCUMENT_SYMBOLS = 64
+    """
+    the maximum number of cached documents for which the dictionary representation of the symbols is kept in memory;
+    the cache itself stores the compact symbol tables, from which the symbols of other documents are re-materialized on demand
+    """
+    DOCUMENT_SYMBOL_CACHE_FILENAME = "document_symbols.bin"
+    DOCUMENT_SYMBOL_CACHE_FILENAME_PICKLE_LEGACY = "document_symbols.pkl"
 
     # To be overridden and extended by subclasses
     def is_ignored_dirname(self, dirname: str) -> bool:
@@ -209,6 +412,68 @@ class SolidLanguageServer(ABC):
             os.makedirs(result, exist_ok=True)
         return result
 
+    @classmethod
+    def acquire_persistent_index_dir(cls, solidlsp_settings: SolidLSPSettings, repository_root_path: str, server_version: str) -> str:
+        """
+        Returns the persistent directory in which the language server can store its index/caches for the given project
+        and server version, such that later starts need not re-index the project, and marks it as being in use
+        (which protects it from eviction). Subclasses should prefer `get_persistent_index_dir`; this variant exists
+        for the case where the directory is needed before the base class is initialised (e.g. for the launch command),
+        in which case the directory must be registered via `_register_persistent_index_dir` afterwards.
+
+        :param solidlsp_settings: the settings
+        :param repository_root_path: the repository root
+        :param server_version: the version of the language server (indexes are typically not compatible across versions)
+        :return: the path of the directory
+        """
+        index_dirs.evict_index_dirs_periodically(
+            solidlsp_settings.solidlsp_dir,
+            max_total_size_mb=solidlsp_settings.index_cache_max_size_mb,
+            max_age_days=solidlsp_settings.index_cache_max_age_days,
+        )
+        index_dir = index_dirs.acquire_index_dir(solidlsp_settings.solidlsp_dir, repository_root_path, cls.__name__, server_version)
+        log.info("Using persistent index directory %s", index_dir)
+        return index_dir
+
+    @classmethod
+    def _resolve_binary(
+        cls, solidlsp_settings: SolidLSPSettings, key: str, resolve_fn: Callable[[], tuple[str, str | None]]
+    ) -> ResolvedBinary:
+        """
+        Resolves a binary required by the language server via the per-machine resolution manifest, i.e. the (potentially
+        expensive) resolution function is only called if no valid resolution was recorded before.
+
+        :param solidlsp_settings: the settings
+        :param key: the key identifying the binary (and the context of its resolution) for this language server
+        :param resolve_fn: a function returning the pair (path, version), raising an exception if the binary cannot be found
+        :return: the resolved binary
+        """
+        return ResolutionManifest(solidlsp_settings.solidlsp_dir).resolve(f"{cls.__name__}:{key}", resolve_fn)
+
+    def get_persistent_index_dir(self, server_version: str) -> str:
+        """
+        Returns the persistent directory in which the language server can store its index/caches for this project and
+        the given server version. The directory is released when the language server is stopped.
+
+        :param server_version: the version of the language server (indexes are typically not compatible across versions)
+        :return: the path of the directory
+        """
+        index_dir = self.acquire_persistent_index_dir(self._solidlsp_settings, self.repository_root_path, server_version)
+        self._register_persistent_index_dir(index_dir)
+        return index_dir
+
+    def _register_persistent_index_dir(self, index_dir: str) -> None:
+        self._persistent_index_dirs.add(index_dir)
+
+    @staticmethod
+    def get_executable_version_fingerprint(executable_path: str) -> str:
+        """
+        Derives a version identifier for a language server executable without running it (from its size and
+        modification time), for use with `get_persistent_index_dir` where the version cannot be determined otherwise.
+        """
+        st = os.stat(executable_path)
+        return f"{os.path.basename(executable_path)}-{st.st_size}-{int(st.st_mtime)}"
+
     @classmethod
     def create(
         cls,
@@ -283,6 +548,9 @@ class SolidLanguageServer(ABC):
         self.open_file_buffers: dict[str, LSPFileBuffer] = {}
         self.language = Language(language_id)
 
+        self._persistent_index_dirs: set[str] = set()
+        """the persistent index directories used by the language server (see `get_persistent_index_dir`)"""
+
         # initialise symbol caches
         self.cache_dir = (
             Path(self.repository_root_path) / self._solidlsp_settings.project_data_relative_path / self.CACHE_FOLDER_NAME / self.language_id
@@ -290,14 +558,19 @@ class SolidLanguageServer(ABC):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         # * raw document symbols cache
         self._ls_specific_raw_document_symbols_cache_version = cache_version_raw_document_symbols
-        self._raw_document_symbols_cache: dict[str, tuple[str, list[DocumentSymbol] | list[SymbolInformation] | None]] = {}
-        """maps relative file paths to a tuple of (file_content_hash, raw_root_symbols)"""
+        self._raw_document_symbols_cache: MutableMapping[str, tuple[str, list[DocumentSymbol] | list[SymbolInformation] | None]] = {}
+        """
+        maps relative file paths to a tuple of (file_content_hash, raw_root_symbols);
+        when loaded from disk, this is a LazyCache whose entries are decoded on first access
+        """
         self._raw_document_symbols_cache_is_modified: bool = False
         self._load_raw_document_symbols_cache()
         # * high-level document symbols cache
-        self._document_symbols_cache: dict[str, tuple[str, DocumentSymbols]] = {}
+        self._document_symbols_cache: MutableMapping[str, tuple[str, DocumentSymbols]] = {}
         """maps relative file paths to a tuple of (file_content_hash, document_symbols)"""
         self._document_symbols_cache_is_modified: bool = False
+        self._materialized_document_symbols: OrderedDict[str, DocumentSymbols] = OrderedDict()
+        """LRU of cache entries whose dictionary representation is currently materialized"""
         self._load_document_symbols_cache()
 
         self.server_started = False
@@ -400,6 +673,37 @@ class SolidLanguageServer(ABC):
 
         return match_path(relative_path, self.get_ignore_spec(), root_path=self.repository_root_path)
 
+    def iter_source_files(self, within_relative_path: str = ".") -> Iterator[str]:
+        """
+        Iterates over the relative paths of all source files that are not ignored, pruning ignored directories
+        (such that their contents are never listed).
+
+        :param within_relative_path: the relative path of the directory to search in
+        :return: an iterator over relative file paths (in sorted order within each directory)
+        """
+        stack = [os.path.normpath(within_relative_path)]
+        while stack:
+            rel_dir_path = stack.pop()
+            abs_dir_path = os.path.join(self.repository_root_path, rel_dir_path)
+            try:
+                with os.scandir(abs_dir_path) as entries:
+                    sorted_entries = sorted(entries, key=lambda e: e.name)
+            except OSError as e:
+                log.debug("Skipping directory %s: %s", abs_dir_path, e)
+                continue
+            sub_dirs = []
+            for entry in sorted_entries:
+                rel_path = entry.name if rel_dir_path == "." else os.path.join(rel_dir_path, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self.is_ignored_dirname(entry.name) and not self.is_ignored_path(rel_path):
+                            sub_dirs.append(rel_path)
+                    elif entry.is_file() and not self.is_ignored_path(rel_path):
+                        yield rel_path
+                except OSError as e:
+                    log.debug("Skipping %s: %s", entry.path, e)
+            stack.extend(reversed(sub_dirs))
+
     def _shutdown(self, timeout: float = 5.0) -> None:
         """
         A robust shutdown process designed to terminate cleanly on all platforms, including Windows,
@@ -546,6 +850,28 @@ class SolidLanguageServer(ABC):
             with self.open_file(relative_file_path) as fb:
                 yield fb
 
+    @contextmanager
+    def _read_file_context(self, relative_file_path: str, file_buffer: LSPFileBuffer | None = None) -> Iterator[LSPFileBuffer]:
+        """
+        Internal context manager providing a buffer with the contents of the given file without opening it
+        in the language server (which therefore need not be started). If the file is already open,
+        the existing buffer is used.
+
+        :param relative_file_path: the relative path of the file to read.
+        :param file_buffer: an optional existing file buffer to reuse.
+        """
+        if file_buffer is not None:
+            yield file_buffer
+            return
+        absolute_file_path = str(PurePath(self.repository_root_path, relative_file_path))
+        uri = pathlib.Path(absolute_file_path).as_uri()
+        open_file_buffer = self.open_file_buffers.get(uri)
+        if open_file_buffer is not None:
+            yield open_file_buffer
+        else:
+            contents = FileUtils.read_file(absolute_file_path, self._encoding)
+            yield LSPFileBuffer(uri, contents, 0, self._get_language_id_for_file(relative_file_path), 0)
+
     def insert_text_at_position(self, relative_file_path: str, line: int, column: int, text_to_be_inserted: str) -> ls_types.Position:
         """
         Insert text at the given line and column in the given file and return
@@ -569,8 +895,7 @@ class SolidLanguageServer(ABC):
         file_buffer = self.open_file_buffers[uri]
         file_buffer.version += 1
 
-        new_contents, new_l, new_c = TextUtils.insert_text_at_position(file_buffer.contents, line, column, text_to_be_inserted)
-        file_buffer.contents = new_contents
+        new_position = file_buffer.insert_text(line, column, text_to_be_inserted)
         self.server.notify.did_change_text_document(
             {
                 LSPConstants.TEXT_DOCUMENT: {  # type: ignore
@@ -588,7 +913,7 @@ class SolidLanguageServer(ABC):
                 ],
             }
         )
-        return ls_types.Position(line=new_l, character=new_c)
+        return new_position
 
     def delete_text_between_positions(
         self,
@@ -611,10 +936,7 @@ class SolidLanguageServer(ABC):
 
         file_buffer = self.open_file_buffers[uri]
         file_buffer.version += 1
-        new_contents, deleted_text = TextUtils.delete_text_between_positions(
-            file_buffer.contents, start_line=start["line"], start_col=start["character"], end_line=end["line"], end_col=end["character"]
-        )
-        file_buffer.contents = new_contents
+        deleted_text = file_buffer.delete_text(start, end)
         self.server.notify.did_change_text_document(
             {
                 LSPConstants.TEXT_DOCUMENT: {  # type: ignore
@@ -986,12 +1308,17 @@ class SolidLanguageServer(ABC):
             with self.open_file(relative_file_path) as opened_file_data:
                 return get_raw_document_symbols(opened_file_data)
 
-    def request_document_symbols(self, relative_file_path: str, file_buffer: LSPFileBuffer | None = None) -> DocumentSymbols:
+    def request_document_symbols(
+        self, relative_file_path: str, file_buffer: LSPFileBuffer | None = None, fast: bool = False
+    ) -> DocumentSymbols:
         """
         Retrieves the collection of symbols in the given file
 
         :param relative_file_path: The relative path of the file that has the symbols
         :param file_buffer: an optional file buffer if the file is already opened.
+        :param fast: whether to extract the symbols with a parser instead of querying the language server, where supported
+            (Python files). The parser is also used if the language server has not been started.
+            Results obtained with the parser are not cached, but a cached language server result is used if available.
         :return: the collection of symbols in the file.
             All contained symbols will have a location, children, and a parent attribute,
             where the parent attribute is None for root symbols.
@@ -999,7 +1326,9 @@ class SolidLanguageServer(ABC):
             where the parent attribute will be the file symbol which in turn may have a package symbol as parent.
             If you need a symbol tree that contains file symbols as well, you should use `request_full_symbol_tree` instead.
         """
-        with self._open_file_context(relative_file_path, file_buffer) as file_data:
+        use_parser = (fast or not self.server_started) and python_ast_symbols.is_python_source_file(relative_file_path)
+        file_context = self._read_file_context(relative_file_path, file_buffer) if use_parser else self._open_file_context(relative_file_path, file_buffer)
+        with file_context as file_data:
             # check if the desired result is cached
             cache_key = relative_file_path
             file_hash_and_result = self._document_symbols_cache.get(cache_key)
@@ -1007,12 +1336,23 @@ class SolidLanguageServer(ABC):
                 file_hash, document_symbols = file_hash_and_result
                 if file_hash == file_data.content_hash:
                     log.debug("Returning cached document symbols for %s", relative_file_path)
+                    document_symbols.materialize(file_data.contents)
+                    self._track_materialized_document_symbols(cache_key, document_symbols)
                     return document_symbols
                 else:
                     log.debug("Cached document symbol content for %s has changed", relative_file_path)
             else:
                 log.debug("No cache hit for document symbols in %s", relative_file_path)
 
+            if use_parser:
+                parsed_root_symbols = python_ast_symbols.extract_python_document_symbols(file_data.contents)
+                if parsed_root_symbols is not None:
+                    log.debug("Extracted %d root symbols for %s with the parser", len(parsed_root_symbols), relative_file_path)
+                    return self._convert_document_symbols(relative_file_path, parsed_root_symbols, file_data)
+                if not self.server_started:
+                    log.warning("Could not parse %s and the language server is not started; returning empty list", relative_file_path)
+                    return DocumentSymbols([])
+
             # no cached result: request the root symbols from the language server
             root_symbols = self._request_document_symbols(relative_file_path, file_data)
 
@@ -1026,86 +1366,118 @@ class SolidLanguageServer(ABC):
 
             assert isinstance(root_symbols, list), f"Unexpected response from Language Server: {root_symbols}"
             log.debug("Received %d root symbols for %s from the language server", len(root_symbols), relative_file_path)
-
-            file_lines = file_data.split_lines()
-
-            def convert_to_unified_symbol(original_symbol_dict: GenericDocumentSymbol) -> ls_types.UnifiedSymbolInformation:
-                """
-                Converts the given symbol dictionary to the unified representation, ensuring
-                that all required fields are present (except 'children' which is handled separately).
-
-                :param original_symbol_dict: the item to augment
-                :return: the augmented item (new object)
-                """
-                # noinspection PyInvalidCast
-                item = cast(ls_types.UnifiedSymbolInformation, dict(original_symbol_dict))
-                absolute_path = os.path.join(self.repository_root_path, relative_file_path)
-
-                # handle missing location and path entries
-                if "location" not in item:
-                    uri = pathlib.Path(absolute_path).as_uri()
-                    assert "range" in item
-                    tree_location = ls_types.Location(
-                        uri=uri,
-                        range=item["range"],
-                        absolutePath=absolute_path,
-                        relativePath=relative_file_path,
-                    )
-                    item["location"] = tree_location
-                location = item["location"]
-                if "absolutePath" not in location:
-                    location["absolutePath"] = absolute_path  # type: ignore
-                if "relativePath" not in location:
-                    location["relativePath"] = relative_file_path  # type: ignore
-
-                if "body" not in item:
-                    item["body"] = self.retrieve_symbol_body(item, file_lines=file_lines)
-
-                # handle missing selectionRange
-                if "selectionRange" not in item:
-                    if "range" in item:
-                        item["selectionRange"] = item["range"]
-                    else:
-                        item["selectionRange"] = item["location"]["range"]
-
-                return item
-
-            def convert_symbols_with_common_parent(
-                symbols: list[DocumentSymbol] | list[SymbolInformation] | list[UnifiedSymbolInformation],
-                parent: ls_types.UnifiedSymbolInformation | None,
-            ) -> list[ls_types.UnifiedSymbolInformation]:
-                """
-                Converts the given symbols into UnifiedSymbolInformation with proper parent-child relationships,
-                adding overload indices for symbols with the same name under the same parent.
-                """
-                total_name_counts: dict[str, int] = defaultdict(lambda: 0)
-                for symbol in symbols:
-                    total_name_counts[symbol["name"]] += 1
-                name_counts: dict[str, int] = defaultdict(lambda: 0)
-                unified_symbols = []
-                for symbol in symbols:
-                    usymbol = convert_to_unified_symbol(symbol)
-                    if total_name_counts[usymbol["name"]] > 1:
-                        usymbol["overload_idx"] = name_counts[usymbol["name"]]
-                    name_counts[usymbol["name"]] += 1
-                    usymbol["parent"] = parent
-                    if "children" in usymbol:
-                        usymbol["children"] = convert_symbols_with_common_parent(usymbol["children"], usymbol)  # type: ignore
-                    else:
-                        usymbol["children"] = []  # type: ignore
-                    unified_symbols.append(usymbol)
-                return unified_symbols
-
-            unified_root_symbols = convert_symbols_with_common_parent(root_symbols, None)
-            document_symbols = DocumentSymbols(unified_root_symbols)
+            document_symbols = self._convert_document_symbols(relative_file_path, root_symbols, file_data)
 
             # update cache
             log.debug("Updating cached document symbols for %s", relative_file_path)
             self._document_symbols_cache[cache_key] = (file_data.content_hash, document_symbols)
             self._document_symbols_cache_is_modified = True
+            self._track_materialized_document_symbols(cache_key, document_symbols)
 
             return document_symbols
 
+    def _convert_document_symbols(
+        self,
+        relative_file_path: str,
+        root_symbols: list[DocumentSymbol] | list[SymbolInformation],
+        file_data: LSPFileBuffer,
+    ) -> DocumentSymbols:
+        """
+        Converts the root symbols returned by the language server (or a parser) into the unified representation
+
+        :param relative_file_path: the relative path of the file containing the symbols
+        :param root_symbols: the root symbols
+        :param file_data: the file buffer with the file's contents
+        :return: the collection of symbols
+        """
+
+        def convert_to_unified_symbol(original_symbol_dict: GenericDocumentSymbol) -> ls_types.UnifiedSymbolInformation:
+            """
+            Converts the given symbol dictionary to the unified representation, ensuring
+            that all required fields are present (except 'children' which is handled separately).
+
+            :param original_symbol_dict: the item to augment
+            :return: the augmented item (new object)
+            """
+            # noinspection PyInvalidCast
+            item = cast(ls_types.UnifiedSymbolInformation, dict(original_symbol_dict))
+            absolute_path = os.path.join(self.repository_root_path, relative_file_path)
+
+            # handle missing location and path entries
+            if "location" not in item:
+                uri = pathlib.Path(absolute_path).as_uri()
+                assert "range" in item
+                tree_location = ls_types.Location(
+                    uri=uri,
+                    range=item["range"],
+                    absolutePath=absolute_path,
+                    relativePath=relative_file_path,
+                )
+                item["location"] = tree_location
+            location = item["location"]
+            if "absolutePath" not in location:
+                location["absolutePath"] = absolute_path  # type: ignore
+            if "relativePath" not in location:
+                location["relativePath"] = relative_file_path  # type: ignore
+
+            if "body" not in item:
+                item["body"] = self.retrieve_symbol_body(item, file_buffer=file_data)
+
+            # handle missing selectionRange
+            if "selectionRange" not in item:
+                if "range" in item:
+                    item["selectionRange"] = item["range"]
+                else:
+                    item["selectionRange"] = item["location"]["range"]
+
+            return item
+
+        def convert_symbols_with_common_parent(
+            symbols: list[DocumentSymbol] | list[SymbolInformation] | list[UnifiedSymbolInformation],
+            parent: ls_types.UnifiedSymbolInformation | None,
+        ) -> list[ls_types.UnifiedSymbolInformation]:
+            """
+            Converts the given symbols into UnifiedSymbolInformation with proper parent-child relationships,
+            adding overload indices for symbols with the same name under the same parent.
+            """
+            total_name_counts: dict[str, int] = defaultdict(lambda: 0)
+            for symbol in symbols:
+                total_name_counts[symbol["name"]] += 1
+            name_counts: dict[str, int] = defaultdict(lambda: 0)
+            unified_symbols = []
+            for symbol in symbols:
+                usymbol = convert_to_unified_symbol(symbol)
+                if total_name_counts[usymbol["name"]] > 1:
+                    usymbol["overload_idx"] = name_counts[usymbol["name"]]
+                name_counts[usymbol["name"]] += 1
+                usymbol["parent"] = parent
+                if "children" in usymbol:
+                    usymbol["children"] = convert_symbols_with_common_parent(usymbol["children"], usymbol)  # type: ignore
+                else:
+                    usymbol["children"] = []  # type: ignore
+                unified_symbols.append(usymbol)
+            return unified_symbols
+
+        unified_root_symbols = convert_symbols_with_common_parent(root_symbols, None)
+        document_symbols = DocumentSymbols(unified_root_symbols)
+        document_symbols.get_symbol_table(text=file_data.contents)
+        return document_symbols
+
+    def _track_materialized_document_symbols(self, cache_key: str, document_symbols: DocumentSymbols) -> None:
+        """
+        Registers the given (materialized) cache entry as recently used. If there are more than
+        MAX_MATERIALIZED_DOCUMENT_SYMBOLS such entries, the least recently used ones are replaced in the cache by
+        unmaterialized instances, such that their dictionary representation is freed once callers no longer hold them
+        (the instances handed out to callers are never modified).
+        """
+        self._materialized_document_symbols[cache_key] = document_symbols
+        self._materialized_document_symbols.move_to_end(cache_key)
+        while len(self._materialized_document_symbols) > self.MAX_MATERIALIZED_DOCUMENT_SYMBOLS:
+            evicted_key, evicted_document_symbols = self._materialized_document_symbols.popitem(last=False)
+            file_hash_and_result = self._document_symbols_cache.get(evicted_key)
+            if file_hash_and_result is not None and file_hash_and_result[1] is evicted_document_symbols:
+                self._document_symbols_cache[evicted_key] = (file_hash_and_result[0], evicted_document_symbols.to_unmaterialized())
+
     def request_full_symbol_tree(self, within_relative_path: str | None = None) -> list[ls_types.UnifiedSymbolInformation]:
         """
         Will go through all files in the project or within a relative path and build a tree of symbols.
@@ -1298,11 +1670,14 @@ class SolidLanguageServer(ABC):
             process_symbol(root)
         return result
 
-    def request_document_overview(self, relative_file_path: str) -> list[UnifiedSymbolInformation]:
+    def request_document_overview(self, relative_file_path: str, fast: bool = False) -> list[UnifiedSymbolInformation]:
         """
+        :param relative_file_path: the relative path of the file
+        :param fast: whether to extract the symbols with a parser instead of querying the language server, where supported
+            (see `request_document_symbols`)
         :return: the top-level symbols in the given file.
         """
-        return self.request_document_symbols(relative_file_path).root_symbols
+        return self.request_document_symbols(relative_file_path, fast=fast).root_symbols
 
     def request_overview(self, within_relative_path: str) -> dict[str, list[UnifiedSymbolInformation]]:
         """
@@ -1367,15 +1742,13 @@ class SolidLanguageServer(ABC):
         symbol_start_line = symbol["location"]["range"]["start"]["line"]
         symbol_end_line = symbol["location"]["range"]["end"]["line"]
         assert "relativePath" in symbol["location"]
-        if file_lines is None:
-            with self._open_file_context(symbol["location"]["relativePath"], file_buffer) as f:  # type: ignore
-                file_lines = f.split_lines()
-        symbol_body = "\n".join(file_lines[symbol_start_line : symbol_end_line + 1])
-
-        # remove leading indentation
+        # the leading indentation is removed by skipping the start column
         symbol_start_column = symbol["location"]["range"]["start"]["character"]  # type: ignore
-        symbol_body = symbol_body[symbol_start_column:]
-        return symbol_body
+        if file_lines is not None:
+            symbol_body = "\n".join(file_lines[symbol_start_line : symbol_end_line + 1])
+            return symbol_body[symbol_start_column:]
+        with self._open_file_context(symbol["location"]["relativePath"], file_buffer) as f:  # type: ignore
+            return f.lines_text(symbol_start_line, symbol_end_line, start_character=symbol_start_column)
 
     def request_referencing_symbols(
         self,
@@ -1440,7 +1813,7 @@ class SolidLanguageServer(ABC):
                     # The hack is to try to find a variable symbol in the containing module
                     # by using the text of the reference to find the variable name (In a very heuristic way)
                     # and then look for a symbol with that name and kind Variable
-                    ref_text = file_data.contents.split("\n")[ref_line]
+                    ref_text = file_data.line(ref_line)
                     if "." in ref_text:
                         containing_symbol_name = ref_text.split(".")[0]
                         document_symbols = self.request_document_symbols(ref_path)
@@ -1551,10 +1924,9 @@ class SolidLanguageServer(ABC):
         :return: The container symbol (if found) or None.
         """
         # checking if the line is empty, unfortunately ugly and duplicating code, but I don't want to refactor
-        with self.open_file(relative_file_path):
+        with self.open_file(relative_file_path) as file_data:
             absolute_file_path = str(PurePath(self.repository_root_path, relative_file_path))
-            content = FileUtils.read_file(absolute_file_path, self._encoding)
-            if content.split("\n")[line].strip() == "":
+            if file_data.line(line).strip() == "":
                 log.error(f"Passing empty lines to request_container_symbol is currently not supported, {relative_file_path=}, {line=}")
                 return None
 
@@ -1706,6 +2078,37 @@ class SolidLanguageServer(ABC):
 
         return defining_symbol
 
+    def _load_binary_cache_file(self, cache_file: Path, legacy_pickle_cache_file: Path, version: Hashable, description: str) -> LazyCache | None:
+        """
+        Opens the given binary cache file, first migrating a cache in the legacy pickle format if there is no binary cache yet.
+
+        :return: the cache (whose entries are decoded on demand) or None if there is no valid cache
+        """
+        if not cache_file.exists() and legacy_pickle_cache_file.exists():
+            log.info("Migrating %s cache from %s to the binary cache format", description, legacy_pickle_cache_file)
+            try:
+                legacy_cache = load_cache(str(legacy_pickle_cache_file), version)
+                if legacy_cache is not None:
+                    save_binary_cache(str(cache_file), version, legacy_cache)
+            except Exception as e:
+                log.warning("Failed to migrate %s cache from %s (%s); Ignoring cache.", description, legacy_pickle_cache_file, e)
+            legacy_pickle_cache_file.unlink(missing_ok=True)
+
+        if cache_file.exists():
+            log.info("Loading %s cache from %s", description, cache_file)
+            try:
+                return load_binary_cache(str(cache_file), version)
+            except Exception as e:
+                # cache can become corrupt, so just skip loading it
+                # (corruption of individual entries is handled upon access, dropping only the affected entries)
+                log.warning(
+                    "Failed to load %s cache from %s (%s); Ignoring cache.",
+                    description,
+                    cache_file,
+                    e,
+                )
+        return None
+
     def _save_raw_document_symbols_cache(self) -> None:
         cache_file = self.cache_dir / self.RAW_DOCUMENT_SYMBOL_CACHE_FILENAME
 
@@ -1715,11 +2118,11 @@ class SolidLanguageServer(ABC):
 
         log.info("Saving updated raw document symbols cache to %s", cache_file)
         try:
-            save_cache(str(cache_file), self._raw_document_symbols_cache_version(), self._raw_document_symbols_cache)
+            save_binary_cache(str(cache_file), self._raw_document_symbols_cache_version(), self._raw_document_symbols_cache)
             self._raw_document_symbols_cache_is_modified = False
         except Exception as e:
             log.error(
-                "Failed to save raw document symbols cache to %s: %s. Note: this may have resulted in a corrupted cache file.",
+                "Failed to save raw document symbols cache to %s: %s. The previous cache file (if any) was left unchanged.",
                 cache_file,
                 e,
             )
@@ -1757,20 +2160,15 @@ class SolidLanguageServer(ABC):
                     return
 
         # load existing cache (if any)
-        if cache_file.exists():
-            log.info("Loading document symbols cache from %s", cache_file)
-            try:
-                saved_cache = load_cache(str(cache_file), self._raw_document_symbols_cache_version())
-                if saved_cache is not None:
-                    self._raw_document_symbols_cache = saved_cache
-                    log.info(f"Loaded {len(self._raw_document_symbols_cache)} entries from raw document symbols cache.")
-            except Exception as e:
-                # cache can become corrupt, so just skip loading it
-                log.warning(
-                    "Failed to load raw document symbols cache from %s (%s); Ignoring cache.",
-                    cache_file,
-                    e,
-                )
+        saved_cache = self._load_binary_cache_file(
+            cache_file,
+            self.cache_dir / self.RAW_DOCUMENT_SYMBOL_CACHE_FILENAME_PICKLE_LEGACY,
+            self._raw_document_symbols_cache_version(),
+            "raw document symbols",
+        )
+        if saved_cache is not None:
+            self._raw_document_symbols_cache = saved_cache
+            log.info(f"Opened raw document symbols cache with {len(self._raw_document_symbols_cache)} entries.")
 
     def _save_document_symbols_cache(self) -> None:
         cache_file = self.cache_dir / self.DOCUMENT_SYMBOL_CACHE_FILENAME
@@ -1781,36 +2179,87 @@ class SolidLanguageServer(ABC):
 
         log.info("Saving updated document symbols cache to %s", cache_file)
         try:
-            save_cache(str(cache_file), self.DOCUMENT_SYMBOL_CACHE_VERSION, self._document_symbols_cache)
+            save_binary_cache(str(cache_file), self.DOCUMENT_SYMBOL_CACHE_VERSION, self._document_symbols_cache)
             self._document_symbols_cache_is_modified = False
         except Exception as e:
             log.error(
-                "Failed to save document symbols cache to %s: %s. Note: this may have resulted in a corrupted cache file.",
+                "Failed to save document symbols cache to %s: %s. The previous cache file (if any) was left unchanged.",
                 cache_file,
                 e,
             )
 
     def _load_document_symbols_cache(self) -> None:
-        cache_file = self.cache_dir / self.DOCUMENT_SYMBOL_CACHE_FILENAME
-        if cache_file.exists():
-            log.info("Loading document symbols cache from %s", cache_file)
-            try:
-                saved_cache = load_cache(str(cache_file), self.DOCUMENT_SYMBOL_CACHE_VERSION)
-                if saved_cache is not None:
-                    self._document_symbols_cache = saved_cache
-                    log.info(f"Loaded {len(self._document_symbols_cache)} entries from document symbols cache.")
-            except Exception as e:
-                # cache can become corrupt, so just skip loading it
-                log.warning(
-                    "Failed to load document symbols cache from %s (%s); Ignoring cache.",
-                    cache_file,
-                    e,
-                )
+        saved_cache = self._load_binary_cache_file(
+            self.cache_dir / self.DOCUMENT_SYMBOL_CACHE_FILENAME,
+            self.cache_dir / self.DOCUMENT_SYMBOL_CACHE_FILENAME_PICKLE_LEGACY,
+            self.DOCUMENT_SYMBOL_CACHE_VERSION,
+            "document symbols",
+        )
+        if saved_cache is not None:
+            self._document_symbols_cache = saved_cache
+            log.info(f"Opened document symbols cache with {len(self._document_symbols_cache)} entries.")
 
     def save_cache(self) -> None:
         self._save_raw_document_symbols_cache()
         self._save_document_symbols_cache()
 
+    def is_document_symbols_cache_valid(self, relative_file_path: str) -> bool:
+        """
+        Checks whether the document symbols of the given file are cached for its current contents
+        (without opening the file in the language server).
+
+        :param relative_file_path: the relative path of the file
+        :return: True if a request for the file's document symbols would be served from the cache
+        """
+        cached = self._document_symbols_cache.get(relative_file_path)
+        if cached is None:
+            return False
+        contents = FileUtils.read_file(os.path.join(self.repository_root_path, relative_file_path), self._encoding)
+        return cached[0] == hashlib.md5(contents.encode("utf-8")).hexdigest()
+
+    def warm_document_symbols_cache(
+        self,
+        relative_file_paths: Iterable[str] | None = None,
+        on_progress: Callable[[int, int, str], None] | None = None,
+        stop_event: threading.Event | None = None,
+        save_interval: int = 100,
+    ) -> tuple[int, int]:
+        """
+        Pre-computes the document symbols of the given files (all non-ignored source files by default), such that
+        subsequent symbol requests are served from the cache. Files whose symbols are already cached are skipped
+        and the cache is saved periodically, so an interrupted warm-up resumes where it left off.
+
+        :param relative_file_paths: the files to process; if None, all source files of the repository
+        :param on_progress: an optional callback, which is called with (num_done, num_total, relative_path) before
+            each file is processed
+        :param stop_event: an optional event with which the warm-up can be interrupted
+        :param save_interval: the number of computed files after which the caches are saved
+        :return: a pair (number of files whose symbols were computed, number of files that were already cached)
+        """
+        if relative_file_paths is None:
+            relative_file_paths = self.iter_source_files()
+        paths = list(relative_file_paths)
+        num_computed = 0
+        num_cached = 0
+        for i, relative_path in enumerate(paths):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if on_progress is not None:
+                on_progress(i, len(paths), relative_path)
+            try:
+                if self.is_document_symbols_cache_valid(relative_path):
+                    num_cached += 1
+                    continue
+                self.request_document_symbols(relative_path)
+            except Exception as e:
+                log.warning("Could not compute document symbols for %s: %s", relative_path, e)
+                continue
+            num_computed += 1
+            if num_computed % save_interval == 0:
+                self.save_cache()
+        self.save_cache()
+        return num_computed, num_cached
+
     def request_workspace_symbol(self, query: str) -> list[ls_types.UnifiedSymbolInformation] | None:
         """
         Raise a [workspace/symbol](https://microsoft.github.io/language-server-protocol/specifications/lsp/3.17/specification/#workspace_symbol) request to the Language Server
@@ -1905,6 +2354,9 @@ class SolidLanguageServer(ABC):
             self._shutdown(timeout=shutdown_timeout)
         except Exception as e:
             log.warning(f"Exception while shutting down language server: {e}")
+        for index_dir in self._persistent_index_dirs:
+            index_dirs.release_index_dir(index_dir)
+        self._persistent_index_dirs.clear()
 
     @property
     def language_server(self) -> Self:
@@ -74,6 +74,8 @@ class Language(str, Enum):
     """Use the typescript language server through the natively bundled vscode extension via https://github.com/yioneko/vtsls"""
     PYTHON_JEDI = "python_jedi"
     """Jedi language server for Python (instead of pyright, which is the default)"""
+    PYTHON_JEDI_INPROCESS = "python_jedi_inprocess"
+    """Jedi-based Python language server running in-process (no subprocess and no JSON-RPC); requires the jedi package"""
     CSHARP_OMNISHARP = "csharp_omnisharp"
     """OmniSharp language server for C# (instead of the default csharp-ls by microsoft).
     Currently has problems with finding references, and generally seems less stable and performant.
@@ -113,6 +115,7 @@ class Language(str, Enum):
         return self in {
             self.TYPESCRIPT_VTS,
             self.PYTHON_JEDI,
+            self.PYTHON_JEDI_INPROCESS,
             self.CSHARP_OMNISHARP,
             self.RUBY_SOLARGRAPH,
             self.MARKDOWN,
@@ -143,7 +146,7 @@ class Language(str, Enum):
 
     def get_source_fn_matcher(self) -> FilenameMatcher:
         match self:
-            case self.PYTHON | self.PYTHON_JEDI:
+            case self.PYTHON | self.PYTHON_JEDI | self.PYTHON_JEDI_INPROCESS:
                 return FilenameMatcher("*.py", "*.pyi")
             case self.JAVA:
                 return FilenameMatcher("*.java")
@@ -245,6 +248,10 @@ class Language(str, Enum):
                 from solidlsp.language_servers.jedi_server import JediServer
 
                 return JediServer
+            case self.PYTHON_JEDI_INPROCESS:
+                from solidlsp.language_servers.jedi_inprocess import JediInProcessServer
+
+                return JediInProcessServer
             case self.JAVA:
                 from solidlsp.language_servers.eclipse_jdtls import EclipseJDTLS
 
@@ -1,11 +1,11 @@
 import asyncio
-import json
 import logging
 import os
 import platform
 import subprocess
 import threading
 import time
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from queue import Empty, Queue
@@ -17,12 +17,12 @@ from pathlib import Path
 lib_path = Path(__file__).parent.parent
 sys.path.insert(0, str(lib_path))
 
-import psutil
 from serena_deps.sensai_shim import ToStringMixin
 
 from solidlsp.ls_config import Language
 from solidlsp.ls_exceptions import SolidLSPException
 from solidlsp.ls_request import LanguageServerRequest
+from solidlsp.lsp_protocol_handler.json_codec import get_json_codec
 from solidlsp.lsp_protocol_handler.lsp_requests import LspNotification
 from solidlsp.lsp_protocol_handler.lsp_types import ErrorCodes
 from solidlsp.lsp_protocol_handler.server import (
@@ -99,6 +99,73 @@ class Request(ToStringMixin):
             raise e
 
 
+class OrderedDispatcher:
+    """
+    Executes callbacks on a small pool of daemon worker threads, such that callbacks submitted with the same key
+    are executed one after another in submission order, while callbacks with different keys may run concurrently.
+    The worker threads are started on demand.
+    """
+
+    def __init__(self, name: str, num_workers: int = 4) -> None:
+        """
+        :param name: the name prefix of the worker threads
+        :param num_workers: the number of worker threads
+        """
+        self._name = name
+        self._num_workers = num_workers
+        self._lock = threading.Lock()
+        # key -> callbacks yet to be executed; a key is present while it is scheduled or being processed by a worker
+        self._lanes: dict[str, deque[Callable[[], None]]] = {}
+        self._ready_keys: Queue[str | None] = Queue()
+        self._workers: list[threading.Thread] = []
+
+    def submit(self, key: str, callback: Callable[[], None]) -> None:
+        """
+        :param key: the ordering key (callbacks with the same key are executed in submission order)
+        :param callback: the callback to execute
+        """
+        with self._lock:
+            if not self._workers:
+                for i in range(self._num_workers):
+                    worker = threading.Thread(target=self._process_lanes, name=f"{self._name}-{i}", daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+            lane = self._lanes.get(key)
+            if lane is not None:
+                # the lane is already scheduled; the worker processing it will execute the callback
+                lane.append(callback)
+                return
+            self._lanes[key] = deque([callback])
+        self._ready_keys.put(key)
+
+    def _process_lanes(self) -> None:
+        while True:
+            key = self._ready_keys.get()
+            if key is None:
+                return
+            while True:
+                with self._lock:
+                    lane = self._lanes[key]
+                    if not lane:
+                        del self._lanes[key]
+                        break
+                    callback = lane.popleft()
+                try:
+                    callback()
+                except Exception as e:
+                    log.error("Error in callback dispatched for %s: %s", key, e, exc_info=e)
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker threads once the callbacks submitted so far have been executed
+        """
+        with self._lock:
+            workers = self._workers
+            self._workers = []
+        for _ in workers:
+            self._ready_keys.put(None)
+
+
 class SolidLanguageServerHandler:
     """
     This class provides the implementation of Python client for the Language Server Protocol.
@@ -134,8 +201,14 @@ class SolidLanguageServerHandler:
         `False` means that the language server process will be in the same process group as the
         the current process, and any SIGINT and SIGTERM signals will be sent to both processes.
 
+    The stdout reader thread only frames and decodes the messages and completes the pending requests to which
+    responses refer. Notifications and requests from the server are handled on the worker threads of a dispatcher
+    (in the order of arrival per method), such that slow callbacks do not delay the delivery of responses.
     """
 
+    NUM_DISPATCH_WORKERS = 4
+    """the number of threads handling notifications and requests from the server"""
+
     def __init__(
         self,
         process_launch_info: ProcessLaunchInfo,
@@ -171,6 +244,8 @@ class SolidLanguageServerHandler:
         self._response_handlers_lock = threading.Lock()
         self._tasks_lock = threading.Lock()
 
+        self._dispatcher = OrderedDispatcher(f"LSP-dispatcher:{language.value}", self.NUM_DISPATCH_WORKERS)
+
     def set_request_timeout(self, timeout: float | None) -> None:
         """
         :param timeout: the timeout, in seconds, for all requests sent to the language server.
@@ -239,6 +314,7 @@ class SolidLanguageServerHandler:
         self.process = None
         if process:
             self._cleanup_process(process)
+        self._dispatcher.shutdown()
 
     def _cleanup_process(self, process: subprocess.Popen[bytes]) -> None:
         """Clean up a process: close stdin, terminate/kill process, close stdout/stderr."""
@@ -272,6 +348,8 @@ class SolidLanguageServerHandler:
 
     def _signal_process_tree(self, process: subprocess.Popen[bytes], terminate: bool = True) -> None:
         """Send signal (terminate or kill) to the process and all its children."""
+        import psutil  # imported lazily, as it is only needed when stopping the server
+
         signal_method = "terminate" if terminate else "kill"
 
         # Try to get the parent process
@@ -406,13 +484,18 @@ class SolidLanguageServerHandler:
         Parse the body text received from the language server process and invoke the appropriate handler
         """
         try:
-            self._receive_payload(json.loads(body))
-        except OSError as ex:
-            self._log(f"malformed {ENCODING}: {ex}")
+            payload = get_json_codec().decode(body)
         except UnicodeDecodeError as ex:
             self._log(f"malformed {ENCODING}: {ex}")
-        except json.JSONDecodeError as ex:
+            return
+        except ValueError as ex:
+            # all codecs raise ValueError subclasses (e.g. json.JSONDecodeError) for malformed JSON
             self._log(f"malformed JSON: {ex}")
+            return
+        try:
+            self._receive_payload(payload)
+        except OSError as ex:
+            self._log(f"malformed {ENCODING}: {ex}")
 
     def _receive_payload(self, payload: StringDict) -> None:
         """
@@ -422,10 +505,12 @@ class SolidLanguageServerHandler:
             self.logger("server", "client", payload)
         try:
             if "method" in payload:
+                # callbacks are executed by the dispatcher, such that they do not block the reader thread
+                method = payload["method"]
                 if "id" in payload:
-                    self._request_handler(payload)
+                    self._dispatcher.submit(method, lambda: self._request_handler(payload))
                 else:
-                    self._notification_handler(payload)
+                    self._dispatcher.submit(method, lambda: self._notification_handler(payload))
             elif "id" in payload:
                 self._response_handler(payload)
             else:
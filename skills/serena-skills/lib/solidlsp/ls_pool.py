@@ -0,0 +1,362 @@
+"""
+A pool of running language servers for several (project, language) pairs, such that a client which switches
+between projects does not have to start a new language server upon each switch.
+
+The pool keeps the servers in least-recently-used order, tracks the resident memory of each server's process tree
+and, whenever the configured memory budget is exceeded, stops the least recently used servers (after saving their
+caches). The frequency with which each (project, language) pair is requested is persisted, such that the most
+frequently used servers can be pre-warmed (started in the background) when a new pool is created.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import psutil
+
+from solidlsp.ls import SolidLanguageServer
+from solidlsp.ls_config import Language, LanguageServerConfig
+from solidlsp.settings import SolidLSPSettings
+
+log = logging.getLogger(__name__)
+
+USAGE_STATS_FILENAME = "ls_pool_usage.json"
+
+PoolKey = tuple[str, Language]
+"""(absolute repository root path, language)"""
+
+
+def get_process_tree_rss(pid: int) -> int:
+    """
+    :return: the resident set size in bytes of the given process and all its descendants (0 if the process does not exist)
+    """
+    try:
+        process = psutil.Process(pid)
+        rss = process.memory_info().rss
+        children = process.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0
+    for child in children:
+        try:
+            rss += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return rss
+
+
+@dataclass
+class PooledLanguageServer:
+    language_server: SolidLanguageServer
+    last_used: float = field(default_factory=time.time)
+    num_uses: int = 0
+    num_leases: int = 0
+    """the number of callers currently using the server (see `LanguageServerPool.lease`); leased servers are not evicted"""
+
+    def get_rss(self) -> int:
+        process = self.language_server.server.process
+        return get_process_tree_rss(process.pid) if process is not None else 0
+
+
+class LanguageServerPool:
+    """
+    Keeps language servers for several (project, language) pairs alive and evicts the least recently used ones
+    when a memory budget is exceeded.
+
+    The pool is thread-safe; the language servers it returns must not be stopped by the caller (use `release` instead).
+    Callers which use a server while other threads may request servers from the same pool must lease it (see `lease`),
+    as servers which are not leased may be evicted at any time.
+    """
+
+    def __init__(
+        self,
+        solidlsp_settings_factory: Callable[[str], SolidLSPSettings] | None = None,
+        max_memory_mb: float | None = 4096,
+        max_servers: int | None = None,
+        usage_stats_dir: str | None = None,
+        ls_config_factory: Callable[[Language], LanguageServerConfig] | None = None,
+    ):
+        """
+        :param solidlsp_settings_factory: a function returning the settings for the given repository root path;
+            if None, default settings are used
+        :param max_memory_mb: the memory budget (sum of the resident memory of all server process trees) in MB; None for no limit
+        :param max_servers: the maximum number of servers that are kept alive; None for no limit
+        :param usage_stats_dir: the directory in which to persist the usage statistics (used for pre-warming);
+            if None, the Solid-LSP directory of the default settings is used
+        :param ls_config_factory: a function returning the language server configuration for the given language;
+            if None, a configuration with default values is used
+        """
+        self._solidlsp_settings_factory = solidlsp_settings_factory or (lambda _: SolidLSPSettings())
+        self._ls_config_factory = ls_config_factory or (lambda language: LanguageServerConfig(code_language=language))
+        self.max_memory_mb = max_memory_mb
+        self.max_servers = max_servers
+        self._usage_stats_path = os.path.join(usage_stats_dir or SolidLSPSettings().solidlsp_dir, USAGE_STATS_FILENAME)
+        self._servers: OrderedDict[PoolKey, PooledLanguageServer] = OrderedDict()
+        self._lock = threading.RLock()
+        self._starting: dict[PoolKey, threading.Event] = {}
+        self._closed = False
+
+    @staticmethod
+    def _make_key(repository_root_path: str, language: Language | str) -> PoolKey:
+        return os.path.realpath(repository_root_path), Language(language)
+
+    def get(self, repository_root_path: str, language: Language | str) -> SolidLanguageServer:
+        """
+        Returns the running language server for the given project and language, starting it if necessary.
+        The server is not leased, i.e. it may be evicted by requests from other threads (see `lease`).
+
+        :param repository_root_path: the root path of the project
+        :param language: the language
+        :return: the started language server
+        """
+        key = self._make_key(repository_root_path, language)
+        self._record_use(key)
+        language_server = self._get_or_start(key)
+        self.enforce_budget(keep={key})
+        return language_server
+
+    @contextmanager
+    def lease(self, repository_root_path: str, language: Language | str) -> Iterator[SolidLanguageServer]:
+        """
+        Context manager which provides the running language server for the given project and language (starting it
+        if necessary, see `get`); the server is not evicted before the context is exited.
+        """
+        key = self._make_key(repository_root_path, language)
+        self._record_use(key)
+        language_server = self._get_or_start(key, lease=True)
+        try:
+            self.enforce_budget(keep={key})
+            yield language_server
+        finally:
+            with self._lock:
+                entry = self._servers.get(key)
+                if entry is not None and entry.language_server is language_server:
+                    entry.num_leases -= 1
+
+    def _get_or_start(self, key: PoolKey, lease: bool = False) -> SolidLanguageServer:
+        """
+        :param lease: whether to increment the lease count of the returned server
+        """
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("The language server pool was closed")
+                entry = self._servers.get(key)
+                if entry is not None and entry.language_server.is_running():
+                    self._servers.move_to_end(key)
+                    entry.last_used = time.time()
+                    entry.num_uses += 1
+                    if lease:
+                        entry.num_leases += 1
+                    return entry.language_server
+                if entry is not None:
+                    log.warning("Pooled language server for %s terminated unexpectedly; restarting it", key)
+                    del self._servers[key]
+                starting = self._starting.get(key)
+                if starting is None:
+                    # this thread starts the server
+                    starting = self._starting[key] = threading.Event()
+                    break
+            # another thread is already starting the server
+            starting.wait()
+
+        try:
+            repository_root_path, language = key
+            log.info("Starting pooled language server for %s (%s)", repository_root_path, language.value)
+            language_server = SolidLanguageServer.create(
+                self._ls_config_factory(language),
+                repository_root_path,
+                solidlsp_settings=self._solidlsp_settings_factory(repository_root_path),
+            )
+            language_server.start()
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._servers[key] = PooledLanguageServer(language_server, num_uses=1, num_leases=1 if lease else 0)
+            if closed:
+                # the pool was closed while the server was starting
+                language_server.stop()
+                raise RuntimeError("The language server pool was closed")
+            return language_server
+        finally:
+            with self._lock:
+                self._starting.pop(key).set()
+
+    def release(self, repository_root_path: str, language: Language | str) -> bool:
+        """
+        Stops the language server for the given project and language (after saving its caches) and removes it from the pool.
+
+        :return: whether a server was stopped
+        """
+        with self._lock:
+            entry = self._servers.pop(self._make_key(repository_root_path, language), None)
+        if entry is None:
+            return False
+        self._stop(entry)
+        return True
+
+    @staticmethod
+    def _stop(entry: PooledLanguageServer) -> None:
+        ls = entry.language_server
+        try:
+            ls.save_cache()
+        except Exception as e:
+            log.warning("Could not save the caches of the language server for %s: %s", ls.repository_root_path, e)
+        ls.stop()
+
+    def get_memory_usage(self) -> dict[PoolKey, int]:
+        """
+        :return: a mapping from each pooled (project, language) pair to the resident memory (in bytes) of its server
+        """
+        with self._lock:
+            entries = list(self._servers.items())
+        return {key: entry.get_rss() for key, entry in entries}
+
+    def enforce_budget(self, keep: set[PoolKey] | None = None) -> list[PoolKey]:
+        """
+        Stops the least recently used servers while the memory budget or the maximum number of servers is exceeded;
+        leased servers are never stopped.
+
+        :param keep: keys of servers which shall not be evicted (e.g. the one that was just requested)
+        :return: the keys of the evicted servers
+        """
+        evicted: list[PoolKey] = []
+        if self.max_memory_mb is None and self.max_servers is None:
+            return evicted
+        usage = self.get_memory_usage()
+        total_rss = sum(usage.values())
+        with self._lock:
+            candidates = [key for key in self._servers if keep is None or key not in keep]
+            num_servers = len(self._servers)
+        for key in candidates:
+            over_memory = self.max_memory_mb is not None and total_rss > self.max_memory_mb * 1024 * 1024
+            over_count = self.max_servers is not None and num_servers > self.max_servers
+            if not over_memory and not over_count:
+                break
+            with self._lock:
+                entry = self._servers.get(key)
+                if entry is None or entry.num_leases > 0:
+                    continue
+                del self._servers[key]
+            rss = usage.get(key, 0)
+            log.info("Evicting language server for %s (%s, %.1f MB)", key[0], key[1].value, rss / (1024 * 1024))
+            self._stop(entry)
+            total_rss -= rss
+            num_servers -= 1
+            evicted.append(key)
+        return evicted
+
+    def _read_usage_stats(self) -> dict[str, dict]:
+        try:
+            with open(self._usage_stats_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _record_use(self, key: PoolKey) -> None:
+        with self._lock:
+            stats = self._read_usage_stats()
+            stats_key = f"{key[1].value}:{key[0]}"
+            entry = stats.setdefault(stats_key, {"repository_root": key[0], "language": key[1].value, "count": 0})
+            entry["count"] += 1
+            entry["last_used"] = time.time()
+            try:
+                directory = os.path.dirname(self._usage_stats_path)
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=USAGE_STATS_FILENAME + ".", suffix=".tmp", dir=directory)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(stats, f, indent=2)
+                os.replace(tmp_path, self._usage_stats_path)
+            except OSError as e:
+                log.warning("Could not update the language server usage statistics %s: %s", self._usage_stats_path, e)
+
+    def get_most_used(self, n: int) -> list[PoolKey]:
+        """
+        :param n: the maximum number of pairs to return
+        :return: the most frequently used (project, language) pairs whose projects still exist, most frequent first
+        """
+        result = []
+        for entry in sorted(self._read_usage_stats().values(), key=lambda e: (e.get("count", 0), e.get("last_used", 0)), reverse=True):
+            if len(result) >= n:
+                break
+            try:
+                key = self._make_key(entry["repository_root"], entry["language"])
+            except (KeyError, ValueError):
+                continue
+            if os.path.isdir(key[0]):
+                result.append(key)
+        return result
+
+    def prewarm(self, n: int = 3, wait: bool = False) -> list[PoolKey]:
+        """
+        Starts the servers of the n most frequently used (project, language) pairs in background threads.
+        Servers are started in order of decreasing frequency, and pre-warming stops as soon as the memory budget
+        is reached, such that pre-warming never evicts servers.
+
+        :param n: the number of servers to pre-warm
+        :param wait: whether to wait until all servers are started
+        :return: the keys of the servers to be pre-warmed
+        """
+        keys = [key for key in self.get_most_used(n) if key not in self._servers]
+
+        def run() -> None:
+            for key in keys:
+                if self._closed:
+                    return
+                if self.max_memory_mb is not None and sum(self.get_memory_usage().values()) >= self.max_memory_mb * 1024 * 1024:
+                    log.info("Memory budget reached; not pre-warming further language servers")
+                    return
+                if self.max_servers is not None and len(self._servers) >= self.max_servers:
+                    return
+                try:
+                    self._get_or_start(key)
+                except Exception as e:
+                    log.warning("Could not pre-warm the language server for %s (%s): %s", key[0], key[1].value, e)
+
+        thread = threading.Thread(target=run, name="ls-pool-prewarm", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return keys
+
+    def get_status(self) -> list[dict]:
+        """
+        :return: descriptions of the pooled servers, least recently used first
+        """
+        usage = self.get_memory_usage()
+        with self._lock:
+            return [
+                {
+                    "repository_root": key[0],
+                    "language": key[1].value,
+                    "running": entry.language_server.is_running(),
+                    "rss_mb": round(usage.get(key, 0) / (1024 * 1024), 1),
+                    "num_uses": entry.num_uses,
+                    "last_used": entry.last_used,
+                }
+                for key, entry in self._servers.items()
+            ]
+
+    def close(self) -> None:
+        """
+        Stops all servers (after saving their caches)
+        """
+        with self._lock:
+            self._closed = True
+            entries = list(self._servers.values())
+            self._servers.clear()
+        for entry in entries:
+            self._stop(entry)
+
+    def __enter__(self) -> "LanguageServerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        self.close()
@@ -0,0 +1,581 @@
+"""
+A persistent, project-wide index of references between symbols (symbol -> referencing symbols).
+
+The index is built in the background by querying the language server (via references or, where supported,
+via the call hierarchy) and is persisted next to the document symbol caches. Entries are invalidated per file
+by content hash, such that reference and caller queries become index lookups and transitive impact queries
+become graph traversals.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, MutableMapping
+from typing import TYPE_CHECKING, Literal
+
+from solidlsp import ls_types
+from solidlsp.ls_utils import FileUtils, PathUtils
+from solidlsp.lsp_protocol_handler.server import LSPError
+from solidlsp.util.cache import LazyCache, load_binary_cache, save_binary_cache
+
+if TYPE_CHECKING:
+    from solidlsp.ls import SolidLanguageServer
+
+log = logging.getLogger(__name__)
+
+SymbolKind = ls_types.SymbolKind
+
+INDEXED_SYMBOL_KINDS = frozenset(
+    {
+        SymbolKind.Class,
+        SymbolKind.Interface,
+        SymbolKind.Struct,
+        SymbolKind.Enum,
+        SymbolKind.Function,
+        SymbolKind.Method,
+        SymbolKind.Constructor,
+        SymbolKind.Property,
+        SymbolKind.Field,
+        SymbolKind.Constant,
+        SymbolKind.Variable,
+    }
+)
+"""the kinds of symbols for which referencing symbols are indexed"""
+
+CALLABLE_SYMBOL_KINDS = frozenset({SymbolKind.Function, SymbolKind.Method, SymbolKind.Constructor})
+
+_IDENTIFIER_PATTERN = re.compile(r"\w+")
+
+ReferenceIndexStrategy = Literal["references", "call_hierarchy"]
+
+
+@dataclasses.dataclass(frozen=True)
+class ReferenceEdge:
+    """A reference from a symbol (the referencing symbol) to an indexed symbol"""
+
+    relative_path: str
+    """the relative path of the file containing the referencing symbol"""
+    name_path: str
+    """the name path of the referencing symbol within its file"""
+    kind: int
+    """the symbol kind of the referencing symbol"""
+    line: int
+    """the 0-based line of the reference"""
+    character: int
+    """the 0-based column of the reference"""
+    via_call_hierarchy: bool = False
+    """whether the edge was obtained from the call hierarchy (i.e. it is known to be a call)"""
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+
+@dataclasses.dataclass
+class IndexedSymbol:
+    name_path: str
+    name: str
+    kind: int
+    line: int
+    """the 0-based line of the symbol's selection range start"""
+    character: int
+    """the 0-based column of the symbol's selection range start"""
+    references: list[ReferenceEdge] | None = None
+    """the referencing symbols; None if they were not computed yet or were invalidated by a change in another file"""
+
+
+@dataclasses.dataclass
+class IndexedFile:
+    content_hash: str
+    mtime_ns: int
+    size: int
+    symbols: dict[str, IndexedSymbol]
+    """maps name paths to the indexed symbols of the file"""
+    identifiers: frozenset[str]
+    """the set of identifiers occurring in the file, used to determine which symbols may be referenced by it"""
+
+
+@dataclasses.dataclass
+class ReferenceIndexProgress:
+    phase: Literal["refresh", "references"]
+    num_done: int
+    num_total: int
+    relative_path: str | None = None
+
+
+def compute_name_path(symbol: ls_types.UnifiedSymbolInformation) -> str:
+    """
+    :param symbol: a symbol with parent links (as returned by `SolidLanguageServer.request_document_symbols`)
+    :return: the symbol's name path within its file, e.g. "MyClass/my_method"; overloads are suffixed with "[idx]"
+    """
+    parts = []
+    s: ls_types.UnifiedSymbolInformation | None = symbol
+    while s is not None:
+        name = s["name"]
+        if "overload_idx" in s:
+            name = f"{name}[{s['overload_idx']}]"
+        parts.append(name)
+        s = s.get("parent")
+    return "/".join(reversed(parts))
+
+
+class ReferenceGraphIndex:
+    """
+    A project-wide graph of references between symbols, which is persisted in the cache directory of the
+    language server. The index is keyed by relative file path; each file entry stores the file's content hash
+    and, for each of its indexed symbols, the list of symbols referencing it.
+
+    When a file changes, its own entry is rebuilt and the reference lists of all symbols which it referenced
+    before the change or which it may reference now (judging by the identifiers it contains) are invalidated.
+    Invalidated reference lists are recomputed by `update` or lazily upon query.
+    """
+
+    CACHE_FILENAME = "reference_graph.bin"
+    CACHE_VERSION = 1
+
+    def __init__(self, language_server: "SolidLanguageServer", strategy: ReferenceIndexStrategy = "references"):
+        """
+        :param language_server: the (started) language server to query
+        :param strategy: how references are obtained; with "call_hierarchy", references to callables are obtained via
+            the call hierarchy where the language server supports it (falling back to references otherwise)
+        """
+        self._ls = language_server
+        self._strategy = strategy
+        self._call_hierarchy_supported = strategy == "call_hierarchy"
+        self._lock = threading.RLock()
+        self._cache_file = language_server.cache_dir / self.CACHE_FILENAME
+        self._files: MutableMapping[str, IndexedFile] = {}
+        self._is_modified = False
+        self._background_thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._load()
+
+    def _cache_version(self) -> tuple[int, str]:
+        return self.CACHE_VERSION, self._strategy
+
+    def _load(self) -> None:
+        if not self._cache_file.exists():
+            return
+        try:
+            saved = load_binary_cache(str(self._cache_file), self._cache_version())
+        except Exception as e:
+            log.warning("Failed to load reference graph index from %s (%s); Ignoring index.", self._cache_file, e)
+            return
+        if saved is not None:
+            self._files = saved
+            log.info("Opened reference graph index with %d files", len(saved))
+
+    def save(self) -> None:
+        """
+        Saves the index (if it was modified) along with the language server's symbol caches
+        """
+        with self._lock:
+            self._ls.save_cache()
+            if not self._is_modified:
+                log.debug("No changes to reference graph index, skipping save")
+                return
+            log.info("Saving reference graph index to %s", self._cache_file)
+            try:
+                save_binary_cache(str(self._cache_file), self._cache_version(), self._files)
+                self._is_modified = False
+            except Exception as e:
+                log.error("Failed to save reference graph index to %s: %s", self._cache_file, e)
+
+    def close(self) -> None:
+        self.stop_background_indexing()
+        if isinstance(self._files, LazyCache):
+            self._files.close()
+
+    # ------------------------------------------------------------------------------------------------------------
+    # index maintenance
+    # ------------------------------------------------------------------------------------------------------------
+
+    def _read_file(self, relative_path: str) -> str:
+        return FileUtils.read_file(os.path.join(self._ls.repository_root_path, relative_path), self._ls._encoding)
+
+    def _index_file_symbols(self, relative_path: str, contents: str, stat: os.stat_result) -> IndexedFile:
+        symbols: dict[str, IndexedSymbol] = {}
+        for symbol in self._ls.request_document_symbols(relative_path).iter_symbols():
+            if symbol["kind"] not in INDEXED_SYMBOL_KINDS:
+                continue
+            parent = symbol.get("parent")
+            if parent is not None and parent["kind"] in CALLABLE_SYMBOL_KINDS:
+                continue  # local symbols cannot be referenced from other symbols
+            selection_start = symbol.get("selectionRange", symbol["location"]["range"])["start"]
+            name_path = compute_name_path(symbol)
+            symbols[name_path] = IndexedSymbol(
+                name_path=name_path,
+                name=symbol["name"],
+                kind=symbol["kind"],
+                line=selection_start["line"],
+                character=selection_start["character"],
+            )
+        return IndexedFile(
+            content_hash=hashlib.md5(contents.encode("utf-8")).hexdigest(),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            symbols=symbols,
+            identifiers=frozenset(_IDENTIFIER_PATTERN.findall(contents)),
+        )
+
+    def _refresh_file(self, relative_path: str, new_entries: dict[str, IndexedFile], invalidated_identifiers: set[str]) -> bool:
+        """
+        Re-indexes the symbols of the given (existing) file if it was added or changed, adding the new entry to
+        new_entries and the identifiers affected by the change to invalidated_identifiers
+
+        :return: whether the file was added or changed
+        """
+        try:
+            stat = os.stat(os.path.join(self._ls.repository_root_path, relative_path))
+            entry = self._files.get(relative_path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                return False
+            contents = self._read_file(relative_path)
+            if entry is not None and entry.content_hash == hashlib.md5(contents.encode("utf-8")).hexdigest():
+                # only the modification time changed
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                self._files[relative_path] = entry
+                self._is_modified = True
+                return False
+            new_entry = self._index_file_symbols(relative_path, contents, stat)
+        except Exception as e:
+            log.warning("Could not index %s: %s", relative_path, e)
+            return False
+        if entry is not None:
+            invalidated_identifiers.update(entry.identifiers)
+        invalidated_identifiers.update(new_entry.identifiers)
+        new_entries[relative_path] = new_entry
+        return True
+
+    def _apply_changes(self, changed_paths: list[str], invalidated_identifiers: set[str], new_entries: dict[str, IndexedFile]) -> None:
+        if changed_paths:
+            self._invalidate(set(changed_paths), invalidated_identifiers, new_entries)
+            self._files.update(new_entries)
+            self._is_modified = True
+            log.info("Reference graph index: %d files added, changed or removed", len(changed_paths))
+
+    def refresh(self, on_progress: Callable[[ReferenceIndexProgress], None] | None = None) -> list[str]:
+        """
+        Brings the set of indexed files up to date with the file system, (re-)indexing the symbols of new or
+        changed files and invalidating the reference lists that may be affected by the changes.
+        Referencing symbols are not computed by this method (see `update`).
+
+        :param on_progress: an optional callback for progress reporting
+        :return: the relative paths of the files that were added, changed or removed
+        """
+        with self._lock:
+            source_files = list(self._ls.iter_source_files())
+            changed_paths: list[str] = []
+            invalidated_identifiers: set[str] = set()
+            new_entries: dict[str, IndexedFile] = {}
+
+            for i, relative_path in enumerate(source_files):
+                if self._stop_event.is_set():
+                    break
+                if on_progress is not None:
+                    on_progress(ReferenceIndexProgress("refresh", i, len(source_files), relative_path))
+                if self._refresh_file(relative_path, new_entries, invalidated_identifiers):
+                    changed_paths.append(relative_path)
+
+            if not self._stop_event.is_set():
+                source_file_set = set(source_files)
+                for relative_path in list(self._files):
+                    if relative_path not in source_file_set:
+                        invalidated_identifiers.update(self._files[relative_path].identifiers)
+                        del self._files[relative_path]
+                        changed_paths.append(relative_path)
+
+            self._apply_changes(changed_paths, invalidated_identifiers, new_entries)
+            return changed_paths
+
+    def refresh_files(self, relative_paths: Iterable[str]) -> list[str]:
+        """
+        Like `refresh`, but only considers the given files (which are added, re-indexed or removed as needed).
+        Queries use this to bring the files involved up to date without scanning the whole project; other changes
+        are picked up by the next `refresh`.
+
+        :param relative_paths: the relative paths of the files to refresh
+        :return: the relative paths of the files that were added, changed or removed
+        """
+        with self._lock:
+            changed_paths: list[str] = []
+            invalidated_identifiers: set[str] = set()
+            new_entries: dict[str, IndexedFile] = {}
+            for relative_path in dict.fromkeys(relative_paths):
+                if os.path.isfile(os.path.join(self._ls.repository_root_path, relative_path)):
+                    if self._refresh_file(relative_path, new_entries, invalidated_identifiers):
+                        changed_paths.append(relative_path)
+                elif relative_path in self._files:
+                    invalidated_identifiers.update(self._files[relative_path].identifiers)
+                    del self._files[relative_path]
+                    changed_paths.append(relative_path)
+            self._apply_changes(changed_paths, invalidated_identifiers, new_entries)
+            return changed_paths
+
+    def _invalidate(self, changed_paths: set[str], identifiers: set[str], new_entries: dict[str, IndexedFile]) -> None:
+        """
+        Invalidates the reference lists of all symbols (in unchanged files) that were referenced from one of the
+        changed files or whose name occurs in one of them (before or after the change).
+        """
+        num_invalidated = 0
+        for relative_path in list(self._files):
+            if relative_path in new_entries:
+                continue
+            entry = self._files[relative_path]
+            entry_modified = False
+            for symbol in entry.symbols.values():
+                if symbol.references is None:
+                    continue
+                if symbol.name in identifiers or any(edge.relative_path in changed_paths for edge in symbol.references):
+                    symbol.references = None
+                    entry_modified = True
+                    num_invalidated += 1
+            if entry_modified:
+                self._files[relative_path] = entry
+        log.debug("Invalidated the references of %d symbols", num_invalidated)
+
+    def _iter_pending_symbols(self) -> Iterator[tuple[str, IndexedSymbol]]:
+        for relative_path in list(self._files):
+            for symbol in self._files[relative_path].symbols.values():
+                if symbol.references is None:
+                    yield relative_path, symbol
+
+    def update(
+        self,
+        on_progress: Callable[[ReferenceIndexProgress], None] | None = None,
+        save_interval: int = 200,
+    ) -> int:
+        """
+        Refreshes the index and computes all missing reference lists.
+        The computation can be interrupted (see `stop_background_indexing`) and resumed later, as the index
+        is saved periodically.
+
+        :param on_progress: an optional callback for progress reporting
+        :param save_interval: the number of symbols after which the index is saved
+        :return: the number of symbols whose references were computed
+        """
+        self.refresh(on_progress=on_progress)
+        with self._lock:
+            pending = list(self._iter_pending_symbols())
+        num_computed = 0
+        for i, (relative_path, symbol) in enumerate(pending):
+            if self._stop_event.is_set():
+                break
+            if on_progress is not None:
+                on_progress(ReferenceIndexProgress("references", i, len(pending), relative_path))
+            with self._lock:
+                entry = self._files.get(relative_path)
+                if entry is None or entry.symbols.get(symbol.name_path) is not symbol or symbol.references is not None:
+                    continue
+                try:
+                    symbol.references = self._compute_references(relative_path, symbol)
+                except Exception as e:
+                    log.warning("Could not compute references of %s in %s: %s", symbol.name_path, relative_path, e)
+                    symbol.references = []
+                self._files[relative_path] = entry
+                self._is_modified = True
+                num_computed += 1
+                if num_computed % save_interval == 0:
+                    self.save()
+        self.save()
+        return num_computed
+
+    def start_background_indexing(self, on_progress: Callable[[ReferenceIndexProgress], None] | None = None) -> threading.Thread:
+        """
+        Starts `update` in a daemon thread; queries remain possible while the index is being built.
+
+        :param on_progress: an optional callback for progress reporting (called from the background thread)
+        :return: the thread
+        """
+        with self._lock:
+            if self._background_thread is not None and self._background_thread.is_alive():
+                return self._background_thread
+            self._stop_event.clear()
+            self._background_thread = threading.Thread(
+                target=self.update, kwargs={"on_progress": on_progress}, name="ReferenceGraphIndexer", daemon=True
+            )
+            self._background_thread.start()
+            return self._background_thread
+
+    def stop_background_indexing(self, timeout: float | None = None) -> None:
+        self._stop_event.set()
+        thread = self._background_thread
+        if thread is not None:
+            thread.join(timeout)
+            self._background_thread = None
+
+    # ------------------------------------------------------------------------------------------------------------
+    # computation of references
+    # ------------------------------------------------------------------------------------------------------------
+
+    def _compute_references(self, relative_path: str, symbol: IndexedSymbol) -> list[ReferenceEdge]:
+        if self._call_hierarchy_supported and symbol.kind in CALLABLE_SYMBOL_KINDS:
+            edges = self._compute_incoming_calls(relative_path, symbol)
+            if edges is not None:
+                return edges
+        references = self._ls.request_referencing_symbols(
+            relative_path, symbol.line, symbol.character, include_imports=False, include_self=False
+        )
+        edges: set[ReferenceEdge] = set()
+        for ref in references:
+            ref_path = ref.symbol["location"].get("relativePath")
+            if ref_path is None:
+                continue
+            edges.add(ReferenceEdge(ref_path, compute_name_path(ref.symbol), ref.symbol["kind"], ref.line, ref.character))
+        return sorted(edges, key=lambda e: (e.relative_path, e.line, e.character))
+
+    def _compute_incoming_calls(self, relative_path: str, symbol: IndexedSymbol) -> list[ReferenceEdge] | None:
+        """
+        :return: the callers of the given symbol or None if the call hierarchy is not available for it
+        """
+        uri = PathUtils.path_to_uri(os.path.join(self._ls.repository_root_path, relative_path))
+        position = {"line": symbol.line, "character": symbol.character}
+        try:
+            with self._ls.open_file(relative_path):
+                items = self._ls.server.send.prepare_call_hierarchy({"textDocument": {"uri": uri}, "position": position})
+                if not items:
+                    return None
+                incoming_calls = self._ls.server.send.incoming_calls({"item": items[0]})
+        except LSPError as e:
+            log.info("Call hierarchy not supported by the language server (%s); falling back to references", e)
+            self._call_hierarchy_supported = False
+            return None
+        if incoming_calls is None:
+            return None
+
+        edges: set[ReferenceEdge] = set()
+        for call in incoming_calls:
+            caller = call["from"]
+            caller_path = self._relative_path_from_uri(caller["uri"])
+            if caller_path is None:
+                continue
+            caller_start = caller["selectionRange"]["start"]
+            caller_name_path = self._find_name_path(caller_path, caller_start["line"], caller_start["character"]) or caller["name"]
+            for call_range in call.get("fromRanges") or [caller["selectionRange"]]:
+                edges.add(
+                    ReferenceEdge(
+                        caller_path,
+                        caller_name_path,
+                        caller["kind"],
+                        call_range["start"]["line"],
+                        call_range["start"]["character"],
+                        via_call_hierarchy=True,
+                    )
+                )
+        return sorted(edges, key=lambda e: (e.relative_path, e.line, e.character))
+
+    def _relative_path_from_uri(self, uri: str) -> str | None:
+        return PathUtils.get_relative_path(PathUtils.uri_to_path(uri), self._ls.repository_root_path)
+
+    def _find_name_path(self, relative_path: str, line: int, character: int) -> str | None:
+        for symbol in self._ls.request_document_symbols(relative_path).iter_symbols():
+            start = symbol.get("selectionRange", symbol["location"]["range"])["start"]
+            if start["line"] == line and start["character"] == character:
+                return compute_name_path(symbol)
+        return None
+
+    # ------------------------------------------------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------------------------------------------------
+
+    def find_symbols(self, relative_path: str, name_path: str) -> list[IndexedSymbol]:
+        """
+        :param relative_path: the relative path of the file containing the symbol
+        :param name_path: the symbol's name path or a suffix thereof (e.g. "method" or "MyClass/method")
+        :return: the matching indexed symbols of the file
+        """
+        with self._lock:
+            entry = self._files.get(relative_path)
+            if entry is None:
+                return []
+            if name_path in entry.symbols:
+                return [entry.symbols[name_path]]
+            suffix = "/" + name_path.strip("/")
+            return [s for s in entry.symbols.values() if ("/" + s.name_path).endswith(suffix)]
+
+    def _get_references(self, relative_path: str, symbol: IndexedSymbol, compute_missing: bool) -> list[ReferenceEdge] | None:
+        with self._lock:
+            if symbol.references is None and compute_missing:
+                symbol.references = self._compute_references(relative_path, symbol)
+                self._is_modified = True
+            return symbol.references
+
+    def get_referencing_symbols(self, relative_path: str, name_path: str, compute_missing: bool = True) -> list[ReferenceEdge] | None:
+        """
+        :param relative_path: the relative path of the file containing the symbol
+        :param name_path: the symbol's name path (or a suffix thereof)
+        :param compute_missing: whether to compute references that are not (or no longer) indexed
+        :return: the referencing symbols (of all matching symbols) or None if the symbol is unknown or its
+            references are not indexed and compute_missing is False
+        """
+        symbols = self.find_symbols(relative_path, name_path)
+        if not symbols:
+            return None
+        result: list[ReferenceEdge] = []
+        for symbol in symbols:
+            references = self._get_references(relative_path, symbol, compute_missing)
+            if references is None:
+                return None
+            result.extend(references)
+        return result
+
+    def get_callers(self, relative_path: str, name_path: str, compute_missing: bool = True) -> list[ReferenceEdge] | None:
+        """
+        Like `get_referencing_symbols`, but only returns references from callables (functions, methods, constructors)
+        """
+        references = self.get_referencing_symbols(relative_path, name_path, compute_missing=compute_missing)
+        if references is None:
+            return None
+        return [edge for edge in references if edge.kind in CALLABLE_SYMBOL_KINDS]
+
+    def get_transitive_impact(
+        self, relative_path: str, name_path: str, max_depth: int = 3, compute_missing: bool = True
+    ) -> list[tuple[int, ReferenceEdge]]:
+        """
+        Determines the symbols that directly or transitively reference the given symbol (breadth-first).
+
+        :param relative_path: the relative path of the file containing the symbol
+        :param name_path: the symbol's name path (or a suffix thereof)
+        :param max_depth: the maximum length of reference chains to follow
+        :param compute_missing: whether to compute references that are not (or no longer) indexed
+        :return: pairs (depth, edge), where depth 1 corresponds to direct references; each referencing symbol is
+            reported once (at the smallest depth)
+        """
+        result: list[tuple[int, ReferenceEdge]] = []
+        visited: set[tuple[str, str]] = {(relative_path, name_path)}
+        queue: deque[tuple[str, str, int]] = deque([(relative_path, name_path, 0)])
+        while queue:
+            path, np, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for edge in self.get_referencing_symbols(path, np, compute_missing=compute_missing) or []:
+                key = (edge.relative_path, edge.name_path)
+                if key in visited:
+                    continue
+                visited.add(key)
+                result.append((depth + 1, edge))
+                queue.append((edge.relative_path, edge.name_path, depth + 1))
+        return result
+
+    def get_statistics(self) -> dict:
+        with self._lock:
+            num_symbols = 0
+            num_pending = 0
+            num_edges = 0
+            for relative_path in list(self._files):
+                for symbol in self._files[relative_path].symbols.values():
+                    num_symbols += 1
+                    if symbol.references is None:
+                        num_pending += 1
+                    else:
+                        num_edges += len(symbol.references)
+            return {
+                "files": len(self._files),
+                "symbols": num_symbols,
+                "symbols_pending": num_pending,
+                "edges": num_edges,
+                "strategy": self._strategy,
+            }
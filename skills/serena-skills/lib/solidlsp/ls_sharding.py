@@ -0,0 +1,353 @@
+"""
+Sharding of (monorepo) repositories across several language server processes.
+
+A repository is partitioned by its sub-project roots (directories containing e.g. pyproject.toml, package.json,
+tsconfig.json or go.mod) into shards, each of which is served by a separate language server process whose
+workspace root is the sub-project root; the remainder of the repository is served by a root shard.
+Each shard ignores the shards nested within it (via the ignored paths of its configuration), which language servers
+supporting exclusions (e.g. pyright) also apply to their own indexing; other language servers may still index nested
+shards, whose duplicate workspace symbols are removed when merging.
+Per-file requests are routed to the shard owning the file, workspace-wide requests are sent to all shards
+concurrently and their results are merged. Since every process only indexes its own shard, indexing and
+workspace-wide queries use several cores.
+
+Note that each language server only knows the files of its own shard, i.e. references across sub-project
+boundaries are only found to the extent that the language server resolves them by itself (e.g. via installed packages).
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import pathlib
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TypeVar
+
+from solidlsp import ls_types
+from solidlsp.ls import DocumentSymbols, LSPFileBuffer, SolidLanguageServer
+from solidlsp.ls_config import LanguageServerConfig
+from solidlsp.settings import SolidLSPSettings
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SUB_PROJECT_MARKER_FILES = ("pyproject.toml", "setup.py", "package.json", "tsconfig.json", "go.mod", "Cargo.toml")
+SHARDS_DIR_NAME = "shards"
+VENDORED_DIR_NAMES = ("node_modules", "vendor", "site-packages")
+"""directories containing third-party packages, whose manifests do not mark sub-projects of the repository"""
+
+
+def discover_sub_project_roots(
+    repository_root_path: str,
+    is_ignored_dir: Callable[[str], bool],
+    marker_files: tuple[str, ...] = SUB_PROJECT_MARKER_FILES,
+    max_depth: int = 6,
+) -> list[str]:
+    """
+    Finds the sub-project roots of the given repository (breadth-first, not descending into ignored directories).
+
+    :param repository_root_path: the repository root
+    :param is_ignored_dir: a function returning whether the directory with the given relative path is to be ignored
+    :param marker_files: the names of files marking a sub-project root
+    :param max_depth: the maximum directory depth to search
+    :return: the relative paths (with forward slashes) of the sub-project roots, excluding the repository root itself
+    """
+    roots = []
+    queue: deque[tuple[str, int]] = deque([("", 0)])
+    while queue:
+        rel_dir, depth = queue.popleft()
+        try:
+            entries = list(os.scandir(os.path.join(repository_root_path, rel_dir)))
+        except OSError:
+            continue
+        if rel_dir and any(e.name in marker_files and e.is_file() for e in entries):
+            roots.append(rel_dir)
+        if depth >= max_depth:
+            continue
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.name not in VENDORED_DIR_NAMES and not is_ignored_dir(rel_path):
+                queue.append((rel_path, depth + 1))
+    return sorted(roots)
+
+
+def limit_shard_roots(shard_roots: list[str], max_shards: int) -> list[str]:
+    """
+    Reduces the number of (sub-project) shard roots to at most max_shards by repeatedly replacing the deepest roots
+    with their parent directories (thereby merging sibling sub-projects into one shard).
+
+    :param shard_roots: relative paths of the shard roots (with forward slashes)
+    :param max_shards: the maximum number of shard roots to return
+    :return: the reduced list of shard roots
+    """
+    roots = set(shard_roots)
+    while len(roots) > max_shards:
+        max_depth = max(r.count("/") for r in roots)
+        if max_depth == 0:
+            # top-level sub-projects cannot be merged any further; keep the first ones (the rest goes to the root shard)
+            return sorted(roots)[:max_shards]
+        roots = {r.rsplit("/", 1)[0] if r.count("/") == max_depth else r for r in roots}
+    return sorted(roots)
+
+
+@dataclasses.dataclass
+class LanguageServerShard:
+    relative_root: str
+    """the root of the shard relative to the repository root ("." for the root shard)"""
+    language_server: SolidLanguageServer
+
+    def contains(self, relative_path: str) -> bool:
+        return self.relative_root == "." or relative_path == self.relative_root or relative_path.startswith(self.relative_root + "/")
+
+    def to_shard_path(self, relative_path: str) -> str:
+        if self.relative_root == ".":
+            return relative_path
+        return os.path.relpath(relative_path, self.relative_root).replace(os.path.sep, "/")
+
+
+class ShardedLanguageServer:
+    """
+    Serves a repository with several language server processes, one per shard (see module documentation).
+    Relative paths passed to and returned by this class are relative to the repository root.
+    """
+
+    def __init__(
+        self,
+        config: LanguageServerConfig,
+        repository_root_path: str,
+        solidlsp_settings: SolidLSPSettings | None = None,
+        shard_roots: list[str] | None = None,
+        max_shards: int | None = None,
+        timeout: float | None = None,
+    ):
+        """
+        :param config: the language server configuration (applied to all shards)
+        :param repository_root_path: the repository root
+        :param solidlsp_settings: the settings; the symbol caches of each shard are stored within the project data
+            directory of the repository
+        :param shard_roots: the relative paths of the sub-project roots; if None, they are discovered automatically
+        :param max_shards: the maximum number of language server processes (including the root shard); defaults to the
+            number of CPUs
+        :param timeout: the request timeout of the language servers
+        """
+        if solidlsp_settings is None:
+            solidlsp_settings = SolidLSPSettings()
+        self.repository_root_path = os.path.abspath(repository_root_path)
+        max_shards = max_shards or os.cpu_count() or 1
+
+        # the root shard is created first, since its ignore rules determine which directories are searched for sub-projects
+        root_ls = SolidLanguageServer.create(config, self.repository_root_path, timeout=timeout, solidlsp_settings=solidlsp_settings)
+        if shard_roots is None:
+            shard_roots = discover_sub_project_roots(
+                self.repository_root_path,
+                lambda rel_path: root_ls.is_ignored_dirname(os.path.basename(rel_path)) or root_ls.is_ignored_path(rel_path, False),
+            )
+        shard_roots = limit_shard_roots([r.strip("/").replace(os.path.sep, "/") for r in shard_roots if r.strip("/.")], max_shards - 1)
+
+        if shard_roots:
+            # the root shard must not index the sub-projects; the instance used for discovery is replaced (and stopped,
+            # which releases the resources acquired on creation, e.g. workspace locks and persistent index directories)
+            root_ls.stop()
+            root_ls = SolidLanguageServer.create(
+                self._with_ignored_shards(config, ".", shard_roots), self.repository_root_path, timeout=timeout, solidlsp_settings=solidlsp_settings
+            )
+        self.shards = [LanguageServerShard(".", root_ls)]
+        for shard_root in shard_roots:
+            shard_abs_root = os.path.join(self.repository_root_path, shard_root)
+            shard_data_dir = os.path.join(
+                self.repository_root_path,
+                solidlsp_settings.project_data_relative_path,
+                SHARDS_DIR_NAME,
+                f"{shard_root.replace('/', '_')}-{hashlib.sha256(shard_root.encode('utf-8')).hexdigest()[:8]}",
+            )
+            shard_settings = dataclasses.replace(solidlsp_settings, project_data_relative_path=os.path.relpath(shard_data_dir, shard_abs_root))
+            shard_ls = SolidLanguageServer.create(
+                self._with_ignored_shards(config, shard_root, shard_roots), shard_abs_root, timeout=timeout, solidlsp_settings=shard_settings
+            )
+            self.shards.append(LanguageServerShard(shard_root, shard_ls))
+        # the most specific shard must be found first
+        self.shards.sort(key=lambda s: -1 if s.relative_root == "." else s.relative_root.count("/"), reverse=True)
+        log.info("Sharded %s into %d language server processes: %s", self.repository_root_path, len(self.shards), [s.relative_root for s in self.shards])
+
+    @staticmethod
+    def _with_ignored_shards(config: LanguageServerConfig, shard_root: str, shard_roots: list[str]) -> LanguageServerConfig:
+        """
+        :return: the configuration for the given shard, which additionally ignores all shards nested within it
+        """
+        nested = []
+        for other in shard_roots:
+            if shard_root == ".":
+                nested.append(other)
+            elif other.startswith(shard_root + "/"):
+                nested.append(other[len(shard_root) + 1 :])
+        return dataclasses.replace(config, ignored_paths=list(config.ignored_paths) + [f"/{n}/" for n in nested])
+
+    def _for_all_shards(self, fn: Callable[[LanguageServerShard], T]) -> list[T]:
+        if len(self.shards) == 1:
+            return [fn(self.shards[0])]
+        with ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="ls-shard") as executor:
+            return list(executor.map(fn, self.shards))
+
+    def start(self) -> "ShardedLanguageServer":
+        """
+        Starts the language servers of all shards concurrently
+        """
+        self._for_all_shards(lambda s: s.language_server.start())
+        return self
+
+    def stop(self, shutdown_timeout: float = 2.0) -> None:
+        self._for_all_shards(lambda s: s.language_server.stop(shutdown_timeout))
+
+    def save_cache(self) -> None:
+        for shard in self.shards:
+            shard.language_server.save_cache()
+
+    def is_running(self) -> bool:
+        return all(s.language_server.is_running() for s in self.shards)
+
+    def get_shard(self, relative_path: str) -> tuple[LanguageServerShard, str]:
+        """
+        :param relative_path: a path relative to the repository root
+        :return: the shard owning the given path and the path relative to the shard root
+        """
+        relative_path = os.path.normpath(relative_path).replace(os.path.sep, "/")
+        for shard in self.shards:
+            if shard.contains(relative_path):
+                return shard, shard.to_shard_path(relative_path)
+        raise AssertionError("The root shard contains all paths")
+
+    def _translate_location(self, location: ls_types.Location) -> ls_types.Location:
+        location = ls_types.Location(**location)  # type: ignore
+        absolute_path = location.get("absolutePath")
+        if absolute_path:
+            relative_path = os.path.relpath(absolute_path, self.repository_root_path)
+            location["relativePath"] = None if relative_path.startswith("..") else relative_path
+        return location
+
+    def _translate_symbols(
+        self, symbols: list[ls_types.UnifiedSymbolInformation], parent: ls_types.UnifiedSymbolInformation | None = None
+    ) -> list[ls_types.UnifiedSymbolInformation]:
+        """
+        Copies the given symbols (recursively), such that their locations are relative to the repository root.
+        The shards' own symbol objects must not be modified, since they are cached by the shards.
+        """
+        result = []
+        for symbol in symbols:
+            copy = ls_types.UnifiedSymbolInformation(**symbol)  # type: ignore
+            if "location" in copy:
+                copy["location"] = self._translate_location(copy["location"])
+            if "parent" in copy:
+                copy["parent"] = parent
+            copy["children"] = self._translate_symbols(symbol.get("children", []), copy)
+            result.append(copy)
+        return result
+
+    @contextmanager
+    def open_file(self, relative_file_path: str) -> Iterator[LSPFileBuffer]:
+        shard, shard_path = self.get_shard(relative_file_path)
+        with shard.language_server.open_file(shard_path) as file_buffer:
+            yield file_buffer
+
+    def request_document_symbols(self, relative_file_path: str, fast: bool = False) -> DocumentSymbols:
+        shard, shard_path = self.get_shard(relative_file_path)
+        return DocumentSymbols(self._translate_symbols(shard.language_server.request_document_symbols(shard_path, fast=fast).root_symbols))
+
+    def request_document_overview(self, relative_file_path: str, fast: bool = False) -> list[ls_types.UnifiedSymbolInformation]:
+        shard, shard_path = self.get_shard(relative_file_path)
+        return self._translate_symbols(shard.language_server.request_document_overview(shard_path, fast=fast))
+
+    def request_definition(self, relative_file_path: str, line: int, column: int) -> list[ls_types.Location]:
+        shard, shard_path = self.get_shard(relative_file_path)
+        return [self._translate_location(loc) for loc in shard.language_server.request_definition(shard_path, line, column)]
+
+    def request_references(self, relative_file_path: str, line: int, column: int) -> list[ls_types.Location]:
+        shard, shard_path = self.get_shard(relative_file_path)
+        return [self._translate_location(loc) for loc in shard.language_server.request_references(shard_path, line, column)]
+
+    def request_hover(self, relative_file_path: str, line: int, column: int) -> ls_types.Hover | None:
+        shard, shard_path = self.get_shard(relative_file_path)
+        return shard.language_server.request_hover(shard_path, line, column)
+
+    def request_workspace_symbol(self, query: str) -> list[ls_types.UnifiedSymbolInformation] | None:
+        """
+        Sends the workspace symbol request to all shards concurrently and merges the results
+
+        :return: the matching symbols of all shards (without duplicates), or None if no shard returned a result
+        """
+        results = self._for_all_shards(lambda s: s.language_server.request_workspace_symbol(query))
+        if all(r is None for r in results):
+            return None
+        merged = []
+        seen = set()
+        for symbol in self._translate_symbols([s for r in results if r is not None for s in r]):
+            location = symbol.get("location") or {}
+            start = location.get("range", {}).get("start", {})
+            key = (symbol["name"], symbol["kind"], location.get("absolutePath") or location.get("uri"), start.get("line"), start.get("character"))
+            if key not in seen:
+                seen.add(key)
+                merged.append(symbol)
+        return merged
+
+    def request_full_symbol_tree(self, within_relative_path: str | None = None) -> list[ls_types.UnifiedSymbolInformation]:
+        """
+        Builds the symbol tree of the given path (see `SolidLanguageServer.request_full_symbol_tree`), where the trees
+        of all shards involved are computed concurrently and the trees of nested shards are inserted into the tree of
+        the enclosing shard.
+        """
+        target = os.path.normpath(within_relative_path or ".").replace(os.path.sep, "/")
+        owner, owner_path = self.get_shard(target)
+        nested = [s for s in self.shards if s is not owner and s.relative_root != "." and (target == "." or s.relative_root.startswith(target + "/"))]
+
+        def compute_tree(shard: LanguageServerShard) -> list[ls_types.UnifiedSymbolInformation]:
+            if shard is owner:
+                return self._translate_symbols(shard.language_server.request_full_symbol_tree(None if owner_path == "." else owner_path))
+            return self._translate_symbols(shard.language_server.request_full_symbol_tree())
+
+        involved = [owner] + nested
+        with ThreadPoolExecutor(max_workers=len(involved), thread_name_prefix="ls-shard") as executor:
+            trees = list(executor.map(compute_tree, involved))
+        root_symbols = trees[0]
+        if not nested:
+            return root_symbols
+        if len(root_symbols) != 1:
+            # the target is a file (which cannot contain nested shards)
+            return root_symbols
+
+        # insert the trees of the nested shards (sorted by depth, such that enclosing shards are inserted first)
+        for shard, tree in sorted(zip(nested, trees[1:]), key=lambda x: x[0].relative_root.count("/")):
+            path_within_target = shard.relative_root if target == "." else shard.relative_root[len(target) + 1 :]
+            package = root_symbols[0]
+            for dir_name in path_within_target.split("/")[:-1]:
+                package = self._get_or_create_package(package, dir_name)
+            for symbol in tree:
+                symbol["parent"] = package
+                package["children"].append(symbol)
+        return root_symbols
+
+    def _get_or_create_package(self, parent: ls_types.UnifiedSymbolInformation, name: str) -> ls_types.UnifiedSymbolInformation:
+        for child in parent["children"]:
+            if child["kind"] == ls_types.SymbolKind.Package and child["name"] == name:
+                return child
+        parent_location = parent["location"]
+        relative_path = os.path.normpath(os.path.join(parent_location["relativePath"] or ".", name))
+        absolute_path = os.path.join(self.repository_root_path, relative_path)
+        package = ls_types.UnifiedSymbolInformation(  # type: ignore
+            name=name,
+            kind=ls_types.SymbolKind.Package,
+            location=ls_types.Location(
+                uri=pathlib.Path(absolute_path).as_uri(),
+                range=parent_location["range"],
+                absolutePath=absolute_path,
+                relativePath=relative_path,
+            ),
+            children=[],
+            parent=parent,
+        )
+        parent["children"].append(package)
+        return package
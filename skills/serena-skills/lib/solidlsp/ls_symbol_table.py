@@ -0,0 +1,402 @@
+"""
+Compact, array-backed representation of the symbols of a single document.
+
+The unified symbol dictionaries produced by the language server wrappers are convenient to work with,
+but they are expensive to keep around in large numbers: every symbol holds several nested dictionaries
+(location, range, selectionRange), a parent back-pointer and a body string that duplicates parts of the file.
+A `CompactSymbolTable` stores the same information as a struct of arrays (symbols in depth-first order,
+integer arrays for kinds, ranges and tree structure, interned strings for names and paths) and
+materializes the dictionary representation only when it is requested.
+"""
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any, cast
+
+from solidlsp import ls_types
+from solidlsp.ls_types import UnifiedSymbolInformation
+
+_FLAG_RANGE = 1
+_FLAG_SELECTION_RANGE = 2
+_FLAG_LOCATION = 4
+_FLAG_CHILDREN = 8
+_FLAG_PARENT = 16
+
+_COMPACT_KEYS = frozenset(["name", "kind", "range", "selectionRange", "location", "children", "parent", "body", "overload_idx"])
+_LOCATION_KEYS = frozenset(["uri", "range", "absolutePath", "relativePath"])
+
+_NO_RANGE = (0, 0, 0, 0)
+
+
+def _range_to_tuple(range_d: Any) -> tuple[int, int, int, int] | None:
+    """
+    :return: the range as a tuple (start line, start character, end line, end character) or None if the
+        value is not a range that can be represented compactly
+    """
+    try:
+        start = range_d["start"]
+        end = range_d["end"]
+        t = (start["line"], start["character"], end["line"], end["character"])
+    except (KeyError, TypeError):
+        return None
+    if len(range_d) != 2 or len(start) != 2 or len(end) != 2 or not all(type(v) is int and v >= 0 for v in t):
+        return None
+    return t
+
+
+def _tuple_to_range(t: tuple[int, int, int, int] | array, offset: int = 0) -> ls_types.Range:
+    return {
+        "start": {"line": t[offset], "character": t[offset + 1]},
+        "end": {"line": t[offset + 2], "character": t[offset + 3]},
+    }
+
+
+def _compute_line_starts(text: str) -> list[int]:
+    line_starts = [0]
+    idx = text.find("\n")
+    while idx != -1:
+        line_starts.append(idx + 1)
+        idx = text.find("\n", idx + 1)
+    return line_starts
+
+
+class SymbolView:
+    """
+    A lightweight, read-only view of a single symbol in a `CompactSymbolTable`.
+    Views do not copy any data; use `to_dict` to obtain the full dictionary representation.
+    """
+
+    __slots__ = ("_table", "index")
+
+    def __init__(self, table: "CompactSymbolTable", index: int):
+        self._table = table
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"SymbolView(name={self.name!r}, kind={self.kind}, index={self.index})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SymbolView) and other._table is self._table and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self.index))
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self.index]
+
+    @property
+    def kind(self) -> int:
+        return self._table.kinds[self.index]
+
+    @property
+    def overload_idx(self) -> int | None:
+        overload_idx = self._table.overload_indices[self.index]
+        return None if overload_idx < 0 else overload_idx
+
+    @property
+    def relative_path(self) -> str | None:
+        path_idx = self._table.path_indices[self.index]
+        return None if path_idx < 0 else self._table.paths[path_idx][2]
+
+    @property
+    def location_range(self) -> ls_types.Range:
+        return _tuple_to_range(self._table.location_ranges, 4 * self.index)
+
+    @property
+    def selection_range(self) -> ls_types.Range:
+        return _tuple_to_range(self._table.selection_ranges, 4 * self.index)
+
+    @property
+    def start_line(self) -> int:
+        return self._table.location_ranges[4 * self.index]
+
+    @property
+    def end_line(self) -> int:
+        return self._table.location_ranges[4 * self.index + 2]
+
+    @property
+    def parent(self) -> "SymbolView | None":
+        parent_idx = self._table.parents[self.index]
+        return None if parent_idx < 0 else SymbolView(self._table, parent_idx)
+
+    def iter_children(self) -> Iterator["SymbolView"]:
+        yield from self._table._iter_children(self.index)
+
+    def to_dict(self, text: str | None = None) -> UnifiedSymbolInformation:
+        """
+        Materializes the symbol (including its parent chain and its descendants) as a dictionary.
+        Only the symbol's own subtree and its ancestors are materialized, i.e. the `children` of the ancestors
+        contain only the symbols on the path to this symbol.
+
+        :param text: the contents of the document, which is required to restore symbol bodies
+        """
+        table = self._table
+        ancestors = []
+        parent_idx = table.parents[self.index]
+        while parent_idx >= 0:
+            ancestors.append(parent_idx)
+            parent_idx = table.parents[parent_idx]
+        indices = ancestors[::-1] + list(range(self.index, self.index + table.subtree_sizes[self.index]))
+        return table._materialize_indices(indices, text)[len(ancestors)]
+
+
+class CompactSymbolTable:
+    """
+    Stores the symbols of a document as a struct of arrays; symbols are stored in depth-first order,
+    such that the descendants of a symbol directly follow it.
+
+    Symbol bodies are not stored as strings but as spans within the document's text, which is passed
+    upon materialization (the cache that holds the table is keyed by the document's content hash,
+    so the text is always available when the table is used).
+    Information that cannot be represented compactly (e.g. LS-specific keys like `detail`) is kept
+    in a sparse dictionary of extras, so the conversion is lossless.
+    """
+
+    __slots__ = (
+        "names",
+        "kinds",
+        "parents",
+        "subtree_sizes",
+        "overload_indices",
+        "flags",
+        "ranges",
+        "selection_ranges",
+        "location_ranges",
+        "path_indices",
+        "paths",
+        "body_spans",
+        "extras",
+        "num_roots",
+    )
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.kinds = array("i")
+        self.parents = array("i")
+        """index of the parent symbol, -1 for root symbols"""
+        self.subtree_sizes = array("i")
+        """number of symbols in the subtree rooted at the symbol (including the symbol itself)"""
+        self.overload_indices = array("i")
+        """the overload index of the symbol, -1 if there is none"""
+        self.flags = array("B")
+        self.ranges = array("i")
+        """flattened (start line, start character, end line, end character) tuples"""
+        self.selection_ranges = array("i")
+        self.location_ranges = array("i")
+        self.path_indices = array("i")
+        """index into `paths`, -1 if the symbol has no location"""
+        self.paths: list[tuple[str, str, str]] = []
+        """tuples (uri, absolutePath, relativePath)"""
+        self.body_spans = array("i")
+        """flattened (start, end) offsets of the symbol's body within the document text; (-1, -1) if there is no such span"""
+        self.extras: dict[int, dict[str, Any]] = {}
+        """maps symbol indices to dictionary entries that are not stored in the arrays"""
+        self.num_roots = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getstate__(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for slot in self.__slots__:
+            setattr(self, slot, state[slot])
+        # re-intern strings such that names and paths are shared across all tables loaded from a cache
+        self.names = [sys.intern(name) for name in self.names]
+        self.paths = [(sys.intern(uri), sys.intern(abs_path), sys.intern(rel_path)) for uri, abs_path, rel_path in self.paths]
+
+    @classmethod
+    def from_symbols(cls, root_symbols: list[UnifiedSymbolInformation], text: str | None = None) -> "CompactSymbolTable":
+        """
+        :param root_symbols: the root symbols of the document (with children)
+        :param text: the contents of the document; if given, symbol bodies that are contained in the text are stored as spans.
+            Otherwise, bodies are stored as strings.
+        :return: the compact representation of the symbols
+        """
+        table = cls()
+        line_starts = _compute_line_starts(text) if text is not None else None
+        path_index: dict[tuple[str, str, str], int] = {}
+
+        def add(symbol: UnifiedSymbolInformation, parent_idx: int) -> int:
+            idx = len(table.names)
+            extras: dict[str, Any] = {}
+            flags = 0
+
+            table.names.append(sys.intern(symbol["name"]))
+            table.kinds.append(symbol["kind"])
+            table.parents.append(parent_idx)
+            table.subtree_sizes.append(1)
+            overload_idx = symbol.get("overload_idx")
+            table.overload_indices.append(overload_idx if overload_idx is not None else -1)
+            if "parent" in symbol:
+                flags |= _FLAG_PARENT
+
+            for key, flag, target in (
+                ("range", _FLAG_RANGE, table.ranges),
+                ("selectionRange", _FLAG_SELECTION_RANGE, table.selection_ranges),
+            ):
+                range_tuple = _NO_RANGE
+                if key in symbol:
+                    converted_range = _range_to_tuple(symbol[key])  # type: ignore
+                    if converted_range is None:
+                        extras[key] = symbol[key]  # type: ignore
+                    else:
+                        range_tuple = converted_range
+                        flags |= flag
+                target.extend(range_tuple)
+
+            location_range = _NO_RANGE
+            path_idx = -1
+            location = symbol.get("location")
+            if location is not None:
+                converted_range = _range_to_tuple(location.get("range"))
+                if converted_range is None or set(location.keys()) != _LOCATION_KEYS:
+                    extras["location"] = location
+                else:
+                    location_range = converted_range
+                    path = (sys.intern(location["uri"]), sys.intern(location["absolutePath"]), sys.intern(location["relativePath"]))  # type: ignore
+                    path_idx = path_index.get(path, -1)
+                    if path_idx == -1:
+                        path_idx = path_index[path] = len(table.paths)
+                        table.paths.append(path)
+                    flags |= _FLAG_LOCATION
+            table.location_ranges.extend(location_range)
+            table.path_indices.append(path_idx)
+
+            body_span = (-1, -1)
+            body = symbol.get("body")
+            if body is not None:
+                if line_starts is not None and text is not None and flags & _FLAG_LOCATION:
+                    start_line, start_col, end_line, _ = location_range
+                    if start_line < len(line_starts):
+                        end_line = min(end_line, len(line_starts) - 1)
+                        end = line_starts[end_line + 1] - 1 if end_line + 1 < len(line_starts) else len(text)
+                        start = min(line_starts[start_line] + start_col, end)
+                        if text[start:end] == body:
+                            body_span = (start, end)
+                if body_span[0] == -1:
+                    extras["body"] = body
+            table.body_spans.extend(body_span)
+
+            for key, value in symbol.items():
+                if key not in _COMPACT_KEYS:
+                    extras[key] = value
+
+            table.flags.append(flags)
+            if extras:
+                table.extras[idx] = extras
+
+            children = symbol.get("children")
+            if children is not None:
+                table.flags[idx] |= _FLAG_CHILDREN
+                for child in children:
+                    table.subtree_sizes[idx] += add(child, idx)
+            return table.subtree_sizes[idx]
+
+        for root_symbol in root_symbols:
+            add(root_symbol, -1)
+            table.num_roots += 1
+        return table
+
+    def _iter_children(self, idx: int) -> Iterator[SymbolView]:
+        child_idx = idx + 1
+        end_idx = idx + self.subtree_sizes[idx]
+        while child_idx < end_idx:
+            yield SymbolView(self, child_idx)
+            child_idx += self.subtree_sizes[child_idx]
+
+    def iter_roots(self) -> Iterator[SymbolView]:
+        idx = 0
+        while idx < len(self.names):
+            yield SymbolView(self, idx)
+            idx += self.subtree_sizes[idx]
+
+    def iter_views(self) -> Iterator[SymbolView]:
+        """
+        Iterates over all symbols in depth-first order without materializing them.
+        """
+        for idx in range(len(self.names)):
+            yield SymbolView(self, idx)
+
+    def materialize_all(self, text: str | None = None) -> list[UnifiedSymbolInformation]:
+        """
+        Materializes all symbols as (new) dictionaries.
+
+        :param text: the contents of the document, which is required to restore symbol bodies that are stored as spans.
+            If it is not given, such bodies are omitted (they can be retrieved later from the file).
+        :return: the list of all symbols in depth-first order (the same order as returned by `iter_views`)
+        """
+        return self._materialize_indices(range(len(self.names)), text)
+
+    def _materialize_indices(self, indices: Iterable[int], text: str | None) -> list[UnifiedSymbolInformation]:
+        """
+        Materializes the symbols with the given indices (in ascending order); the parent of an included symbol
+        is linked only if it is included as well.
+
+        :return: the symbols, in the order of the given indices
+        """
+        symbols: list[UnifiedSymbolInformation] = []
+        materialized: dict[int, dict[str, Any]] = {}
+        names = self.names
+        kinds = self.kinds
+        parents = self.parents
+        overload_indices = self.overload_indices
+        flags_arr = self.flags
+        ranges = self.ranges
+        selection_ranges = self.selection_ranges
+        location_ranges = self.location_ranges
+        path_indices = self.path_indices
+        paths = self.paths
+        body_spans = self.body_spans
+        extras = self.extras
+
+        for idx in indices:
+            flags = flags_arr[idx]
+            o = 4 * idx
+            symbol: dict[str, Any] = {"name": names[idx], "kind": kinds[idx]}
+
+            location_range = None
+            if flags & _FLAG_LOCATION:
+                location_range = _tuple_to_range(location_ranges, o)
+                uri, abs_path, rel_path = paths[path_indices[idx]]
+                symbol["location"] = {"uri": uri, "range": location_range, "absolutePath": abs_path, "relativePath": rel_path}
+            if flags & _FLAG_RANGE:
+                if location_range is not None and ranges[o : o + 4] == location_ranges[o : o + 4]:
+                    # share the range object with the location, as done by the language server wrapper
+                    symbol["range"] = location_range
+                else:
+                    symbol["range"] = _tuple_to_range(ranges, o)
+            if flags & _FLAG_SELECTION_RANGE:
+                symbol["selectionRange"] = _tuple_to_range(selection_ranges, o)
+            body_start = body_spans[2 * idx]
+            if body_start >= 0 and text is not None:
+                symbol["body"] = text[body_start : body_spans[2 * idx + 1]]
+            if overload_indices[idx] >= 0:
+                symbol["overload_idx"] = overload_indices[idx]
+            symbol_extras = extras.get(idx)
+            if symbol_extras is not None:
+                symbol.update(symbol_extras)
+
+            parent_idx = parents[idx]
+            parent = materialized.get(parent_idx) if parent_idx >= 0 else None
+            if flags & _FLAG_PARENT:
+                symbol["parent"] = parent
+            if flags & _FLAG_CHILDREN:
+                symbol["children"] = []
+            if parent is not None and "children" in parent:
+                parent["children"].append(symbol)  # type: ignore
+            materialized[idx] = symbol
+            symbols.append(cast(UnifiedSymbolInformation, symbol))
+        return symbols
+
+    def materialize(self, text: str | None = None) -> list[UnifiedSymbolInformation]:
+        """
+        Materializes the symbols as (new) dictionaries, see `materialize_all`.
+
+        :return: the list of root symbols
+        """
+        all_symbols = self.materialize_all(text)
+        return [all_symbols[view.index] for view in self.iter_roots()]
@@ -5,11 +5,12 @@ Defines wrapper objects around the types returned by LSP to ensure decoupling be
 from __future__ import annotations
 
 from enum import Enum, IntEnum
-from typing import NotRequired, Union
+from typing import TYPE_CHECKING, NotRequired, Union
 
 from typing_extensions import TypedDict
 
-from solidlsp.lsp_protocol_handler.lsp_types import DiagnosticSeverity
+if TYPE_CHECKING:
+    from solidlsp.lsp_protocol_handler.lsp_types import DiagnosticSeverity
 
 URI = str
 DocumentUri = str
@@ -2,20 +2,14 @@
 This file contains various utility functions like I/O operations, handling paths, etc.
 """
 
-import gzip
 import logging
 import os
 import platform
 import shutil
 import subprocess
-import uuid
-import zipfile
 from enum import Enum
 from pathlib import Path, PurePath
 
-import charset_normalizer
-import requests
-
 from solidlsp.ls_exceptions import SolidLSPException
 from solidlsp.ls_types import UnifiedSymbolInformation
 
@@ -187,6 +181,8 @@ class FileUtils:
                 with open(file_path, encoding=encoding) as inp_file:
                     return inp_file.read()
             except UnicodeDecodeError as ude:
+                import charset_normalizer  # imported lazily, as it is rarely needed and slow to import
+
                 results = charset_normalizer.from_path(file_path)
                 match = results.best()
                 if match:
@@ -200,72 +196,34 @@ class FileUtils:
             raise exc
 
     @staticmethod
-    def download_file(url: str, target_path: str) -> None:
+    def download_file(url: str, target_path: str, sha256: str | None = None) -> None:
         """
-        Downloads the file from the given URL to the given {target_path}
+        Downloads the file from the given URL to the given {target_path} (via the download store, see `solidlsp.util.fetcher`)
         """
+        # imported lazily, as it imports requests (slow) and is only needed when installing language servers
+        from solidlsp.util.fetcher import get_default_fetcher
+
         os.makedirs(os.path.dirname(target_path), exist_ok=True)
         try:
-            response = requests.get(url, stream=True, timeout=60)
-            if response.status_code != 200:
-                log.error(f"Error downloading file '{url}': {response.status_code} {response.text}")
-                raise SolidLSPException("Error downloading file.")
-            with open(target_path, "wb") as f:
-                shutil.copyfileobj(response.raw, f)
+            shutil.copyfile(get_default_fetcher().fetch(url, sha256), target_path)
         except Exception as exc:
             log.error(f"Error downloading file '{url}': {exc}")
             raise SolidLSPException("Error downloading file.") from None
 
     @staticmethod
-    def download_and_extract_archive(url: str, target_path: str, archive_type: str) -> None:
+    def download_and_extract_archive(url: str, target_path: str, archive_type: str, sha256: str | None = None) -> None:
         """
-        Downloads the archive from the given URL having format {archive_type} and extracts it to the given {target_path}
+        Downloads the archive from the given URL having format {archive_type} and extracts it to the given {target_path}.
+        The download is kept in the content-addressed download store (see `solidlsp.util.fetcher`), interrupted downloads
+        are resumed and zip archives are extracted in parallel.
         """
+        from solidlsp.util.fetcher import get_default_fetcher
+
         try:
-            tmp_files = []
-            tmp_file_name = str(PurePath(os.path.expanduser("~"), "solidlsp_tmp", uuid.uuid4().hex))
-            tmp_files.append(tmp_file_name)
-            os.makedirs(os.path.dirname(tmp_file_name), exist_ok=True)
-            FileUtils.download_file(url, tmp_file_name)
-            if archive_type in ["tar", "gztar", "bztar", "xztar"]:
-                os.makedirs(target_path, exist_ok=True)
-                shutil.unpack_archive(tmp_file_name, target_path, archive_type)
-            elif archive_type == "zip":
-                os.makedirs(target_path, exist_ok=True)
-                with zipfile.ZipFile(tmp_file_name, "r") as zip_ref:
-                    for zip_info in zip_ref.infolist():
-                        extracted_path = zip_ref.extract(zip_info, target_path)
-                        ZIP_SYSTEM_UNIX = 3  # zip file created on Unix system
-                        if zip_info.create_system != ZIP_SYSTEM_UNIX:
-                            continue
-                        # extractall() does not preserve permissions
-                        # see. https://github.com/python/cpython/issues/59999
-                        attrs = (zip_info.external_attr >> 16) & 0o777
-                        if attrs:
-                            os.chmod(extracted_path, attrs)
-            elif archive_type == "zip.gz":
-                os.makedirs(target_path, exist_ok=True)
-                tmp_file_name_ungzipped = tmp_file_name + ".zip"
-                tmp_files.append(tmp_file_name_ungzipped)
-                with gzip.open(tmp_file_name, "rb") as f_in, open(tmp_file_name_ungzipped, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-                shutil.unpack_archive(tmp_file_name_ungzipped, target_path, "zip")
-            elif archive_type == "gz":
-                with gzip.open(tmp_file_name, "rb") as f_in, open(target_path, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            elif archive_type == "binary":
-                # For single binary files, just move to target without extraction
-                shutil.move(tmp_file_name, target_path)
-            else:
-                log.error(f"Unknown archive type '{archive_type}' for extraction")
-                raise SolidLSPException(f"Unknown archive type '{archive_type}'")
+            get_default_fetcher().download_and_extract(url, target_path, archive_type, sha256)
         except Exception as exc:
-            log.error(f"Error extracting archive '{tmp_file_name}' obtained from '{url}': {exc}")
+            log.error(f"Error extracting archive obtained from '{url}': {exc}")
             raise SolidLSPException("Error extracting archive.") from exc
-        finally:
-            for tmp_file_name in tmp_files:
-                if os.path.exists(tmp_file_name):
-                    Path.unlink(Path(tmp_file_name))
 
 
 class PlatformId(str, Enum):
@@ -0,0 +1,146 @@
+"""
+JSON codecs for encoding and decoding the bodies of JSON-RPC messages.
+
+The standard library codec is always available; faster codecs are used if the corresponding package is installed.
+The codec can be selected via the environment variable SOLIDLSP_JSON_CODEC (one of "auto", "json", "orjson",
+"msgspec"); by default ("auto"), the fastest available codec is used.
+"""
+
+import importlib.util
+import json
+import logging
+import os
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+JSON_CODEC_ENV_VAR = "SOLIDLSP_JSON_CODEC"
+
+
+class JsonCodec:
+    """
+    Codec based on the json module of the standard library.
+
+    Implementations must produce compact UTF-8 (without escaping non-ASCII characters) and must raise a ValueError
+    (e.g. json.JSONDecodeError or UnicodeDecodeError) for malformed input.
+    """
+
+    name = "json"
+
+    def encode(self, payload: Any) -> bytes:
+        return json.dumps(payload, check_circular=False, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec based on orjson
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def encode(self, payload: Any) -> bytes:
+        try:
+            return self._orjson.dumps(payload, option=self._options)
+        except TypeError:
+            # orjson does not support some types which the json module handles (e.g. integers exceeding 64 bits)
+            return super().encode(payload)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            # orjson rejects some input which the json module accepts (e.g. lone surrogates in strings); malformed
+            # input makes the json module raise json.JSONDecodeError.
+            # Note that orjson decodes integers exceeding 64 bits as floats (use SOLIDLSP_JSON_CODEC=json to avoid this)
+            return super().decode(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """
+    Codec based on msgspec
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._encode_error = msgspec.EncodeError
+
+    def encode(self, payload: Any) -> bytes:
+        try:
+            return self._encoder.encode(payload)
+        except (TypeError, OverflowError, self._encode_error):
+            return super().encode(payload)
+
+    def decode(self, data: bytes) -> Any:
+        # msgspec.DecodeError is a subclass of ValueError
+        return self._decoder.decode(data)
+
+
+# name -> (codec class, top-level module required by the codec), in order of preference
+JSON_CODECS: dict[str, tuple[type[JsonCodec], str]] = {
+    "orjson": (OrjsonCodec, "orjson"),
+    "msgspec": (MsgspecCodec, "msgspec"),
+    "json": (JsonCodec, "json"),
+}
+
+
+def available_json_codecs() -> list[str]:
+    """
+    :return: the names of the codecs whose required packages are installed, in order of preference
+    """
+    return [name for name, (_, module) in JSON_CODECS.items() if importlib.util.find_spec(module) is not None]
+
+
+def create_json_codec(name: str | None = None) -> JsonCodec:
+    """
+    :param name: the name of the codec ("auto" for the fastest available codec); if None, it is taken from the
+        environment variable SOLIDLSP_JSON_CODEC (default: "auto")
+    :return: the codec
+    """
+    if name is None:
+        name = os.environ.get(JSON_CODEC_ENV_VAR, "auto")
+    name = name.strip().lower()
+    if name == "auto":
+        return JSON_CODECS[available_json_codecs()[0]][0]()
+    if name not in JSON_CODECS:
+        raise ValueError(f"Unknown JSON codec '{name}'; supported codecs: auto, {', '.join(JSON_CODECS)}")
+    codec_class, module = JSON_CODECS[name]
+    if importlib.util.find_spec(module) is None:
+        log.warning(f"JSON codec '{name}' was requested but {module} is not installed; using the json module")
+        return JsonCodec()
+    return codec_class()
+
+
+_json_codec: JsonCodec | None = None
+
+
+def get_json_codec() -> JsonCodec:
+    """
+    :return: the codec used for the messages exchanged with language servers (created on first use)
+    """
+    global _json_codec
+    if _json_codec is None:
+        _json_codec = create_json_codec()
+        log.debug(f"Using JSON codec '{_json_codec.name}'")
+    return _json_codec
+
+
+def set_json_codec(codec: JsonCodec) -> None:
+    """
+    Sets the codec used for the messages exchanged with language servers
+    """
+    global _json_codec
+    _json_codec = codec
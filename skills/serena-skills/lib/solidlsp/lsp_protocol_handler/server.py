@@ -29,11 +29,11 @@ SOFTWARE.
 """
 
 import dataclasses
-import json
 import logging
 import os
 from typing import Any, Union
 
+from .json_codec import get_json_codec
 from .lsp_types import ErrorCodes
 
 StringDict = dict[str, Any]
@@ -108,7 +108,7 @@ class StopLoopException(Exception):
 
 
 def create_message(payload: PayloadLike) -> tuple[bytes, bytes, bytes]:
-    body = json.dumps(payload, check_circular=False, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+    body = get_json_codec().encode(payload)
     return (
         f"Content-Length: {len(body)}\r\n".encode(ENCODING),
         "Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n\r\n".encode(ENCODING),
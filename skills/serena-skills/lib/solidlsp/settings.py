@@ -34,6 +34,15 @@ class SolidLSPSettings:
     For instance, if this is ".solidlsp" and the project is located at "/home/user/myproject",
     then Solid-LSP will store project-specific data in "/home/user/myproject/.solidlsp".
     """
+    index_cache_max_size_mb: float | None = 4096
+    """
+    Disk budget for the persistent index directories of language servers (see `SolidLanguageServer.get_persistent_index_dir`);
+    least recently used directories are evicted when it is exceeded. None for no limit.
+    """
+    index_cache_max_age_days: float | None = 60
+    """
+    Persistent index directories of language servers that were not used for this number of days are evicted. None for no limit.
+    """
     ls_specific_settings: dict["Language", dict[str, Any]] = field(default_factory=dict)
     """
     Advanced configuration option allowing to configure language server implementation specific options.
@@ -1,4 +1,11 @@
 import logging
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from collections.abc import Iterator, Mapping, MutableMapping
 from typing import Any, Optional
 import sys
 from pathlib import Path
@@ -27,3 +34,272 @@ def load_cache(path: str, version: Any) -> Optional[Any]:
 def save_cache(path: str, version: Any, obj: Any) -> None:
     data = {"__cache_version": version, "obj": obj}
     dump_pickle(data, path)
+
+
+# Binary cache format
+# -------------------
+# A binary cache file stores a mapping from string keys (typically relative file paths) to arbitrary picklable values,
+# where each value is pickled separately, such that entries can be decoded on demand and a corrupted entry only
+# invalidates itself. Layout:
+#
+#   preamble: magic (8 bytes), format version (uint32), header length (uint32), header crc32 (uint32)
+#   header:   pickled dict {"version": <cache version>, "entries": {key: (offset, length, crc32)}}
+#   data:     the pickled entries; offsets are relative to the start of the data section
+#
+# Files are memory-mapped for reading and written atomically (temp file + rename).
+
+BINARY_CACHE_MAGIC = b"SLSPCACH"
+BINARY_CACHE_FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIII")
+
+
+class CacheFormatError(Exception):
+    """Raised if a binary cache file cannot be read as a whole (invalid preamble or corrupted header)"""
+
+
+class CacheEntryCorruptedError(Exception):
+    """Raised if a single entry of a binary cache file is corrupted"""
+
+
+class BinaryCacheReader:
+    """
+    Provides on-demand access to the entries of a memory-mapped binary cache file
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: the path of the binary cache file
+        :raises CacheFormatError: if the file is not a valid binary cache file
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap: mmap.mmap | None = None
+        try:
+            preamble = self._file.read(_PREAMBLE.size)
+            if len(preamble) != _PREAMBLE.size:
+                raise CacheFormatError(f"Truncated cache file {path}")
+            magic, format_version, header_length, header_crc = _PREAMBLE.unpack(preamble)
+            if magic != BINARY_CACHE_MAGIC:
+                raise CacheFormatError(f"Not a binary cache file: {path}")
+            if format_version != BINARY_CACHE_FORMAT_VERSION:
+                raise CacheFormatError(f"Unsupported binary cache format version {format_version} in {path}")
+            header_bytes = self._file.read(header_length)
+            if len(header_bytes) != header_length or zlib.crc32(header_bytes) != header_crc:
+                raise CacheFormatError(f"Corrupted header in cache file {path}")
+            try:
+                header = pickle.loads(header_bytes)
+                self.version: Any = header["version"]
+                self._entries: dict[str, tuple[int, int, int]] = header["entries"]
+            except Exception as e:
+                raise CacheFormatError(f"Invalid header in cache file {path}: {e}") from e
+            self._data_offset = _PREAMBLE.size + header_length
+            if os.fstat(self._file.fileno()).st_size > self._data_offset:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def keys(self) -> list[str]:
+        return list(self._entries.keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def read_raw_entry(self, key: str) -> tuple[bytes, int]:
+        """
+        :param key: the key of the entry
+        :return: a pair (pickled value, crc32)
+        :raises CacheEntryCorruptedError: if the entry's data does not match its checksum
+        """
+        offset, length, crc = self._entries[key]
+        start = self._data_offset + offset
+        if self._mmap is None or start + length > len(self._mmap):
+            raise CacheEntryCorruptedError(f"Entry {key} is truncated in {self.path}")
+        data = self._mmap[start : start + length]
+        if zlib.crc32(data) != crc:
+            raise CacheEntryCorruptedError(f"Checksum mismatch for entry {key} in {self.path}")
+        return data, crc
+
+    def read_entry(self, key: str) -> Any:
+        """
+        :param key: the key of the entry
+        :return: the decoded value
+        :raises CacheEntryCorruptedError: if the entry is corrupted
+        """
+        data, _ = self.read_raw_entry(key)
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            raise CacheEntryCorruptedError(f"Could not decode entry {key} in {self.path}: {e}") from e
+
+
+def _write_binary_cache(path: str, version: Any, entries: list[tuple[str, bytes, int]]) -> None:
+    """
+    Atomically writes a binary cache file.
+
+    :param path: the path of the file to write
+    :param version: the cache version
+    :param entries: triples (key, pickled value, crc32)
+    """
+    index: dict[str, tuple[int, int, int]] = {}
+    offset = 0
+    for key, data, crc in entries:
+        index[key] = (offset, len(data), crc)
+        offset += len(data)
+    header_bytes = pickle.dumps({"version": version, "entries": index}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(BINARY_CACHE_MAGIC, BINARY_CACHE_FORMAT_VERSION, len(header_bytes), zlib.crc32(header_bytes)))
+            f.write(header_bytes)
+            for _, data, _ in entries:
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class LazyCache(MutableMapping[str, Any]):
+    """
+    A dictionary-like cache whose entries are loaded on demand from a binary cache file.
+    Entries that are found to be corrupted are dropped (with a warning) and treated as missing.
+    """
+
+    def __init__(self, reader: BinaryCacheReader | None = None):
+        self._reader = reader
+        self._loaded: dict[str, Any] = {}
+        self._removed: set[str] = set()
+        """keys of the reader that were deleted or found to be corrupted"""
+
+    def _has_stored_entry(self, key: object) -> bool:
+        return self._reader is not None and key in self._reader and key not in self._removed
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if not self._has_stored_entry(key):
+            raise KeyError(key)
+        assert self._reader is not None
+        try:
+            value = self._reader.read_entry(key)
+        except CacheEntryCorruptedError as e:
+            log.warning("Dropping corrupted cache entry: %s", e)
+            self._removed.add(key)
+            raise KeyError(key) from e
+        self._loaded[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._loaded[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        found = False
+        if key in self._loaded:
+            del self._loaded[key]
+            found = True
+        if self._has_stored_entry(key):
+            self._removed.add(key)
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._loaded or self._has_stored_entry(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._loaded
+        if self._reader is not None:
+            for key in self._reader.keys():
+                if key not in self._loaded and key not in self._removed:
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def close(self) -> None:
+        """
+        Closes the underlying cache file (entries that were not loaded yet are dropped).
+        """
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self._removed.clear()
+
+    def save(self, path: str, version: Any) -> None:
+        """
+        Atomically saves the cache to the given path. Entries that were never loaded are copied without decoding them.
+        Afterwards, the cache is backed by the newly written file.
+
+        :param path: the path of the binary cache file
+        :param version: the cache version
+        """
+        entries: list[tuple[str, bytes, int]] = []
+        for key in self:
+            if key in self._loaded:
+                data = pickle.dumps(self._loaded[key], protocol=pickle.HIGHEST_PROTOCOL)
+                entries.append((key, data, zlib.crc32(data)))
+            else:
+                assert self._reader is not None
+                try:
+                    data, crc = self._reader.read_raw_entry(key)
+                except CacheEntryCorruptedError as e:
+                    log.warning("Dropping corrupted cache entry: %s", e)
+                    continue
+                entries.append((key, data, crc))
+
+        # the old file must be closed before it is replaced (required on Windows)
+        self.close()
+        _write_binary_cache(path, version, entries)
+        self._reader = BinaryCacheReader(path)
+
+
+def load_binary_cache(path: str, version: Any) -> LazyCache | None:
+    """
+    Opens a binary cache file for on-demand loading of its entries.
+
+    :param path: the path of the binary cache file
+    :param version: the expected cache version
+    :return: the cache or None if the file is outdated
+    :raises CacheFormatError: if the file is not a valid binary cache file
+    """
+    reader = BinaryCacheReader(path)
+    if reader.version != version:
+        log.info("Cache is outdated (expected version %s, got %s). Ignoring cache at %s", version, reader.version, path)
+        reader.close()
+        return None
+    return LazyCache(reader)
+
+
+def save_binary_cache(path: str, version: Any, obj: Mapping[str, Any]) -> None:
+    """
+    Atomically saves the given mapping as a binary cache file.
+
+    :param path: the path of the binary cache file
+    :param version: the cache version
+    :param obj: the mapping to save; if it is a LazyCache, entries that were not loaded are copied without decoding them
+    """
+    if isinstance(obj, LazyCache):
+        obj.save(path, version)
+        return
+    entries = []
+    for key, value in obj.items():
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        entries.append((key, data, zlib.crc32(data)))
+    _write_binary_cache(path, version, entries)
@@ -0,0 +1,468 @@
+"""
+Unified fetcher for the runtime dependencies of language servers.
+
+Downloads are kept in a content-addressed store, i.e. files are named by their (verified) sha256 digest,
+such that a dependency that was already downloaded (e.g. for another language server or a reinstallation)
+is not downloaded again. Interrupted downloads are resumed via HTTP range requests (conditional on the resource being
+unchanged, as identified by its ETag or modification time), independent dependencies
+can be downloaded concurrently (see `DependencyFetcher.fetch_many`) and zip archives are extracted in parallel.
+
+Layout of the store directory:
+  * sha256/<digest>: complete, verified downloads
+  * partial/<url key>.part: incomplete downloads (resumed upon the next fetch of the same URL)
+  * partial/<url key>.meta: the validator (ETag or Last-Modified) of the resource an incomplete download belongs to
+  * partial/<url key>.lock: lock files serialising the downloads of the same URL across processes
+  * urls.json: maps URLs to the digest of the content that was last downloaded from them
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePath
+
+import requests
+
+from solidlsp.ls_exceptions import SolidLSPException
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = str(PurePath(os.path.expanduser("~"), "solidlsp_tmp", "store"))
+URL_INDEX_FILENAME = "urls.json"
+
+ZIP_SYSTEM_UNIX = 3  # zip file created on Unix system
+
+
+@contextmanager
+def _exclusive_file_lock(lock_path: str) -> Iterator[None]:
+    """
+    Holds an exclusive (advisory) lock on the given file, blocking until it is available;
+    the lock is released by the operating system if the holding process terminates.
+    """
+    with open(lock_path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt  # imported lazily, as it is only available on Windows
+
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 attempts (one per second)
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # imported lazily, as it is not available on Windows
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@dataclass(frozen=True)
+class FetchRequest:
+    url: str
+    sha256: str | None = None
+    """
+    the expected sha256 digest of the content; if it is given, the download is verified against it and a stored
+    file with this digest is used without contacting the server at all
+    """
+
+
+class DependencyFetcher:
+    """
+    Downloads files into a content-addressed store and extracts archives from it.
+    Concurrent fetches of the same URL are serialised, both within the process and across processes
+    (via a lock file next to the partial download).
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self, store_dir: str = DEFAULT_STORE_DIR, max_workers: int = 4, max_store_size_mb: float | None = 2048, timeout: float = 60
+    ):
+        """
+        :param store_dir: the directory of the content-addressed store
+        :param max_workers: the maximum number of concurrent downloads (and of threads used for the extraction of an archive)
+        :param max_store_size_mb: the disk budget of the store; least recently used files are removed when it is exceeded.
+            None for no limit.
+        :param timeout: the timeout (in seconds) for connecting to the server and for each read
+        """
+        self.store_dir = store_dir
+        self.max_workers = max_workers
+        self.max_store_size_mb = max_store_size_mb
+        self.timeout = timeout
+        self._url_locks: dict[str, threading.Lock] = {}
+        self._url_locks_lock = threading.Lock()
+        self._url_index_lock = threading.Lock()
+        # digests of the files fetched by this fetcher, which may still be in use (e.g. extracted after `fetch_many`)
+        # and are therefore never removed by `prune`
+        self._fetched_digests: set[str] = set()
+
+    def get_store_path(self, sha256: str) -> str:
+        return os.path.join(self.store_dir, "sha256", sha256.lower())
+
+    def _get_partial_path(self, url: str) -> str:
+        return os.path.join(self.store_dir, "partial", hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".part")
+
+    @staticmethod
+    def _get_validator(response: requests.Response) -> str | None:
+        """
+        :return: the validator identifying the version of the resource, which can be used in an If-Range header
+            (a strong ETag or, if there is none, the modification time), or None if the response has none
+        """
+        etag = response.headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
+
+    @staticmethod
+    def _read_validator(meta_path: str) -> str | None:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f).get("validator")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    @staticmethod
+    def _remove_partial(part_path: str, meta_path: str) -> None:
+        for path in (part_path, meta_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def _lock_for(self, url: str) -> threading.Lock:
+        with self._url_locks_lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def _read_url_index(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.store_dir, URL_INDEX_FILENAME), encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _record_url(self, url: str, sha256: str) -> None:
+        with self._url_index_lock:
+            data = self._read_url_index()
+            data[url] = sha256
+            fd, tmp_path = tempfile.mkstemp(prefix=URL_INDEX_FILENAME + ".", suffix=".tmp", dir=self.store_dir)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_path, os.path.join(self.store_dir, URL_INDEX_FILENAME))
+            except OSError as e:
+                log.warning("Could not update the URL index of the download store %s: %s", self.store_dir, e)
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _get_stored_file(self, url: str, sha256: str | None) -> str | None:
+        digest = sha256 or self._read_url_index().get(url)
+        if digest is None:
+            return None
+        path = self.get_store_path(digest)
+        if not os.path.isfile(path):
+            return None
+        # mark the file as recently used (for the eviction of least recently used files)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def fetch(self, url: str, sha256: str | None = None) -> str:
+        """
+        Returns the path of the stored file for the given URL, downloading it if it is not yet in the store.
+
+        :param url: the URL to download
+        :param sha256: the expected sha256 digest of the content (if known)
+        :return: the path of the file in the store (which must not be modified or moved by the caller)
+        """
+        digest = self._fetch(url, sha256)
+        self._fetched_digests.add(digest)
+        if self.max_store_size_mb is not None:
+            self.prune(self.max_store_size_mb, keep={digest})
+        return self.get_store_path(digest)
+
+    def _fetch(self, url: str, sha256: str | None) -> str:
+        """
+        Fetches the given URL into the store (without pruning the store)
+
+        :return: the sha256 digest of the stored file
+        """
+        with self._lock_for(url):
+            path = self._get_stored_file(url, sha256)
+            if path is not None:
+                log.info("Using stored download of %s: %s", url, path)
+                return os.path.basename(path)
+            part_path = self._get_partial_path(url)
+            os.makedirs(os.path.dirname(part_path), exist_ok=True)
+            with _exclusive_file_lock(part_path[: -len(".part")] + ".lock"):
+                # another process may have completed the download while we were waiting for the lock
+                path = self._get_stored_file(url, sha256)
+                if path is not None:
+                    log.info("Using stored download of %s: %s", url, path)
+                    return os.path.basename(path)
+                digest = self._download(url, sha256)
+                self._record_url(url, digest)
+        return digest
+
+    def fetch_many(self, fetch_requests: Sequence[FetchRequest]) -> list[str]:
+        """
+        Fetches the given files concurrently.
+
+        :param fetch_requests: the files to fetch
+        :return: the paths of the stored files (in the order of the requests)
+        """
+        if len(fetch_requests) <= 1:
+            return [self.fetch(r.url, r.sha256) for r in fetch_requests]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(fetch_requests)), thread_name_prefix="fetch") as executor:
+            futures = [executor.submit(self._fetch, r.url, r.sha256) for r in fetch_requests]
+            digests = [f.result() for f in futures]
+        self._fetched_digests.update(digests)
+        # the store is pruned once all files have been fetched, such that none of them is removed before it is used
+        if self.max_store_size_mb is not None:
+            self.prune(self.max_store_size_mb, keep=set(digests))
+        return [self.get_store_path(digest) for digest in digests]
+
+    def _download(self, url: str, sha256: str | None, allow_resume: bool = True) -> str:
+        """
+        Downloads the given URL into the store, resuming a previously interrupted download if possible.
+        A download is only resumed if the resource is unchanged (the validator stored with the partial download is
+        sent in an If-Range header, such that the server sends the full content if it does not match).
+        The caller must hold the lock of the URL's partial download (see `fetch`).
+
+        :return: the sha256 digest of the downloaded content
+        """
+        part_path = self._get_partial_path(url)
+        meta_path = part_path[: -len(".part")] + ".meta"
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.get_store_path("0")), exist_ok=True)
+
+        offset = os.path.getsize(part_path) if allow_resume and os.path.exists(part_path) else 0
+        validator = self._read_validator(meta_path) if offset > 0 else None
+        if offset > 0 and validator is None:
+            # the version of the resource the partial download belongs to is unknown
+            log.info("Discarding partial download of %s without validator", url)
+            offset = 0
+        # disable content encodings, since byte ranges refer to the encoded representation
+        headers = {"Accept-Encoding": "identity"}
+        if offset > 0:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        try:
+            response = requests.get(url, stream=True, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            raise SolidLSPException(f"Error downloading '{url}': {e}") from e
+
+        with response:
+            if response.status_code == 416 and offset > 0:
+                log.info("Server rejected resumption of the download of %s; downloading from scratch", url)
+                self._remove_partial(part_path, meta_path)
+                return self._download(url, sha256, allow_resume=False)
+            if response.status_code == 206 and offset > 0:
+                if not response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+                    log.info("Server sent an unexpected range for %s; downloading from scratch", url)
+                    self._remove_partial(part_path, meta_path)
+                    return self._download(url, sha256, allow_resume=False)
+                log.info("Resuming download of %s at byte %d", url, offset)
+                mode = "ab"
+            elif response.status_code == 200:
+                if offset > 0:
+                    log.info("Resource %s has changed since the partial download; downloading from scratch", url)
+                offset = 0
+                mode = "wb"
+                # the validator is stored before the content, such that a partial download always belongs to it
+                self._remove_partial(part_path, meta_path)
+                validator = self._get_validator(response)
+                if validator is not None:
+                    with open(meta_path, "w", encoding="utf-8") as f:
+                        json.dump({"validator": validator}, f)
+            else:
+                raise SolidLSPException(f"Error downloading '{url}': HTTP status {response.status_code}")
+
+            hasher = hashlib.sha256()
+            if offset > 0:
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+            content_length = response.headers.get("Content-Length")
+            expected_size = offset + int(content_length) if content_length is not None else None
+
+            log.info("Downloading %s", url)
+            size = offset
+            try:
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        size += len(chunk)
+            except (requests.RequestException, OSError) as e:
+                # the partial file is kept, such that the next attempt can resume the download
+                raise SolidLSPException(f"Download of '{url}' was interrupted after {size} bytes: {e}") from e
+
+        if expected_size is not None and size != expected_size:
+            raise SolidLSPException(f"Download of '{url}' is incomplete ({size} of {expected_size} bytes)")
+
+        digest = hasher.hexdigest()
+        if sha256 is not None and digest != sha256.lower():
+            self._remove_partial(part_path, meta_path)
+            raise SolidLSPException(f"SHA256 checksum verification failed for '{url}': expected {sha256.lower()}, got {digest}")
+        os.replace(part_path, self.get_store_path(digest))
+        self._remove_partial(part_path, meta_path)
+        log.info("Downloaded %s (%d bytes, sha256 %s)", url, size, digest)
+        return digest
+
+    def prune(self, max_total_size_mb: float, keep: set[str] | None = None) -> list[str]:
+        """
+        Removes the least recently used files from the store until its size no longer exceeds the given budget.
+
+        :param max_total_size_mb: the disk budget in MB
+        :param keep: digests of files which shall not be removed (in addition to the files fetched by this fetcher)
+        :return: the digests of the removed files
+        """
+        keep = self._fetched_digests | (keep or set())
+        files_dir = os.path.dirname(self.get_store_path("0"))
+        try:
+            entries = [(e.name, e.stat()) for e in os.scandir(files_dir) if e.is_file()]
+        except OSError:
+            return []
+        total_size = sum(st.st_size for _, st in entries)
+        removed = []
+        for name, st in sorted(entries, key=lambda e: e[1].st_mtime):
+            if total_size <= max_total_size_mb * 1024 * 1024:
+                break
+            if name in keep:
+                continue
+            try:
+                os.unlink(os.path.join(files_dir, name))
+            except OSError:
+                continue
+            total_size -= st.st_size
+            removed.append(name)
+        if removed:
+            log.info("Removed %d least recently used files from the download store %s", len(removed), self.store_dir)
+        return removed
+
+    def extract(self, archive_path: str, target_path: str, archive_type: str) -> None:
+        """
+        Extracts the given archive.
+
+        :param archive_path: the path of the archive
+        :param target_path: the directory to extract to (or, for archive types "gz" and "binary", the target file)
+        :param archive_type: one of "tar", "gztar", "bztar", "xztar", "zip", "zip.gz", "gz" and "binary"
+        """
+        if archive_type in ["tar", "gztar", "bztar", "xztar"]:
+            # tar archives can only be read sequentially
+            os.makedirs(target_path, exist_ok=True)
+            shutil.unpack_archive(archive_path, target_path, archive_type)
+        elif archive_type == "zip":
+            extract_zip_parallel(archive_path, target_path, self.max_workers)
+        elif archive_type == "zip.gz":
+            os.makedirs(self.store_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".zip", dir=self.store_dir)
+            try:
+                with gzip.open(archive_path, "rb") as f_in, os.fdopen(fd, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                extract_zip_parallel(tmp_path, target_path, self.max_workers)
+            finally:
+                os.unlink(tmp_path)
+        elif archive_type == "gz":
+            with gzip.open(archive_path, "rb") as f_in, open(target_path, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        elif archive_type == "binary":
+            # the stored file must remain in the store, so it is copied rather than moved
+            shutil.copyfile(archive_path, target_path)
+        else:
+            log.error(f"Unknown archive type '{archive_type}' for extraction")
+            raise SolidLSPException(f"Unknown archive type '{archive_type}'")
+
+    def download_and_extract(self, url: str, target_path: str, archive_type: str, sha256: str | None = None) -> None:
+        """
+        Fetches the archive from the given URL and extracts it (see `extract`)
+        """
+        self.extract(self.fetch(url, sha256), target_path, archive_type)
+
+
+def extract_zip_parallel(archive_path: str, target_path: str, max_workers: int = 4, min_members_per_worker: int = 32) -> None:
+    """
+    Extracts the given zip archive, distributing the members over several threads (decompression and file I/O
+    release the GIL). Unix permissions of the members are preserved.
+
+    :param archive_path: the path of the zip archive
+    :param target_path: the directory to extract to
+    :param max_workers: the maximum number of threads
+    :param min_members_per_worker: the minimum number of members per thread (small archives are extracted by a single thread)
+    """
+    os.makedirs(target_path, exist_ok=True)
+    with zipfile.ZipFile(archive_path, "r") as zip_ref:
+        infos = zip_ref.infolist()
+        # create all directories up front, since concurrent creation of the same directory by ZipFile.extract may fail
+        abs_target_path = os.path.abspath(target_path)
+        for info in infos:
+            directory = os.path.normpath(os.path.join(abs_target_path, os.path.dirname(info.filename.rstrip("/"))))
+            if directory == abs_target_path or directory.startswith(abs_target_path + os.sep):
+                os.makedirs(directory, exist_ok=True)
+
+    num_workers = max(1, min(max_workers, len(infos) // min_members_per_worker))
+    # distribute the members such that all workers extract approximately the same number of bytes
+    buckets: list[list[zipfile.ZipInfo]] = [[] for _ in range(num_workers)]
+    bucket_sizes = [0] * num_workers
+    for info in sorted(infos, key=lambda i: i.file_size, reverse=True):
+        i = bucket_sizes.index(min(bucket_sizes))
+        buckets[i].append(info)
+        bucket_sizes[i] += info.file_size
+
+    def extract_members(members: list[zipfile.ZipInfo]) -> None:
+        # each worker uses its own file handle, since reads from a shared ZipFile are serialised
+        with zipfile.ZipFile(archive_path, "r") as zf:
+            for zip_info in members:
+                extracted_path = zf.extract(zip_info, target_path)
+                if zip_info.create_system != ZIP_SYSTEM_UNIX:
+                    continue
+                # extractall() does not preserve permissions
+                # see. https://github.com/python/cpython/issues/59999
+                attrs = (zip_info.external_attr >> 16) & 0o777
+                if attrs:
+                    os.chmod(extracted_path, attrs)
+
+    if num_workers == 1:
+        extract_members(buckets[0])
+        return
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="unzip") as executor:
+        for future in [executor.submit(extract_members, bucket) for bucket in buckets]:
+            future.result()
+
+
+_default_fetcher: DependencyFetcher | None = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_default_fetcher() -> DependencyFetcher:
+    """
+    :return: the fetcher that is shared by all language servers of the process
+    """
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = DependencyFetcher()
+        return _default_fetcher
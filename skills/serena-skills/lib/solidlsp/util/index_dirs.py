@@ -0,0 +1,234 @@
+"""
+Persistent per-(project, server, server version) directories, in which language servers can store their
+indexes/caches across runs, together with size accounting and eviction.
+
+Layout: <solidlsp_dir>/language_servers/index_cache/<server>/<server version>/<project key>/
+where each index directory contains
+  * index_dir.json: metadata (repository root, last use)
+  * in_use/<pid>: markers of the processes currently using the directory (which protect it from eviction)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+
+log = logging.getLogger(__name__)
+
+INDEX_CACHE_DIR_NAME = "index_cache"
+METADATA_FILENAME = "index_dir.json"
+IN_USE_DIR_NAME = "in_use"
+EVICTION_STAMP_FILENAME = ".last_eviction"
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def get_index_cache_root(solidlsp_dir: str) -> str:
+    return os.path.join(solidlsp_dir, "language_servers", INDEX_CACHE_DIR_NAME)
+
+
+def _safe_name(name: str, max_length: int = 64) -> str:
+    safe = _UNSAFE_NAME_CHARS.sub("_", name).strip("._") or "default"
+    if len(safe) > max_length:
+        safe = safe[: max_length - 9] + "-" + hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+    return safe
+
+
+def get_project_key(repository_root_path: str) -> str:
+    """
+    :return: a directory name identifying the given repository (readable prefix plus hash of the resolved path)
+    """
+    resolved = os.path.normcase(os.path.realpath(repository_root_path))
+    return f"{_safe_name(os.path.basename(resolved), 32)}-{hashlib.sha256(resolved.encode('utf-8')).hexdigest()[:16]}"
+
+
+def acquire_index_dir(solidlsp_dir: str, repository_root_path: str, server_name: str, server_version: str) -> str:
+    """
+    Creates (if necessary) the index directory for the given project, server and server version and marks
+    it as being in use by the current process.
+
+    :return: the path of the index directory
+    """
+    index_dir = os.path.join(
+        get_index_cache_root(solidlsp_dir), _safe_name(server_name), _safe_name(server_version), get_project_key(repository_root_path)
+    )
+    in_use_dir = os.path.join(index_dir, IN_USE_DIR_NAME)
+    os.makedirs(in_use_dir, exist_ok=True)
+    with open(os.path.join(in_use_dir, str(os.getpid())), "w", encoding="utf-8"):
+        pass
+    metadata = {"repository_root": os.path.realpath(repository_root_path), "last_used": time.time()}
+    try:
+        with open(os.path.join(index_dir, METADATA_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+    except OSError as e:
+        log.warning("Could not write index directory metadata in %s: %s", index_dir, e)
+    return index_dir
+
+
+def release_index_dir(index_dir: str) -> None:
+    """
+    Removes the in-use marker of the current process from the given index directory
+    """
+    try:
+        os.unlink(os.path.join(index_dir, IN_USE_DIR_NAME, str(os.getpid())))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log.warning("Could not release index directory %s: %s", index_dir, e)
+
+
+def _is_in_use(index_dir: str) -> bool:
+    import psutil  # imported lazily, as it is slow to import
+
+    in_use_dir = os.path.join(index_dir, IN_USE_DIR_NAME)
+    try:
+        pids = os.listdir(in_use_dir)
+    except OSError:
+        return False
+    in_use = False
+    for pid in pids:
+        if pid.isdigit() and psutil.pid_exists(int(pid)):
+            in_use = True
+        else:
+            # stale marker of a process that did not shut down cleanly
+            try:
+                os.unlink(os.path.join(in_use_dir, pid))
+            except OSError:
+                pass
+    return in_use
+
+
+def _get_dir_size(path: str) -> int:
+    size = 0
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                size += os.lstat(os.path.join(dir_path, file_name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def list_index_dirs(solidlsp_dir: str) -> list[dict]:
+    """
+    :return: descriptions (path, server, server_version, repository_root, last_used, size, in_use) of all index directories
+    """
+    root = get_index_cache_root(solidlsp_dir)
+    result = []
+    if not os.path.isdir(root):
+        return result
+    for server_name in sorted(os.listdir(root)):
+        server_dir = os.path.join(root, server_name)
+        if not os.path.isdir(server_dir):
+            continue
+        for server_version in sorted(os.listdir(server_dir)):
+            version_dir = os.path.join(server_dir, server_version)
+            if not os.path.isdir(version_dir):
+                continue
+            for project_key in sorted(os.listdir(version_dir)):
+                index_dir = os.path.join(version_dir, project_key)
+                if not os.path.isdir(index_dir):
+                    continue
+                metadata: dict = {}
+                try:
+                    with open(os.path.join(index_dir, METADATA_FILENAME), encoding="utf-8") as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                result.append(
+                    {
+                        "path": index_dir,
+                        "server": server_name,
+                        "server_version": server_version,
+                        "repository_root": metadata.get("repository_root"),
+                        "last_used": metadata.get("last_used") or os.path.getmtime(index_dir),
+                        "size": _get_dir_size(index_dir),
+                        "in_use": _is_in_use(index_dir),
+                    }
+                )
+    return result
+
+
+def evict_index_dirs(
+    solidlsp_dir: str,
+    max_total_size_mb: float | None = None,
+    max_age_days: float | None = None,
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Deletes index directories that are not in use if
+      * their repository no longer exists,
+      * there is a more recently used directory for the same repository and server (i.e. for an older server version),
+      * they were not used within max_age_days, or
+      * the total size exceeds max_total_size_mb, in which case the least recently used directories are deleted first.
+
+    :param solidlsp_dir: the Solid-LSP directory
+    :param max_total_size_mb: the disk budget for all index directories in MB; None for no limit
+    :param max_age_days: the maximum time since the last use in days; None for no limit
+    :param dry_run: whether to only report the directories that would be deleted
+    :return: descriptions of the deleted directories (with the reason for the deletion)
+    """
+    index_dirs = list_index_dirs(solidlsp_dir)
+    now = time.time()
+    to_delete: dict[str, str] = {}
+    seen: set[tuple[str, str]] = set()
+    for d in sorted(index_dirs, key=lambda d: d["last_used"], reverse=True):
+        key = (d["server"], d["repository_root"] or d["path"])
+        is_superseded = key in seen
+        seen.add(key)
+        if d["in_use"]:
+            continue
+        if d["repository_root"] is not None and not os.path.isdir(d["repository_root"]):
+            to_delete[d["path"]] = "repository no longer exists"
+        elif is_superseded:
+            to_delete[d["path"]] = "superseded by another server version"
+        elif max_age_days is not None and now - d["last_used"] > max_age_days * 86400:
+            to_delete[d["path"]] = f"unused for more than {max_age_days} days"
+
+    if max_total_size_mb is not None:
+        remaining = sorted((d for d in index_dirs if d["path"] not in to_delete), key=lambda d: d["last_used"])
+        total_size = sum(d["size"] for d in remaining)
+        for d in remaining:
+            if total_size <= max_total_size_mb * 1024 * 1024:
+                break
+            if d["in_use"]:
+                continue
+            to_delete[d["path"]] = "disk budget exceeded"
+            total_size -= d["size"]
+
+    deleted = []
+    for d in index_dirs:
+        reason = to_delete.get(d["path"])
+        if reason is None:
+            continue
+        if not dry_run:
+            log.info("Deleting index directory %s (%s)", d["path"], reason)
+            shutil.rmtree(d["path"], ignore_errors=True)
+        deleted.append(dict(d, reason=reason))
+    return deleted
+
+
+def evict_index_dirs_periodically(
+    solidlsp_dir: str, max_total_size_mb: float | None, max_age_days: float | None, interval_seconds: float = 86400
+) -> None:
+    """
+    Calls `evict_index_dirs` unless it was already called within the given interval (by any process), such that
+    the cost of size accounting is not incurred upon every language server start
+    """
+    root = get_index_cache_root(solidlsp_dir)
+    stamp_file = os.path.join(root, EVICTION_STAMP_FILENAME)
+    try:
+        if time.time() - os.path.getmtime(stamp_file) < interval_seconds:
+            return
+    except OSError:
+        pass
+    os.makedirs(root, exist_ok=True)
+    with open(stamp_file, "w", encoding="utf-8"):
+        pass
+    try:
+        evict_index_dirs(solidlsp_dir, max_total_size_mb=max_total_size_mb, max_age_days=max_age_days)
+    except Exception as e:
+        log.warning("Eviction of index directories failed: %s", e)
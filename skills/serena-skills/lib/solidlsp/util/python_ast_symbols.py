@@ -0,0 +1,308 @@
+"""
+Parser-based extraction of document symbols from Python source code (using the `ast` module), which does not require
+a running language server.
+
+The symbols are returned as (hierarchical) LSP document symbols shaped like the ones returned by pyright:
+  * classes, functions/methods, parameters and variables are included, one symbol per name and scope;
+    the symbol's range is the one of the name's last declaration with a type (class, function, parameter or annotated
+    variable), or of its first declaration if there is no such declaration;
+  * imported names, names declared global/nonlocal, `_`, self/cls parameters as well as names bound within lambdas
+    and comprehensions are omitted;
+  * instance attributes (names in `__slots__` and attributes assigned via the first parameter of a method,
+    e.g. `self.x = ...`) are children of the class, following the symbols of the class body; like pyright,
+    slot names are reported even if they are never assigned (see EDGE_CASES of benchmark_python_ast_symbols.py);
+  * the range of classes and functions includes their decorators, the selection range is the name.
+Unlike pyright, the extraction does not evaluate conditions statically, i.e. declarations in unreachable code
+(such as platform-specific branches) are not ignored.
+"""
+
+import ast
+import logging
+import re
+from dataclasses import dataclass, field
+
+from solidlsp.ls_types import SymbolKind
+from solidlsp.lsp_protocol_handler.lsp_types import DocumentSymbol
+
+log = logging.getLogger(__name__)
+
+PYTHON_SOURCE_EXTENSIONS = (".py", ".pyi")
+
+_LINE_SPLIT_RE = re.compile(r"\r\n|\r|\n")
+_DEF_KEYWORD_RE = re.compile(r"(?:async\s+)?(?:def|class)\s+")
+_CONSTANT_NAME_RE = re.compile(r"^_*[A-Z][A-Z0-9_]*$")
+_COMPREHENSION_TYPES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp, ast.Lambda)
+
+
+def is_python_source_file(relative_file_path: str) -> bool:
+    return relative_file_path.endswith(PYTHON_SOURCE_EXTENSIONS)
+
+
+@dataclass
+class _Declaration:
+    symbol: DocumentSymbol
+    has_type: bool
+
+
+@dataclass
+class _Scope:
+    symbols: list[DocumentSymbol]
+    is_class: bool = False
+    declarations: dict[str, _Declaration] = field(default_factory=dict)
+    # names which are bound in the scope but not reported (imports, global/nonlocal declarations)
+    hidden_names: set[str] = field(default_factory=set)
+    # for methods: the name of the parameter referring to the instance/class (e.g. `self`)
+    self_name: str | None = None
+    # for methods: the scope of the class
+    class_scope: "_Scope | None" = None
+    # for classes: the instance attributes (added after the class body's symbols)
+    attributes: list[DocumentSymbol] = field(default_factory=list)
+
+
+class _SymbolExtractor:
+    def __init__(self, source: str):
+        self._lines = _LINE_SPLIT_RE.split(source)
+
+    def _column(self, lineno: int, col_offset: int) -> int:
+        """
+        Converts an ast column (UTF-8 byte offset) to an LSP column (UTF-16 code units)
+        """
+        line = self._lines[lineno - 1] if lineno - 1 < len(self._lines) else ""
+        if line.isascii():
+            return col_offset
+        prefix = line.encode("utf-8")[:col_offset].decode("utf-8", errors="replace")
+        return len(prefix.encode("utf-16-le")) // 2
+
+    def _range(self, lineno: int, col_offset: int, end_lineno: int, end_col_offset: int) -> dict:
+        return {
+            "start": {"line": lineno - 1, "character": self._column(lineno, col_offset)},
+            "end": {"line": end_lineno - 1, "character": self._column(end_lineno, end_col_offset)},
+        }
+
+    def _node_range(self, node: ast.AST) -> dict:
+        return self._range(node.lineno, node.col_offset, node.end_lineno, node.end_col_offset)  # type: ignore[attr-defined]
+
+    def _name_range(self, lineno: int, col_offset: int, name: str) -> dict:
+        start = self._column(lineno, col_offset)
+        return {"start": {"line": lineno - 1, "character": start}, "end": {"line": lineno - 1, "character": start + len(name)}}
+
+    def _find_name_column(self, lineno: int, col_offset: int, pattern: str) -> int | None:
+        """
+        :return: the ast column (UTF-8 byte offset) of the first group of the first match of the given pattern
+            on the given line (starting at the given column), or None if there is no match
+        """
+        line = self._lines[lineno - 1].encode("utf-8")
+        match = re.compile(pattern.encode("utf-8")).search(line, col_offset)
+        return match.start(1) if match else None
+
+    @staticmethod
+    def _symbol(name: str, kind: SymbolKind, symbol_range: dict, selection_range: dict | None = None) -> DocumentSymbol:
+        return DocumentSymbol(  # type: ignore[typeddict-item]
+            name=name,
+            kind=kind,
+            range=symbol_range,
+            selectionRange=selection_range or symbol_range,
+            children=[],
+        )
+
+    @staticmethod
+    def _declare(scope: _Scope, symbol: DocumentSymbol, has_type: bool, is_attribute: bool = False) -> None:
+        """
+        Adds the declaration of the given symbol to the scope, replacing the symbol of a previous declaration
+        of the same name if this declaration has a type
+        """
+        name = symbol["name"]
+        if name in scope.hidden_names or name == "_":
+            return
+        declaration = scope.declarations.get(name)
+        if declaration is None:
+            scope.declarations[name] = _Declaration(symbol, has_type)
+            (scope.attributes if is_attribute else scope.symbols).append(symbol)
+        elif has_type:
+            # the existing symbol object is updated in place, such that its position among its siblings is retained
+            declaration.symbol.clear()
+            declaration.symbol.update(symbol)
+            declaration.has_type = True
+
+    def _declare_variable(self, scope: _Scope, name: str, lineno: int, col_offset: int, has_type: bool = False) -> None:
+        kind = SymbolKind.Constant if _CONSTANT_NAME_RE.match(name) else SymbolKind.Variable
+        self._declare(scope, self._symbol(name, kind, self._name_range(lineno, col_offset, name)), has_type)
+
+    def _declare_attribute(self, scope: _Scope, node: ast.Attribute, has_type: bool) -> bool:
+        """
+        Declares the given attribute target in the enclosing class if it is an instance attribute (e.g. `self.x`)
+
+        :return: whether the attribute is an instance attribute
+        """
+        if (
+            scope.self_name is None
+            or scope.class_scope is None
+            or not isinstance(node.value, ast.Name)
+            or node.value.id != scope.self_name
+            or node.end_lineno != node.lineno
+        ):
+            return False
+        attr_col = node.end_col_offset - len(node.attr.encode("utf-8"))  # type: ignore[operator]
+        symbol = self._symbol(node.attr, SymbolKind.Variable, self._name_range(node.lineno, attr_col, node.attr))
+        self._declare(scope.class_scope, symbol, has_type, is_attribute=True)
+        return True
+
+    def extract(self, module: ast.Module) -> list[DocumentSymbol]:
+        scope = _Scope(symbols=[])
+        for statement in module.body:
+            self._visit(statement, scope)
+        return scope.symbols
+
+    def _visit_children(self, node: ast.AST, scope: _Scope) -> None:
+        for child in ast.iter_child_nodes(node):
+            self._visit(child, scope)
+
+    def _visit(self, node: ast.AST, scope: _Scope) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            self._visit_function(node, scope)
+        elif isinstance(node, ast.ClassDef):
+            self._visit_class(node, scope)
+        elif isinstance(node, _COMPREHENSION_TYPES):
+            # separate scopes whose names are not reported
+            return
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != "*":
+                    scope.hidden_names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            scope.hidden_names.update(node.names)
+        elif isinstance(node, ast.AnnAssign):
+            self._visit(node.annotation, scope)
+            if node.value is not None:
+                self._visit(node.value, scope)
+            if isinstance(node.target, ast.Name):
+                self._declare_variable(scope, node.target.id, node.target.lineno, node.target.col_offset, has_type=True)
+            elif not (isinstance(node.target, ast.Attribute) and self._declare_attribute(scope, node.target, has_type=True)):
+                self._visit(node.target, scope)
+        elif isinstance(node, ast.Assign) and scope.is_class and self._visit_slots(node, scope):
+            pass
+        elif isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                self._declare_variable(scope, node.id, node.lineno, node.col_offset)
+        elif isinstance(node, ast.Attribute):
+            if not (isinstance(node.ctx, ast.Store) and self._declare_attribute(scope, node, has_type=False)):
+                self._visit(node.value, scope)
+        elif isinstance(node, ast.ExceptHandler):
+            if node.name is not None:
+                col = self._find_name_column(node.lineno, node.col_offset, rf"\bas\s+({re.escape(node.name)})\b")
+                if col is not None:
+                    self._declare_variable(scope, node.name, node.lineno, col)
+            self._visit_children(node, scope)
+        elif isinstance(node, ast.MatchAs):
+            if node.pattern is not None:
+                self._visit(node.pattern, scope)
+                if node.name is not None:
+                    col = self._find_name_column(
+                        node.end_lineno, node.pattern.end_col_offset, rf"\bas\s+({re.escape(node.name)})\b"  # type: ignore[arg-type]
+                    )
+                    if col is not None:
+                        self._declare_variable(scope, node.name, node.end_lineno, col)  # type: ignore[arg-type]
+            elif node.name is not None:
+                self._declare_variable(scope, node.name, node.lineno, node.col_offset)
+        elif isinstance(node, ast.MatchStar):
+            if node.name is not None:
+                self._declare_variable(scope, node.name, node.lineno, node.col_offset + 1)
+        elif isinstance(node, ast.MatchMapping):
+            self._visit_children(node, scope)
+            if node.rest is not None:
+                col = self._find_name_column(node.lineno, node.col_offset, rf"\*\*\s*({re.escape(node.rest)})\b")
+                if col is not None:
+                    self._declare_variable(scope, node.rest, node.lineno, col)
+        else:
+            self._visit_children(node, scope)
+
+    def _visit_slots(self, node: ast.Assign, scope: _Scope) -> bool:
+        """
+        Handles a `__slots__` assignment in a class body, declaring the slots as instance attributes
+
+        :return: whether the assignment is a `__slots__` assignment
+        """
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name) or node.targets[0].id != "__slots__":
+            return False
+        self._visit(node.targets[0], scope)
+        slots = node.value.elts if isinstance(node.value, (ast.Tuple, ast.List)) else [node.value]
+        for slot in slots:
+            if isinstance(slot, ast.Constant) and isinstance(slot.value, str):
+                self._declare(scope, self._symbol(slot.value, SymbolKind.Variable, self._node_range(slot)), False, is_attribute=True)
+        return True
+
+    def _definition_symbol(self, node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef, kind: SymbolKind) -> DocumentSymbol:
+        if node.decorator_list:
+            first_decorator = node.decorator_list[0]
+            # the '@' precedes the decorator expression
+            start_lineno, start_col = first_decorator.lineno, max(first_decorator.col_offset - 1, 0)
+        else:
+            start_lineno, start_col = node.lineno, node.col_offset
+        symbol_range = self._range(start_lineno, start_col, node.end_lineno, node.end_col_offset)  # type: ignore[arg-type]
+        name_col = self._find_name_column(node.lineno, node.col_offset, _DEF_KEYWORD_RE.pattern + f"({re.escape(node.name)})")
+        selection_range = self._name_range(node.lineno, name_col if name_col is not None else node.col_offset, node.name)
+        return self._symbol(node.name, kind, symbol_range, selection_range)
+
+    def _visit_class(self, node: ast.ClassDef, scope: _Scope) -> None:
+        for child in [*node.decorator_list, *node.bases, *node.keywords]:
+            self._visit(child, scope)
+        symbol = self._definition_symbol(node, SymbolKind.Class)
+        self._declare(scope, symbol, has_type=True)
+        class_scope = _Scope(symbols=symbol["children"], is_class=True)  # type: ignore[arg-type]
+        for statement in node.body:
+            self._visit(statement, class_scope)
+        class_scope.symbols.extend(class_scope.attributes)
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef, scope: _Scope) -> None:
+        for child in [*node.decorator_list, *node.args.defaults, *(d for d in node.args.kw_defaults if d is not None)]:
+            self._visit(child, scope)
+        is_method = scope.is_class
+        symbol = self._definition_symbol(node, SymbolKind.Method if is_method else SymbolKind.Function)
+        self._declare(scope, symbol, has_type=True)
+        function_scope = _Scope(symbols=symbol["children"])  # type: ignore[arg-type]
+
+        args = node.args
+        positional = [*args.posonlyargs, *args.args]
+        if is_method and positional:
+            is_static = any(isinstance(d, ast.Name) and d.id == "staticmethod" for d in node.decorator_list)
+            if not is_static:
+                function_scope.self_name = positional[0].arg
+                function_scope.class_scope = scope
+
+        defaults: dict[int, ast.expr] = {}
+        for arg, default in zip(positional[len(positional) - len(args.defaults) :], args.defaults):
+            defaults[id(arg)] = default
+        for arg, kw_default in zip(args.kwonlyargs, args.kw_defaults):
+            if kw_default is not None:
+                defaults[id(arg)] = kw_default
+        parameters = [(arg, 0) for arg in positional]
+        if args.vararg is not None:
+            parameters.append((args.vararg, 1))
+        parameters.extend((arg, 0) for arg in args.kwonlyargs)
+        if args.kwarg is not None:
+            parameters.append((args.kwarg, 2))
+        for arg, num_stars in parameters:
+            if arg.arg in ("self", "cls"):
+                function_scope.hidden_names.add(arg.arg)
+                continue
+            end_node: ast.AST = defaults.get(id(arg), arg)
+            param_range = self._range(arg.lineno, max(arg.col_offset - num_stars, 0), end_node.end_lineno, end_node.end_col_offset)  # type: ignore[attr-defined]
+            self._declare(function_scope, self._symbol(arg.arg, SymbolKind.Variable, param_range), has_type=True)
+
+        for statement in node.body:
+            self._visit(statement, function_scope)
+
+
+def extract_python_document_symbols(source: str) -> list[DocumentSymbol] | None:
+    """
+    Extracts the document symbols from the given Python source code (see module documentation).
+
+    :param source: the source code
+    :return: the root symbols (with nested children), or None if the source code cannot be parsed
+    """
+    try:
+        module = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        log.debug("Cannot extract symbols with the ast module: %s", e)
+        return None
+    return _SymbolExtractor(source).extract(module)
@@ -0,0 +1,146 @@
+"""
+A per-machine manifest of resolved language server binaries (path, version, size and modification time),
+such that the resolution of a binary (which may require spawning several processes, e.g. `rustup which`)
+is only performed once and later starts merely re-validate the result with a single stat call.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "resolution_manifest.json"
+
+
+@dataclasses.dataclass
+class ResolvedBinary:
+    path: str
+    version: str | None
+    size: int
+    mtime_ns: int
+
+    def is_valid(self) -> bool:
+        """
+        :return: whether the binary still exists unchanged (checked with a single stat call)
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return st.st_size == self.size and st.st_mtime_ns == self.mtime_ns
+
+
+class ResolutionManifest:
+    """
+    Stores resolved binaries in a JSON file under the Solid-LSP directory
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, solidlsp_dir: str):
+        self.path = os.path.join(solidlsp_dir, MANIFEST_FILENAME)
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring unreadable resolution manifest %s: %s", self.path, e)
+            return {}
+
+    def _write(self, data: dict[str, dict]) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=MANIFEST_FILENAME + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def lookup(self, key: str) -> ResolvedBinary | None:
+        """
+        :param key: the key identifying the binary (and the context of its resolution)
+        :return: the recorded binary if it is still valid, None otherwise
+        """
+        entry = self._read().get(key)
+        if entry is None:
+            return None
+        try:
+            resolved = ResolvedBinary(**entry)
+        except TypeError:
+            return None
+        if not resolved.is_valid():
+            log.info("Recorded binary %s for %s changed or no longer exists; resolving again", resolved.path, key)
+            return None
+        return resolved
+
+    def record(self, key: str, path: str, version: str | None = None) -> ResolvedBinary:
+        """
+        Records the resolved binary for the given key
+
+        :param key: the key identifying the binary (and the context of its resolution)
+        :param path: the path of the binary
+        :param version: the binary's version (if known)
+        :return: the recorded binary
+        """
+        st = os.stat(path)
+        resolved = ResolvedBinary(path=path, version=version, size=st.st_size, mtime_ns=st.st_mtime_ns)
+        with self._lock:
+            data = self._read()
+            data[key] = dataclasses.asdict(resolved)
+            try:
+                self._write(data)
+            except OSError as e:
+                log.warning("Could not update resolution manifest %s: %s", self.path, e)
+        return resolved
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
+
+    def resolve(self, key: str, resolve_fn: Callable[[], tuple[str, str | None]]) -> ResolvedBinary:
+        """
+        Returns the recorded binary for the given key if it is still valid; otherwise resolves it with the given
+        function and records the result.
+
+        :param key: the key identifying the binary (and the context of its resolution)
+        :param resolve_fn: a function returning the pair (path, version); it shall raise an exception if the binary
+            cannot be resolved
+        :return: the resolved binary
+        """
+        resolved = self.lookup(key)
+        if resolved is not None:
+            log.debug("Using recorded binary %s for %s", resolved.path, key)
+            return resolved
+        path, version = resolve_fn()
+        try:
+            return self.record(key, path, version)
+        except OSError as e:
+            # e.g. a bare command name that is resolved by the OS; cannot be validated, hence not recorded
+            log.debug("Not recording binary %s for %s: %s", path, key, e)
+            return ResolvedBinary(path=path, version=version, size=-1, mtime_ns=-1)
+
+
+def get_search_path_key() -> str:
+    """
+    :return: a short key identifying the current executable search path (PATH), for use in the keys of binaries
+        that are resolved via the search path
+    """
+    return hashlib.sha256(os.environ.get("PATH", "").encode("utf-8")).hexdigest()[:12]
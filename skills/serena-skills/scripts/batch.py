@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Execute many operations in a single process: reads JSON operation objects (one per line) from stdin, executes them
+against language servers which are started once (and kept alive in a pool) and writes one JSON result per line
+to stdout as soon as each operation has finished.
+
+Each operation object contains the name of the operation ("op"), an optional "id" (echoed in the result) and the
+operation's parameters, named like the options of the corresponding script (e.g. "file", "pattern", "include_body",
+"max_answer_chars", "continuation_token"); unknown parameters are rejected:
+
+    {"id": 1, "op": "get_symbols_overview", "file": "src/main.py", "depth": 1}
+    {"id": 2, "op": "find_symbol", "pattern": "MyClass", "include_body": true}
+    {"id": 3, "op": "read_file", "file": "src/main.py", "start_line": 10, "end_line": 20}
+
+Results have the form {"id": ..., "op": ..., "ok": true, "result": ..., "seconds": ...}
+or {"id": ..., "op": ..., "ok": false, "error": "..."}.
+
+With --prewarm N, the language servers of the N most frequently used (project, language) pairs (according to the
+usage statistics of previous runs) are started in the background while the first operations are read.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp import SolidLanguageServer
+from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.ls_pool import LanguageServerPool
+from lib.common.utils import auto_detect_language, create_lsp_settings
+
+# operation name -> (script path relative to the scripts directory, function name, whether a language server is required)
+OPERATIONS = {
+    "find_symbol": ("symbol-search/find_symbol.py", "paginate_find_symbol_with_ls", True),
+    "get_symbols_overview": ("symbol-search/get_symbols_overview.py", "paginate_symbols_overview_with_ls", True),
+    "find_referencing_symbols": ("symbol-search/find_referencing_symbols.py", "paginate_references_with_ls", True),
+    "search_for_pattern": ("file-ops/search_for_pattern.py", "search_pattern_paginated", False),
+    "read_file": ("file-ops/read_file.py", "read_file", False),
+    "list_dir": ("file-ops/list_dir.py", "list_directory", False),
+    "find_file": ("file-ops/find_file.py", "find_file", False),
+}
+
+# operations whose functions return (paginated) JSON text, which is decoded into the result
+JSON_TEXT_OPERATIONS = {"find_symbol", "get_symbols_overview", "find_referencing_symbols", "search_for_pattern"}
+
+# operation name -> {parameter name in the operation object (option of the script): parameter name of the script function}
+PARAMETER_NAMES = {
+    "find_symbol": {
+        "pattern": "pattern",
+        "file": "file",
+        "depth": "depth",
+        "include_body": "include_body",
+        "substring": "substring",
+        "max_answer_chars": "max_answer_chars",
+        "continuation_token": "continuation_token",
+    },
+    "get_symbols_overview": {
+        "file": "relative_file_path",
+        "depth": "depth",
+        "fast": "fast",
+        "max_answer_chars": "max_answer_chars",
+        "continuation_token": "continuation_token",
+    },
+    "find_referencing_symbols": {
+        "file": "file",
+        "symbol": "symbol",
+        "use_index": "use_index",
+        "callers_only": "callers_only",
+        "transitive_depth": "transitive_depth",
+        "max_answer_chars": "max_answer_chars",
+        "continuation_token": "continuation_token",
+    },
+    "search_for_pattern": {
+        "pattern": "pattern",
+        "path": "search_path",
+        "context": "context",
+        "code_only": "code_only",
+        "include_glob": "include_glob",
+        "exclude_glob": "exclude_glob",
+        "max_answer_chars": "max_answer_chars",
+        "continuation_token": "continuation_token",
+    },
+    "read_file": {"file": "file", "start_line": "start_line", "end_line": "end_line"},
+    "list_dir": {
+        "path": "relative_path",
+        "recursive": "recursive",
+        "skip_ignored": "skip_ignored",
+        "max_depth": "max_depth",
+        "max_entries": "max_entries",
+    },
+    "find_file": {"mask": "mask", "query": "query", "mode": "mode", "path": "search_path", "top_k": "top_k"},
+}
+
+# operation name -> {negated option of the script: parameter name of the script function}
+NEGATED_PARAMETER_NAMES = {
+    "find_file": {"no_refresh": "refresh", "include_ignored": "skip_ignored"},
+}
+
+# keys which are accepted by all operations (and not passed to the operation function)
+COMMON_KEYS = {"id", "op", "project_root", "language"}
+# options of the language server scripts which have no effect in batch mode (the servers are started by the pool)
+IGNORED_LANGUAGE_SERVER_KEYS = {"lsp_timeout"}
+
+_loaded_functions = {}
+
+
+def load_operation_function(op: str):
+    """Load the function implementing the given operation from its script (scripts are imported on first use only)"""
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown operation '{op}'; supported operations: {', '.join(OPERATIONS)}")
+    if op not in _loaded_functions:
+        script_path, function_name, _ = OPERATIONS[op]
+        module_name = "serena_skills_" + Path(script_path).stem
+        spec = importlib.util.spec_from_file_location(module_name, Path(__file__).parent / script_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_functions[op] = getattr(module, function_name)
+    return _loaded_functions[op]
+
+
+class BatchExecutor:
+    """Executes operations against language servers that are started once and shared by all operations"""
+
+    def __init__(self, project_root: str, language: str | None = None, max_memory_mb: float | None = 4096, prewarm: int = 0):
+        """
+        :param prewarm: the number of most frequently used language servers to start in the background
+        """
+        self.project_root = os.path.abspath(project_root)
+        self.language = language
+        self.pool = LanguageServerPool(
+            solidlsp_settings_factory=create_lsp_settings,
+            max_memory_mb=max_memory_mb,
+            usage_stats_dir=create_lsp_settings(self.project_root).solidlsp_dir,
+        )
+        if prewarm > 0:
+            keys = self.pool.prewarm(prewarm)
+            if keys:
+                print(f"Pre-warming language servers: {', '.join(f'{root} ({lang.value})' for root, lang in keys)}", file=sys.stderr)
+        # (project root, language) -> language server which is not started (for parsing Python files in fast mode)
+        self._parser_servers = {}
+        # (project root, file extension) -> auto-detected language
+        self._detected_languages = {}
+
+    def _get_language(self, project_root: str, operation: dict) -> str:
+        language = operation.get("language") or self.language
+        if language is None:
+            file = operation.get("file")
+            key = (project_root, os.path.splitext(file)[1] if file else None)
+            if key not in self._detected_languages:
+                self._detected_languages[key] = auto_detect_language(project_root, file)
+                print(f"Auto-detected language: {self._detected_languages[key]}", file=sys.stderr)
+            language = self._detected_languages[key]
+        try:
+            return Language(language.lower()).value
+        except ValueError as e:
+            raise ValueError(f"Unsupported language: {language}") from e
+
+    @contextmanager
+    def _language_server(self, project_root: str, operation: dict):
+        """Context manager providing the language server for the operation (leased from the pool while it is used)"""
+        language = self._get_language(project_root, operation)
+        if operation["op"] == "get_symbols_overview" and operation.get("fast") and operation.get("file", "").endswith((".py", ".pyi")):
+            # fast mode: Python files are parsed directly, without starting the language server
+            key = (project_root, language)
+            if key not in self._parser_servers:
+                ls_config = LanguageServerConfig(code_language=Language(language), ignored_paths=[], encoding="utf-8")
+                self._parser_servers[key] = SolidLanguageServer.create(
+                    ls_config, project_root, solidlsp_settings=create_lsp_settings(project_root)
+                )
+            lease = nullcontext(self._parser_servers[key])
+        else:
+            lease = self.pool.lease(project_root, language)
+        with lease as language_server:
+            yield language_server
+
+    @staticmethod
+    def _get_arguments(op: str, operation: dict) -> dict:
+        """
+        :return: the keyword arguments of the operation function for the parameters of the operation object
+        """
+        parameter_names = PARAMETER_NAMES[op]
+        negated_parameter_names = NEGATED_PARAMETER_NAMES.get(op, {})
+        ignored_keys = COMMON_KEYS | (IGNORED_LANGUAGE_SERVER_KEYS if OPERATIONS[op][2] else set())
+        kwargs = {}
+        unknown = []
+        for name, value in operation.items():
+            if name in parameter_names:
+                kwargs[parameter_names[name]] = value
+            elif name in negated_parameter_names:
+                kwargs[negated_parameter_names[name]] = not value
+            elif name not in ignored_keys:
+                unknown.append(name)
+        if unknown:
+            supported = sorted([*parameter_names, *negated_parameter_names, *ignored_keys - {"id", "op"}])
+            raise ValueError(f"Unknown parameter(s) for '{op}': {', '.join(unknown)}; supported parameters: {', '.join(supported)}")
+        return kwargs
+
+    def execute(self, operation: dict):
+        """
+        :param operation: the operation object
+        :return: the result of the operation
+        """
+        op = operation.get("op")
+        function = load_operation_function(op)
+        project_root = os.path.abspath(operation.get("project_root", self.project_root))
+        kwargs = self._get_arguments(op, operation)
+        if OPERATIONS[op][2]:
+            with self._language_server(project_root, operation) as language_server:
+                result = function(language_server, project_root, **kwargs)
+        else:
+            result = function(project_root, **kwargs)
+        return json.loads(result) if op in JSON_TEXT_OPERATIONS else result
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def run_batch(executor: BatchExecutor, lines, out=sys.stdout) -> int:
+    """
+    Executes the operations in the given lines, writing one result line per operation.
+
+    :return: the number of failed operations
+    """
+    num_failed = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        start = time.perf_counter()
+        op_id = op = None
+        try:
+            operation = json.loads(line)
+            if not isinstance(operation, dict):
+                raise ValueError("Each line must contain a JSON object")
+            op_id, op = operation.get("id"), operation.get("op")
+            result = {"id": op_id, "op": op, "ok": True, "result": executor.execute(operation)}
+        except Exception as e:
+            num_failed += 1
+            result = {"id": op_id, "op": op, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        out.write(json.dumps(result, default=str) + "\n")
+        out.flush()
+    return num_failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execute JSON operations read from stdin (one per line) in a single process")
+    parser.add_argument("--project-root", required=True, help="Absolute path to project root")
+    parser.add_argument("--language", default=None, help="Programming language (auto-detected per operation if not specified)")
+    parser.add_argument("--max-memory-mb", type=float, default=4096,
+                        help="Memory budget of the language servers kept alive (default: 4096)")
+    parser.add_argument("--prewarm", type=int, default=0, metavar="N",
+                        help="Start the language servers of the N most frequently used projects/languages in the background (default: 0)")
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any operation failed")
+
+    args = parser.parse_args()
+
+    try:
+        executor = BatchExecutor(args.project_root, args.language, args.max_memory_mb, args.prewarm)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        num_failed = run_batch(executor, sys.stdin)
+    finally:
+        executor.close()
+    if num_failed and args.strict:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Measure the import time of scripts (via `python -X importtime <script> --help`) and check it against a budget
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+skills_root = Path(__file__).parent.parent.parent
+
+DEFAULT_SCRIPTS = [
+    "symbol-search/find_symbol.py",
+    "symbol-search/get_symbols_overview.py",
+    "symbol-search/find_referencing_symbols.py",
+    "file-ops/search_for_pattern.py",
+    "file-ops/read_file.py",
+    "batch.py",
+]
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure_script(script: str) -> dict:
+    """
+    :return: the total import time, the process wall time and the per-module import times (in ms) of one run of the script
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(skills_root / "scripts" / script), "--help"],
+        capture_output=True,
+        text=True,
+        cwd=str(skills_root),
+    )
+    wall_time = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} --help failed: {proc.stderr.strip().splitlines()[-1:]}")
+
+    total_us = 0
+    # module -> cumulative import time of the modules imported at the top level (i.e. not by other modules)
+    top_level_us = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        total_us += self_us
+        if len(indent) == 1:
+            top_level_us[module] = cumulative_us
+    return {"import_ms": total_us / 1000, "wall_ms": wall_time * 1000, "top_level_ms": {m: us / 1000 for m, us in top_level_us.items()}}
+
+
+def run_benchmark(scripts: list[str], repeat: int, budget_ms: float, top: int) -> dict:
+    results = {}
+    for script in scripts:
+        # the fastest run is the least disturbed by other processes
+        runs = [measure_script(script) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        slowest_modules = sorted(best["top_level_ms"].items(), key=lambda item: item[1], reverse=True)[:top]
+        results[script] = {
+            "import_ms": round(best["import_ms"], 1),
+            "wall_ms": round(min(r["wall_ms"] for r in runs), 1),
+            "within_budget": best["import_ms"] <= budget_ms,
+            "slowest_top_level_imports_ms": {module: round(ms, 1) for module, ms in slowest_modules},
+        }
+    return {
+        "python": sys.version.split()[0],
+        "budget_ms": budget_ms,
+        "all_within_budget": all(r["within_budget"] for r in results.values()),
+        "scripts": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of scripts and check it against a budget")
+    parser.add_argument("--scripts", nargs="+", default=DEFAULT_SCRIPTS,
+                        help="Scripts to measure, relative to the scripts directory (default: frequently used scripts)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per script; the fastest is reported (default: 5)")
+    parser.add_argument("--budget-ms", type=float, default=250, help="Import time budget per script in ms (default: 250)")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest top-level imports to report (default: 5)")
+
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.scripts, args.repeat, args.budget_ms, args.top)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not result["all_within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compare the in-process jedi backend (python_jedi_inprocess) with jedi-language-server running as a
+subprocess (python_jedi): start time and latency of document symbol, definition and reference requests
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp import SolidLanguageServer
+from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.settings import SolidLSPSettings
+
+
+def collect_files(project_root: str, max_files: int) -> list[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in ("venv", "__pycache__", "node_modules"))
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                files.append(os.path.relpath(os.path.join(dirpath, filename), project_root))
+                if len(files) >= max_files:
+                    return files
+    return files
+
+
+def summarize(durations: list[float]) -> dict:
+    if not durations:
+        return {"count": 0}
+    return {
+        "count": len(durations),
+        "total_seconds": round(sum(durations), 4),
+        "mean_ms": round(statistics.mean(durations) * 1000, 3),
+        "median_ms": round(statistics.median(durations) * 1000, 3),
+        "max_ms": round(max(durations) * 1000, 3),
+    }
+
+
+def run_mode(language: Language, project_root: str, files: list[str]) -> dict:
+    # a fresh Solid-LSP directory, such that no caches are used and every request reaches the backend
+    with tempfile.TemporaryDirectory() as solidlsp_dir:
+        settings = SolidLSPSettings(solidlsp_dir=solidlsp_dir, project_data_relative_path=os.path.relpath(solidlsp_dir, project_root))
+        ls = SolidLanguageServer.create(LanguageServerConfig(code_language=language), project_root, solidlsp_settings=settings)
+        start = time.perf_counter()
+        ls.start()
+        start_time = time.perf_counter() - start
+        try:
+            symbol_times, definition_times, reference_times = [], [], []
+            for relative_path in files:
+                start = time.perf_counter()
+                document_symbols = ls.request_document_symbols(relative_path)
+                symbol_times.append(time.perf_counter() - start)
+
+                # query definitions and references of (at most) the first few top-level symbols of each file
+                for symbol in document_symbols.root_symbols[:3]:
+                    position = symbol["selectionRange"]["start"]
+                    start = time.perf_counter()
+                    ls.request_definition(relative_path, position["line"], position["character"])
+                    definition_times.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    ls.request_references(relative_path, position["line"], position["character"])
+                    reference_times.append(time.perf_counter() - start)
+        finally:
+            ls.stop()
+    return {
+        "start_seconds": round(start_time, 4),
+        "document_symbols": summarize(symbol_times),
+        "definition": summarize(definition_times),
+        "references": summarize(reference_times),
+    }
+
+
+def run_benchmark(project_root: str, max_files: int) -> dict:
+    project_root = os.path.abspath(project_root)
+    files = collect_files(project_root, max_files)
+    result: dict = {"project_root": project_root, "num_files": len(files)}
+    for key, language in (("inprocess", Language.PYTHON_JEDI_INPROCESS), ("subprocess", Language.PYTHON_JEDI)):
+        try:
+            result[key] = run_mode(language, project_root, files)
+        except Exception as e:
+            # e.g. jedi-language-server is not installed; report the root cause rather than the (long) request
+            result[key] = {"error": str(getattr(e, "cause", None) or e)}
+    if "start_seconds" in result["inprocess"] and "start_seconds" in result["subprocess"]:
+        result["speedup"] = {
+            metric: round(result["subprocess"][metric]["total_seconds"] / max(result["inprocess"][metric]["total_seconds"], 1e-9), 2)
+            for metric in ("document_symbols", "definition", "references")
+            if result["inprocess"][metric]["count"] > 0
+        }
+        result["speedup"]["start"] = round(result["subprocess"]["start_seconds"] / max(result["inprocess"]["start_seconds"], 1e-9), 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process jedi backend against jedi-language-server")
+    parser.add_argument(
+        "--project", default=str(skills_root / "lib" / "solidlsp"), help="Python project to benchmark on (default: the solidlsp library)"
+    )
+    parser.add_argument("--max-files", type=int, default=50, help="Maximum number of files to query (default: 50)")
+
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.project, args.max_files)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
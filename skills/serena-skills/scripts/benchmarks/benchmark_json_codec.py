@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codecs used for the messages exchanged with language servers on real payloads.
+
+The payloads are recorded from a language server (the bodies of all messages it sends while document symbols and
+references are requested for the files of a project) or loaded from a file recorded earlier (--payloads).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp.lsp_protocol_handler.json_codec import JSON_CODECS, available_json_codecs, create_json_codec
+
+DEFAULT_PROJECT = skills_root / "lib" / "solidlsp"
+
+
+def record_payloads(project_root: str, language: str, max_files: int, max_references: int) -> list[bytes]:
+    """
+    Starts a language server for the project and records the bodies of the messages it sends
+
+    :return: the recorded message bodies
+    """
+    from lib.solidlsp import SolidLanguageServer
+    from lib.solidlsp.ls_config import Language, LanguageServerConfig
+    from lib.solidlsp.settings import SolidLSPSettings
+
+    bodies = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # a temporary data directory, such that no request is answered from a cache
+        settings = SolidLSPSettings(solidlsp_dir=temp_dir, project_data_relative_path=temp_dir)
+        ls_config = LanguageServerConfig(code_language=Language(language), ignored_paths=[], encoding="utf-8")
+        ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=settings)
+        handle_body = ls.server._handle_body
+
+        def recording_handle_body(body: bytes) -> None:
+            bodies.append(body)
+            handle_body(body)
+
+        ls.server._handle_body = recording_handle_body
+        ls.start()
+        try:
+            matcher = Language(language).get_source_fn_matcher()
+            files = sorted(
+                os.path.relpath(os.path.join(dirpath, fn), project_root)
+                for dirpath, dirnames, filenames in os.walk(project_root)
+                for fn in filenames
+                if matcher.is_relevant_filename(fn)
+            )[:max_files]
+            num_references = 0
+            for file in files:
+                for symbol in ls.request_document_symbols(file).root_symbols:
+                    if num_references >= max_references:
+                        break
+                    position = symbol.get("selectionRange", {}).get("start")
+                    if position is not None:
+                        ls.request_references(file, position["line"], position["character"])
+                        num_references += 1
+        finally:
+            ls.stop()
+    return bodies
+
+
+def time_per_call(function, items: list, repeat: int) -> float:
+    """
+    :return: the time (in seconds) of the fastest of the given number of passes over all items
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(bodies: list[bytes], repeat: int) -> dict:
+    reference_codec = create_json_codec("json")
+    payloads = [reference_codec.decode(body) for body in bodies]
+    total_mb = sum(len(body) for body in bodies) / 1e6
+
+    results = {}
+    available = available_json_codecs()
+    for name in JSON_CODECS:
+        if name not in available:
+            results[name] = {"available": False}
+            continue
+        codec = create_json_codec(name)
+        # the codec must be interchangeable with the json module
+        consistent = all(codec.decode(body) == payload for body, payload in zip(bodies, payloads)) and all(
+            reference_codec.decode(codec.encode(payload)) == payload for payload in payloads
+        )
+        decode_seconds = time_per_call(codec.decode, bodies, repeat)
+        encode_seconds = time_per_call(codec.encode, payloads, repeat)
+        results[name] = {
+            "available": True,
+            "consistent_with_json": consistent,
+            "decode_ms": round(decode_seconds * 1000, 2),
+            "encode_ms": round(encode_seconds * 1000, 2),
+            "decode_mb_per_s": round(total_mb / decode_seconds, 1),
+            "encode_mb_per_s": round(total_mb / encode_seconds, 1),
+        }
+
+    baseline = results["json"]
+    for result in results.values():
+        if result["available"]:
+            result["decode_speedup"] = round(baseline["decode_ms"] / result["decode_ms"], 2)
+            result["encode_speedup"] = round(baseline["encode_ms"] / result["encode_ms"], 2)
+
+    return {
+        "python": sys.version.split()[0],
+        "num_payloads": len(bodies),
+        "total_mb": round(total_mb, 3),
+        "largest_payload_kb": round(max(len(body) for body in bodies) / 1000, 1),
+        "default_codec": create_json_codec().name,
+        "codecs": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON codecs for language server messages on real payloads")
+    parser.add_argument("--project-root", default=str(DEFAULT_PROJECT),
+                        help="Project whose language server payloads are recorded (default: the solidlsp library)")
+    parser.add_argument("--language", default="python", help="Language of the project (default: python)")
+    parser.add_argument("--max-files", type=int, default=50, help="Maximum number of files to request symbols for (default: 50)")
+    parser.add_argument("--max-references", type=int, default=50,
+                        help="Maximum number of symbols to request references for (default: 50)")
+    parser.add_argument("--payloads", help="File with recorded payloads (one JSON message body per line) to use instead of recording")
+    parser.add_argument("--save-payloads", help="Save the recorded payloads to this file (one JSON message body per line)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of passes per codec; the fastest is reported (default: 5)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.payloads:
+            with open(args.payloads, "rb") as f:
+                bodies = [line.rstrip(b"\n") for line in f if line.strip()]
+        else:
+            bodies = record_payloads(os.path.abspath(args.project_root), args.language, args.max_files, args.max_references)
+            if args.save_payloads:
+                # line breaks can only occur as whitespace between JSON tokens (within strings, they are escaped)
+                with open(args.save_payloads, "wb") as f:
+                    f.writelines(body.replace(b"\r", b" ").replace(b"\n", b" ") + b"\n" for body in bodies)
+        if not bodies:
+            raise ValueError("No payloads were recorded")
+        print(json.dumps(run_benchmark(bodies, args.repeat), indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Check the parity of the parser-based (ast) document symbols for Python files with the symbols returned by pyright
+and compare the time required to obtain them
+
+Besides the files of the given project, a set of edge cases (EDGE_CASES) is compared in a temporary project.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp import SolidLanguageServer
+from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.settings import SolidLSPSettings
+
+# file name -> source code of constructs for which the parser must match pyright
+EDGE_CASES = {
+    # pyright reports all slot names (at their position in `__slots__`), whether they are assigned or not
+    "slots.py": (
+        "class Slots:\n"
+        "    __slots__ = (\"s\", \"t\")\n"
+        "\n"
+        "    def __init__(self):\n"
+        "        self.t = 1\n"
+        "\n"
+        "\n"
+        "class ListSlots:\n"
+        "    __slots__ = [\"u\"]\n"
+    ),
+    "redefinitions.py": (
+        "X = 1\n"
+        "X = 2\n"
+        "\n"
+        "\n"
+        "class C:\n"
+        "    @property\n"
+        "    def p(self):\n"
+        "        return 1\n"
+        "\n"
+        "    @p.setter\n"
+        "    def p(self, value):\n"
+        "        pass\n"
+    ),
+}
+
+
+def collect_files(project_root: str, max_files: int) -> list[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(project_root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in ("venv", "__pycache__", "node_modules"))
+        for filename in sorted(filenames):
+            if filename.endswith((".py", ".pyi")):
+                files.append(os.path.relpath(os.path.join(dirpath, filename), project_root))
+                if len(files) >= max_files:
+                    return files
+    return files
+
+
+def to_comparable(symbols: list[dict]) -> list[tuple]:
+    """
+    :return: the (recursive) tuples (name, kind, range, selection range, children) of the given symbols
+    """
+
+    def position(p: dict) -> tuple[int, int]:
+        return p["line"], p["character"]
+
+    return [
+        (
+            s["name"],
+            int(s["kind"]),
+            (position(s["range"]["start"]), position(s["range"]["end"])),
+            (position(s["selectionRange"]["start"]), position(s["selectionRange"]["end"])),
+            to_comparable(s.get("children") or []),
+        )
+        for s in symbols
+    ]
+
+
+def find_difference(parsed: list[tuple], expected: list[tuple], path: str = "") -> str | None:
+    """
+    :return: a description of the first difference between the given symbol lists, or None if they are equal
+    """
+    for i in range(max(len(parsed), len(expected))):
+        if i >= len(parsed):
+            return f"{path}: missing {expected[i][:4]}"
+        if i >= len(expected):
+            return f"{path}: unexpected {parsed[i][:4]}"
+        if parsed[i][:4] != expected[i][:4]:
+            return f"{path}: got {parsed[i][:4]}, expected {expected[i][:4]}"
+        difference = find_difference(parsed[i][4], expected[i][4], f"{path}/{parsed[i][0]}")
+        if difference is not None:
+            return difference
+    return None
+
+
+def run_benchmark(project_root: str, max_files: int) -> dict:
+    project_root = os.path.abspath(project_root)
+    files = collect_files(project_root, max_files)
+    with tempfile.TemporaryDirectory() as solidlsp_dir:
+        # a fresh Solid-LSP directory, such that no cached language server results are used
+        settings = SolidLSPSettings(solidlsp_dir=solidlsp_dir, project_data_relative_path=os.path.relpath(solidlsp_dir, project_root))
+        ls = SolidLanguageServer.create(LanguageServerConfig(code_language=Language.PYTHON), project_root, solidlsp_settings=settings)
+        ls.start()
+        try:
+            parser_time = ls_time = 0.0
+            num_equal = 0
+            differences = {}
+            for relative_path in files:
+                # the parser is queried first, such that no cached language server result is returned instead
+                start = time.perf_counter()
+                parsed = ls.request_document_symbols(relative_path, fast=True).root_symbols
+                parser_time += time.perf_counter() - start
+                start = time.perf_counter()
+                expected = ls.request_document_symbols(relative_path).root_symbols
+                ls_time += time.perf_counter() - start
+
+                difference = find_difference(to_comparable(parsed), to_comparable(expected))
+                if difference is None:
+                    num_equal += 1
+                else:
+                    differences[relative_path] = difference
+        finally:
+            ls.stop()
+    return {
+        "project_root": project_root,
+        "num_files": len(files),
+        "num_equal": num_equal,
+        "parity": round(num_equal / max(len(files), 1), 3),
+        "parser_seconds": round(parser_time, 4),
+        "language_server_seconds": round(ls_time, 4),
+        "speedup": round(ls_time / max(parser_time, 1e-9), 2),
+        "differences": differences,
+    }
+
+
+def run_edge_cases() -> dict:
+    """
+    Compares the symbols of the edge cases (see EDGE_CASES), which are written to a temporary project
+    """
+    with tempfile.TemporaryDirectory() as project_root:
+        for filename, source in EDGE_CASES.items():
+            with open(os.path.join(project_root, filename), "w", encoding="utf-8") as f:
+                f.write(source)
+        result = run_benchmark(project_root, len(EDGE_CASES))
+    return {key: result[key] for key in ("num_files", "num_equal", "differences")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check parity of the ast-based Python document symbols with pyright")
+    parser.add_argument(
+        "--project", default=str(skills_root / "lib" / "solidlsp"), help="Python project to compare on (default: the solidlsp library)"
+    )
+    parser.add_argument("--max-files", type=int, default=200, help="Maximum number of files to compare (default: 200)")
+    parser.add_argument("--no-edge-cases", action="store_true", help="Do not compare the built-in edge cases")
+
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.project, args.max_files)
+        if not args.no_edge_cases:
+            result["edge_cases"] = run_edge_cases()
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Compare memory usage and pickling cost of the document symbols cache in dictionary form
+(nested UnifiedSymbolInformation dicts) and in compact form (CompactSymbolTable)
+"""
+import argparse
+import gc
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp.ls import DocumentSymbols
+
+
+def make_document(file_idx: int, num_classes: int, methods_per_class: int) -> tuple[str, str, list[dict]]:
+    """
+    Create a synthetic Python document together with symbols shaped like the ones produced by
+    SolidLanguageServer.request_document_symbols (location, range, selectionRange, body, parent, children)
+    """
+    relative_path = f"pkg{file_idx % 100}/module_{file_idx}.py"
+    absolute_path = f"/repo/{relative_path}"
+    uri = f"file://{absolute_path}"
+    lines: list[str] = []
+    root_symbols: list[dict] = []
+
+    def make_symbol(name: str, kind: int, start_line: int, end_line: int, start_col: int, parent: dict | None) -> dict:
+        symbol_range = {"start": {"line": start_line, "character": start_col}, "end": {"line": end_line, "character": 0}}
+        return {
+            "name": name,
+            "kind": kind,
+            "range": symbol_range,
+            "selectionRange": {
+                "start": {"line": start_line, "character": start_col + 4},
+                "end": {"line": start_line, "character": start_col + 4 + len(name)},
+            },
+            "location": {"uri": uri, "range": symbol_range, "absolutePath": absolute_path, "relativePath": relative_path},
+            "parent": parent,
+            "children": [],
+        }
+
+    for class_idx in range(num_classes):
+        class_start = len(lines)
+        lines.append(f"class Class{class_idx}:")
+        class_symbol = make_symbol(f"Class{class_idx}", 5, class_start, class_start, 0, None)
+        for method_idx in range(methods_per_class):
+            method_start = len(lines)
+            lines.append(f"    def method_{method_idx}(self, value):")
+            lines.append(f"        result = value * {method_idx}")
+            lines.append("        return result")
+            method_symbol = make_symbol(f"method_{method_idx}", 6, method_start, method_start + 2, 4, class_symbol)
+            class_symbol["children"].append(method_symbol)
+        class_symbol["range"]["end"]["line"] = len(lines) - 1
+        root_symbols.append(class_symbol)
+        lines.append("")
+    text = "\n".join(lines)
+
+    # add bodies the same way as SolidLanguageServer.retrieve_symbol_body
+    def add_bodies(symbols: list[dict]) -> None:
+        for s in symbols:
+            r = s["location"]["range"]
+            s["body"] = "\n".join(lines[r["start"]["line"] : r["end"]["line"] + 1])[r["start"]["character"] :]
+            add_bodies(s["children"])
+
+    add_bodies(root_symbols)
+    return relative_path, text, root_symbols
+
+
+def measure(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def time_pickle(obj: object) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    dump_time = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(data)
+    load_time = time.perf_counter() - start
+    return len(data), dump_time, load_time
+
+
+def run_benchmark(num_files: int, num_classes: int, methods_per_class: int) -> dict:
+    documents = [make_document(i, num_classes, methods_per_class) for i in range(num_files)]
+    num_symbols = num_files * num_classes * (methods_per_class + 1)
+
+    def build_dict_cache() -> dict:
+        return {path: ("hash", {"root_symbols": roots}) for path, _, roots in documents}
+
+    def build_compact_cache() -> dict:
+        cache = {}
+        for path, text, roots in documents:
+            document_symbols = DocumentSymbols(roots)
+            document_symbols.get_symbol_table(text=text)
+            cache[path] = ("hash", document_symbols.to_unmaterialized())
+        return cache
+
+    # both caches are measured as loaded from a pickle, such that no objects are shared with the synthetic documents
+    dict_cache = build_dict_cache()
+    compact_cache = build_compact_cache()
+    _, dict_memory = measure(lambda: pickle.loads(pickle.dumps(dict_cache)))
+    _, compact_memory = measure(lambda: pickle.loads(pickle.dumps(compact_cache)))
+    dict_pickle = time_pickle(dict_cache)
+    compact_pickle = time_pickle(compact_cache)
+
+    return {
+        "num_files": num_files,
+        "num_symbols": num_symbols,
+        "dict": {
+            "memory_bytes": dict_memory,
+            "pickle_bytes": dict_pickle[0],
+            "pickle_dump_seconds": round(dict_pickle[1], 4),
+            "pickle_load_seconds": round(dict_pickle[2], 4),
+        },
+        "compact": {
+            "memory_bytes": compact_memory,
+            "pickle_bytes": compact_pickle[0],
+            "pickle_dump_seconds": round(compact_pickle[1], 4),
+            "pickle_load_seconds": round(compact_pickle[2], 4),
+        },
+        "memory_ratio": round(dict_memory / max(compact_memory, 1), 2),
+        "pickle_size_ratio": round(dict_pickle[0] / max(compact_pickle[0], 1), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory usage of the document symbols cache representations")
+    parser.add_argument("--files", type=int, default=500, help="Number of synthetic documents (default: 500)")
+    parser.add_argument("--classes", type=int, default=5, help="Number of classes per document (default: 5)")
+    parser.add_argument("--methods", type=int, default=10, help="Number of methods per class (default: 10)")
+
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args.files, args.classes, args.methods)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 """
 Replace content in a file using exact string matching or regex
+
+In bulk mode (--files or --glob), the replacement is applied to many files in parallel by a pool of worker processes;
+files without matches are skipped. Files are written atomically (via a temporary file which replaces the original),
+and --dry-run shows unified diffs instead of writing.
 """
 import argparse
+import difflib
+import json
 import os
 import sys
 from pathlib import Path
@@ -11,7 +17,9 @@ from pathlib import Path
 skills_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(skills_root))
 
-from lib.common.utils import replace_content_advanced, format_error
+from lib.common.bulk_replace import bulk_replace
+from lib.common.path_index import open_path_index
+from lib.common.utils import replace_content_advanced, write_file_atomic, format_error
 
 
 def replace_content(
@@ -20,7 +28,8 @@ def replace_content(
     old: str,
     new: str,
     mode: str = "literal",
-    allow_multiple: bool = False
+    allow_multiple: bool = False,
+    dry_run: bool = False
 ):
     """Replace content in file"""
     
@@ -31,48 +40,91 @@ def replace_content(
     
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
+        # keep the file's line endings when writing it back
+        newline = f.newlines if isinstance(f.newlines, str) else None
     
     # Use advanced replacement with ambiguity detection and backreferences
     new_content, count, first_match_line = replace_content_advanced(
         content, old, new, mode, allow_multiple
     )
     
-    # Write back
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
     result = f"Replaced {count} occurrence(s)"
     if first_match_line:
         result += f" (first match at line {first_match_line})"
     
+    if dry_run:
+        diff = difflib.unified_diff(
+            content.splitlines(keepends=True), new_content.splitlines(keepends=True), "a/" + file, "b/" + file
+        )
+        return result.replace("Replaced", "Would replace", 1) + "\n" + "".join(diff).rstrip("\n")
+    
+    # Write back
+    write_file_atomic(file_path, new_content, newline=newline)
+    
     return result
 
 
+def resolve_files(project_root: str, files: list[str] | None = None, glob: str | None = None) -> list[str]:
+    """
+    :param files: relative file paths
+    :param glob: a glob pattern, matched against the file names or (if it contains a path separator) the relative
+        paths of the project's non-ignored files
+    :return: the given files followed by the files matching the glob pattern (without duplicates)
+    """
+    result = list(files or [])
+    if glob is not None:
+        result.extend(open_path_index(project_root).glob(glob))
+    return list(dict.fromkeys(os.path.normpath(file) for file in result))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Replace content in file")
     parser.add_argument("--project-root", required=True, help="Absolute path to project root")
-    parser.add_argument("--file", required=True, help="Relative file path")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("--file", help="Relative file path")
+    target_group.add_argument("--files", nargs="+", help="Relative file paths (bulk mode)")
+    target_group.add_argument("--glob", help="Files matching a glob pattern, e.g. '*.py' or 'src/**/*.ts' (bulk mode)")
     parser.add_argument("--old", required=True, help="Text to find")
     parser.add_argument("--new", required=True, help="Replacement text")
     parser.add_argument("--mode", choices=["literal", "regex"], default="literal", help="Match mode")
-    parser.add_argument("--allow-multiple", action="store_true", help="Allow multiple replacements")
+    parser.add_argument("--allow-multiple", action="store_true", help="Allow multiple replacements (per file)")
+    parser.add_argument("--dry-run", action="store_true", help="Show unified diffs instead of writing the files")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes in bulk mode (default: number of CPUs)")
     
     args = parser.parse_args()
     
     try:
-        result = replace_content(
-            args.project_root,
-            args.file,
-            args.old,
-            args.new,
-            args.mode,
-            args.allow_multiple
-        )
-        print(result)
+        if args.file is not None:
+            result = replace_content(
+                args.project_root,
+                args.file,
+                args.old,
+                args.new,
+                args.mode,
+                args.allow_multiple,
+                args.dry_run
+            )
+            print(result)
+        else:
+            files = resolve_files(args.project_root, args.files, args.glob)
+            result = bulk_replace(
+                args.project_root,
+                files,
+                args.old,
+                args.new,
+                args.mode,
+                args.allow_multiple,
+                args.dry_run,
+                args.workers
+            )
+            print(json.dumps(result, indent=2))
+            if result["errors"]:
+                sys.exit(1)
     except Exception as e:
         context = {
             "project_root": args.project_root,
-            "file": args.file,
+            "file": args.file if args.file is not None else args.glob or args.files,
             "mode": args.mode,
             "operation": "replace_content"
         }
@@ -1,47 +1,123 @@
 #!/usr/bin/env python3
 """
 Find files matching a pattern
+
+Queries are answered from a persistent index of the project's file paths (stored in .tmp/.serena-skills), which is
+refreshed incrementally before each query: only directories modified since the last query are re-read.
+Files and directories matched by the project's ignore patterns (project.yml, .gitignore) are not indexed.
 """
 import argparse
 import json
 import os
 import sys
 from pathlib import Path
-from fnmatch import fnmatch
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.path_index import open_path_index
+
+QUERY_MODES = ("fuzzy", "substring", "glob")
 
 
-def find_files(project_root: str, mask: str, search_path: str = "."):
-    """Find files matching pattern"""
-    full_search_path = os.path.join(project_root, search_path)
-    
-    if not os.path.exists(full_search_path):
+def _check_search_path(project_root: str, search_path: str) -> None:
+    if not os.path.exists(os.path.join(project_root, search_path)):
         raise FileNotFoundError(f"Path not found: {search_path}")
-    
-    matches = []
-    
-    for root, dirs, files in os.walk(full_search_path):
-        # Skip ignored directories
-        dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', 'node_modules', '.serena'}]
-        
-        for filename in files:
-            if fnmatch(filename, mask):
-                full_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(full_path, project_root)
-                matches.append(rel_path)
-    
-    return sorted(matches)
+
+
+def find_files(
+    project_root: str,
+    mask: str,
+    search_path: str = ".",
+    refresh: bool = True,
+    skip_ignored: bool = True
+):
+    """
+    Find files matching pattern
+
+    :param mask: a glob pattern (*, ? and ** wildcards), matched against the file name or, if it contains a path
+        separator, against the path relative to the project root
+    :param refresh: whether to update the index before the query
+    :return: the sorted relative paths of the matching files
+    """
+    _check_search_path(project_root, search_path)
+    index = open_path_index(project_root, refresh=refresh, skip_ignored=skip_ignored)
+    return index.glob(mask, search_path)
+
+
+def search_files(
+    project_root: str,
+    query: str,
+    mode: str = "fuzzy",
+    search_path: str = ".",
+    top_k: int = 20,
+    refresh: bool = True,
+    skip_ignored: bool = True
+):
+    """
+    Search files by their paths relative to the project root
+
+    :param mode: "fuzzy" (the characters of the query occur in order, fzf-style), "substring" or "glob"
+    :param top_k: the maximum number of matches to return
+    :return: the best matches {"path": ..., "score": ...} (for glob queries, the first matching paths {"path": ...})
+    """
+    if mode not in QUERY_MODES:
+        raise ValueError(f"Unknown mode '{mode}'; supported modes: {', '.join(QUERY_MODES)}")
+    _check_search_path(project_root, search_path)
+    index = open_path_index(project_root, refresh=refresh, skip_ignored=skip_ignored)
+    if mode == "fuzzy":
+        return index.fuzzy(query, search_path, top_k)
+    if mode == "substring":
+        return index.substring(query, search_path, top_k)
+    return [{"path": path} for path in index.glob(query, search_path)[:top_k]]
+
+
+def find_file(
+    project_root: str,
+    mask: str | None = None,
+    query: str | None = None,
+    mode: str = "fuzzy",
+    search_path: str = ".",
+    top_k: int = 20,
+    refresh: bool = True,
+    skip_ignored: bool = True
+):
+    """
+    Find files by mask (see find_files) or by query (see search_files); exactly one of them must be given
+    """
+    if (mask is None) == (query is None):
+        raise ValueError("Exactly one of mask and query must be given")
+    if mask is not None:
+        return find_files(project_root, mask, search_path, refresh, skip_ignored)
+    return search_files(project_root, query, mode, search_path, top_k, refresh, skip_ignored)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Find files matching a pattern")
     parser.add_argument("--project-root", required=True, help="Absolute path to project root")
-    parser.add_argument("--mask", required=True, help="Filename pattern (* and ? wildcards)")
+    query_group = parser.add_mutually_exclusive_group(required=True)
+    query_group.add_argument("--mask", help="Filename pattern (*, ? and ** wildcards, e.g. 'src/**/*.py'); returns all matches, sorted")
+    query_group.add_argument("--query", help="Path query (see --mode); returns the best matches, ranked")
+    parser.add_argument("--mode", choices=QUERY_MODES, default="fuzzy", help="Matching mode for --query (default: fuzzy)")
+    parser.add_argument("--top-k", type=int, default=20, help="Maximum number of matches for --query (default: 20)")
     parser.add_argument("--path", default=".", help="Search within relative path")
-    
+    parser.add_argument("--no-refresh", action="store_true", help="Query the index without updating it first")
+    parser.add_argument("--include-ignored", action="store_true", help="Also find files matched by the ignore patterns")
+
     args = parser.parse_args()
-    
+
     try:
-        matches = find_files(args.project_root, args.mask, args.path)
+        matches = find_file(
+            args.project_root,
+            args.mask,
+            args.query,
+            args.mode,
+            args.path,
+            args.top_k,
+            not args.no_refresh,
+            not args.include_ignored
+        )
         print(json.dumps(matches, indent=2))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
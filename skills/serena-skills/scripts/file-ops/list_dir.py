@@ -1,89 +1,192 @@
 #!/usr/bin/env python3
 """
 List directory contents with optional recursion
+
+Directories are scanned with os.scandir; ignored directories are pruned without being scanned. The recursion depth
+can be limited with --max-depth (directories at the limit are collapsed into a summary of the files they contain)
+and the number of entries with --max-entries. With --stream, entries are printed as JSON lines as soon as they are
+found instead of a single JSON object at the end.
 """
 import argparse
+import itertools
 import json
 import os
 import sys
 from pathlib import Path
+from typing import Iterator
 
 # Add serena-skills to path
 skills_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(skills_root))
 
-from lib.common.utils import load_ignore_patterns, is_ignored_path, format_error
+from lib.common.utils import load_ignore_patterns, is_ignored_entry, format_error
 
 
-def list_directory(
+def _scan_sorted(dir_path: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(dir_path) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        # unreadable directories are skipped (like os.walk does)
+        return []
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _summarize_directory(dir_path: str, rel_path: str, ignore_spec) -> dict:
+    """
+    :return: the number of files and directories in the given directory (recursively) and the total size of the files
+    """
+    num_files = num_dirs = size = 0
+    stack = [(dir_path, rel_path)]
+    while stack:
+        current_path, current_rel_path = stack.pop()
+        for entry in _scan_sorted(current_path):
+            entry_rel_path = os.path.join(current_rel_path, entry.name)
+            is_dir = _is_dir(entry)
+            if is_ignored_entry(ignore_spec, entry_rel_path, is_dir):
+                continue
+            if is_dir:
+                num_dirs += 1
+                if not entry.is_symlink():
+                    stack.append((entry.path, entry_rel_path))
+            else:
+                num_files += 1
+                try:
+                    size += entry.stat().st_size
+                except OSError:
+                    pass
+    return {"files": num_files, "dirs": num_dirs, "size_bytes": size}
+
+
+def iter_directory_entries(
     project_root: str,
     relative_path: str,
-    recursive: bool = False,
-    skip_ignored: bool = False
-):
-    """List directory contents"""
-    
+    max_depth: int | None = None,
+    skip_ignored: bool = False,
+    summarize_collapsed: bool = True
+) -> Iterator[dict]:
+    """
+    Iterate over the entries of a directory, depth-first with the entries of each directory sorted by name
+
+    :param max_depth: the maximum depth of the entries (1 for the directory's own entries only); None for no limit.
+        Directories at the maximum depth are not descended into ("collapsed")
+    :param summarize_collapsed: whether to add the number of files/directories and the total size of the files
+        contained in collapsed directories
+    :return: an iterator of entries {"type": "dir" | "file", "path": <path relative to project_root>}
+    """
     dir_path = os.path.join(project_root, relative_path)
-    
+
     if not os.path.exists(dir_path):
         raise FileNotFoundError(f"Directory not found: {relative_path}")
-    
+
     if not os.path.isdir(dir_path):
         raise ValueError(f"Not a directory: {relative_path}")
-    
-    # Load ignore patterns if needed
-    ignore_spec = None
-    if skip_ignored:
-        ignore_spec = load_ignore_patterns(project_root)
-    
+
+    ignore_spec = load_ignore_patterns(project_root) if skip_ignored else None
+
+    def iter_entries(current_path: str, current_rel_path: str, depth: int) -> Iterator[dict]:
+        for entry in _scan_sorted(current_path):
+            rel_path = os.path.join(current_rel_path, entry.name) if current_rel_path != "." else entry.name
+            is_dir = _is_dir(entry)
+            if is_ignored_entry(ignore_spec, rel_path, is_dir):
+                continue
+            if not is_dir:
+                yield {"type": "file", "path": rel_path}
+            elif max_depth is not None and depth >= max_depth:
+                item = {"type": "dir", "path": rel_path}
+                if summarize_collapsed:
+                    item["collapsed"] = _summarize_directory(entry.path, rel_path, ignore_spec) if not entry.is_symlink() else {}
+                yield item
+            else:
+                yield {"type": "dir", "path": rel_path}
+                # symbolic links to directories are listed but not followed (like os.walk does)
+                if not entry.is_symlink():
+                    yield from iter_entries(entry.path, rel_path, depth + 1)
+
+    yield from iter_entries(dir_path, os.path.relpath(dir_path, project_root), 1)
+
+
+def list_directory(
+    project_root: str,
+    relative_path: str,
+    recursive: bool = False,
+    skip_ignored: bool = False,
+    max_depth: int | None = None,
+    max_entries: int | None = None
+):
+    """
+    List directory contents
+
+    :param max_depth: the maximum recursion depth (implies recursive); the contents of directories at this depth are
+        summarized in "collapsed"
+    :param max_entries: the maximum number of entries to list; if exceeded, "truncated" is set
+    """
+    if max_depth is None and not recursive:
+        entries = iter_directory_entries(project_root, relative_path, 1, skip_ignored, summarize_collapsed=False)
+    else:
+        entries = iter_directory_entries(project_root, relative_path, max_depth, skip_ignored)
+
     dirs = []
     files = []
-    
-    if recursive:
-        for root, dirnames, filenames in os.walk(dir_path):
-            # Filter ignored directories
-            if skip_ignored and ignore_spec:
-                dirnames[:] = [
-                    d for d in dirnames
-                    if not is_ignored_path(
-                        os.path.relpath(os.path.join(root, d), project_root),
-                        project_root,
-                        ignore_spec
-                    )
-                ]
-            
-            rel_root = os.path.relpath(root, project_root)
-            
-            for dirname in dirnames:
-                full_dir = os.path.join(rel_root, dirname)
-                if skip_ignored and ignore_spec:
-                    if not is_ignored_path(full_dir, project_root, ignore_spec):
-                        dirs.append(full_dir)
-                else:
-                    dirs.append(full_dir)
-            
-            for filename in filenames:
-                full_file = os.path.join(rel_root, filename)
-                if skip_ignored and ignore_spec:
-                    if not is_ignored_path(full_file, project_root, ignore_spec):
-                        files.append(full_file)
-                else:
-                    files.append(full_file)
+    collapsed = {}
+    truncated = False
+
+    if max_entries is not None:
+        entries = itertools.islice(entries, max_entries + 1)
+    for i, entry in enumerate(entries):
+        if max_entries is not None and i == max_entries:
+            truncated = True
+            break
+        if entry["type"] == "dir":
+            dirs.append(entry["path"])
+            if "collapsed" in entry:
+                collapsed[entry["path"]] = entry["collapsed"]
+        else:
+            files.append(entry["path"])
+
+    result = {"dirs": sorted(dirs), "files": sorted(files)}
+    if collapsed:
+        result["collapsed"] = collapsed
+    if truncated:
+        result["truncated"] = True
+    return result
+
+
+def stream_directory(
+    project_root: str,
+    relative_path: str,
+    recursive: bool = False,
+    skip_ignored: bool = False,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    out=sys.stdout
+) -> None:
+    """
+    Write the directory entries as JSON lines as soon as they are found, followed by a line with the totals
+    """
+    if max_depth is None and not recursive:
+        entries = iter_directory_entries(project_root, relative_path, 1, skip_ignored, summarize_collapsed=False)
     else:
-        for item in os.listdir(dir_path):
-            full_path = os.path.join(dir_path, item)
-            rel_path = os.path.relpath(full_path, project_root)
-            
-            if skip_ignored and ignore_spec:
-                if is_ignored_path(rel_path, project_root, ignore_spec):
-                    continue
-            
-            if os.path.isdir(full_path):
-                dirs.append(rel_path)
-            else:
-                files.append(rel_path)
-    
-    return {"dirs": sorted(dirs), "files": sorted(files)}
+        entries = iter_directory_entries(project_root, relative_path, max_depth, skip_ignored)
+    num_dirs = num_files = 0
+    truncated = False
+    for entry in entries:
+        if max_entries is not None and num_dirs + num_files == max_entries:
+            truncated = True
+            break
+        if entry["type"] == "dir":
+            num_dirs += 1
+        else:
+            num_files += 1
+        out.write(json.dumps(entry) + "\n")
+    out.write(json.dumps({"type": "summary", "dirs": num_dirs, "files": num_files, "truncated": truncated}) + "\n")
+    out.flush()
 
 
 def main():
@@ -92,17 +195,33 @@ def main():
     parser.add_argument("--path", required=True, help="Relative path to directory")
     parser.add_argument("--recursive", action="store_true", help="List recursively")
     parser.add_argument("--skip-ignored", action="store_true", help="Skip ignored files/dirs")
-    
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help="Maximum recursion depth (implies --recursive); deeper directories are summarized")
+    parser.add_argument("--max-entries", type=int, default=None, help="Maximum number of entries to list")
+    parser.add_argument("--stream", action="store_true", help="Print entries as JSON lines as soon as they are found")
+
     args = parser.parse_args()
-    
+
     try:
-        result = list_directory(
-            args.project_root,
-            args.path,
-            args.recursive,
-            args.skip_ignored
-        )
-        print(json.dumps(result, indent=2))
+        if args.stream:
+            stream_directory(
+                args.project_root,
+                args.path,
+                args.recursive,
+                args.skip_ignored,
+                args.max_depth,
+                args.max_entries
+            )
+        else:
+            result = list_directory(
+                args.project_root,
+                args.path,
+                args.recursive,
+                args.skip_ignored,
+                args.max_depth,
+                args.max_entries
+            )
+            print(json.dumps(result, indent=2))
     except Exception as e:
         context = {
             "project_root": args.project_root,
@@ -10,6 +10,12 @@ import sys
 from pathlib import Path
 from fnmatch import fnmatch
 
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.utils import decode_continuation_token, paginate_output
+
 
 CODE_EXTENSIONS = {
     '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.c', '.cpp', '.h', '.hpp',
@@ -48,7 +54,52 @@ def search_pattern(
     exclude_glob: str | None = None
 ):
     """Search for regex pattern in files"""
-    
+    matches = iter_pattern_matches(project_root, pattern, search_path, context, code_only, include_glob, exclude_glob)
+    return dict(file_matches for _, file_matches in matches)
+
+
+def search_pattern_paginated(
+    project_root: str,
+    pattern: str,
+    search_path: str = "",
+    context: int = 0,
+    code_only: bool = False,
+    include_glob: str | None = None,
+    exclude_glob: str | None = None,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """Search for regex pattern in files, returning JSON limited to max_answer_chars (with a continuation token if truncated)"""
+    query = {
+        "operation": "search_for_pattern",
+        "pattern": pattern,
+        "path": search_path,
+        "context": context,
+        "code_only": code_only,
+        "include_glob": include_glob,
+        "exclude_glob": exclude_glob
+    }
+    start = decode_continuation_token(continuation_token, query) if continuation_token else None
+    matches = iter_pattern_matches(project_root, pattern, search_path, context, code_only, include_glob, exclude_glob, start)
+    return paginate_output(matches, project_root, max_answer_chars, query, continuation_token, assemble=dict)
+
+
+def iter_pattern_matches(
+    project_root: str,
+    pattern: str,
+    search_path: str = "",
+    context: int = 0,
+    code_only: bool = False,
+    include_glob: str | None = None,
+    exclude_glob: str | None = None,
+    start: list | None = None
+):
+    """
+    Search for regex pattern in files, file by file (in a deterministic order)
+
+    Yields pairs (position, (relative path, matches)) for the files containing matches, where position is
+    [file index, relative path], from which the search can be resumed (see the start parameter)
+    """
     if search_path:
         full_search_path = os.path.join(project_root, search_path)
     else:
@@ -60,56 +111,62 @@ def search_pattern(
     # Compile regex with DOTALL flag
     regex = re.compile(pattern, re.DOTALL | re.IGNORECASE)
     
-    results = {}
-    
     # Determine if searching file or directory
     if os.path.isfile(full_search_path):
         search_files = [full_search_path]
     else:
         search_files = []
         for root, dirs, files in os.walk(full_search_path):
-            dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', 'node_modules', '.serena'}]
+            dirs[:] = sorted(d for d in dirs if d not in {'.git', '__pycache__', 'node_modules', '.serena'})
             
-            for filename in files:
+            for filename in sorted(files):
                 file_path = os.path.join(root, filename)
                 rel_path = os.path.relpath(file_path, project_root)
                 
                 if should_search_file(rel_path, code_only, include_glob, exclude_glob):
                     search_files.append(file_path)
     
+    first_index = 0
+    if start is not None:
+        first_index, first_rel_path = start
+        rel_paths = [os.path.relpath(file_path, project_root) for file_path in search_files]
+        if first_index >= len(rel_paths) or rel_paths[first_index] != first_rel_path:
+            # files were added or removed since the previous page was returned
+            if first_rel_path not in rel_paths:
+                raise ValueError(f"Cannot resume the search: {first_rel_path} no longer exists; repeat the query without a continuation token")
+            first_index = rel_paths.index(first_rel_path)
+    
     # Search each file
-    for file_path in search_files:
+    for file_index in range(first_index, len(search_files)):
+        file_path = search_files[file_index]
         rel_path = os.path.relpath(file_path, project_root)
         
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 lines = f.readlines()
-            
-            matches = []
-            for i, line in enumerate(lines):
-                if regex.search(line):
-                    # Get context
-                    start_idx = max(0, i - context)
-                    end_idx = min(len(lines), i + context + 1)
-                    
-                    context_lines = []
-                    for j in range(start_idx, end_idx):
-                        prefix = ">>> " if j == i else "    "
-                        context_lines.append(f"{prefix}{j+1}: {lines[j].rstrip()}")
-                    
-                    matches.append({
-                        "line": i + 1,
-                        "content": "\n".join(context_lines)
-                    })
-            
-            if matches:
-                results[rel_path] = matches
-        
         except Exception as e:
             # Skip files that can't be read
-            pass
-    
-    return results
+            continue
+        
+        matches = []
+        for i, line in enumerate(lines):
+            if regex.search(line):
+                # Get context
+                start_idx = max(0, i - context)
+                end_idx = min(len(lines), i + context + 1)
+                
+                context_lines = []
+                for j in range(start_idx, end_idx):
+                    prefix = ">>> " if j == i else "    "
+                    context_lines.append(f"{prefix}{j+1}: {lines[j].rstrip()}")
+                
+                matches.append({
+                    "line": i + 1,
+                    "content": "\n".join(context_lines)
+                })
+        
+        if matches:
+            yield [file_index, rel_path], (rel_path, matches)
 
 
 def main():
@@ -121,20 +178,23 @@ def main():
     parser.add_argument("--code-only", action="store_true", help="Search only code files")
     parser.add_argument("--include-glob", help="Include pattern (e.g., '*.py')")
     parser.add_argument("--exclude-glob", help="Exclude pattern (e.g., '*test*')")
+    parser.add_argument("--max-answer-chars", type=int, default=-1, help="Max output chars per page (-1 for default)")
+    parser.add_argument("--continuation-token", help="Token returned with a truncated result, to get the next page")
     
     args = parser.parse_args()
     
     try:
-        results = search_pattern(
+        print(search_pattern_paginated(
             args.project_root,
             args.pattern,
             args.path,
             args.context,
             args.code_only,
             args.include_glob,
-            args.exclude_glob
-        )
-        print(json.dumps(results, indent=2))
+            args.exclude_glob,
+            args.max_answer_chars,
+            args.continuation_token
+        ))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
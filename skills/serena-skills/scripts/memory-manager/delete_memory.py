@@ -3,27 +3,21 @@
 Delete a project memory
 """
 import argparse
-import os
 import sys
 from pathlib import Path
 
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.memory_store import MemoryStore, memory_file_name
+
 
 def delete_memory(project_root: str, name: str):
-    """Delete memory from project"""
-    memory_dir = Path(project_root) / ".tmp" / ".serena-skills" / "memories"
-    
-    # Ensure .md extension
-    if not name.endswith('.md'):
-        name = f"{name}.md"
-    
-    memory_file = memory_dir / name
-    
-    if not memory_file.exists():
-        raise FileNotFoundError(f"Memory not found: {name}")
-    
-    memory_file.unlink()
+    """Delete memory from project (and remove it from the search index)"""
+    MemoryStore(project_root).delete(name)
     
-    return f"Memory deleted: {name}"
+    return f"Memory deleted: {memory_file_name(name)}"
 
 
 def main():
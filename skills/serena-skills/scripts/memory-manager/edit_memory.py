@@ -10,31 +10,16 @@ from pathlib import Path
 skills_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(skills_root))
 
-from lib.common.utils import replace_content_advanced, format_error
+from lib.common.memory_store import MemoryStore, memory_file_name
+from lib.common.utils import format_error
 
 
 def edit_memory(project_root: str, name: str, needle: str, replace: str, mode: str = "literal"):
-    """Edit memory file"""
-    memory_dir = Path(project_root) / ".tmp" / ".serena-skills" / "memories"
-    
-    if not name.endswith('.md'):
-        name = f"{name}.md"
-    
-    memory_file = memory_dir / name
-    
-    if not memory_file.exists():
-        raise FileNotFoundError(f"Memory not found: {name}")
-    
-    content = memory_file.read_text(encoding='utf-8')
-    
+    """Edit memory file (and update the search index)"""
     # Use advanced replacement
-    new_content, count, first_match_line = replace_content_advanced(
-        content, needle, replace, mode, allow_multiple=False
-    )
-    
-    memory_file.write_text(new_content, encoding='utf-8')
+    count, first_match_line = MemoryStore(project_root).edit(name, needle, replace, mode)
     
-    result = f"Memory updated: {name} ({count} replacement(s))"
+    result = f"Memory updated: {memory_file_name(name)} ({count} replacement(s))"
     if first_match_line:
         result += f" at line {first_match_line}"
     
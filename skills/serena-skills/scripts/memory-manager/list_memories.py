@@ -4,23 +4,19 @@ List all project memories
 """
 import argparse
 import json
-import os
 import sys
 from pathlib import Path
 
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.memory_store import MemoryStore
+
 
 def list_memories(project_root: str):
-    """List all memories in project"""
-    memory_dir = Path(project_root) / ".tmp" / ".serena-skills" / "memories"
-    
-    if not memory_dir.exists():
-        return []
-    
-    memories = []
-    for file in sorted(memory_dir.glob("*.md")):
-        memories.append(file.stem)  # Name without .md extension
-    
-    return memories
+    """List all memories in project (names without .md extension)"""
+    return MemoryStore(project_root).list_memories()
 
 
 def main():
@@ -3,25 +3,19 @@
 Read content from project memory
 """
 import argparse
-import os
 import sys
 from pathlib import Path
 
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.memory_store import MemoryStore
+
 
 def read_memory(project_root: str, name: str):
     """Read memory from project"""
-    memory_dir = Path(project_root) / ".tmp" / ".serena-skills" / "memories"
-    
-    # Ensure .md extension
-    if not name.endswith('.md'):
-        name = f"{name}.md"
-    
-    memory_file = memory_dir / name
-    
-    if not memory_file.exists():
-        raise FileNotFoundError(f"Memory not found: {name}")
-    
-    return memory_file.read_text(encoding='utf-8')
+    return MemoryStore(project_root).read(name)
 
 
 def main():
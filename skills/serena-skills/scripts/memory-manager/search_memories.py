@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Search project memories
+
+Memories are ranked by relevance to the query (BM25) using a persistent inverted index, which is updated
+incrementally; only the memories which are returned are read (to extract snippets).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.memory_store import MemoryStore
+
+
+def search_memories(project_root: str, query: str, top_k: int = 10, context_lines: int = 1):
+    """
+    Search memories in project
+
+    :return: the best matches {"name": ..., "score": ..., "line": ..., "snippet": ...}, best first
+    """
+    return MemoryStore(project_root).search(query, top_k, context_lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search project memories")
+    parser.add_argument("--project-root", required=True, help="Absolute path to project root")
+    parser.add_argument("--query", required=True, help="Search terms")
+    parser.add_argument("--top-k", type=int, default=10, help="Maximum number of memories to return (default: 10)")
+    parser.add_argument("--context-lines", type=int, default=1,
+                        help="Lines of context around the best matching line in snippets (default: 1)")
+
+    args = parser.parse_args()
+
+    try:
+        results = search_memories(args.project_root, args.query, args.top_k, args.context_lines)
+        print(json.dumps(results, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,21 @@
 Write content to project memory
 """
 import argparse
-import os
 import sys
 from pathlib import Path
 
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+from lib.common.memory_store import MemoryStore, memory_file_name
+
 
 def write_memory(project_root: str, name: str, content: str):
-    """Write memory to project"""
-    memory_dir = Path(project_root) / ".tmp" / ".serena-skills" / "memories"
-    memory_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Ensure .md extension
-    if not name.endswith('.md'):
-        name = f"{name}.md"
-    
-    memory_file = memory_dir / name
-    
-    memory_file.write_text(content, encoding='utf-8')
+    """Write memory to project (and add it to the search index)"""
+    MemoryStore(project_root).write(name, content)
     
-    return f"Memory saved: {name}"
+    return f"Memory saved: {memory_file_name(name)}"
 
 
 def main():
@@ -5,6 +5,7 @@ Activate and register a project
 import argparse
 import json
 import os
+import subprocess
 import sys
 from pathlib import Path
 
@@ -62,7 +63,23 @@ def save_projects(project_root: str, projects):
         json.dump(projects, f, indent=2)
 
 
-def activate_project(project_path: str, name: str | None = None):
+def start_warm_index(project_path: str, language: str) -> str:
+    """Start warming the symbol caches of the project in the background (see warm_index.py)"""
+    warm_index_script = Path(__file__).parent / "warm_index.py"
+    result = subprocess.run(
+        [sys.executable, str(warm_index_script), "--project-root", project_path, "--language", language, "--background"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return f"not started ({result.stderr.strip()})"
+    status = json.loads(result.stdout)
+    if status["status"] == "already_running":
+        return f"already running (pid {status['pid']})"
+    return f"started in background (pid {status['pid']}, progress: warm_index.py --status)"
+
+
+def activate_project(project_path: str, name: str | None = None, warm_index: bool = True):
     """Activate a project"""
     
     project_path = os.path.abspath(project_path)
@@ -111,18 +128,22 @@ def activate_project(project_path: str, name: str | None = None):
         with open(project_yml_path, 'w', encoding='utf-8') as f:
             f.write(yml_content)
     
-    return f"Project activated: {name} ({project_path})\nLanguage: {language}\nConfig: {project_yml_path}"
+    result = f"Project activated: {name} ({project_path})\nLanguage: {language}\nConfig: {project_yml_path}"
+    if warm_index:
+        result += f"\nSymbol cache warm-up: {start_warm_index(project_path, language)}"
+    return result
 
 
 def main():
     parser = argparse.ArgumentParser(description="Activate a project")
     parser.add_argument("--project-path", required=True, help="Absolute path to project")
     parser.add_argument("--name", help="Project name (defaults to directory name)")
+    parser.add_argument("--no-warm-index", action="store_true", help="Do not start warming the symbol caches in the background")
     
     args = parser.parse_args()
     
     try:
-        result = activate_project(args.project_path, args.name)
+        result = activate_project(args.project_path, args.name, warm_index=not args.no_warm_index)
         print(result)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
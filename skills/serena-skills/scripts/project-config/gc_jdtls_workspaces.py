@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Prune stale Eclipse JDTLS (Java language server) workspaces by age and disk budget
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp.language_servers.eclipse_jdtls import JDTLSWorkspace
+from lib.solidlsp.settings import SolidLSPSettings
+
+
+def gc_workspaces(max_age_days: float | None, max_size_mb: float | None, dry_run: bool = False):
+    """Delete stale JDTLS workspaces"""
+    settings = SolidLSPSettings(solidlsp_dir=os.path.expanduser("~/.serena"))
+    deleted = JDTLSWorkspace.gc(settings.ls_resources_dir, max_age_days=max_age_days, max_total_size_mb=max_size_mb, dry_run=dry_run)
+    return {
+        "dry_run": dry_run,
+        "deleted": deleted,
+        "freed_mb": round(sum(ws["size"] for ws in deleted) / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune stale Eclipse JDTLS workspaces")
+    parser.add_argument("--max-age-days", type=float, default=30, help="Delete workspaces unused for this many days (default: 30, 0 to disable)")
+    parser.add_argument("--max-size-mb", type=float, default=None, help="Disk budget for all workspaces; least recently used ones are deleted first")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the workspaces that would be deleted")
+
+    args = parser.parse_args()
+
+    try:
+        result = gc_workspaces(args.max_age_days or None, args.max_size_mb, args.dry_run)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
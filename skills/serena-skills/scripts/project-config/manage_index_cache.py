@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Show the disk usage of the persistent language server index directories and evict stale ones
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp.settings import SolidLSPSettings
+from lib.solidlsp.util.index_dirs import evict_index_dirs, list_index_dirs
+
+
+def to_mb(size: int) -> float:
+    return round(size / (1024 * 1024), 1)
+
+
+def show_usage(solidlsp_dir: str):
+    """List all index directories with their sizes"""
+    index_dirs = list_index_dirs(solidlsp_dir)
+    return {
+        "total_mb": to_mb(sum(d["size"] for d in index_dirs)),
+        "index_dirs": [dict(d, size_mb=to_mb(d.pop("size"))) for d in index_dirs],
+    }
+
+
+def evict(solidlsp_dir: str, max_size_mb: float | None, max_age_days: float | None, dry_run: bool):
+    """Evict index directories exceeding the given limits"""
+    deleted = evict_index_dirs(solidlsp_dir, max_total_size_mb=max_size_mb, max_age_days=max_age_days, dry_run=dry_run)
+    freed = sum(d["size"] for d in deleted)
+    return {
+        "dry_run": dry_run,
+        "deleted": [dict(d, size_mb=to_mb(d.pop("size"))) for d in deleted],
+        "freed_mb": to_mb(freed),
+    }
+
+
+def main():
+    settings = SolidLSPSettings(solidlsp_dir=os.path.expanduser("~/.serena"))
+
+    parser = argparse.ArgumentParser(description="Manage the persistent language server index directories")
+    parser.add_argument("--evict", action="store_true", help="Evict stale index directories (default: only show usage)")
+    parser.add_argument("--max-size-mb", type=float, default=settings.index_cache_max_size_mb,
+                        help=f"Disk budget for all index directories (default: {settings.index_cache_max_size_mb})")
+    parser.add_argument("--max-age-days", type=float, default=settings.index_cache_max_age_days,
+                        help=f"Evict directories unused for this many days (default: {settings.index_cache_max_age_days})")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the directories that would be evicted")
+
+    args = parser.parse_args()
+
+    try:
+        if args.evict:
+            result = evict(settings.solidlsp_dir, args.max_size_mb, args.max_age_days, args.dry_run)
+        else:
+            result = show_usage(settings.solidlsp_dir)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Warm the symbol caches of a project by pre-computing the document symbols of all
+non-ignored source files, such that subsequent symbol queries are served from the cache
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.common.utils import auto_detect_language, get_project_data_dir, is_process_running, spawn_detached
+
+STATUS_FILENAME = "warm_index.json"
+LOG_FILENAME = "warm_index.log"
+
+
+def read_status(project_root: str) -> dict:
+    """Read the status of the last (or current) warm-up job"""
+    status_file = get_project_data_dir(project_root) / STATUS_FILENAME
+    if not status_file.exists():
+        return {"state": "never_run"}
+    try:
+        with open(status_file, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return {"state": "unknown"}
+    # a job that was killed cannot update its status itself
+    if status.get("state") == "running" and not is_process_running(status.get("pid")):
+        status["state"] = "interrupted"
+    return status
+
+
+def write_status(project_root: str, status: dict):
+    """Atomically write the status of the warm-up job"""
+    status_file = get_project_data_dir(project_root) / STATUS_FILENAME
+    status["updated_at"] = time.time()
+    tmp_file = status_file.with_suffix(".json.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_file, status_file)
+
+
+def start_background_warm_up(project_root: str, language: str | None = None) -> dict:
+    """Start the warm-up in a detached process unless one is already running for the project"""
+    project_root = os.path.abspath(project_root)
+    status = read_status(project_root)
+    if status.get("state") == "running":
+        return {"status": "already_running", "pid": status.get("pid")}
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--project-root", project_root]
+    if language:
+        cmd += ["--language", language]
+    log_file = get_project_data_dir(project_root) / LOG_FILENAME
+    pid = spawn_detached(cmd, log_file)
+    return {"status": "started", "pid": pid, "log_file": str(log_file)}
+
+
+def warm_index(project_root: str, language: str | None = None) -> dict:
+    """Pre-compute the document symbols of all source files (files that are already cached are skipped)"""
+    from lib.solidlsp import SolidLanguageServer
+    from lib.solidlsp.ls_config import Language, LanguageServerConfig
+    from lib.common.utils import create_lsp_settings
+
+    project_root = os.path.abspath(project_root)
+
+    # Auto-detect language if not specified
+    if language is None:
+        language = auto_detect_language(project_root)
+        print(f"Auto-detected language: {language}", file=sys.stderr)
+
+    try:
+        lang = Language(language.lower())
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"Unsupported language: {language}") from e
+    ls_config = LanguageServerConfig(
+        code_language=lang,
+        ignored_paths=[],
+        encoding="utf-8"
+    )
+
+    ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=create_lsp_settings(project_root))
+    status = {"state": "running", "pid": os.getpid(), "language": language, "started_at": time.time(),
+              "files_done": 0, "files_total": None}
+    write_status(project_root, status)
+    last_write = 0.0
+
+    def on_progress(num_done: int, num_total: int, relative_path: str):
+        nonlocal last_write
+        status["files_done"] = num_done
+        status["files_total"] = num_total
+        status["current_file"] = relative_path
+        # limit the number of status writes
+        if time.time() - last_write >= 1.0:
+            write_status(project_root, status)
+            last_write = time.time()
+
+    try:
+        ls.start()
+        try:
+            num_computed, num_cached = ls.warm_document_symbols_cache(on_progress=on_progress)
+        finally:
+            ls.stop()
+    except BaseException as e:
+        status["state"] = "failed" if isinstance(e, Exception) else "interrupted"
+        status["error"] = str(e)
+        write_status(project_root, status)
+        raise
+
+    status.pop("current_file", None)
+    status.update(state="completed", files_done=status["files_total"] or 0, files_computed=num_computed, files_cached=num_cached,
+                  duration_seconds=round(time.time() - status["started_at"], 1))
+    write_status(project_root, status)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the symbol caches of a project")
+    parser.add_argument("--project-root", required=True, help="Absolute path to project root")
+    parser.add_argument("--language", default=None, help="Programming language (auto-detected if not specified)")
+    parser.add_argument("--background", action="store_true", help="Run the warm-up in a detached background process")
+    parser.add_argument("--status", action="store_true", help="Report the progress of the current/last warm-up")
+
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            result = read_status(args.project_root)
+        elif args.background:
+            result = start_background_warm_up(args.project_root, args.language)
+        else:
+            result = warm_index(args.project_root, args.language)
+        print(json.dumps(result, indent=2))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
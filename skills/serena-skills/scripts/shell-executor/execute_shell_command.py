@@ -1,13 +1,129 @@
 #!/usr/bin/env python3
 """
 Execute shell commands safely
+
+Output is read incrementally while the command runs (and can be streamed to stderr with --stream); only the head and
+the tail of long outputs are kept, so memory use is bounded. On timeout, the output produced so far is returned.
+Several commands can be executed concurrently (--command given multiple times) with a limit on the number of
+commands running at the same time (--max-parallel).
 """
 import argparse
+import codecs
 import json
 import os
 import subprocess
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+DEFAULT_MAX_OUTPUT_CHARS = 100000
+# interval (in seconds) at which the memory usage of a running command is sampled
+MEMORY_SAMPLING_INTERVAL = 0.05
+READ_CHUNK_SIZE = 65536
+
+
+class HeadTailBuffer:
+    """
+    Keeps the first and the last characters of a text stream of unbounded length
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_OUTPUT_CHARS):
+        """
+        :param max_chars: the maximum number of characters to keep (half of them from the head and half from the tail);
+            -1 for no limit
+        """
+        self.head_limit = max_chars // 2 if max_chars >= 0 else float("inf")
+        self.tail_limit = max_chars - self.head_limit if max_chars >= 0 else 0
+        self._head = []
+        self._head_length = 0
+        self._tail = deque()
+        self._tail_length = 0
+        self.total_chars = 0
+
+    def write(self, text: str) -> None:
+        self.total_chars += len(text)
+        if self._head_length < self.head_limit:
+            head_part = text[: self.head_limit - self._head_length] if self.head_limit != float("inf") else text
+            self._head.append(head_part)
+            self._head_length += len(head_part)
+            text = text[len(head_part) :]
+        if text and self.tail_limit > 0:
+            self._tail.append(text)
+            self._tail_length += len(text)
+            # drop chunks which are entirely outside of the tail
+            while self._tail_length - len(self._tail[0]) >= self.tail_limit:
+                self._tail_length -= len(self._tail.popleft())
+
+    @property
+    def omitted_chars(self) -> int:
+        return self.total_chars - self._head_length - min(self._tail_length, self.tail_limit)
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)[-self.tail_limit :] if self.tail_limit > 0 else ""
+        omitted_chars = self.omitted_chars
+        if omitted_chars > 0:
+            return f"{head}\n... [{omitted_chars} characters omitted] ...\n{tail}"
+        return head + tail
+
+
+def _read_stream(stream, buffer: HeadTailBuffer, tee: Callable[[str], None] | None) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = stream.fileno()
+    while True:
+        data = os.read(fd, READ_CHUNK_SIZE)
+        text = decoder.decode(data, final=not data)
+        if text:
+            buffer.write(text)
+            if tee is not None:
+                tee(text)
+        if not data:
+            break
+    stream.close()
+
+
+def _get_process_tree(pid: int) -> list:
+    """
+    :return: the psutil processes of the process with the given pid and its descendants (empty if psutil is unavailable)
+    """
+    try:
+        import psutil  # imported lazily, as it is needed only for sampling memory usage and terminating process trees
+    except ImportError:
+        return []
+    try:
+        process = psutil.Process(pid)
+        return [process] + process.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def _get_memory_usage(pid: int) -> int | None:
+    """
+    :return: the resident memory (in bytes) of the process with the given pid and its descendants
+    """
+    total = None
+    for process in _get_process_tree(pid):
+        try:
+            total = (total or 0) + process.memory_info().rss
+        except Exception:
+            # the process terminated in the meantime
+            pass
+    return total
+
+
+def _kill_process_tree(proc: subprocess.Popen) -> None:
+    # the shell's descendants must be killed too, as they may keep the output pipes open;
+    # the shell is killed first, such that it does not continue with the next command once a descendant was killed
+    descendants = _get_process_tree(proc.pid)[1:]
+    proc.kill()
+    for process in descendants:
+        try:
+            process.kill()
+        except Exception:
+            pass
 
 
 def execute_command(
@@ -15,73 +131,139 @@ def execute_command(
     command: str,
     timeout: int = 30,
     capture_output: bool = True,
-    env: dict | None = None
+    env: dict | None = None,
+    max_output_chars: int = DEFAULT_MAX_OUTPUT_CHARS,
+    tee: Callable[[str, str], None] | None = None,
 ):
-    """Execute a shell command"""
-    
+    """
+    Execute a shell command
+
+    :param max_output_chars: the maximum number of characters of stdout and stderr (each) to return; for longer outputs,
+        the head and the tail are returned. -1 for no limit
+    :param tee: a function which is called with the stream name ("stdout" or "stderr") and each piece of output as
+        soon as it has been read
+    """
+
     if not os.path.exists(project_root):
         raise FileNotFoundError(f"Project root does not exist: {project_root}")
-    
+
     # Prepare environment
     exec_env = os.environ.copy()
     if env:
         exec_env.update(env)
-    
+
     # Execute command
     start_time = time.time()
-    
+    buffers = {"stdout": HeadTailBuffer(max_output_chars), "stderr": HeadTailBuffer(max_output_chars)}
+    peak_memory = None
+    timed_out = False
+
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=project_root,
-            capture_output=capture_output,
-            text=True,
-            timeout=timeout,
-            env=exec_env
-        )
-        
-        duration = time.time() - start_time
-        
-        return {
-            "exit_code": result.returncode,
-            "stdout": result.stdout if capture_output else "",
-            "stderr": result.stderr if capture_output else "",
-            "duration": round(duration, 2),
-            "timed_out": False
-        }
-    
-    except subprocess.TimeoutExpired:
+        pipe = subprocess.PIPE if capture_output else None
+        proc = subprocess.Popen(command, shell=True, cwd=project_root, stdout=pipe, stderr=pipe, env=exec_env)
+
+        readers = []
+        if capture_output:
+            for name in buffers:
+                stream_tee = (lambda text, name=name: tee(name, text)) if tee is not None else None
+                reader = threading.Thread(target=_read_stream, args=(getattr(proc, name), buffers[name], stream_tee), daemon=True)
+                reader.start()
+                readers.append(reader)
+
+        # wait for the command to finish, sampling its memory usage
+        deadline = start_time + timeout
+        while True:
+            memory = _get_memory_usage(proc.pid)
+            if memory:
+                peak_memory = max(peak_memory or 0, memory)
+            try:
+                proc.wait(timeout=max(0.0, min(MEMORY_SAMPLING_INTERVAL, deadline - time.time())))
+                break
+            except subprocess.TimeoutExpired:
+                if time.time() >= deadline:
+                    timed_out = True
+                    _kill_process_tree(proc)
+                    proc.wait()
+                    break
+
+        for reader in readers:
+            # processes which were started in the background may keep the pipes open
+            reader.join(timeout=1.0)
+
         duration = time.time() - start_time
+        stderr = buffers["stderr"].getvalue()
+        if timed_out:
+            stderr += ("\n" if stderr and not stderr.endswith("\n") else "") + f"Command timed out after {timeout} seconds"
+
         return {
-            "exit_code": 124,  # Standard timeout exit code
-            "stdout": "",
-            "stderr": f"Command timed out after {timeout} seconds",
+            "exit_code": 124 if timed_out else proc.returncode,  # Standard timeout exit code
+            "stdout": buffers["stdout"].getvalue(),
+            "stderr": stderr,
             "duration": round(duration, 2),
-            "timed_out": True
+            "timed_out": timed_out,
+            "output_truncated": any(buffer.omitted_chars > 0 for buffer in buffers.values()),
+            "peak_memory_mb": round(peak_memory / 1024**2, 1) if peak_memory is not None else None
         }
-    
+
     except Exception as e:
         duration = time.time() - start_time
         return {
             "exit_code": 1,
-            "stdout": "",
+            "stdout": buffers["stdout"].getvalue(),
             "stderr": str(e),
             "duration": round(duration, 2),
-            "timed_out": False
+            "timed_out": False,
+            "output_truncated": False,
+            "peak_memory_mb": None
         }
 
 
+def execute_commands(
+    project_root: str,
+    commands: list[str],
+    timeout: int = 30,
+    capture_output: bool = True,
+    env: dict | None = None,
+    max_output_chars: int = DEFAULT_MAX_OUTPUT_CHARS,
+    max_parallel: int | None = None,
+    tee: Callable[[int, str, str], None] | None = None,
+) -> list[dict]:
+    """
+    Execute several shell commands concurrently
+
+    :param max_parallel: the maximum number of commands running at the same time (default: number of CPUs)
+    :param tee: a function which is called with the index of the command, the stream name and each piece of output
+    :return: the results (as returned by execute_command, plus the command), in the order of the commands
+    """
+    if not os.path.exists(project_root):
+        raise FileNotFoundError(f"Project root does not exist: {project_root}")
+
+    def run(index: int) -> dict:
+        command_tee = (lambda name, text: tee(index, name, text)) if tee is not None else None
+        result = execute_command(project_root, commands[index], timeout, capture_output, env, max_output_chars, command_tee)
+        return {"command": commands[index], **result}
+
+    with ThreadPoolExecutor(max_workers=max_parallel or os.cpu_count() or 1) as executor:
+        return list(executor.map(run, range(len(commands))))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Execute shell command")
     parser.add_argument("--project-root", required=True, help="Working directory")
-    parser.add_argument("--command", required=True, help="Command to execute")
-    parser.add_argument("--timeout", type=int, default=30, help="Timeout in seconds")
+    parser.add_argument("--command", required=True, action="append",
+                        help="Command to execute (can be given multiple times to execute commands concurrently)")
+    parser.add_argument("--timeout", type=int, default=30, help="Timeout in seconds (per command)")
     parser.add_argument("--no-capture", action="store_true", help="Don't capture output")
     parser.add_argument("--env", help="Environment variables (JSON)")
-    
+    parser.add_argument("--max-output-chars", type=int, default=DEFAULT_MAX_OUTPUT_CHARS,
+                        help=f"Maximum characters of stdout/stderr (each) to return; for longer outputs, the head and tail "
+                             f"are kept. -1 for no limit (default: {DEFAULT_MAX_OUTPUT_CHARS})")
+    parser.add_argument("--max-parallel", type=int, default=None,
+                        help="Maximum number of commands running at the same time (default: number of CPUs)")
+    parser.add_argument("--stream", action="store_true", help="Stream the output to stderr while the command runs")
+
     args = parser.parse_args()
-    
+
     # Parse environment variables
     env = None
     if args.env:
@@ -90,22 +272,52 @@ def main():
         except json.JSONDecodeError:
             print("Error: Invalid JSON for --env", file=sys.stderr)
             sys.exit(1)
-    
+
+    tee = None
+    if args.stream:
+        tee_lock = threading.Lock()
+
+        def tee(index: int, name: str, text: str) -> None:
+            with tee_lock:
+                if len(args.command) > 1:
+                    text = "".join(f"[{index}] {line}" for line in text.splitlines(keepends=True))
+                sys.stderr.write(text)
+                sys.stderr.flush()
+
     try:
-        result = execute_command(
-            args.project_root,
-            args.command,
-            args.timeout,
-            not args.no_capture,
-            env
-        )
-        
+        if len(args.command) == 1:
+            result = execute_command(
+                args.project_root,
+                args.command[0],
+                args.timeout,
+                not args.no_capture,
+                env,
+                args.max_output_chars,
+                (lambda name, text: tee(0, name, text)) if tee is not None else None
+            )
+            exit_code = result["exit_code"]
+        else:
+            start_time = time.time()
+            results = execute_commands(
+                args.project_root,
+                args.command,
+                args.timeout,
+                not args.no_capture,
+                env,
+                args.max_output_chars,
+                args.max_parallel,
+                tee
+            )
+            num_failed = sum(1 for r in results if r["exit_code"] != 0)
+            result = {"results": results, "failed": num_failed, "duration": round(time.time() - start_time, 2)}
+            exit_code = 1 if num_failed else 0
+
         # Print result as JSON
         print(json.dumps(result, indent=2))
-        
+
         # Exit with command's exit code
-        sys.exit(result["exit_code"])
-    
+        sys.exit(exit_code)
+
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Build (or update) the project-wide reference graph index, which is used by
+find_referencing_symbols.py --use-index
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add serena-skills to path
+skills_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(skills_root))
+
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
+
+activate_venv(skills_root)
+
+from lib.solidlsp import SolidLanguageServer
+from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.ls_reference_index import ReferenceGraphIndex, ReferenceIndexProgress
+from lib.solidlsp.settings import SolidLSPSettings
+from lib.common.utils import auto_detect_language, get_project_data_dir, spawn_detached
+
+PROJECT_DATA_RELATIVE_PATH = ".tmp/.serena-skills"
+
+
+def spawn_background(args: argparse.Namespace) -> dict:
+    """Re-launch this script as a detached process, logging to the project data directory"""
+    log_file = get_project_data_dir(args.project_root) / "reference_index.log"
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--project-root", args.project_root, "--strategy", args.strategy]
+    if args.language:
+        cmd += ["--language", args.language]
+    pid = spawn_detached(cmd, log_file)
+    return {"status": "started", "pid": pid, "log_file": str(log_file)}
+
+
+def build_reference_index(
+    project_root: str,
+    language: str | None = None,
+    strategy: str = "references",
+    status_only: bool = False,
+):
+    """Refresh the reference graph index and compute all missing references"""
+
+    # Auto-detect language if not specified
+    if language is None:
+        language = auto_detect_language(project_root)
+        print(f"Auto-detected language: {language}", file=sys.stderr)
+
+    try:
+        lang = Language(language.lower())
+    except (ValueError, KeyError) as e:
+        print(f"Error: Unsupported language '{language}'", file=sys.stderr)
+        raise ValueError(f"Unsupported language: {language}") from e
+    ls_config = LanguageServerConfig(
+        code_language=lang,
+        ignored_paths=[],
+        encoding="utf-8"
+    )
+
+    settings = SolidLSPSettings(
+        solidlsp_dir=os.path.expanduser("~/.serena"),
+        project_data_relative_path=PROJECT_DATA_RELATIVE_PATH
+    )
+
+    ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=settings)
+    if status_only:
+        index = ReferenceGraphIndex(ls, strategy=strategy)
+        try:
+            return index.get_statistics()
+        finally:
+            index.close()
+
+    ls.start()
+    index = ReferenceGraphIndex(ls, strategy=strategy)
+    try:
+        last_reported: dict[str, int] = {}
+
+        def on_progress(progress: ReferenceIndexProgress) -> None:
+            # report roughly every 5 percent
+            step = max(1, progress.num_total // 20)
+            if progress.num_done - last_reported.get(progress.phase, -step) >= step:
+                last_reported[progress.phase] = progress.num_done
+                print(f"[{progress.phase}] {progress.num_done}/{progress.num_total}", file=sys.stderr)
+
+        num_computed = index.update(on_progress=on_progress)
+        result = index.get_statistics()
+        result["symbols_computed"] = num_computed
+        return result
+    finally:
+        index.close()
+        ls.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the project-wide reference graph index")
+    parser.add_argument("--project-root", required=True, help="Absolute path to project root")
+    parser.add_argument("--language", default=None, help="Programming language (auto-detected if not specified)")
+    parser.add_argument("--strategy", choices=["references", "call_hierarchy"], default="references",
+                        help="How references are obtained (default: references)")
+    parser.add_argument("--background", action="store_true", help="Build the index in a detached background process")
+    parser.add_argument("--status", action="store_true", help="Only report the state of the index (no language server is started)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.background:
+            result = spawn_background(args)
+        else:
+            result = build_reference_index(args.project_root, args.language, args.strategy, status_only=args.status)
+        print(json.dumps(result, indent=2))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,29 +3,24 @@
 Find references to a symbol using LSP
 """
 import argparse
-import json
 import os
 import sys
-import platform
 from pathlib import Path
 
-# Auto-activate venv if available
+# Add serena-skills to path
 skills_root = Path(__file__).parent.parent.parent
-if platform.system() == "Windows":
-    venv_python = skills_root / ".venv" / "Scripts" / "python.exe"
-else:
-    venv_python = skills_root / ".venv" / "bin" / "python"
+sys.path.insert(0, str(skills_root))
 
-if venv_python.exists() and str(Path(sys.executable).parent) != str(venv_python.parent):
-    os.execv(str(venv_python), [str(venv_python)] + sys.argv)
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
 
-# Add serena-skills to path
-sys.path.insert(0, str(skills_root))
+activate_venv(skills_root)
 
 from lib.solidlsp import SolidLanguageServer
 from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.ls_reference_index import CALLABLE_SYMBOL_KINDS, ReferenceGraphIndex
 from lib.solidlsp.settings import SolidLSPSettings
-from lib.common.utils import auto_detect_language
+from lib.common.utils import auto_detect_language, decode_continuation_token, paginate_output
 
 
 def find_references(
@@ -33,9 +28,21 @@ def find_references(
     file: str,
     symbol: str,
     language: str | None = None,
-    lsp_timeout: float = 10.0
-):
-    """Find all references to a symbol"""
+    lsp_timeout: float = 10.0,
+    use_index: bool = False,
+    callers_only: bool = False,
+    transitive_depth: int = 0,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """
+    Find all references to a symbol, returning JSON limited to max_answer_chars
+
+    If the limit is reached, only the references that fit are returned together with a continuation token
+    """
+    # validate the token before starting the language server
+    if continuation_token:
+        decode_continuation_token(continuation_token, _references_query(file, symbol, use_index, callers_only, transitive_depth))
     
     # Auto-detect language if not specified
     if language is None:
@@ -72,65 +79,152 @@ def find_references(
         raise
     
     try:
-        # First find the symbol definition
-        full_path = os.path.join(project_root, file)
-        # Get document symbols to find the target
-        doc_symbols = ls.request_document_symbols(file).root_symbols
-
-        def find_target(syms):
-            for sym in syms:
-                name = sym.get("name")
-                if name == symbol or (name and symbol.endswith(f"/{name}")):
-                    return sym
-                children = sym.get("children") or []
-                found = find_target(children)
-                if found:
-                    return found
-            return None
-
-        target_sym = find_target(doc_symbols)
-        
-        if not target_sym:
-            return []
+        return paginate_references_with_ls(
+            ls, project_root, file, symbol, use_index, callers_only, transitive_depth, max_answer_chars, continuation_token
+        )
         
-        # Find references
-        range_info = target_sym.get("range") or {}
-        start_info = range_info.get("start") or {}
-        line = start_info.get("line")
-        character = start_info.get("character")
-        if line is None or character is None:
+    finally:
+        ls.stop()
+
+
+def _references_query(file: str, symbol: str, use_index: bool, callers_only: bool, transitive_depth: int) -> dict:
+    """The parameters to which continuation tokens of a reference search are bound"""
+    return {
+        "operation": "find_referencing_symbols",
+        "file": file,
+        "symbol": symbol,
+        "use_index": use_index,
+        "callers_only": callers_only,
+        "transitive_depth": transitive_depth
+    }
+
+
+def paginate_references_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    file: str,
+    symbol: str,
+    use_index: bool = False,
+    callers_only: bool = False,
+    transitive_depth: int = 0,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """Find all references to a symbol as JSON using a started language server, limited to max_answer_chars (see find_references)"""
+    query = _references_query(file, symbol, use_index, callers_only, transitive_depth)
+    start = decode_continuation_token(continuation_token, query) if continuation_token else 0
+    results = find_references_with_ls(ls, project_root, file, symbol, use_index, callers_only, transitive_depth)
+    return paginate_output(
+        ((position, result) for position, result in enumerate(results) if position >= start),
+        project_root, max_answer_chars, query, continuation_token
+    )
+
+
+def find_references_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    file: str,
+    symbol: str,
+    use_index: bool = False,
+    callers_only: bool = False,
+    transitive_depth: int = 0
+):
+    """Find all references to a symbol using a started language server"""
+    if use_index or callers_only or transitive_depth > 0:
+        return find_references_in_index(ls, file, symbol, callers_only, transitive_depth)
+
+    # First find the symbol definition
+    full_path = os.path.join(project_root, file)
+    # Get document symbols to find the target
+    doc_symbols = ls.request_document_symbols(file).root_symbols
+
+    def find_target(syms):
+        for sym in syms:
+            name = sym.get("name")
+            if name == symbol or (name and symbol.endswith(f"/{name}")):
+                return sym
+            children = sym.get("children") or []
+            found = find_target(children)
+            if found:
+                return found
+        return None
+
+    target_sym = find_target(doc_symbols)
+
+    if not target_sym:
+        return []
+
+    # Find references
+    range_info = target_sym.get("range") or {}
+    start_info = range_info.get("start") or {}
+    line = start_info.get("line")
+    character = start_info.get("character")
+    if line is None or character is None:
+        return []
+    references = ls.request_references(file, line, character)
+
+    results = []
+    for ref in references:
+        ref_uri = ref.get("uri")
+        ref_path = Path(ref_uri.replace("file://", "")).relative_to(project_root) if ref_uri else None
+        ref_range = ref.get("range") or {}
+        ref_start = ref_range.get("start") or {}
+        ref_line = ref_start.get("line")
+
+        # Get code snippet around reference
+        snippet = ""
+        if ref_path and ref_line is not None:
+            ref_file_path = os.path.join(project_root, str(ref_path))
+            if os.path.exists(ref_file_path):
+                with open(ref_file_path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+                    start = max(0, ref_line - 1)
+                    end = min(len(lines), ref_line + 2)
+                    snippet = "".join(lines[start:end])
+
+        results.append({
+            "relative_path": str(ref_path) if ref_path else None,
+            "line": ref_line,
+            "snippet": snippet
+        })
+
+    return results
+
+
+def find_references_in_index(
+    ls: SolidLanguageServer,
+    file: str,
+    symbol: str,
+    callers_only: bool = False,
+    transitive_depth: int = 0
+):
+    """
+    Look up referencing symbols in the reference graph index (see build_reference_index.py)
+
+    Only the queried file and the files of its indexed referencing symbols are brought up to date (the whole project
+    is refreshed by build_reference_index.py); missing references are computed on demand.
+    """
+    index = ReferenceGraphIndex(ls)
+    try:
+        index.refresh_files([file])
+        symbols = index.find_symbols(file, symbol)
+        if not symbols:
             return []
-        references = ls.request_references(file, line, character)
-        
-        results = []
-        for ref in references:
-            ref_uri = ref.get("uri")
-            ref_path = Path(ref_uri.replace("file://", "")).relative_to(project_root) if ref_uri else None
-            ref_range = ref.get("range") or {}
-            ref_start = ref_range.get("start") or {}
-            ref_line = ref_start.get("line")
-            
-            # Get code snippet around reference
-            snippet = ""
-            if ref_path and ref_line is not None:
-                ref_file_path = os.path.join(project_root, str(ref_path))
-                if os.path.exists(ref_file_path):
-                    with open(ref_file_path, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        start = max(0, ref_line - 1)
-                        end = min(len(lines), ref_line + 2)
-                        snippet = "".join(lines[start:end])
-            
-            results.append({
-                "relative_path": str(ref_path) if ref_path else None,
-                "line": ref_line,
-                "snippet": snippet
-            })
-        
+        # changes to these files invalidate the affected references, which are then recomputed
+        index.refresh_files({edge.relative_path for s in symbols for edge in s.references or []})
+        if transitive_depth > 0:
+            impact = index.get_transitive_impact(file, symbol, max_depth=transitive_depth)
+            results = [dict(edge.to_dict(), depth=depth) for depth, edge in impact]
+            if callers_only:
+                results = [r for r in results if r["via_call_hierarchy"] or r["kind"] in CALLABLE_SYMBOL_KINDS]
+        elif callers_only:
+            results = [edge.to_dict() for edge in index.get_callers(file, symbol) or []]
+        else:
+            results = [edge.to_dict() for edge in index.get_referencing_symbols(file, symbol) or []]
+        index.save()
         return results
-        
     finally:
-        ls.stop()
+        index.close()
 
 
 def main():
@@ -140,18 +234,29 @@ def main():
     parser.add_argument("--symbol", required=True, help="Symbol name path")
     parser.add_argument("--language", default=None, help="Programming language (auto-detected if not specified)")
     parser.add_argument("--lsp-timeout", type=float, default=10.0, help="LSP analysis timeout in seconds (default: 10)")
+    parser.add_argument("--use-index", action="store_true", help="Return referencing symbols from the reference graph index")
+    parser.add_argument("--callers-only", action="store_true", help="Only return referencing functions/methods (implies --use-index)")
+    parser.add_argument("--transitive-depth", type=int, default=0,
+                        help="Also return symbols referencing the symbol indirectly, up to the given depth (implies --use-index)")
+    parser.add_argument("--max-answer-chars", type=int, default=-1, help="Max output chars per page (-1 for default)")
+    parser.add_argument("--continuation-token", help="Token returned with a truncated result, to get the next page")
     
     args = parser.parse_args()
     
     try:
-        results = find_references(
+        output = find_references(
             args.project_root,
             args.file,
             args.symbol,
             args.language,
-            args.lsp_timeout
+            args.lsp_timeout,
+            args.use_index,
+            args.callers_only,
+            args.transitive_depth,
+            args.max_answer_chars,
+            args.continuation_token
         )
-        print(json.dumps(results, indent=2))
+        print(output)
     except ValueError as e:
         # Language detection or validation error
         print(f"Error: {e}", file=sys.stderr)
@@ -3,30 +3,25 @@
 Find symbols by name path pattern using LSP
 """
 import argparse
-import json
 import os
 import sys
-import platform
 from pathlib import Path
 
-# Auto-activate venv if available
+# Add serena-skills to path
 skills_root = Path(__file__).parent.parent.parent
-if platform.system() == "Windows":
-    venv_python = skills_root / ".venv" / "Scripts" / "python.exe"
-else:
-    venv_python = skills_root / ".venv" / "bin" / "python"
+sys.path.insert(0, str(skills_root))
 
-if venv_python.exists() and str(Path(sys.executable).parent) != str(venv_python.parent):
-    os.execv(str(venv_python), [str(venv_python)] + sys.argv)
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
 
-# Add serena-skills to path
-sys.path.insert(0, str(skills_root))
+activate_venv(skills_root)
 
 from lib.solidlsp import SolidLanguageServer
 from lib.solidlsp.ls_config import Language, LanguageServerConfig
+from lib.solidlsp.ls_sharding import ShardedLanguageServer
 from lib.solidlsp.settings import SolidLSPSettings
 from lib.solidlsp.ls_types import SymbolKind
-from lib.common.utils import auto_detect_language
+from lib.common.utils import auto_detect_language, decode_continuation_token, paginate_output
 
 
 def find_symbol(
@@ -37,9 +32,20 @@ def find_symbol(
     depth: int = 0,
     include_body: bool = False,
     substring: bool = False,
-    lsp_timeout: float = 10.0
-):
-    """Find symbols matching the name path pattern"""
+    lsp_timeout: float = 10.0,
+    shards: int = 1,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """
+    Find symbols matching the name path pattern, returning JSON limited to max_answer_chars
+
+    If the limit is reached, only the symbols that fit are returned together with a continuation token
+    (the bodies and descendants of the remaining symbols are not computed)
+    """
+    # validate the token before starting the language server
+    if continuation_token:
+        decode_continuation_token(continuation_token, _find_symbol_query(pattern, file, depth, include_body, substring))
     
     # Auto-detect language if not specified
     if language is None:
@@ -64,7 +70,11 @@ def find_symbol(
         project_data_relative_path=".tmp/.serena-skills"
     )
     
-    ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=settings)
+    if shards > 1:
+        # monorepo: one language server process per sub-project, queried concurrently
+        ls = ShardedLanguageServer(ls_config, project_root, solidlsp_settings=settings, max_shards=shards)
+    else:
+        ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=settings)
     
     # Note: LSP timeout is handled internally by language server during initialization
     # The timeout parameter here affects our wait time for results
@@ -78,67 +88,157 @@ def find_symbol(
         raise
     
     try:
-        # Parse pattern
-        is_absolute = pattern.startswith("/")
-        if is_absolute:
-            pattern = pattern[1:]
-        
-        parts = pattern.split("/")
-        
-        # Search workspace symbols (keep file open to ensure TS project context)
-        search_query = parts[-1]  # Use last part for search
-        if file:
-            with ls.open_file(file):
-                workspace_symbols = ls.request_workspace_symbol(search_query) or []
-        else:
-            workspace_symbols = ls.request_workspace_symbol(search_query) or []
-        
-        results = []
-        for sym in workspace_symbols:
-            # Match pattern logic
-            sym_name_path = sym.get("name")  # Simplified - in full implementation, build name path
-            
-            if substring:
-                matches = search_query.lower() in (sym.get("name") or "").lower()
-            else:
-                matches = sym.get("name") == search_query or sym_name_path == pattern
-            
-            if matches:
-                location = sym.get("location") or {}
-                uri = location.get("uri")
-                rel_path = None
-                if uri:
-                    rel_path = str(Path(uri.replace("file://", "")).relative_to(project_root))
-
-                range_info = location.get("range") or {}
-                start_info = range_info.get("start") or {}
-                sym_dict = {
-                    "name": sym.get("name"),
-                    "kind": str(sym.get("kind")),
-                    "relative_path": rel_path,
-                    "line": start_info.get("line"),
-                }
-                
-                if include_body:
-                    # Read file content for body
-                    if sym_dict["relative_path"] and sym_dict["line"] is not None:
-                        file_path = os.path.join(project_root, sym_dict["relative_path"])
-                        if os.path.exists(file_path):
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                lines = f.readlines()
-                                # Simple body extraction - get a few lines
-                                start_line = sym_dict["line"]
-                                end_line = min(start_line + 20, len(lines))
-                                sym_dict["body"] = "".join(lines[start_line:end_line])
-                
-                results.append(sym_dict)
-        
-        return results
+        return paginate_find_symbol_with_ls(
+            ls, project_root, pattern, file, include_body, substring, depth, max_answer_chars, continuation_token
+        )
         
     finally:
         ls.stop()
 
 
+def _find_symbol_query(pattern: str, file: str | None, depth: int, include_body: bool, substring: bool) -> dict:
+    """The parameters to which continuation tokens of a symbol search are bound"""
+    return {
+        "operation": "find_symbol",
+        "pattern": pattern,
+        "file": file,
+        "depth": depth,
+        "include_body": include_body,
+        "substring": substring
+    }
+
+
+def paginate_find_symbol_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    pattern: str,
+    file: str | None = None,
+    include_body: bool = False,
+    substring: bool = False,
+    depth: int = 0,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """Find symbols matching the name path pattern as JSON using a started language server, limited to max_answer_chars (see find_symbol)"""
+    query = _find_symbol_query(pattern, file, depth, include_body, substring)
+    start = decode_continuation_token(continuation_token, query) if continuation_token else 0
+    symbols = iter_symbols_with_ls(ls, project_root, pattern, file, include_body, substring, depth, start)
+    return paginate_output(symbols, project_root, max_answer_chars, query, continuation_token)
+
+
+def find_symbol_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    pattern: str,
+    file: str | None = None,
+    include_body: bool = False,
+    substring: bool = False,
+    depth: int = 0
+):
+    """
+    Find symbols matching the name path pattern using a started language server
+
+    :param depth: the depth up to which the descendants of each matching symbol are included (as "children")
+    """
+    return [sym_dict for _, sym_dict in iter_symbols_with_ls(ls, project_root, pattern, file, include_body, substring, depth)]
+
+
+def iter_symbols_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    pattern: str,
+    file: str | None = None,
+    include_body: bool = False,
+    substring: bool = False,
+    depth: int = 0,
+    start: int = 0
+):
+    """
+    Find symbols matching the name path pattern using a started language server, one at a time
+
+    Yields pairs (position, symbol), where position is the index of the symbol among the matches, from which the
+    search can be resumed (see the start parameter); the body and descendants of skipped symbols are not computed
+    """
+    # Parse pattern
+    is_absolute = pattern.startswith("/")
+    if is_absolute:
+        pattern = pattern[1:]
+
+    parts = pattern.split("/")
+
+    # Search workspace symbols (keep file open to ensure TS project context)
+    search_query = parts[-1]  # Use last part for search
+    if file:
+        with ls.open_file(file):
+            workspace_symbols = ls.request_workspace_symbol(search_query) or []
+    else:
+        workspace_symbols = ls.request_workspace_symbol(search_query) or []
+
+    index = 0
+    for sym in workspace_symbols:
+        # Match pattern logic
+        sym_name_path = sym.get("name")  # Simplified - in full implementation, build name path
+
+        if substring:
+            matches = search_query.lower() in (sym.get("name") or "").lower()
+        else:
+            matches = sym.get("name") == search_query or sym_name_path == pattern
+
+        if matches:
+            position = index
+            index += 1
+            if position < start:
+                continue
+            location = sym.get("location") or {}
+            uri = location.get("uri")
+            rel_path = None
+            if uri:
+                rel_path = str(Path(uri.replace("file://", "")).relative_to(project_root))
+
+            range_info = location.get("range") or {}
+            start_info = range_info.get("start") or {}
+            sym_dict = {
+                "name": sym.get("name"),
+                "kind": str(sym.get("kind")),
+                "relative_path": rel_path,
+                "line": start_info.get("line"),
+            }
+
+            if include_body:
+                # Read file content for body
+                if sym_dict["relative_path"] and sym_dict["line"] is not None:
+                    file_path = os.path.join(project_root, sym_dict["relative_path"])
+                    if os.path.exists(file_path):
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            lines = f.readlines()
+                            # Simple body extraction - get a few lines
+                            start_line = sym_dict["line"]
+                            end_line = min(start_line + 20, len(lines))
+                            sym_dict["body"] = "".join(lines[start_line:end_line])
+
+            if depth > 0 and sym_dict["relative_path"] and sym_dict["line"] is not None:
+                sym_dict["children"] = get_descendants(ls, sym_dict["relative_path"], sym_dict["name"], sym_dict["line"], depth)
+
+            yield position, sym_dict
+
+
+def get_descendants(ls: SolidLanguageServer, relative_path: str, name: str, line: int, depth: int) -> list[dict]:
+    """
+    :return: the descendants (up to the given depth) of the symbol with the given name whose declaration starts
+        at the given line
+    """
+    def to_dict(view, current_depth: int) -> dict:
+        entry = {"name": view.name, "kind": str(view.kind), "relative_path": relative_path, "line": view.start_line}
+        if current_depth < depth:
+            entry["children"] = [to_dict(child, current_depth + 1) for child in view.iter_children()]
+        return entry
+
+    for view in ls.request_document_symbols(relative_path).iter_symbol_views():
+        if view.name == name and line in (view.start_line, view.selection_range["start"]["line"]):
+            return [to_dict(child, 1) for child in view.iter_children()]
+    return []
+
+
 def main():
     parser = argparse.ArgumentParser(description="Find symbols by name path pattern")
     parser.add_argument("--project-root", required=True, help="Absolute path to project root")
@@ -149,11 +249,15 @@ def main():
     parser.add_argument("--include-body", action="store_true", help="Include source code")
     parser.add_argument("--substring", action="store_true", help="Enable substring matching")
     parser.add_argument("--lsp-timeout", type=float, default=10.0, help="LSP analysis timeout in seconds (default: 10)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split a monorepo by sub-project roots into up to this many language server processes (default: 1)")
+    parser.add_argument("--max-answer-chars", type=int, default=-1, help="Max output chars per page (-1 for default)")
+    parser.add_argument("--continuation-token", help="Token returned with a truncated result, to get the next page")
     
     args = parser.parse_args()
     
     try:
-        results = find_symbol(
+        output = find_symbol(
             args.project_root,
             args.pattern,
             args.language,
@@ -161,9 +265,12 @@ def main():
             args.depth,
             args.include_body,
             args.substring,
-            args.lsp_timeout
+            args.lsp_timeout,
+            args.shards,
+            args.max_answer_chars,
+            args.continuation_token
         )
-        print(json.dumps(results, indent=2))
+        print(output)
     except ValueError as e:
         # Language detection or validation error
         print(f"Error: {e}", file=sys.stderr)
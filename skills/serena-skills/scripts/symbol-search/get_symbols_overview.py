@@ -6,21 +6,16 @@ import argparse
 import json
 import os
 import sys
-import platform
 from pathlib import Path
 
-# Auto-activate venv if available
+# Add serena-skills to path
 skills_root = Path(__file__).parent.parent.parent
-if platform.system() == "Windows":
-    venv_python = skills_root / ".venv" / "Scripts" / "python.exe"
-else:
-    venv_python = skills_root / ".venv" / "bin" / "python"
+sys.path.insert(0, str(skills_root))
 
-if venv_python.exists() and str(Path(sys.executable).parent) != str(venv_python.parent):
-    os.execv(str(venv_python), [str(venv_python)] + sys.argv)
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
 
-# Add serena-skills to path
-sys.path.insert(0, str(skills_root))
+activate_venv(skills_root)
 
 from lib.solidlsp import SolidLanguageServer
 from solidlsp import ls_types
@@ -28,7 +23,8 @@ from lib.solidlsp.ls_config import Language, LanguageServerConfig
 from lib.common.utils import (
     create_lsp_settings,
     get_project_language,
-    limit_output_length,
+    decode_continuation_token,
+    paginate_output,
     format_error
 )
 
@@ -39,9 +35,19 @@ def get_symbols_overview(
     depth: int = 0,
     language: str | None = None,
     max_answer_chars: int = -1,
-    lsp_timeout: float = 10.0
-):
-    """Get symbols overview for a file"""
+    lsp_timeout: float = 10.0,
+    fast: bool = False,
+    continuation_token: str | None = None
+) -> str:
+    """
+    Get symbols overview for a file as JSON, limited to max_answer_chars
+
+    If the limit is reached, only the top-level symbols that fit are returned together with a continuation token
+    (the remaining symbols are not processed)
+    """
+    # validate the token before starting the language server
+    if continuation_token:
+        decode_continuation_token(continuation_token, _overview_query(relative_file_path, depth))
     
     # Auto-detect language if not provided
     if language is None:
@@ -66,8 +72,12 @@ def get_symbols_overview(
     
     ls = SolidLanguageServer.create(ls_config, project_root, solidlsp_settings=settings)
     
+    # fast mode: Python files are parsed directly, without starting the language server
+    use_parser = fast and relative_file_path.endswith((".py", ".pyi"))
+    
     try:
-        ls.start()
+        if not use_parser:
+            ls.start()
     except TimeoutError as e:
         print(f"Warning: LSP analysis timed out after {lsp_timeout}s", file=sys.stderr)
         print(f"Tip: Try --language {language} if auto-detection is incorrect", file=sys.stderr)
@@ -76,46 +86,96 @@ def get_symbols_overview(
         raise
     
     try:
-        # Get document symbols
-        full_path = os.path.join(project_root, relative_file_path)
-        
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"File not found: {relative_file_path}")
-        
-        symbols = ls.request_document_symbols(relative_file_path).root_symbols
-        
-        # Transform to compact format
-        def get_kind_name(kind_value):
-            if hasattr(kind_value, "name"):
-                return kind_value.name
-            try:
-                return ls_types.SymbolKind(kind_value).name
-            except Exception:
-                return str(kind_value)
-
-        def transform_symbols(syms, current_depth=0):
-            result = {}
-            for sym in syms:
-                kind_name = get_kind_name(sym.get("kind"))
-                if kind_name not in result:
-                    result[kind_name] = []
-                
-                children = sym.get("children") or []
-                if current_depth < depth and children:
-                    children_dict = transform_symbols(children, current_depth + 1)
-                    result[kind_name].append({sym.get("name"): children_dict})
-                else:
-                    result[kind_name].append(sym.get("name"))
-            
-            return result
-        
-        overview = transform_symbols(symbols)
-        return overview
+        return paginate_symbols_overview_with_ls(
+            ls, project_root, relative_file_path, depth, fast, max_answer_chars, continuation_token
+        )
         
     finally:
         ls.stop()
 
 
+def _overview_query(relative_file_path: str, depth: int) -> dict:
+    """The parameters to which continuation tokens of an overview are bound"""
+    return {"operation": "get_symbols_overview", "file": relative_file_path, "depth": depth}
+
+
+def paginate_symbols_overview_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    relative_file_path: str,
+    depth: int = 0,
+    fast: bool = False,
+    max_answer_chars: int = -1,
+    continuation_token: str | None = None
+) -> str:
+    """Get symbols overview for a file as JSON using a language server, limited to max_answer_chars (see get_symbols_overview)"""
+    query = _overview_query(relative_file_path, depth)
+    start = decode_continuation_token(continuation_token, query) if continuation_token else 0
+    entries = iter_symbols_overview_with_ls(ls, project_root, relative_file_path, depth, fast, start)
+    return paginate_output(entries, project_root, max_answer_chars, query, continuation_token, assemble=group_by_kind)
+
+
+def get_symbols_overview_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    relative_file_path: str,
+    depth: int = 0,
+    fast: bool = False
+):
+    """Get symbols overview for a file using a language server (which must be started unless a Python file is parsed in fast mode)"""
+    return group_by_kind(entry for _, entry in iter_symbols_overview_with_ls(ls, project_root, relative_file_path, depth, fast))
+
+
+def iter_symbols_overview_with_ls(
+    ls: SolidLanguageServer,
+    project_root: str,
+    relative_file_path: str,
+    depth: int = 0,
+    fast: bool = False,
+    start: int = 0
+):
+    """
+    Get the overview entries of the top-level symbols of a file, starting with the top-level symbol at index start
+
+    Yields pairs (index, (kind name, entry)), where entry is the symbol's name or {name: overview of children}
+    """
+    # Get document symbols
+    full_path = os.path.join(project_root, relative_file_path)
+
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"File not found: {relative_file_path}")
+
+    symbols = ls.request_document_symbols(relative_file_path, fast=fast).root_symbols
+
+    # Transform to compact format
+    def get_kind_name(kind_value):
+        if hasattr(kind_value, "name"):
+            return kind_value.name
+        try:
+            return ls_types.SymbolKind(kind_value).name
+        except Exception:
+            return str(kind_value)
+
+    def transform_symbol(sym, current_depth=0):
+        children = sym.get("children") or []
+        if current_depth < depth and children:
+            entry = {sym.get("name"): group_by_kind(transform_symbol(child, current_depth + 1) for child in children)}
+        else:
+            entry = sym.get("name")
+        return get_kind_name(sym.get("kind")), entry
+
+    for index in range(start, len(symbols)):
+        yield index, transform_symbol(symbols[index])
+
+
+def group_by_kind(entries):
+    """Group (kind name, entry) pairs into a dict mapping kind names to lists of entries"""
+    result = {}
+    for kind_name, entry in entries:
+        result.setdefault(kind_name, []).append(entry)
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description="Get symbols overview from a file")
     parser.add_argument("--project-root", required=True, help="Absolute path to project root")
@@ -124,6 +184,8 @@ def main():
     parser.add_argument("--language", default=None, help="Programming language (auto-detected if not specified)")
     parser.add_argument("--max-answer-chars", type=int, default=-1, help="Max output chars (-1 for default)")
     parser.add_argument("--lsp-timeout", type=float, default=10.0, help="LSP analysis timeout in seconds (default: 10)")
+    parser.add_argument("--fast", action="store_true", help="Parse Python files directly instead of starting the language server")
+    parser.add_argument("--continuation-token", help="Token returned with a truncated result, to get the next page")
     
     args = parser.parse_args()
     
@@ -134,12 +196,11 @@ def main():
             args.depth,
             args.language,
             args.max_answer_chars,
-            args.lsp_timeout
+            args.lsp_timeout,
+            args.fast,
+            args.continuation_token
         )
-        
-        # Apply output limit
-        output = limit_output_length(overview, args.project_root, args.max_answer_chars)
-        print(output)
+        print(overview)
         
     except ValueError as e:
         # Language detection or validation error
@@ -5,21 +5,16 @@ Insert code after a symbol using LSP
 import argparse
 import os
 import sys
-import platform
 from pathlib import Path
 
-# Auto-activate venv if available
+# Add serena-skills to path
 skills_root = Path(__file__).parent.parent.parent
-if platform.system() == "Windows":
-    venv_python = skills_root / ".venv" / "Scripts" / "python.exe"
-else:
-    venv_python = skills_root / ".venv" / "bin" / "python"
+sys.path.insert(0, str(skills_root))
 
-if venv_python.exists() and str(Path(sys.executable).parent) != str(venv_python.parent):
-    os.execv(str(venv_python), [str(venv_python)] + sys.argv)
+# Auto-activate venv if available (unless this interpreter already provides the required packages)
+from lib.common.venv import activate_venv
 
-# Add serena-skills to path
-sys.path.insert(0, str(skills_root))
+activate_venv(skills_root)
 
 from lib.solidlsp import SolidLanguageServer
 from lib.solidlsp.ls_config import Language, LanguageServerConfig